@@ -0,0 +1,101 @@
+"""Shared fixtures for the fan-manager benchmark suite.
+
+Benchmarks are kept out of the default ``pytest`` run (``testpaths = tests``);
+run them explicitly with ``pytest benchmarks``. Every measurement is compared
+with ``benchmarks/baselines.json`` and fails when it regresses by more than
+``FAN_MANAGER_BENCH_THRESHOLD`` (default ``0.5`` = 50% slower). Set
+``FAN_MANAGER_BENCH_UPDATE=1`` to record new baselines instead of gating.
+Full per-benchmark reports go through the ``bench_report`` fixture: they are
+listed at the end of the run and attached to ``--junitxml`` output.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+BASELINES = Path(__file__).with_name("baselines.json")
+THRESHOLD = float(os.environ.get("FAN_MANAGER_BENCH_THRESHOLD", "0.5"))
+UPDATE = os.environ.get("FAN_MANAGER_BENCH_UPDATE", "").lower() in {"1", "true", "yes"}
+
+_reports: dict[str, Any] = {}
+
+
+@pytest.fixture(scope="session")
+def baselines():
+    data = json.loads(BASELINES.read_text()) if BASELINES.is_file() else {}
+    yield data
+    if UPDATE:
+        BASELINES.write_text(json.dumps(dict(sorted(data.items())), indent=2) + "\n")
+
+
+@pytest.fixture
+def regression_gate(baselines) -> Callable[..., float]:
+    """Compare ``value`` (lower is better) for ``name`` with its stored baseline.
+
+    ``slack`` is an absolute allowance added on top of the relative threshold
+    for measurements small enough that scheduler noise dominates.
+    """
+
+    def gate(name: str, value: float, slack: float = 0.0) -> float:
+        if UPDATE:
+            baselines[name] = value
+            return value
+        baseline = baselines.get(name)
+        if baseline is None:
+            pytest.skip(f"no baseline recorded for {name!r}")
+        limit = baseline * (1 + THRESHOLD) + slack
+        assert value <= limit, (
+            f"{name} regressed: {value:.6g} > {limit:.6g} "
+            f"(baseline {baseline:.6g}, threshold {THRESHOLD:.0%})"
+        )
+        return value
+
+    return gate
+
+
+@pytest.fixture
+def bench(regression_gate) -> Callable[..., float]:
+    """Time ``fn`` (best per-call seconds over ``repeat`` rounds) and gate it.
+
+    ``summary`` replaces the best round, e.g. with :func:`statistics.median`
+    for paths whose best case is a lucky thread wake-up.
+    """
+
+    def run(
+        name: str,
+        fn: Callable[[], object],
+        number: int = 100,
+        repeat: int = 5,
+        slack: float = 0.0,
+        summary: Callable[[list[float]], float] = min,
+    ) -> float:
+        per_call = summary(timeit.repeat(fn, number=number, repeat=repeat)) / number
+        return regression_gate(name, per_call, slack=slack)
+
+    return run
+
+
+@pytest.fixture
+def bench_report(record_property) -> Callable[[str, Any], None]:
+    """Record ``report`` (any JSON-able value) under ``name`` for the run summary."""
+
+    def record(name: str, report: Any) -> None:
+        _reports[name] = report
+        record_property(name, json.dumps(report, default=str))
+
+    return record
+
+
+def pytest_terminal_summary(terminalreporter) -> None:
+    if not _reports:
+        return
+    terminalreporter.section("benchmark reports")
+    for name, report in sorted(_reports.items()):
+        terminalreporter.write_line(f"{name}: {json.dumps(report, default=str)}")
@@ -0,0 +1,294 @@
+"""Concurrent load harness for ``fan-manager-mcp`` over streamable-http.
+
+Starts the real server from :func:`fan_manager.mcp_server.get_mcp_instance` in
+a background thread, with a :class:`LatencyRunner` stub standing in for
+``sensors``/``ipmitool`` (each command blocks its caller for ``latency``
+seconds, like a real subprocess wait). ``clients`` concurrent MCP sessions
+then call a mix of ``fan_manager_sensors``, ``fan_manager_temperature`` and
+``fan_manager_power status`` for ``duration`` seconds.
+
+The :class:`LoadReport` gives throughput, latency percentiles (overall and per
+tool) and how long the server's event loop was blocked, measured by a monitor
+task on the server loop that expects to wake every ``interval`` seconds. When
+hardware calls run synchronously on the loop, throughput stays near
+``1 / latency`` however many clients connect and the blocked fraction
+approaches 1.
+
+The stock middleware stack includes a global rate limiter (10 req/s, burst 20)
+that would otherwise dominate the numbers; it is removed unless
+``keep_rate_limit`` is set. Run standalone with::
+
+    python benchmarks/mcp_load.py --clients 16 --duration 10 --latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+SENSORS_JSON = json.dumps(
+    {
+        cpu: {
+            "Adapter": "ISA adapter",
+            **{f"Core {c}": {f"temp{c + 2}_input": 45.0 + c} for c in range(8)},
+        }
+        for cpu in ("coretemp-isa-0000", "coretemp-isa-0001")
+    }
+)
+SDR_LIST = "\n".join(
+    [f"Fan{i} RPM        | 3600 RPM          | ok" for i in range(1, 7)]
+    + [f"Temp{i}            | {40 + i} degrees C      | ok" for i in range(1, 5)]
+)
+
+MIX: list[tuple[str, dict[str, Any]]] = [
+    ("fan_manager_sensors", {"action": "list"}),
+    ("fan_manager_temperature", {"action": "get"}),
+    ("fan_manager_power", {"action": "status"}),
+]
+
+
+class LatencyRunner:
+    """CommandRunner stub that blocks for ``latency`` seconds per command."""
+
+    def __init__(self, latency: float = 0.05) -> None:
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def which(self, name: str) -> str | None:
+        return f"/usr/bin/{name}"
+
+    def run(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> str:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        if argv[0].endswith("sensors"):
+            return SENSORS_JSON
+        if "-V" in argv:
+            return "ipmitool version 1.8.19"
+        if argv[-2:] == ["power", "status"]:
+            return "Chassis Power is on"
+        return SDR_LIST
+
+
+@dataclass
+class LoopMonitor:
+    """Accumulates how late a periodic task on the server loop wakes up."""
+
+    interval: float = 0.005
+    blocked: float = 0.0
+    longest: float = 0.0
+    samples: int = 0
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            late = loop.time() - expected
+            self.samples += 1
+            if late > self.interval:
+                self.blocked += late
+                self.longest = max(self.longest, late)
+
+    def reset(self) -> None:
+        self.blocked = self.longest = 0.0
+        self.samples = 0
+
+
+@dataclass
+class LoadReport:
+    clients: int
+    latency: float
+    duration: float
+    calls: int
+    errors: int
+    throughput: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+    loop_blocked: float
+    loop_blocked_fraction: float
+    longest_block: float
+    per_tool: dict[str, dict[str, float]] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {k: getattr(self, k) for k in self.__dataclass_fields__}
+
+
+def _percentiles(samples: list[float]) -> tuple[float, float, float, float]:
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return value, value, value, value
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return cuts[49], cuts[89], cuts[98], max(samples)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextmanager
+def serve(
+    runner: Any, *, keep_rate_limit: bool = False, interval: float = 0.005
+) -> Iterator[tuple[str, LoopMonitor]]:
+    """Run the MCP server on a private port; yield its URL and loop monitor."""
+    from fastmcp.server.middleware.rate_limiting import RateLimitingMiddleware
+
+    from fan_manager import fan_manager as core
+    from fan_manager.mcp_server import get_mcp_instance
+
+    port = _free_port()
+    previous = core._DEFAULT_RUNNER
+    mcp, _, _, _ = get_mcp_instance(
+        runner=runner, command_args=["--transport", "streamable-http"]
+    )
+    if not keep_rate_limit:
+        mcp.middleware[:] = [
+            mw for mw in mcp.middleware if not isinstance(mw, RateLimitingMiddleware)
+        ]
+
+    monitor = LoopMonitor(interval=interval)
+    ready = threading.Event()
+    state: dict[str, Any] = {}
+
+    async def main() -> None:
+        state["loop"] = asyncio.get_running_loop()
+        state["task"] = asyncio.current_task()
+        watcher = asyncio.create_task(monitor.run())
+        ready.set()
+        try:
+            await mcp.run_http_async(
+                show_banner=False,
+                transport="streamable-http",
+                host="127.0.0.1",
+                port=port,
+                log_level="warning",
+            )
+        finally:
+            watcher.cancel()
+
+    def run_server() -> None:
+        try:
+            asyncio.run(main())
+        except asyncio.CancelledError:
+            pass  # stopped by the harness
+
+    thread = threading.Thread(target=run_server, name="mcp-load-server", daemon=True)
+    thread.start()
+    ready.wait()
+    url = f"http://127.0.0.1:{port}/mcp"
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                break
+        time.sleep(0.02)
+    try:
+        yield url, monitor
+    finally:
+        state["loop"].call_soon_threadsafe(state["task"].cancel)
+        thread.join(timeout=10)
+        core.set_default_runner(previous)
+
+
+async def _client(
+    url: str, index: int, stop_at: float, results: list[tuple[str, float, bool]]
+) -> None:
+    from fastmcp import Client
+
+    async with Client(url) as client:
+        i = index
+        while time.perf_counter() < stop_at:
+            tool, arguments = MIX[i % len(MIX)]
+            i += 1
+            started = time.perf_counter()
+            result = await client.call_tool(tool, arguments, raise_on_error=False)
+            results.append((tool, time.perf_counter() - started, result.is_error))
+
+
+async def drive(url: str, clients: int, duration: float) -> list:
+    """``clients`` concurrent sessions calling the tool mix for ``duration``."""
+    results: list[tuple[str, float, bool]] = []
+    stop_at = time.perf_counter() + duration
+    await asyncio.gather(*(_client(url, i, stop_at, results) for i in range(clients)))
+    return results
+
+
+def run_load(
+    clients: int = 8,
+    duration: float = 5.0,
+    latency: float = 0.05,
+    *,
+    keep_rate_limit: bool = False,
+    warmup: float = 0.5,
+) -> LoadReport:
+    """Serve with a :class:`LatencyRunner` and measure ``clients`` sessions."""
+    with serve(LatencyRunner(latency), keep_rate_limit=keep_rate_limit) as (
+        url,
+        monitor,
+    ):
+        asyncio.run(drive(url, min(clients, 2), warmup))
+        monitor.reset()
+        started = time.perf_counter()
+        results = asyncio.run(drive(url, clients, duration))
+        elapsed = time.perf_counter() - started
+        blocked, longest = monitor.blocked, monitor.longest
+
+    latencies = [seconds for _, seconds, _ in results]
+    p50, p90, p99, worst = _percentiles(latencies)
+    per_tool = {}
+    for tool, _ in MIX:
+        samples = [seconds for name, seconds, _ in results if name == tool]
+        t50, t90, t99, tmax = _percentiles(samples)
+        per_tool[tool] = {"calls": len(samples), "p50": t50, "p99": t99}
+    return LoadReport(
+        clients=clients,
+        latency=latency,
+        duration=elapsed,
+        calls=len(results),
+        errors=sum(1 for *_, failed in results if failed),
+        throughput=len(results) / elapsed,
+        p50=p50,
+        p90=p90,
+        p99=p99,
+        max=worst,
+        loop_blocked=blocked,
+        loop_blocked_fraction=min(1.0, blocked / elapsed),
+        longest_block=longest,
+        per_tool=per_tool,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--keep-rate-limit", action="store_true")
+    args = parser.parse_args()
+    report = run_load(
+        args.clients,
+        args.duration,
+        args.latency,
+        keep_rate_limit=args.keep_rate_limit,
+    )
+    print(json.dumps(report.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
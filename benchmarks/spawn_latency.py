@@ -0,0 +1,94 @@
+"""Command launch latency and RSS of each runner inside an MCP server process.
+
+Each measurement runs in a fresh interpreter that first builds the real server
+with :func:`fan_manager.mcp_server.get_mcp_instance` (importing fastmcp,
+pydantic and the tool domains, as ``fan-manager-mcp`` does) around a runner
+from :func:`fan_manager.spawn.runner_for`, then launches ``true`` ``calls``
+times through that runner. The report gives per-launch latency (median and
+best), the server's RSS before and after the launches and, for the fork-server
+runner, the helper's RSS, which is the memory that mode adds to the host.
+Run standalone with::
+
+    python benchmarks/spawn_latency.py --mode forkserver --calls 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any
+
+
+def _rss_mb(pid: int | str = "self") -> float:
+    """Resident set size of ``pid`` in MiB, from ``/proc``."""
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def measure(mode: str, calls: int = 200) -> dict[str, Any]:
+    """Build the MCP server around a ``mode`` runner and time ``calls`` launches."""
+    from fan_manager.mcp_server import get_mcp_instance
+    from fan_manager.spawn import ForkServerRunner, runner_for
+
+    runner = runner_for(mode)
+    get_mcp_instance(runner=runner, command_args=["--transport", "stdio"])
+    argv = [shutil.which("true") or "/bin/true"]
+    if isinstance(runner, ForkServerRunner):
+        runner.start()
+    runner.run(argv)  # warm up: page in the spawn path, start the helper
+    server_rss = _rss_mb()
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        runner.run(argv)
+        samples.append(time.perf_counter() - started)
+    report = {
+        "mode": mode,
+        "calls": calls,
+        "median": statistics.median(samples),
+        "best": min(samples),
+        "server_rss_mb": round(server_rss, 1),
+        "server_rss_growth_mb": round(_rss_mb() - server_rss, 1),
+        "helper_rss_mb": 0.0,
+    }
+    if isinstance(runner, ForkServerRunner):
+        report["helper_rss_mb"] = round(_rss_mb(runner.start()), 1)
+        runner.close()
+    return report
+
+
+def run_isolated(mode: str, calls: int = 200) -> dict[str, Any]:
+    """:func:`measure` in a fresh interpreter, so modes do not share a heap."""
+    out = subprocess.run(
+        [sys.executable, __file__, "--mode", mode, "--calls", str(calls)],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "FAN_MANAGER_FAST_START": "false"},
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--mode",
+        default="subprocess",
+        choices=("subprocess", "posix_spawn", "forkserver"),
+    )
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(measure(args.mode, args.calls)))
+
+
+if __name__ == "__main__":
+    main()
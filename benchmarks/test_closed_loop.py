@@ -0,0 +1,54 @@
+"""Closed-loop controller benchmark on the simulated thermal host.
+
+Runs ``run_service`` against :class:`fan_manager.simulator.SimulatedHost` in
+virtual time for each built-in curve configuration and a heavy load step, and
+gates the control quality — overshoot, error integral, fan writes and the
+fan-duty integral — against ``baselines.json``. Each metric is the mean over
+the fixed ``SEEDS``, so a change that only reorders the measurement noise does
+not move it. Settling time is reported but not gated: it is set by the last
+noisy excursion past the band and jumps by minutes between seeds.
+"""
+
+from __future__ import annotations
+
+import statistics
+from typing import Any
+
+import pytest
+
+from fan_manager import simulator
+
+WORKLOAD = simulator.Workload.step(600, 40.0, 220.0)
+DURATION = 1800.0
+SEEDS = range(5)
+
+
+def _mean(reports: list[simulator.SimulationReport]) -> dict[str, Any]:
+    """Per-metric mean over seeds; settling time over the runs that settled."""
+    rows = [r.as_dict() for r in reports]
+    settled = [r.pop("settling_time") for r in rows]
+    settled = [t for t in settled if t is not None]
+    mean: dict[str, Any] = {k: statistics.fmean(r[k] for r in rows) for k in rows[0]}
+    mean["settling_time"] = statistics.fmean(settled) if settled else None
+    mean["settled"] = len(settled)
+    return mean
+
+
+@pytest.fixture(scope="module")
+def reports():
+    runs = [
+        simulator.compare(simulator.DEFAULT_CONFIGS, WORKLOAD, DURATION, seed=seed)
+        for seed in SEEDS
+    ]
+    return {name: _mean([run[name] for run in runs]) for name in runs[0]}
+
+
+@pytest.mark.parametrize("config", sorted(simulator.DEFAULT_CONFIGS))
+def test_curve_quality(reports, regression_gate, bench_report, config):
+    report = reports[config]
+    prefix = f"loop.{config}"
+    bench_report(prefix, report)
+    regression_gate(f"{prefix}.overshoot", report["overshoot"], slack=1.0)
+    regression_gate(f"{prefix}.error_integral", report["error_integral"])
+    regression_gate(f"{prefix}.duty_integral", report["duty_integral"])
+    regression_gate(f"{prefix}.fan_writes", report["fan_writes"])
@@ -0,0 +1,215 @@
+"""Microbenchmarks for the control-loop tick and the IPMI/MCP dispatch paths.
+
+A fake CommandRunner (the ``_FakeRunner`` pattern from ``tests/test_ipmi.py``)
+answers every shell-out from memory, so these measure only our own parsing,
+argv construction, retry/breaker bookkeeping and tool dispatch — the part a
+code change can make slower. Each result is the best per-call time, gated
+against ``baselines.json`` by the ``bench``/``regression_gate`` fixtures;
+the scheduler hand-off, a thread wake-up, is timed apart as a median.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from fan_manager import capabilities, ipmi, resilience, scheduler
+from fan_manager.mcp import (
+    mcp_ipmi,
+    register_fan_control_tools,
+    register_ipmi_tools,
+    register_temperature_tools,
+)
+
+core = importlib.import_module("fan_manager.fan_manager")
+T = TypeVar("T")
+
+CPUS = ["coretemp-isa-0000", "coretemp-isa-0001"]
+TARGET = {"host": "10.0.0.113", "user": "root", "password": "s3cret"}
+# Absolute allowance for sub-microsecond paths where scheduler noise dominates.
+SLACK = 2e-6
+# Handing a command to a target's scheduler worker costs a thread wake-up
+# whose latency depends on the host's CPU governor and load, not on our code.
+# Paths that schedule are timed on the worker itself (where ``schedule`` runs
+# inline) and the hand-off is gated on its own, as a median.
+HANDOFF_SLACK = 5e-6
+
+
+def _sensors_doc(cores: int, extra_chips: int = 0) -> dict[str, Any]:
+    """A ``sensors -j`` document with ``cores`` cores per socket."""
+    doc: dict[str, Any] = {}
+    for s, cpu in enumerate(CPUS):
+        chip: dict[str, Any] = {"Adapter": "ISA adapter"}
+        chip["Package id 0"] = {"temp1_input": 50.0, "temp1_max": 84.0}
+        for c in range(cores):
+            chip[f"Core {c}"] = {
+                f"temp{c + 2}_input": 40.0 + (c * 7 + s) % 30,
+                f"temp{c + 2}_max": 84.0,
+                f"temp{c + 2}_crit": 94.0,
+                f"temp{c + 2}_crit_alarm": 0.0,
+            }
+        doc[cpu] = chip
+    for i in range(extra_chips):
+        doc[f"nvme-pci-{i:04x}"] = {
+            "Adapter": "PCI adapter",
+            "Composite": {"temp1_input": 38.0, "temp1_max": 81.0},
+        }
+    return doc
+
+
+SMALL = _sensors_doc(cores=4)
+LARGE = _sensors_doc(cores=256, extra_chips=512)
+
+
+class _FakeRunner:
+    """Answers ``sensors -j`` with canned JSON and ``ipmitool`` with ``out``."""
+
+    def __init__(self, sensors: dict | None = None, out: str = "ok"):
+        self.sensors = json.dumps(sensors if sensors is not None else SMALL)
+        self.out = out
+
+    def which(self, name: str):
+        return f"/usr/bin/{name}"
+
+    def run(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> str:
+        return self.sensors if argv[0].endswith("sensors") else self.out
+
+
+@pytest.fixture(autouse=True)
+def _isolated_state():
+    resilience.reset_breakers()
+    capabilities.reset()
+    yield
+    resilience.reset_breakers()
+    capabilities.reset()
+
+
+@pytest.mark.parametrize(
+    "name,doc",
+    [("hot.get_core_temp.small", SMALL), ("hot.get_core_temp.large", LARGE)],
+)
+def test_get_core_temp(bench, name, doc):
+    number = 2000 if doc is SMALL else 20
+    bench(name, lambda: core.get_core_temp(CPUS, doc), number=number)
+
+
+@pytest.mark.parametrize(
+    "name,doc",
+    [("hot.get_temp.small", SMALL), ("hot.get_temp.large", LARGE)],
+)
+def test_get_temp(bench, name, doc):
+    runner = _FakeRunner(sensors=doc)
+    number = 1000 if doc is SMALL else 10
+    bench(name, lambda: core.get_temp(runner=runner), number=number)
+
+
+def _on_worker(key: str, run: Callable[[], T]) -> T:
+    """``run`` on ``key``'s scheduler worker, so its commands skip the hand-off."""
+    return scheduler.schedule(key, run)
+
+
+def test_scheduler_handoff(bench):
+    bench(
+        "hot.scheduler.handoff",
+        lambda: scheduler.schedule("bench", lambda: None),
+        number=2000,
+        repeat=15,
+        slack=HANDOFF_SLACK,
+        summary=statistics.median,
+    )
+
+
+def test_auto_set_fan_speed_tick(bench):
+    runner = _FakeRunner()
+    _on_worker(
+        ipmi._target_key(None),
+        lambda: bench(
+            "hot.auto_set_fan_speed",
+            lambda: core.auto_set_fan_speed(runner=runner),
+            number=500,
+        ),
+    )
+
+
+def test_ipmi_base_argv(bench):
+    runner = _FakeRunner()
+    bench(
+        "hot.ipmi._base_argv",
+        lambda: ipmi._base_argv(runner, TARGET),
+        number=20000,
+        slack=SLACK,
+    )
+
+
+def test_ipmi_redact(bench):
+    argv = ipmi._base_argv(_FakeRunner(), TARGET) + ["chassis", "power", "status"]
+    bench("hot.ipmi._redact", lambda: ipmi._redact(argv), number=20000, slack=SLACK)
+
+
+def test_ipmi_exec(bench):
+    runner = _FakeRunner(out="System Power : on")
+    _on_worker(
+        ipmi._target_key(TARGET),
+        lambda: bench(
+            "hot.ipmi._exec",
+            lambda: ipmi._exec(
+                runner, TARGET, ["chassis", "power", "status"], action_class="read"
+            ),
+            number=2000,
+        ),
+    )
+
+
+def test_mcp_ipmi_parse(bench):
+    params = json.dumps({**TARGET, "action": "list", "limit": None})
+    bench(
+        "hot.mcp_ipmi._parse",
+        lambda: mcp_ipmi._parse(params),
+        number=20000,
+        slack=SLACK,
+    )
+
+
+@pytest.mark.parametrize(
+    "name,tool,arguments",
+    [
+        ("hot.mcp.temperature.get", "fan_manager_temperature", {"action": "get"}),
+        (
+            "hot.mcp.fan_control.set",
+            "fan_manager_fan_control",
+            {"action": "set", "params_json": json.dumps({"fan_level": 30})},
+        ),
+        (
+            "hot.mcp.power.status",
+            "fan_manager_power",
+            {"action": "status", "params_json": json.dumps(TARGET)},
+        ),
+    ],
+)
+async def test_mcp_tool_call(monkeypatch, regression_gate, name, tool, arguments):
+    """Full in-process MCP round trip: validation, dispatch, serialization."""
+    runner = _FakeRunner(out="System Power : on")
+    monkeypatch.setattr(core, "_DEFAULT_RUNNER", runner)
+    mcp = FastMCP(name="bench-fan-manager")
+    register_temperature_tools(mcp)
+    register_fan_control_tools(mcp)
+    register_ipmi_tools(mcp)
+    async with Client(mcp) as client:
+        for _ in range(20):  # warm up schemas and caches
+            await client.call_tool(tool, arguments)
+        best = float("inf")
+        for _ in range(5):
+            started = time.perf_counter()
+            for _ in range(100):
+                await client.call_tool(tool, arguments)
+            best = min(best, (time.perf_counter() - started) / 100)
+    regression_gate(name, best)
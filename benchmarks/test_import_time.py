@@ -0,0 +1,54 @@
+"""Import-time regression benchmark for the console-script entry points.
+
+Each entry module is imported in a fresh interpreter under ``-X importtime``;
+the cumulative time of its top-level ``fan_manager*`` entries is the cold-start
+cost the ``fan-manager``, ``fan-manager-mcp`` and ``fan-manager-agent`` scripts
+pay before doing any work.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+RUNS = 5
+
+
+def _import_seconds(module: str) -> float:
+    """Best-of-``RUNS`` cumulative import time of ``module`` in seconds."""
+    best = float("inf")
+    for _ in range(RUNS):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+            check=True,
+        )
+        total_us = 0
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            _, cumulative, name = line.split("|")
+            # Top-level entries carry exactly one space after the separator.
+            if name.startswith(" fan_manager") and cumulative.strip().isdigit():
+                total_us += int(cumulative)
+        best = min(best, total_us / 1e6)
+    return best
+
+
+@pytest.mark.parametrize(
+    "name,module",
+    [
+        ("import.package", "fan_manager"),
+        ("import.daemon", "fan_manager.fan_manager"),
+        ("import.mcp", "fan_manager.mcp_server"),
+        ("import.agent", "fan_manager.agent_server"),
+    ],
+)
+def test_entry_point_import_time(regression_gate, name: str, module: str):
+    regression_gate(name, _import_seconds(module), slack=0.005)
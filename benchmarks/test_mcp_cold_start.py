@@ -0,0 +1,76 @@
+"""Cold-start benchmark: process start to first ``tools/list`` response.
+
+Spawns ``python -m fan_manager.mcp_server`` over stdio exactly as an IDE does,
+performs the MCP ``initialize`` handshake and times the first ``tools/list``
+answer, with and without ``FAN_MANAGER_FAST_START``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+RUNS = 3
+
+
+def _request(proc: subprocess.Popen, msg_id: int | None, method: str, params=None):
+    message = {"jsonrpc": "2.0", "method": method, "params": params or {}}
+    if msg_id is not None:
+        message["id"] = msg_id
+    assert proc.stdin is not None and proc.stdout is not None  # both PIPE
+    proc.stdin.write(json.dumps(message) + "\n")
+    proc.stdin.flush()
+    if msg_id is None:
+        return None
+    for line in proc.stdout:
+        reply = json.loads(line)
+        if reply.get("id") == msg_id:
+            return reply
+    raise RuntimeError(f"server exited before answering {method}")
+
+
+def _seconds_to_tools_list(fast_start: bool) -> tuple[float, int]:
+    env = {**os.environ, "FAN_MANAGER_FAST_START": str(fast_start)}
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "fan_manager.mcp_server", "--transport", "stdio"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        cwd=ROOT,
+        env=env,
+    )
+    try:
+        _request(
+            proc,
+            1,
+            "initialize",
+            {
+                "protocolVersion": "2025-06-18",
+                "capabilities": {},
+                "clientInfo": {"name": "bench", "version": "0"},
+            },
+        )
+        _request(proc, None, "notifications/initialized")
+        reply = _request(proc, 2, "tools/list")
+        elapsed = time.perf_counter() - started
+    finally:
+        proc.kill()
+        proc.wait()
+    return elapsed, len(reply["result"]["tools"])
+
+
+@pytest.mark.parametrize("fast_start", [False, True], ids=["eager", "fast"])
+def test_time_to_first_tools_list(regression_gate, fast_start: bool):
+    runs = [_seconds_to_tools_list(fast_start) for _ in range(RUNS)]
+    assert all(count > 0 for _, count in runs)
+    name = f"mcp.cold_start.{'fast' if fast_start else 'eager'}"
+    regression_gate(name, min(seconds for seconds, _ in runs), slack=0.05)
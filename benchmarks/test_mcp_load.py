@@ -0,0 +1,30 @@
+"""Concurrent streamable-http load benchmark for the MCP server.
+
+Drives :mod:`mcp_load` with a stub runner that blocks 20 ms per command and
+gates per-call latency, throughput (as seconds per call) and the fraction of
+time the server's event loop spent blocked.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import mcp_load  # noqa: E402
+
+CLIENTS = 8
+LATENCY = 0.02
+
+
+def test_concurrent_tool_calls(regression_gate, bench_report):
+    report = mcp_load.run_load(CLIENTS, duration=3.0, latency=LATENCY)
+    bench_report("load", report.as_dict())
+    assert report.calls > 0 and report.errors == 0
+    regression_gate("load.p50", report.p50, slack=0.01)
+    regression_gate("load.p99", report.p99, slack=0.05)
+    regression_gate("load.seconds_per_call", 1 / report.throughput, slack=0.002)
+    regression_gate(
+        "load.loop_blocked_fraction", report.loop_blocked_fraction, slack=0.1
+    )
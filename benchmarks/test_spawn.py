@@ -0,0 +1,29 @@
+"""Launch latency and RSS of the spawn modes inside the MCP server.
+
+Drives :mod:`spawn_latency` once per ``FAN_MANAGER_SPAWN`` mode and gates the
+median per-launch latency of each, plus the fork-server helper's RSS.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import spawn_latency  # noqa: E402
+
+CALLS = 300
+
+
+@pytest.mark.parametrize("mode", ["subprocess", "posix_spawn", "forkserver"])
+def test_spawn_latency_under_the_mcp_server(regression_gate, bench_report, mode: str):
+    report = spawn_latency.run_isolated(mode, CALLS)
+    bench_report(f"spawn.{mode}", report)
+    assert report["calls"] == CALLS and report["server_rss_mb"] > 0
+    regression_gate(f"spawn.{mode}.median", report["median"], slack=0.001)
+    if mode == "forkserver":
+        assert report["helper_rss_mb"] > 0
+        regression_gate("spawn.forkserver.helper_rss_mb", report["helper_rss_mb"])
@@ -6,51 +6,48 @@
 
 import importlib
 import importlib.util
-import inspect
 from typing import Any
 
 __version__ = "1.6.0"
 
-__all__: list[str] = ["__version__"]
-
-CORE_MODULES: list[str] = [
-    "fan_manager.fan_manager",
-    "fan_manager.api_client",
-    "fan_manager.models",
-]
-
-OPTIONAL_MODULES = {
-    "fan_manager.agent_server": "agent",
-    "fan_manager.mcp_server": "mcp",
+# Public name -> defining module. Nothing is imported until a name is first
+# accessed, so ``import fan_manager`` (and the ``fan-manager`` daemon, which only
+# needs ``fan_manager.fan_manager``) never pays for pydantic or the MCP/agent
+# stacks. Names that collide with a submodule (``fan_manager``, ``mcp_server``,
+# ``agent_server``) are deliberately absent so ``from fan_manager import
+# mcp_server`` keeps yielding the module rather than its entrypoint function.
+_EXPORTS: dict[str, str] = {
+    "CommandRunner": "fan_manager.fan_manager",
+    "SubprocessCommandRunner": "fan_manager.fan_manager",
+    "setup_logging": "fan_manager.fan_manager",
+    "get_core_temp": "fan_manager.fan_manager",
+    "get_temp": "fan_manager.fan_manager",
+    "set_fan": "fan_manager.fan_manager",
+    "auto_set_fan_speed": "fan_manager.fan_manager",
+    "run_service": "fan_manager.fan_manager",
+    "usage": "fan_manager.fan_manager",
+    "read_state": "fan_manager.state_page",
+    "TickState": "fan_manager.state_page",
+    "Api": "fan_manager.api_client",
+    "FanControlService": "fan_manager.services",
+    "CommandResult": "fan_manager.models",
+    "TempReading": "fan_manager.models",
+    "FanSetResult": "fan_manager.models",
+    "SetFanInput": "fan_manager.models",
+    "AutoFanInput": "fan_manager.models",
+    "ControlLoopInput": "fan_manager.models",
 }
 
+# Members of the optional MCP/agent modules; resolved only when those extras
+# are installed.
+OPTIONAL_EXPORTS: dict[str, str] = {
+    "get_mcp_instance": "fan_manager.mcp_server",
+    "register_temperature_tools": "fan_manager.mcp",
+    "register_fan_control_tools": "fan_manager.mcp",
+    "register_ipmi_tools": "fan_manager.mcp",
+}
 
-def _expose_members(module):
-    """Expose public classes and functions from a module into globals and __all__.
-
-    A member is skipped when its name collides with a submodule of this package
-    (e.g. the ``mcp_server``/``agent_server`` entrypoint functions share the name
-    of their defining submodule). Re-binding those would shadow the submodule and
-    break ``from fan_manager import mcp_server`` (it would yield the function
-    instead of the module).
-    """
-    for name, obj in inspect.getmembers(module):
-        if (inspect.isclass(obj) or inspect.isfunction(obj)) and not name.startswith(
-            "_"
-        ):
-            if importlib.util.find_spec(f"{__name__}.{name}") is not None:
-                continue
-            globals()[name] = obj
-            if name not in __all__:
-                __all__.append(name)
-
-
-for module_name in CORE_MODULES:
-    if module_name:
-        module = importlib.import_module(module_name)
-        _expose_members(module)
-
-_loaded_optional_modules: dict[str, Any] = {}
+__all__: list[str] = ["__version__", *_EXPORTS]
 
 
 def _import_module_safely(module_name: str):
@@ -62,25 +59,33 @@ def _import_module_safely(module_name: str):
 
 
 def __getattr__(name: str) -> Any:
-    """Lazily expose optional MCP/agent members and availability flags."""
+    """Resolve public members and availability flags on first access."""
     if name == "_MCP_AVAILABLE":
         return _import_module_safely("fan_manager.mcp_server") is not None
     if name == "_AGENT_AVAILABLE":
         return _import_module_safely("fan_manager.agent_server") is not None
 
-    for module_name in OPTIONAL_MODULES:
-        if module_name not in _loaded_optional_modules:
-            module = _import_module_safely(module_name)
-            if module is not None:
-                _loaded_optional_modules[module_name] = module
-                _expose_members(module)
-
-        module = _loaded_optional_modules.get(module_name)
+    module_name = _EXPORTS.get(name)
+    if module_name is not None:
+        value = getattr(importlib.import_module(module_name), name)
+    else:
+        module_name = OPTIONAL_EXPORTS.get(name)
+        module = _import_module_safely(module_name) if module_name else None
         if module is not None and hasattr(module, name):
-            return getattr(module, name)
-
-    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+            value = getattr(module, name)
+        elif (
+            name.isidentifier()
+            and not name.startswith("__")
+            and importlib.util.find_spec(f"{__name__}.{name}") is not None
+        ):
+            # Plain attribute access to a not-yet-imported submodule.
+            value = importlib.import_module(f"{__name__}.{name}")
+        else:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Cache so later lookups bypass __getattr__ entirely.
+    globals()[name] = value
+    return value
 
 
 def __dir__() -> list[str]:
-    return sorted(list(globals().keys()) + __all__)
+    return sorted(set(globals()) | set(__all__) | set(OPTIONAL_EXPORTS))
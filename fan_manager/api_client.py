@@ -87,4 +87,5 @@ def auto_set_fan_speed(
 
     def run_service(self, **kwargs: Any) -> Any:
         """Run the continuous fan-management service loop (CONCEPT:FAN-002)."""
+        self._service.probe()
         return run_service(runner=self._service.runner, **kwargs)
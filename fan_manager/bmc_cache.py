@@ -0,0 +1,133 @@
+"""Per-target cache for slow-changing BMC reads (CONCEPT:FAN-007).
+
+``mc info``, ``lan print``, ``user list``, ``sol info`` and ``chassis poh``
+describe configuration and inventory that changes rarely, yet agents re-query
+them constantly and every out-of-band call costs a full ``lanplus`` session.
+:func:`read` serves these from a cache keyed by target, credentials and
+command, with a long per-command TTL (:data:`TTLS`):
+
+  * only successful (status 200) replies are stored; hits come back with
+    ``cached: true`` and their ``age`` in seconds, misses with ``cached: false``;
+  * ``refresh=True`` skips the lookup and replaces the entry;
+  * the writes in :mod:`fan_manager.ipmi` call :func:`invalidate` for exactly
+    what they change — ``lan set <channel>`` drops that channel's
+    ``lan print``, the ``user`` writes drop every ``user list`` of the target
+    and ``mc reset`` drops everything cached for the target. The entry is
+    dropped whether or not the write reported success, since a timed-out write
+    may still have been applied.
+
+Credentials are part of the key (as a digest), so a caller with a wrong
+password never gets a reply fetched with the right one.
+``FAN_MANAGER_BMC_CACHE_TTL`` overrides every TTL (seconds; ``0`` disables
+the cache).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+ENV_TTL = "FAN_MANAGER_BMC_CACHE_TTL"
+
+# Command -> seconds a successful reply is served from the cache.
+TTLS: dict[str, float] = {
+    "mc info": 3600.0,
+    "lan print": 900.0,
+    "user list": 900.0,
+    "sol info": 900.0,
+    "chassis poh": 300.0,
+}
+
+# (target key, credential digest, command, args) -> (stored at, envelope)
+Key = tuple[str, str, str, tuple[str, ...]]
+
+_lock = threading.Lock()
+_entries: dict[Key, tuple[float, dict[str, Any]]] = {}
+_counters = {"hits": 0, "misses": 0, "refreshes": 0, "invalidations": 0}
+_clock: Callable[[], float] = time.monotonic
+
+
+def ttl_for(command: str) -> float:
+    """TTL for ``command``; ``FAN_MANAGER_BMC_CACHE_TTL`` overrides it."""
+    override = os.environ.get(ENV_TTL)
+    if override:
+        try:
+            return max(0.0, float(override))
+        except ValueError:
+            pass
+    return TTLS.get(command, 0.0)
+
+
+def credentials(target: dict[str, Any] | None) -> str:
+    """Digest of the target's user and password ("" in-band)."""
+    if not target or not target.get("host"):
+        return ""
+    secret = f"{target.get('user', 'root')}\0{target.get('password', '')}"
+    return hashlib.sha256(secret.encode()).hexdigest()[:16]
+
+
+def read(
+    key: str,
+    creds: str,
+    command: str,
+    args: tuple[str, ...],
+    fetch: Callable[[], dict[str, Any]],
+    refresh: bool = False,
+) -> dict[str, Any]:
+    """``fetch()`` through the cache; the envelope gains ``cached`` (and ``age``)."""
+    ttl = ttl_for(command)
+    entry_key = (key, creds, command, args)
+    now = _clock()
+    if ttl > 0 and not refresh:
+        with _lock:
+            entry = _entries.get(entry_key)
+            if entry is not None and now - entry[0] < ttl:
+                _counters["hits"] += 1
+                return {**entry[1], "cached": True, "age": round(now - entry[0], 1)}
+    res = fetch()
+    with _lock:
+        _counters["refreshes" if refresh else "misses"] += 1
+        if ttl > 0 and res.get("status") == 200:
+            _entries[entry_key] = (_clock(), dict(res))
+        else:
+            _entries.pop(entry_key, None)
+    return {**res, "cached": False}
+
+
+def invalidate(
+    key: str, command: str | None = None, args: tuple[str, ...] | None = None
+) -> int:
+    """Drop cached entries of target ``key`` (all credentials).
+
+    ``command`` limits it to one command, ``args`` to one argument tuple.
+    Returns the number of entries dropped.
+    """
+    with _lock:
+        doomed = [
+            k
+            for k in _entries
+            if k[0] == key
+            and (command is None or k[2] == command)
+            and (args is None or k[3] == args)
+        ]
+        for k in doomed:
+            del _entries[k]
+        _counters["invalidations"] += len(doomed)
+    return len(doomed)
+
+
+def stats() -> dict[str, Any]:
+    with _lock:
+        return {"entries": len(_entries), **_counters}
+
+
+def reset() -> None:
+    """Forget every entry and counter (tests and operator resets)."""
+    with _lock:
+        _entries.clear()
+        for name in _counters:
+            _counters[name] = 0
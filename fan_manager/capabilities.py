@@ -0,0 +1,147 @@
+"""One-time capability probe for the ``ipmitool``/``sensors`` binaries.
+
+The temperature read path (CONCEPT:FAN-001), fan control (CONCEPT:FAN-002) and
+the IPMI wrapper (CONCEPT:FAN-003..FAN-008) all need the same two binaries.
+Instead of scanning ``PATH`` on every call, each :class:`CommandRunner` gets a
+cached :class:`ToolProfile`:
+
+  * :func:`probe` — run once at service/server start. Resolves both binaries
+    honoring the ``IPMITOOL_PATH``/``SENSORS_PATH`` settings and records the
+    ``ipmitool`` version for ``stats``. Nothing else is probed: command
+    construction does not vary by version, so there is nothing to detect.
+  * :func:`binary` — the hot-path lookup; returns the cached path and only
+    falls back to ``runner.which`` for a binary that has not been found yet.
+
+Profiles are cached per runner instance and dropped with it.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Any
+
+from fan_manager.resilience import policy_for
+
+_log = logging.getLogger("FanManager.capabilities")
+
+_VERSION_RE = re.compile(r"version\s+(\d+(?:\.\d+)+)")
+
+
+def default_config() -> dict[str, str]:
+    """Binary names/paths from the settings (``auth.get_config`` keys).
+
+    Reads through ``setting`` like :func:`fan_manager.auth.get_config`, so
+    ``.env`` values apply. agent-utilities is imported here rather than at
+    module level, which keeps it out of the CLI daemon's import time.
+    """
+    from agent_utilities.core.config import setting
+
+    return {
+        "ipmitool": setting("IPMITOOL_PATH", "ipmitool"),
+        "sensors": setting("SENSORS_PATH", "sensors"),
+    }
+
+
+@dataclass
+class ToolProfile:
+    """Resolved binaries and the ``ipmitool`` version for one runner."""
+
+    config: dict[str, str] = field(default_factory=default_config)
+    paths: dict[str, str | None] = field(default_factory=dict)
+    ipmitool_version: str | None = None
+    probed: bool = False
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "paths": dict(self.paths),
+            "ipmitool_version": self.ipmitool_version,
+            "probed": self.probed,
+        }
+
+
+_profiles: weakref.WeakKeyDictionary[Any, ToolProfile] = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _parse_version(text: str) -> tuple[int, ...] | None:
+    match = _VERSION_RE.search(text or "")
+    if not match:
+        return None
+    return tuple(int(p) for p in match.group(1).split("."))
+
+
+def _profile(runner: Any) -> ToolProfile:
+    with _lock:
+        profile = _profiles.get(runner)
+        if profile is None:
+            profile = _profiles[runner] = ToolProfile()
+        return profile
+
+
+def binary(runner: Any, name: str) -> str | None:
+    """Return the cached path for ``name`` (``"ipmitool"``/``"sensors"``).
+
+    A binary that is already resolved costs a dict lookup; one that is still
+    missing is looked up again so installing it later heals without a restart.
+    """
+    profile = _profile(runner)
+    path = profile.paths.get(name)
+    if path is None:
+        path = runner.which(profile.config.get(name, name))
+        profile.paths[name] = path
+    return path
+
+
+def probe(
+    runner: Any, config: dict[str, Any] | None = None, *, refresh: bool = False
+) -> ToolProfile:
+    """Resolve binaries and the ``ipmitool`` version once for ``runner``.
+
+    Args:
+        runner: The :class:`~fan_manager.fan_manager.CommandRunner` to probe.
+        config: ``{"ipmitool": ..., "sensors": ...}`` names or paths (as
+            returned by ``auth.get_config``); defaults to the environment.
+        refresh: Re-probe even if a probed profile is cached.
+    """
+    with _lock:
+        cached = _profiles.get(runner)
+    if cached is not None and cached.probed and not refresh:
+        return cached
+
+    profile = ToolProfile(config={**default_config(), **(config or {})})
+    for name in ("ipmitool", "sensors"):
+        profile.paths[name] = runner.which(profile.config[name])
+
+    timeout = policy_for("read").timeout
+    ipmitool = profile.paths["ipmitool"]
+    if ipmitool:
+        try:
+            version = _parse_version(
+                runner.run([ipmitool, "-V"], check=False, timeout=timeout)
+            )
+        except Exception as e:  # noqa: BLE001 — probing must never abort startup
+            _log.warning("ipmitool version probe failed: %s", e)
+            version = None
+        if version:
+            profile.ipmitool_version = ".".join(str(p) for p in version)
+
+    profile.probed = True
+    with _lock:
+        _profiles[runner] = profile
+    _log.info("capability probe: %s", profile.as_dict())
+    return profile
+
+
+def profile_for(runner: Any) -> ToolProfile:
+    """The cached profile for ``runner`` (paths-only if never probed)."""
+    return _profile(runner)
+
+
+def reset() -> None:
+    """Drop every cached profile (tests and operator re-probes)."""
+    with _lock:
+        _profiles.clear()
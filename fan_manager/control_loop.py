@@ -0,0 +1,178 @@
+"""The fan control loop, managed inside the MCP server process (CONCEPT:FAN-002).
+
+The ``auto`` action of ``fan_manager_fan_control`` runs one tick. Continuous
+control used to need a separately deployed ``fan-manager`` daemon driving the
+same BMC as the MCP server. A :class:`ControlLoop` runs
+:func:`~fan_manager.fan_manager.run_service` in the server process instead:
+
+  * :meth:`ControlLoop.start` launches it as an asyncio task on the server's
+    event loop; the blocking loop itself runs in a worker thread
+    (``asyncio.to_thread``) with the process's default runner, scheduler
+    lanes, breakers and caches, so one process owns the hardware;
+  * the loop's ``sleep`` waits on a stop event, so :meth:`ControlLoop.stop`
+    ends it at the next wait instead of after a full poll interval. Cancelling
+    the task (server shutdown) stops it the same way. Either way the loop
+    counts as running until the worker thread has returned, so a tick still
+    writing to the BMC never overlaps a new loop. The fans are left at the
+    last level applied;
+  * :meth:`ControlLoop.status` reports the parameters, tick count, last tick
+    summary and the error that ended the loop, if any.
+
+One loop per process: :func:`controller` returns the shared instance. While it
+runs, the tool's one-off ``set`` and ``auto`` actions are refused (409) rather
+than fighting it for the fans.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from fan_manager.fan_manager import CommandRunner, run_service
+
+_log = logging.getLogger("FanManager.control")
+
+
+class _Stopped(Exception):
+    """Raised from the loop's ``sleep`` to unwind :func:`run_service`."""
+
+
+class ControlLoop:
+    """One background :func:`run_service` loop with start/stop/status."""
+
+    def __init__(
+        self,
+        runner: CommandRunner | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.runner = runner
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._done = threading.Event()
+        self._done.set()
+        self._task: asyncio.Task | None = None
+        self.params: dict[str, Any] = {}
+        self.started_at: float | None = None
+        self.stopped_at: float | None = None
+        self.ticks = 0
+        self.last_tick: dict[str, Any] | None = None
+        self.error: str | None = None
+
+    @property
+    def running(self) -> bool:
+        return not self._done.is_set()
+
+    def start(self, **params: Any) -> dict[str, Any]:
+        """Start the loop with ``run_service`` keyword ``params``.
+
+        Must be called from a running event loop. Raises :class:`RuntimeError`
+        if the loop is already running.
+        """
+        with self._lock:
+            if self.running:
+                raise RuntimeError("The control loop is already running")
+            self._stop.clear()
+            self._done.clear()
+            self.params = dict(params)
+            self.started_at, self.stopped_at = self._clock(), None
+            self.ticks, self.last_tick, self.error = 0, None, None
+        try:
+            self._task = asyncio.get_running_loop().create_task(
+                self._run(params), name="fan-manager-control"
+            )
+        except RuntimeError:
+            self._finish()
+            raise
+        _log.info("Control loop started: %s", params)
+        return self.status()
+
+    async def _run(self, params: dict[str, Any]) -> None:
+        try:
+            await asyncio.to_thread(self._serve, params)
+        except asyncio.CancelledError:
+            # The worker thread cannot be interrupted: it sees the stop event at
+            # its next wait and marks the loop done only once it has returned.
+            self._stop.set()
+            raise
+
+    def _serve(self, params: dict[str, Any]) -> None:
+        """Run :func:`run_service` in the worker thread until it ends."""
+        try:
+            run_service(
+                runner=self.runner,
+                sleep=self._sleep,
+                on_tick=self._on_tick,
+                **params,
+            )
+        except _Stopped:
+            pass
+        except Exception as e:  # noqa: BLE001 — reported through status()
+            self.error = f"{type(e).__name__}: {e}"
+            _log.error("Control loop stopped: %s", self.error)
+        finally:
+            self._finish()
+
+    def _finish(self) -> None:
+        with self._lock:
+            self.stopped_at = self._clock()
+            self._done.set()
+
+    def _sleep(self, seconds: float) -> None:
+        if self._stop.wait(seconds):
+            raise _Stopped
+
+    def _on_tick(self, tick: dict[str, Any]) -> None:
+        with self._lock:
+            self.ticks += 1
+            self.last_tick = {**tick, "time": self._clock()}
+
+    async def stop(self, timeout: float = 10.0) -> bool:
+        """Stop the loop; ``False`` if it was not running.
+
+        Waits up to ``timeout`` seconds for the tick in progress to finish.
+        """
+        if not self.running:
+            return False
+        self._stop.set()
+        await asyncio.to_thread(self._done.wait, timeout)
+        _log.info("Control loop stopped after %d ticks", self.ticks)
+        return True
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "params": dict(self.params),
+                "started_at": self.started_at,
+                "stopped_at": self.stopped_at,
+                "ticks": self.ticks,
+                "last_tick": self.last_tick,
+                "error": self.error,
+            }
+
+
+_controller: ControlLoop | None = None
+_controller_lock = threading.Lock()
+
+
+def controller() -> ControlLoop:
+    """The process-wide control loop shared by every MCP session."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = ControlLoop()
+        return _controller
+
+
+def reset() -> None:
+    """Stop and forget the shared control loop (tests and operator resets)."""
+    global _controller
+    with _controller_lock:
+        if _controller is not None:
+            _controller._stop.set()
+        _controller = None
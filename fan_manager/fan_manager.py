@@ -3,11 +3,34 @@
 import argparse
 import json
 import logging
+import os
 import shutil
+import signal
 import subprocess
 import sys
+import tempfile
+import threading
 import time
-from typing import Any, Protocol, runtime_checkable
+from collections.abc import Callable, Generator
+from typing import TYPE_CHECKING, Any, Protocol, runtime_checkable
+
+from fan_manager.capabilities import binary, probe
+from fan_manager.resilience import (
+    FAN_TARGET,
+    LOCAL_TARGET,
+    CircuitOpenError,
+    breaker_for,
+    call_with_policy,
+    policy_for,
+)
+from fan_manager.scheduler import WRITE, QueueFullError, schedule
+
+if TYPE_CHECKING:
+    from fan_manager.fan_verify import FanVerifier
+    from fan_manager.feedforward import Feedforward
+    from fan_manager.hwmon import HwmonSampler
+    from fan_manager.temp_sources import SourceChain
+    from fan_manager.throttle import ThrottleGuard
 
 
 @runtime_checkable
@@ -19,61 +42,222 @@ class CommandRunner(Protocol):
     this runner lets callers and tests substitute the shell-out without globally
     monkeypatching :mod:`subprocess`, keeping the dependency-injection seam
     explicit and the tests hermetic.
+
+    Runners may also provide ``run_stream(argv, *, check, timeout)``, a
+    generator of stdout lines (see :meth:`SubprocessCommandRunner.run_stream`);
+    :func:`stream_lines` falls back to splitting :meth:`run` output for runners
+    that do not.
     """
 
     def which(self, name: str) -> str | None:
         """Resolve an executable on ``PATH`` (``None`` if absent)."""
         ...
 
-    def run(self, argv: list[str], *, check: bool = True) -> str:
-        """Run a fixed argv with ``shell=False`` and return captured stdout."""
+    def run(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> str:
+        """Run a fixed argv with ``shell=False`` and return captured stdout.
+
+        ``timeout`` is the per-command deadline in seconds; implementations
+        raise :class:`subprocess.TimeoutExpired` when it elapses.
+        """
         ...
 
 
 class SubprocessCommandRunner:
-    """Default :class:`CommandRunner` backed by ``shutil.which``/``subprocess.run``.
+    """Default :class:`CommandRunner` backed by ``shutil.which``/``subprocess.Popen``.
 
     Uses fixed argv with ``shell=False`` and resolves binaries via
-    ``shutil.which`` so no user input ever reaches a command line.
+    ``shutil.which`` so no user input ever reaches a command line. Each command
+    runs in its own session/process group; when its deadline elapses the whole
+    group is killed so a hung ``ipmitool`` lanplus session cannot outlive it.
+
+    Args:
+        timeout: Default deadline (seconds) when the caller passes none.
     """
 
+    def __init__(self, timeout: float | None = 60.0) -> None:
+        self.timeout = timeout
+
     def which(self, name: str) -> str | None:
         return shutil.which(name)
 
-    def run(self, argv: list[str], *, check: bool = True) -> str:
+    def run(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> str:
+        deadline = self.timeout if timeout is None else timeout
         # Fixed argv, shell=False: no user input reaches the command line.
-        completed = subprocess.run(  # nosec B603 - fixed argv, no shell, no user input
+        with subprocess.Popen(  # nosec B603 - fixed argv, no shell, no user input
             argv,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            check=check,
-        )
-        return completed.stdout
+            start_new_session=True,
+        ) as proc:
+            try:
+                stdout, stderr = proc.communicate(timeout=deadline)
+            except subprocess.TimeoutExpired:
+                _kill_process_group(proc)
+                proc.communicate()
+                raise
+        if check and proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, argv, stdout, stderr)
+        return stdout
+
+    def run_stream(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> Generator[str, None, None]:
+        """Run ``argv`` like :meth:`run`, yielding stdout lines as they arrive.
+
+        Only the current line is held in memory (stderr spools to a temporary
+        file). Closing the generator before the end kills the process group,
+        so a consumer that has what it needs stops the command; no exit status
+        is checked then. The deadline covers the whole stream.
+        """
+        deadline = self.timeout if timeout is None else timeout
+        with (
+            tempfile.TemporaryFile() as stderr,
+            subprocess.Popen(  # nosec B603 - fixed argv, no shell, no user input
+                argv,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                text=True,
+                start_new_session=True,
+            ) as proc,
+        ):
+            expired = threading.Event()
+
+            def expire() -> None:
+                expired.set()
+                _kill_process_group(proc)
+
+            timer = threading.Timer(deadline, expire) if deadline else None
+            if timer:
+                timer.daemon = True
+                timer.start()
+            finished = False
+            assert proc.stdout is not None  # stdout=PIPE
+            try:
+                for line in proc.stdout:
+                    yield line.rstrip("\n")
+                proc.wait()
+                finished = True
+            finally:
+                if timer:
+                    timer.cancel()
+                if not finished:
+                    _kill_process_group(proc)
+                    proc.wait()
+            if expired.is_set():
+                raise subprocess.TimeoutExpired(argv, deadline or 0.0)
+            if check and proc.returncode:
+                stderr.seek(0)
+                raise subprocess.CalledProcessError(
+                    proc.returncode,
+                    argv,
+                    None,
+                    stderr.read().decode(errors="replace"),
+                )
+
+
+def stream_lines(
+    runner: CommandRunner,
+    argv: list[str],
+    *,
+    check: bool = True,
+    timeout: float | None = None,
+) -> Generator[str, None, None]:
+    """Stdout lines of ``argv``: ``runner.run_stream`` or split ``runner.run``."""
+    run_stream = getattr(runner, "run_stream", None)
+    if run_stream is not None:
+        yield from run_stream(argv, check=check, timeout=timeout)
+    else:
+        yield from runner.run(argv, check=check, timeout=timeout).splitlines()
+
+
+def _kill_process_group(proc: subprocess.Popen) -> None:
+    """SIGKILL the process group led by ``proc`` (falls back to the process)."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError, OSError):
+        proc.kill()
+
+
+def _failure_status(error: BaseException) -> int:
+    """Map an execution error to the envelope status.
+
+    504 deadline, 503 breaker open, 429 target queue full.
+    """
+    if isinstance(error, subprocess.TimeoutExpired):
+        return 504
+    if isinstance(error, CircuitOpenError):
+        return 503
+    if isinstance(error, QueueFullError):
+        return 429
+    return 500
+
+
+_log = logging.getLogger("FanManager")
+
+
+def _default_runner() -> CommandRunner:
+    """The process-wide runner; ``FAN_MANAGER_RECORD``/``_REPLAY`` wrap it.
+
+    ``FAN_MANAGER_SPAWN`` picks how it launches commands (see
+    :mod:`fan_manager.spawn`).
+    """
+    mode = os.environ.get("FAN_MANAGER_SPAWN", "subprocess")
+    if mode == "subprocess":
+        runner: CommandRunner = SubprocessCommandRunner()
+    else:
+        from fan_manager.spawn import runner_for
+
+        try:
+            runner = runner_for(mode)
+        except ValueError as e:
+            _log.warning("%s; using subprocess", e)
+            runner = SubprocessCommandRunner()
+    if os.environ.get("FAN_MANAGER_RECORD") or os.environ.get("FAN_MANAGER_REPLAY"):
+        from fan_manager.replay import runner_from_env
+
+        return runner_from_env(runner)
+    return runner
 
 
 # Module-level default runner. Callers may pass their own ``CommandRunner`` to
 # the temperature/fan functions for testing or alternate execution backends.
-_DEFAULT_RUNNER: CommandRunner = SubprocessCommandRunner()
+_DEFAULT_RUNNER: CommandRunner = _default_runner()
+
+
+def set_default_runner(runner: CommandRunner) -> CommandRunner:
+    """Swap the process-wide runner used when callers pass none.
+
+    The MCP tools and :mod:`fan_manager.ipmi` call through this default, so a
+    server can be pointed at a stub or simulated host. Returns the previous
+    runner so it can be restored.
+    """
+    global _DEFAULT_RUNNER
+    previous, _DEFAULT_RUNNER = _DEFAULT_RUNNER, runner
+    return previous
 
 
 def setup_logging(
-    is_mcp_server: bool = False, log_file: str = "fan_manager.log"
+    is_mcp_server: bool = False,
+    log_file: str = "fan_manager.log",
+    level: int | str = logging.INFO,
 ) -> None:
     """
     Configure logging for the fan manager application.
 
     Bootstraps the logging used across the CONCEPT:FAN-001 temperature read path
-    and the CONCEPT:FAN-002 fan-control path.
+    and the CONCEPT:FAN-002 fan-control path: a queue-backed pipeline with a
+    size-rotated JSON-lines file, a stdout copy and per-tick repeat suppression
+    (see :mod:`fan_manager.log_pipeline`).
     """
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler(
-                log_file if not is_mcp_server else "fan_manager_mcp.log"
-            ),
-            logging.StreamHandler(sys.stdout),
-        ],
+    from fan_manager import log_pipeline
+
+    log_pipeline.configure(
+        log_file if not is_mcp_server else "fan_manager_mcp.log", level=level
     )
 
 
@@ -82,9 +266,10 @@ def get_core_temp(cpus: list, sensors: dict) -> dict[str, Any]:
     Get the highest core temperature from the specified CPUs (CONCEPT:FAN-001).
 
     Pure computation over a supplied ``sensors`` mapping (no shell-out).
-    Returns a dictionary with response, command, and status.
+    Returns a dictionary with response, command, and status, plus ``zones``:
+    the hottest core per CPU package.
     """
-    logger = logging.getLogger("FanManager")
+    zones: dict[str, float] = {}
     highest_temp = 0.0
     highest_core = 0
     highest_cpu = ""
@@ -100,16 +285,26 @@ def get_core_temp(cpus: list, sensors: dict) -> dict[str, Any]:
                         for temp_key in sensors[cpu][key].keys():
                             if "_input" in temp_key:
                                 temp_cpu = sensors[cpu][key][temp_key]
+                                if temp_cpu > zones.get(cpu, -273.0):
+                                    zones[cpu] = temp_cpu
                                 if temp_cpu > highest_temp:
                                     highest_temp = temp_cpu
                                     highest_core = cores
                                     highest_cpu = cpu
-        logger.info(
-            f"Highest CPU: {highest_cpu}, Core: {highest_core}, Temperature: {highest_temp}"
+        _log.info(
+            "Highest CPU: %s, Core: %s, Temperature: %s",
+            highest_cpu,
+            highest_core,
+            highest_temp,
         )
-        return {"response": highest_temp, "command": command, "status": 200}
+        return {
+            "response": highest_temp,
+            "command": command,
+            "status": 200,
+            "zones": zones,
+        }
     except Exception as e:
-        logger.error(f"Failed to get core temperature: {str(e)}")
+        _log.error("Failed to get core temperature: %s", e)
         return {"response": None, "command": command, "status": 500, "error": str(e)}
 
 
@@ -122,13 +317,18 @@ def get_temp(runner: CommandRunner | None = None) -> dict[str, Any]:
     Returns a dictionary with response, command, and status.
     """
     runner = runner or _DEFAULT_RUNNER
-    logger = logging.getLogger("FanManager")
     command = "sensors -j"
     try:
-        sensors_bin = runner.which("sensors")
+        sensors_bin = binary(runner, "sensors")
         if sensors_bin is None:
             raise RuntimeError("'sensors' executable not found on PATH")
-        sensors_output = runner.run([sensors_bin, "-j"], check=True)
+        sensors_output = call_with_policy(
+            lambda timeout: runner.run(
+                [sensors_bin, "-j"], check=True, timeout=timeout
+            ),
+            policy_for("read"),
+            breaker_for("sensors"),
+        )
         if not sensors_output.strip():
             raise RuntimeError("No output from 'sensors -j' command")
         sensors = json.loads(sensors_output)
@@ -139,28 +339,42 @@ def get_temp(runner: CommandRunner | None = None) -> dict[str, Any]:
                 temp_result.get("error", "Failed to get core temperature")
             )
         temp_cpu = temp_result["response"]
-        logger.info(f"Current Temperature: {temp_cpu}")
-        return {"response": temp_cpu, "command": command, "status": 200}
+        _log.info("Current Temperature: %s", temp_cpu)
+        return {
+            "response": temp_cpu,
+            "command": command,
+            "status": 200,
+            "zones": temp_result["zones"],
+        }
     except Exception as e:
-        logger.error(f"Failed to get temperature: {str(e)}")
-        return {"response": None, "command": command, "status": 500, "error": str(e)}
+        _log.error("Failed to get temperature: %s", e)
+        return {
+            "response": None,
+            "command": command,
+            "status": _failure_status(e),
+            "error": str(e),
+        }
 
 
-def set_fan(fan_level: int, runner: CommandRunner | None = None) -> dict[str, Any]:
+def set_fan(
+    fan_level: int, runner: CommandRunner | None = None, failsafe: bool = False
+) -> dict[str, Any]:
     """
     Set the fan speed to the specified level (CONCEPT:FAN-002).
 
     Validates ``fan_level`` (0-100) and drives the BMC through the injected
     :class:`CommandRunner` (defaulting to ``ipmitool`` raw commands).
+    Writes go through the fan breaker (``FAN_TARGET``), not the one shared
+    by in-band reads. A ``failsafe`` write or a write to 100% skips the
+    breaker, so the fans can always be driven to maximum.
     Returns a dictionary with response, command, and status.
     """
     runner = runner or _DEFAULT_RUNNER
-    logger = logging.getLogger("FanManager")
     cmd2_str = "ipmitool raw"
     try:
         if not (0 <= fan_level <= 100):
             raise ValueError(f"Fan level {fan_level} is out of range (0-100)")
-        ipmitool_bin = runner.which("ipmitool")
+        ipmitool_bin = binary(runner, "ipmitool")
         if ipmitool_bin is None:
             raise RuntimeError("'ipmitool' executable not found on PATH")
         # fan_level is validated to be an int in [0, 100] above; hex() yields a
@@ -169,18 +383,31 @@ def set_fan(fan_level: int, runner: CommandRunner | None = None) -> dict[str, An
         cmd1 = [ipmitool_bin, "raw", "0x30", "0x30", "0x01", "0x00"]
         cmd2 = [ipmitool_bin, "raw", "0x30", "0x30", "0x02", "0xff", hex(fan_level)]
         cmd2_str = " ".join(cmd2)
-        # Enable manual fan control.
-        runner.run(cmd1, check=True)
-        # Apply the requested fan level.
-        runner.run(cmd2, check=True)
-        logger.info(f"Set fan level to {fan_level}")
+        policy = policy_for("control")
+        breaker = None if failsafe or fan_level >= 100 else breaker_for(FAN_TARGET)
+
+        def write(timeout: float | None) -> None:
+            # Enable manual fan control (idempotent, so a retry repeats it).
+            runner.run(cmd1, check=True, timeout=timeout)
+            # Apply the requested fan level.
+            runner.run(cmd2, check=True, timeout=timeout)
+
+        # Each attempt sends both commands back to back on the BMC's write
+        # lane, ahead of any queued reads; retry backoff waits off the lane.
+        call_with_policy(
+            write,
+            policy,
+            breaker,
+            submit=lambda attempt: schedule(LOCAL_TARGET, attempt, lane=WRITE),
+        )
+        _log.info("Set fan level to %s", fan_level)
         return {
             "response": None,
             "command": f"{' '.join(cmd1)}; {cmd2_str}",
             "status": 200,
         }
     except ValueError as e:
-        logger.error(f"Invalid fan level: {str(e)}")
+        _log.error("Invalid fan level: %s", e)
         return {
             "response": None,
             "command": cmd2_str,
@@ -188,11 +415,11 @@ def set_fan(fan_level: int, runner: CommandRunner | None = None) -> dict[str, An
             "error": str(e),
         }
     except Exception as e:
-        logger.error(f"Failed to set fan level: {str(e)}")
+        _log.error("Failed to set fan level: %s", e)
         return {
             "response": None,
             "command": cmd2_str,
-            "status": 500,
+            "status": _failure_status(e),
             "error": str(e),
         }
 
@@ -204,33 +431,87 @@ def auto_set_fan_speed(
     maximum_temperature: int | float = 80,
     temperature_power: int = 5,
     runner: CommandRunner | None = None,
-):
+    verifier: "FanVerifier | None" = None,
+    feedforward: "Feedforward | None" = None,
+    throttle: "ThrottleGuard | None" = None,
+    sampler: "HwmonSampler | None" = None,
+    sources: "SourceChain | None" = None,
+) -> dict[str, Any]:
     """Drive the temperature-to-fan-speed curve once (CONCEPT:FAN-002).
 
     Reads the current temperature (CONCEPT:FAN-001) via the injected
     :class:`CommandRunner` and applies a logarithmic temperature-to-speed curve.
     On a temperature read error, the fans fail safe to ``maximum_fan_speed``.
+    With a ``verifier`` an unchanged level is checked against the fan RPMs
+    instead of being rewritten (see :mod:`fan_manager.fan_verify`). With a
+    ``feedforward`` the curve is evaluated at the measured temperature plus the
+    rise predicted from CPU load (see :mod:`fan_manager.feedforward`). With a
+    ``throttle`` guard a rise in the kernel's throttle counters escalates the
+    fans to ``maximum_fan_speed`` and lowers the curve's effective
+    ``maximum_temperature`` (see :mod:`fan_manager.throttle`). With a hwmon
+    ``sampler`` the curve acts on the window of samples taken since the last
+    tick (peak, EMA, slope; see :mod:`fan_manager.hwmon`) instead of a
+    ``sensors`` reading, which remains the fallback. With a ``sources`` chain
+    the temperature comes from its fastest healthy source (hwmon, ``sensors``,
+    BMC SDR; see :mod:`fan_manager.temp_sources`) and the tick records which
+    ``source`` served it; the fans fail safe only when every source fails.
+
+    Returns a tick summary: ``temperature``, per-package ``zones``, the fan
+    ``level`` applied (``None`` if the write failed), the controller ``mode``
+    (``curve``, ``verified``, ``throttle``, ``failsafe`` or ``error``) and the
+    write ``status`` with its ``error`` (plus the temperature ``source``, the
+    sampler ``window``, the feedforward ``predicted_rise`` and ``throttle``
+    counters when those are used).
     """
     runner = runner or _DEFAULT_RUNNER
-    logger = logging.getLogger("FanManager")
-    temp_result = get_temp(runner=runner)
+    throttled = False
+    if throttle is not None:
+        throttled = throttle.poll()
+        maximum_temperature = throttle.maximum_temperature(
+            maximum_temperature, minimum_temperature
+        )
+    window = sampler.take() if sampler is not None else None
+    temp_result: dict[str, Any]
+    if window is not None:
+        temp_result = {
+            "response": window.control,
+            "command": "hwmon",
+            "status": 200,
+            "zones": window.zones,
+        }
+    elif sources is not None:
+        temp_result = sources.read()
+    else:
+        temp_result = get_temp(runner=runner)
     if temp_result["status"] != 200:
-        logger.error(
-            f"Skipping fan adjustment due to temperature error: {temp_result.get('error', 'Unknown error')}. Setting fan to maximum as fallback."
+        _log.error(
+            "Skipping fan adjustment due to temperature error: %s. "
+            "Setting fan to maximum as fallback.",
+            temp_result.get("error", "Unknown error"),
         )
-        fan_result = set_fan(int(maximum_fan_speed), runner=runner)
+        fan_result = set_fan(int(maximum_fan_speed), runner=runner, failsafe=True)
+        if verifier is not None:
+            verifier.forget()  # the next level must be written, not verified
         if fan_result["status"] != 200:
-            logger.error(
-                f"Failed to set fallback fan: {fan_result.get('error', 'Unknown error')}"
+            _log.error(
+                "Failed to set fallback fan: %s",
+                fan_result.get("error", "Unknown error"),
             )
-        return  # Exit early to avoid computation with None
+        # Exit early to avoid computation with None
+        tick = _tick(None, {}, int(maximum_fan_speed), "failsafe", fan_result)
+        if throttle is not None:
+            tick["throttle"] = {**throttle.stats(), "maximum": maximum_temperature}
+        return tick
 
     cpu_temperature = temp_result["response"]
+    curve_temperature = cpu_temperature
+    if feedforward is not None:
+        curve_temperature += feedforward.predicted_rise
     x: float = min(
         1.0,
         max(
             0.0,
-            (cpu_temperature - minimum_temperature)
+            (curve_temperature - minimum_temperature)
             / (maximum_temperature - minimum_temperature),
         ),
     )
@@ -244,39 +525,220 @@ def auto_set_fan_speed(
             ),
         )
     )
-    fan_result = set_fan(fan_level, runner=runner)
+    if throttled:
+        _log.warning(
+            "CPU throttling detected at %s°C; fans to %s, curve ceiling now %s°C",
+            cpu_temperature,
+            int(maximum_fan_speed),
+            maximum_temperature,
+        )
+        fan_level = int(maximum_fan_speed)
+    if verifier is not None:
+        fan_result = verifier.apply(fan_level, runner=runner)
+    else:
+        fan_result = set_fan(fan_level, runner=runner)
     if fan_result["status"] != 200:
-        logger.error(f"Failed to set fan: {fan_result.get('error', 'Unknown error')}")
+        _log.error("Failed to set fan: %s", fan_result.get("error", "Unknown error"))
+    mode = "verified" if fan_result["command"] == "verify fan rpm" else "curve"
+    if throttled:
+        mode = "throttle"
+    tick = _tick(
+        cpu_temperature, temp_result.get("zones", {}), fan_level, mode, fan_result
+    )
+    if "source" in temp_result:
+        tick["source"] = temp_result["source"]
+    if window is not None:
+        tick["window"] = window.as_dict()
+    if feedforward is not None:
+        tick["predicted_rise"] = round(curve_temperature - cpu_temperature, 2)
+    if throttle is not None:
+        tick["throttle"] = {**throttle.stats(), "maximum": maximum_temperature}
+    return tick
+
+
+def _tick(
+    temperature: float | None,
+    zones: dict[str, float],
+    level: int,
+    mode: str,
+    fan_result: dict[str, Any],
+) -> dict[str, Any]:
+    ok = fan_result["status"] == 200
+    tick = {
+        "temperature": temperature,
+        "zones": zones,
+        "level": level if ok else None,
+        "mode": mode if ok else "error",
+        "status": fan_result["status"],
+    }
+    if not ok:
+        tick["error"] = fan_result.get("error", "Unknown error")
+    return tick
 
 
 def run_service(
-    temperature_poll_rate: int = 24,
+    temperature_poll_rate: float = 24,
     minimum_fan_speed: int | float = 5,
     maximum_fan_speed: int | float = 100,
     minimum_temperature: int | float = 50,
     maximum_temperature: int | float = 80,
     temperature_power: int = 5,
     runner: CommandRunner | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+    verify: bool = False,
+    state_path: str | None = None,
+    feedforward: float | None = None,
+    feedforward_time_constant: float | None = None,
+    avoid_throttle: bool = False,
+    sample_rate: float | None = None,
+    alarm_timeout: float | None = None,
+    on_tick: Callable[[dict[str, Any]], None] | None = None,
+    temperature_sources: list[str] | None = None,
+    bmc_target: dict[str, Any] | None = None,
 ):
     """Continuously poll temperature and adjust fans (CONCEPT:FAN-002 loop).
 
-    Each tick re-runs :func:`auto_set_fan_speed` (CONCEPT:FAN-001 read +
-    CONCEPT:FAN-002 write) through the injected :class:`CommandRunner`, then
-    sleeps for ``temperature_poll_rate`` seconds.
+    Probes the runner's binaries once at start (see
+    :mod:`fan_manager.capabilities`), then each tick re-runs
+    :func:`auto_set_fan_speed` (CONCEPT:FAN-001 read + CONCEPT:FAN-002 write)
+    through the injected :class:`CommandRunner` and waits
+    ``temperature_poll_rate`` seconds via ``sleep`` (injectable so a simulated
+    host can drive the loop in virtual time). With ``verify`` an unchanged
+    level is verified by fan RPM readback and only reasserted on drift. With
+    ``state_path`` each tick is published to a shared-memory state page (see
+    :mod:`fan_manager.state_page`). A ``feedforward`` gain (°C per unit CPU
+    load) samples ``/proc/stat`` and cpufreq between polls, pre-ramps the fans
+    on a load jump and ticks early when the predicted rise jumps (see
+    :mod:`fan_manager.feedforward`); runners that provide ``read_text`` (the
+    simulator) stand in for those files. With ``avoid_throttle`` a
+    :class:`~fan_manager.throttle.ThrottleGuard` watches the kernel's thermal
+    throttle and power-limit counters each tick and escalates on any increase.
+    With ``sample_rate`` (seconds) a :class:`~fan_manager.hwmon.HwmonSampler`
+    reads hwmon during every wait (alarm waits included) and each tick acts on
+    the window since the previous one, catching spikes between polls without
+    more ``sensors`` forks or BMC writes. With ``alarm_timeout`` (seconds) the
+    loop sleeps on hwmon threshold alarms instead of the poll timer: after each
+    tick a :class:`~fan_manager.hwmon.HwmonAlarms` re-arms writable CPU
+    thresholds around the current temperature and the next tick runs when one
+    fires or a hwmon sample leaves that band, or after ``alarm_timeout`` at the
+    latest (``temperature_poll_rate`` without ``sample_rate``, since most
+    drivers never signal the alarm); runners that provide ``write_text`` and
+    ``wait_alarm`` (the simulator) stand in for the files and ``poll()``. The
+    firmware's threshold values are written back when the loop exits.
+    ``temperature_sources`` (e.g. ``["hwmon", "sensors", "sdr"]``) reads the
+    temperature through a :class:`~fan_manager.temp_sources.SourceChain` that
+    picks the fastest healthy source and falls back with backoff; ``sdr-oob``
+    reads ``bmc_target``'s SDR over LAN. ``on_tick`` is called with each tick
+    summary (see :mod:`fan_manager.control_loop`).
     """
     runner = runner or _DEFAULT_RUNNER
-    logger = logging.getLogger("FanManager")
-    logger.info("Starting fan manager service")
-    while True:
-        auto_set_fan_speed(
-            minimum_fan_speed=minimum_fan_speed,
-            maximum_fan_speed=maximum_fan_speed,
-            minimum_temperature=minimum_temperature,
-            maximum_temperature=maximum_temperature,
-            temperature_power=temperature_power,
+    _log.info("Starting fan manager service")
+    probe(runner)
+    verifier = None
+    if verify:
+        from fan_manager.fan_verify import FanVerifier
+
+        verifier = FanVerifier()
+    publisher = None
+    if state_path:
+        from fan_manager.state_page import StatePublisher
+
+        publisher = StatePublisher(state_path)
+    ff = None
+    if feedforward:
+        from fan_manager.feedforward import DEFAULT_TIME_CONSTANT, Feedforward
+
+        ff = Feedforward(
+            feedforward,
+            feedforward_time_constant or DEFAULT_TIME_CONSTANT,
+            read=getattr(runner, "read_text", None),
+        )
+        ff.update(0.0)
+    guard = None
+    if avoid_throttle:
+        from fan_manager.throttle import ThrottleGuard
+
+        guard = ThrottleGuard(read=getattr(runner, "read_text", None))
+    sampler = None
+    if sample_rate:
+        from fan_manager.hwmon import HwmonSampler
+
+        sampler = HwmonSampler(
+            sample_rate,
+            read=getattr(runner, "read_text", None),
+            listdir=getattr(runner, "list_dir", None),
+        )
+        if sampler.sample() is None:
+            _log.warning("No CPU hwmon inputs found; using 'sensors' each tick")
+            sampler = None
+        else:
+            sleep = sampler.sleep(sleep)
+    chain = None
+    if temperature_sources:
+        from fan_manager.temp_sources import build_chain
+
+        chain = build_chain(
+            temperature_sources,
             runner=runner,
+            target=bmc_target,
+            read=getattr(runner, "read_text", None),
+            listdir=getattr(runner, "list_dir", None),
+        )
+    alarms = None
+    if alarm_timeout:
+        from fan_manager.hwmon import HwmonAlarms
+
+        alarms = HwmonAlarms(
+            read=getattr(runner, "read_text", None),
+            write=getattr(runner, "write_text", None),
+            listdir=getattr(runner, "list_dir", None),
+            waiter=getattr(runner, "wait_alarm", None),
         )
-        time.sleep(temperature_poll_rate)
+        if not alarms.discover():
+            _log.warning("No writable CPU hwmon alarms found; polling on a timer")
+            alarms = None
+    wait_timeout = float(alarm_timeout or 0)
+    if sampler is None:
+        wait_timeout = min(wait_timeout, temperature_poll_rate)
+    try:
+        while True:
+            tick = auto_set_fan_speed(
+                minimum_fan_speed=minimum_fan_speed,
+                maximum_fan_speed=maximum_fan_speed,
+                minimum_temperature=minimum_temperature,
+                maximum_temperature=maximum_temperature,
+                temperature_power=temperature_power,
+                runner=runner,
+                verifier=verifier,
+                feedforward=ff,
+                throttle=guard,
+                sampler=sampler,
+                sources=chain,
+            )
+            if publisher is not None:
+                publisher.publish(
+                    level=tick["level"],
+                    mode=tick["mode"],
+                    temperature=tick["temperature"],
+                    zones=tick["zones"],
+                    throttle=tick.get("throttle"),
+                )
+            if on_tick is not None:
+                on_tick(tick)
+            if (
+                alarms is not None
+                and tick["temperature"] is not None
+                and alarms.arm(tick["temperature"])
+            ):
+                alarms.wait(wait_timeout, sampler)
+            elif ff is None:
+                sleep(temperature_poll_rate)
+            else:
+                ff.wait(temperature_poll_rate, sleep)
+
+    finally:
+        if alarms is not None:
+            alarms.restore()
 
 
 def usage():
@@ -291,6 +753,17 @@ def usage():
         "-s | --slow      [ Minimum Fan Speed (0-100) ]\n"
         "-f | --fast      [ Maximum Fan Speed (0-100) ]\n"
         "-p | --poll-rate [ Poll Rate for CPU Temperature in Seconds (1-300) ]\n"
+        "-v | --verify    [ Verify fan RPMs; rewrite an unchanged level only on drift ]\n"
+        "--feedforward    [ Pre-ramp on CPU load jumps; gain in °C per unit load ]\n"
+        "--feedforward-tau [ Thermal time constant for --feedforward in seconds ]\n"
+        "-r | --sample-rate [ Read hwmon every N seconds between polls (peak-hold) ]\n"
+        "-e | --on-alarm  [ Tick on hwmon threshold alarms; timer fallback in seconds ]\n"
+        "-t | --avoid-throttle [ Escalate fans and lower the curve ceiling on CPU throttling ]\n"
+        "--sources LIST   [ Temperature sources in fallback order: hwmon,sensors,sdr,sdr-oob ]\n"
+        "--bmc-host HOST  [ BMC for 'sdr-oob' (--bmc-user; password from $FAN_MANAGER_BMC_PASSWORD) ]\n"
+        "--state-file     [ Shared-memory state page path ('' disables publishing) ]\n"
+        "\nfan-manager status [--state-file PATH] [--max-age SECONDS] [--json]\n"
+        "                 [ Show the running daemon's latest tick ]\n"
         "\nExample: \n\t"
         "fan-manager --intensity 5 --cold 50 --warm 80 --slow 5 --fast 100 --poll-rate 24\n"
     )
@@ -300,8 +773,13 @@ def fan_manager():
     """CLI entrypoint: parse args and run the fan-management service loop.
 
     Wires the temperature read (CONCEPT:FAN-001) and fan-control (CONCEPT:FAN-002)
-    paths together as a long-running poller.
+    paths together as a long-running poller. ``fan-manager status`` instead
+    reads the running daemon's state page (see :mod:`fan_manager.state_page`).
     """
+    if sys.argv[1:2] == ["status"]:
+        from fan_manager.state_page import main as status
+
+        sys.exit(status(sys.argv[2:]))
     setup_logging()
     logger = logging.getLogger("FanManager")
     logger.debug("Initializing fan manager")
@@ -371,12 +849,94 @@ def fan_manager():
         help="Temperature poll rate (default: %(default)s)",
     )
 
+    parser.add_argument(
+        "-v",
+        "--verify",
+        action="store_true",
+        help="Verify fan RPMs and reassert an unchanged level only on drift",
+    )
+    parser.add_argument(
+        "--feedforward",
+        type=float,
+        nargs="?",
+        const=32.0,
+        default=None,
+        metavar="GAIN",
+        help="Pre-ramp fans on CPU load jumps; °C per unit load (default gain "
+        "%(const)s; measure with python -m fan_manager.feedforward)",
+    )
+    parser.add_argument(
+        "--feedforward-tau",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Thermal time constant for --feedforward (default 18)",
+    )
+    parser.add_argument(
+        "-r",
+        "--sample-rate",
+        type=float,
+        nargs="?",
+        const=1.0,
+        default=None,
+        metavar="SECONDS",
+        help="Sample hwmon every SECONDS (default %(const)s) between polls and "
+        "act on the peak/EMA/slope of the window",
+    )
+    parser.add_argument(
+        "-e",
+        "--on-alarm",
+        type=float,
+        nargs="?",
+        const=300.0,
+        default=None,
+        metavar="TIMEOUT",
+        help="Sleep until a CPU hwmon threshold alarm fires instead of polling; "
+        "tick when a --sample-rate reading leaves the band, or after TIMEOUT "
+        "seconds at the latest (default %(const)s; the poll rate without "
+        "--sample-rate)",
+    )
+    parser.add_argument(
+        "-t",
+        "--avoid-throttle",
+        action="store_true",
+        help="Escalate fans and lower the curve's maximum temperature whenever "
+        "the kernel's thermal throttle or power-limit counters increase",
+    )
+    parser.add_argument(
+        "--sources",
+        default=None,
+        metavar="LIST",
+        help="Comma-separated temperature sources tried fastest-healthy first with "
+        "fallback: hwmon, sensors, sdr, sdr-oob (default: sensors only)",
+    )
+    parser.add_argument(
+        "--bmc-host",
+        default=None,
+        help="BMC for the 'sdr-oob' source; the password is read from "
+        "$FAN_MANAGER_BMC_PASSWORD",
+    )
+    parser.add_argument(
+        "--bmc-user",
+        default="root",
+        help="BMC user for --bmc-host (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--state-file",
+        default=None,
+        help="Shared-memory state page to publish each tick to; '' disables "
+        "(default: $FAN_MANAGER_STATE_PATH or /dev/shm/fan-manager.state)",
+    )
+
     try:
         args = parser.parse_args()
     except SystemExit:
         usage()
         sys.exit(2)
 
+    # SIGTERM (systemd stop) unwinds run_service so it can restore hwmon limits.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(128 + signal.SIGTERM))
+
     run_service(
         temperature_poll_rate=args.poll_rate,
         minimum_fan_speed=args.slow,
@@ -384,8 +944,35 @@ def fan_manager():
         minimum_temperature=args.cold,
         maximum_temperature=args.warm,
         temperature_power=args.intensity,
+        verify=args.verify,
+        state_path=_state_path(args.state_file),
+        feedforward=args.feedforward,
+        feedforward_time_constant=args.feedforward_tau,
+        avoid_throttle=args.avoid_throttle,
+        sample_rate=args.sample_rate,
+        alarm_timeout=args.on_alarm,
+        temperature_sources=args.sources.split(",") if args.sources else None,
+        bmc_target=_bmc_target(args.bmc_host, args.bmc_user),
     )
 
 
+def _bmc_target(host: str | None, user: str) -> dict[str, Any] | None:
+    if not host:
+        return None
+    return {
+        "host": host,
+        "user": user,
+        "password": os.environ.get("FAN_MANAGER_BMC_PASSWORD", ""),
+    }
+
+
+def _state_path(option: str | None) -> str | None:
+    if option is not None:
+        return option or None
+    from fan_manager.state_page import default_path
+
+    return default_path()
+
+
 if __name__ == "__main__":
     fan_manager()
@@ -0,0 +1,235 @@
+"""Fan RPM readback and verification for CONCEPT:FAN-002 writes.
+
+:func:`~fan_manager.fan_manager.set_fan` reports success as soon as
+``ipmitool raw`` exits. A BMC can silently drop back to automatic fan control,
+and a daemon that rewrites the same level every tick never notices. A
+:class:`FanVerifier` sits between the control loop and ``set_fan``:
+
+  * the fan sensors are discovered once with ``sdr type fan`` and then read
+    with a targeted ``sensor reading <names>``, so a check does not walk the
+    whole SDR repository (``sdr type fan`` is the fallback read);
+  * it learns the chassis's level -> mean RPM mapping (:class:`FanMap`) from
+    ticks where the level was unchanged, and interpolates unseen levels;
+  * a new level is written as before. An unchanged level is *verified*
+    instead of rewritten, and reasserted only when the mean RPM is off the
+    expectation by more than ``tolerance``. A mismatch that survives
+    ``relearn_after`` consecutive successful reasserts, each reading back the
+    same RPM, means the mapping is stale, so that level is relearned; until
+    then every mismatch counts as drift and is reasserted;
+  * a level with no expected RPM yet is learned only from the readback that
+    directly follows the verifier's own write of it; otherwise it is
+    written again rather than trusting whatever the fans are doing;
+  * a write made around the verifier (the daemon's failsafe) must be
+    followed by :meth:`FanVerifier.forget`, so the next level is written.
+
+Counters are reported by :meth:`FanVerifier.stats` and logged on reassert.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from fan_manager import ipmi
+from fan_manager.fan_manager import CommandRunner, set_fan
+from fan_manager.sensor_delta import parse_readings
+
+_log = logging.getLogger("FanManager.verify")
+
+DEFAULT_TOLERANCE = 0.15  # relative mean-RPM deviation before reasserting
+DEFAULT_RELEARN_AFTER = 3  # agreeing readbacks after reasserts before relearning
+_ALPHA = 0.3  # EMA weight of a new observation
+
+
+class FanMap:
+    """Learned fan level (0-100) -> mean RPM for one chassis."""
+
+    def __init__(self) -> None:
+        self.points: dict[int, float] = {}
+
+    def observe(self, level: int, rpm: float, *, replace: bool = False) -> None:
+        old = self.points.get(level)
+        self.points[level] = (
+            rpm if old is None or replace else old + _ALPHA * (rpm - old)
+        )
+
+    def expected(self, level: int) -> float | None:
+        """Learned RPM at ``level``, interpolated or extrapolated linearly."""
+        if level in self.points:
+            return self.points[level]
+        levels = sorted(self.points)
+        if len(levels) < 2:
+            return None
+        below = [lv for lv in levels if lv < level]
+        above = [lv for lv in levels if lv > level]
+        if below and above:
+            lo, hi = below[-1], above[0]
+        elif below:
+            lo, hi = below[-2] if len(below) > 1 else below[0], below[-1]
+        else:
+            lo, hi = above[0], above[1]
+        if lo == hi:
+            return None
+        slope = (self.points[hi] - self.points[lo]) / (hi - lo)
+        return max(0.0, self.points[lo] + slope * (level - lo))
+
+
+def _parse_sensor_reading(text: str) -> dict[str, float]:
+    rpms = {}
+    for line in text.splitlines():
+        name, _, value = line.partition("|")
+        try:
+            rpms[name.strip()] = float(value.split()[0])
+        except (IndexError, ValueError):
+            continue
+    return rpms
+
+
+def _verified(
+    level: int, rpm: float, expected: float | None, rpms: dict[str, float]
+) -> dict[str, Any]:
+    return {
+        "response": {"level": level, "rpm": rpm, "expected": expected, "fans": rpms},
+        "command": "verify fan rpm",
+        "status": 200,
+    }
+
+
+class FanVerifier:
+    """Verify-before-rewrite wrapper around :func:`set_fan` for one chassis."""
+
+    def __init__(
+        self,
+        tolerance: float = DEFAULT_TOLERANCE,
+        relearn_after: int = DEFAULT_RELEARN_AFTER,
+    ) -> None:
+        self.tolerance = tolerance
+        self.relearn_after = relearn_after
+        self.map = FanMap()
+        self.level: int | None = None
+        self._sensors: list[str] | None = None
+        self._reasserted_at: int | None = None
+        self._drift: list[float] = []  # readbacks after consecutive reasserts
+        self._written: int | None = None  # level written by the previous call
+        self._counters = {
+            "writes": 0,
+            "verified": 0,
+            "learned": 0,
+            "reasserted": 0,
+            "relearned": 0,
+            "unverified": 0,
+            "fallback_reads": 0,
+        }
+
+    # --- readback ------------------------------------------------------------
+    def _sdr_fans(self, runner: CommandRunner | None) -> dict[str, float]:
+        res = ipmi._exec(runner, None, ["sdr", "type", "fan"], action_class="read")
+        if res["status"] != 200:
+            return {}
+        return {
+            name: r["value"]
+            for name, r in parse_readings(res["response"]).items()
+            if r["unit"].lower() == "rpm" and isinstance(r["value"], float)
+        }
+
+    def read_rpms(self, runner: CommandRunner | None = None) -> dict[str, float]:
+        """Current fan RPMs by sensor name (empty if they cannot be read)."""
+        if self._sensors is None:
+            fans = self._sdr_fans(runner)
+            self._sensors = list(fans)
+            return fans
+        if not self._sensors:
+            return {}
+        res = ipmi._exec(
+            runner, None, ["sensor", "reading", *self._sensors], action_class="read"
+        )
+        rpms = _parse_sensor_reading(res["response"]) if res["status"] == 200 else {}
+        if not rpms:
+            self._counters["fallback_reads"] += 1
+            rpms = self._sdr_fans(runner)
+        return rpms
+
+    # --- control -------------------------------------------------------------
+    def _write(self, level: int, runner: CommandRunner | None) -> dict[str, Any]:
+        res = set_fan(level, runner=runner)
+        if res["status"] == 200:
+            self.level = level
+            self._written = level
+            self._counters["writes"] += 1
+        return res
+
+    def forget(self) -> None:
+        """Drop the applied level after a write made around the verifier."""
+        self.level = None
+        self._written = None
+        self._reasserted_at = None
+        self._drift = []
+
+    def _agrees(self, rpm: float) -> bool:
+        """Whether ``rpm`` matches every readback of the current drift run."""
+        return all(abs(rpm - seen) <= self.tolerance * seen for seen in self._drift)
+
+    def apply(self, level: int, runner: CommandRunner | None = None) -> dict[str, Any]:
+        """Write ``level`` if it changed; otherwise verify and reassert on drift."""
+        if level != self.level:
+            self._reasserted_at = None
+            self._drift = []
+            return self._write(level, runner)
+        rpms = self.read_rpms(runner)
+        if not rpms:
+            self._counters["unverified"] += 1
+            return self._write(level, runner)
+        rpm = sum(rpms.values()) / len(rpms)
+        expected = self.map.expected(level)
+        written, self._written = self._written, None
+        if expected is None:
+            if written != level:
+                # Nothing to check against and not our own fresh write.
+                self._counters["unverified"] += 1
+                return self._write(level, runner)
+            self.map.observe(level, rpm)
+            self._counters["learned"] += 1
+            self._counters["verified"] += 1
+            return _verified(level, rpm, expected, rpms)
+        if abs(rpm - expected) <= self.tolerance * expected:
+            self.map.observe(level, rpm)
+            self._reasserted_at = None
+            self._drift = []
+            self._counters["verified"] += 1
+            return _verified(level, rpm, expected, rpms)
+        if self._reasserted_at == level and written == level and self._agrees(rpm):
+            self._drift.append(rpm)
+        else:
+            # First mismatch, a failed reassert or a different reading.
+            self._drift = [rpm] if self._reasserted_at == level == written else []
+        if len(self._drift) >= self.relearn_after:
+            # Still off, the same way, after every reassert: the mapping, not
+            # the BMC, is wrong.
+            learned = sum(self._drift) / len(self._drift)
+            self.map.observe(level, learned, replace=True)
+            self._reasserted_at = None
+            self._drift = []
+            self._counters["relearned"] += 1
+            _log.info(
+                "Relearned fan level %s: %.0f RPM (was %.0f)", level, learned, expected
+            )
+            return _verified(level, rpm, expected, rpms)
+        self._counters["reasserted"] += 1
+        self._reasserted_at = level
+        _log.warning(
+            "Fan RPM %.0f diverges from %.0f expected at level %s; reasserting "
+            "(%d reasserts so far)",
+            rpm,
+            expected,
+            level,
+            self._counters["reasserted"],
+        )
+        return self._write(level, runner)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._counters,
+            "level": self.level,
+            "sensors": list(self._sensors or []),
+            "map": dict(sorted(self.map.points.items())),
+        }
@@ -0,0 +1,282 @@
+"""Load-aware feedforward for the CONCEPT:FAN-002 fan curve.
+
+The curve in :func:`~fan_manager.fan_manager.auto_set_fan_speed` only reacts
+once core temperatures have climbed; with a heat sink's thermal lag a bursty
+job reaches ``maximum_temperature`` before the fans catch up. CPU load is
+visible immediately, so a :class:`Feedforward` samples it cheaply between
+temperature polls:
+
+  * :class:`LoadSampler` reads ``/proc/stat`` busy/total deltas and each CPU's
+    ``scaling_cur_freq`` relative to ``cpuinfo_max_freq`` (1.0 when cpufreq is
+    absent); the load is the mean of ``utilization * frequency ratio``;
+  * the load the temperatures have already responded to is tracked as a
+    first-order lag with the plant's ``time_constant``;
+  * the *predicted rise* is ``gain * (load - lagged load)`` °C: how much hotter
+    the cores will get once they catch up. The curve is evaluated at the
+    measured temperature plus that rise, so the fans pre-ramp on a load jump
+    and hand back to the plain curve as the temperature arrives.
+
+``gain`` (°C per unit load at a fixed fan duty) and ``time_constant`` are
+properties of the chassis; :func:`measure_plant` runs a step test (fans fixed,
+load stepped by the operator or the simulator) and fits both::
+
+    python -m fan_manager.feedforward --duty 40 --duration 600
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from fan_manager.fan_manager import CommandRunner, get_temp, set_fan
+
+DEFAULT_GAIN = 32.0  # °C per unit load, simulated plant at 40% duty
+DEFAULT_TIME_CONSTANT = 18.0  # seconds, simulated plant at 40% duty
+DEFAULT_INTERVAL = 2.0  # seconds between load samples
+DEFAULT_RETICK = 3.0  # °C of new predicted rise that triggers an early tick
+
+_CPU_ROOT = "/sys/devices/system/cpu"
+
+
+def _read_text(path: str) -> str:
+    with open(path) as fh:
+        return fh.read()
+
+
+def parse_proc_stat(text: str) -> dict[str, tuple[int, int]]:
+    """``/proc/stat`` CPU lines as ``{"cpu": (busy, total), "cpu0": ...}``."""
+    times = {}
+    for line in text.splitlines():
+        if not line.startswith("cpu"):
+            continue
+        name, *fields = line.split()
+        values = [int(v) for v in fields[:8]]
+        idle = values[3] + (values[4] if len(values) > 4 else 0)  # idle + iowait
+        total = sum(values)
+        times[name] = (total - idle, total)
+    return times
+
+
+class LoadSampler:
+    """CPU load in ``[0, 1]`` from ``/proc/stat`` and cpufreq.
+
+    ``read`` stands in for file reads (the simulator provides one); it must
+    raise :class:`OSError` for a missing file.
+    """
+
+    def __init__(self, read: Callable[[str], str] | None = None) -> None:
+        self._read = read or _read_text
+        self._last: dict[str, tuple[int, int]] = {}
+        self._max_khz: dict[str, float | None] = {}
+
+    def _freq_ratio(self, cpu: str) -> float:
+        if cpu not in self._max_khz:
+            try:
+                self._max_khz[cpu] = float(
+                    self._read(f"{_CPU_ROOT}/{cpu}/cpufreq/cpuinfo_max_freq")
+                )
+            except (OSError, ValueError):
+                self._max_khz[cpu] = None
+        max_khz = self._max_khz[cpu]
+        if not max_khz:
+            return 1.0
+        try:
+            cur = float(self._read(f"{_CPU_ROOT}/{cpu}/cpufreq/scaling_cur_freq"))
+        except (OSError, ValueError):
+            return 1.0
+        return min(1.0, cur / max_khz)
+
+    def sample(self) -> float | None:
+        """Load since the previous call (``None`` on the first call)."""
+        times = parse_proc_stat(self._read("/proc/stat"))
+        last, self._last = self._last, times
+        loads = []
+        for cpu, (busy, total) in times.items():
+            if cpu == "cpu" or cpu not in last:
+                continue
+            d_total = total - last[cpu][1]
+            if d_total <= 0:
+                continue
+            util = min(1.0, max(0.0, (busy - last[cpu][0]) / d_total))
+            loads.append(util * self._freq_ratio(cpu) if util else 0.0)
+        if not loads:
+            return None
+        return sum(loads) / len(loads)
+
+
+class Feedforward:
+    """Predicted temperature rise from load the cores have not caught up with."""
+
+    def __init__(
+        self,
+        gain: float = DEFAULT_GAIN,
+        time_constant: float = DEFAULT_TIME_CONSTANT,
+        *,
+        interval: float = DEFAULT_INTERVAL,
+        retick: float = DEFAULT_RETICK,
+        read: Callable[[str], str] | None = None,
+        sampler: LoadSampler | None = None,
+    ) -> None:
+        self.gain = gain
+        self.time_constant = time_constant
+        self.interval = interval
+        self.retick = retick
+        self.sampler = sampler or LoadSampler(read)
+        self.load: float | None = None
+        self.lagged: float | None = None
+        self.samples = 0
+        self.early_ticks = 0
+        self.errors = 0
+
+    @property
+    def predicted_rise(self) -> float:
+        if self.load is None or self.lagged is None:
+            return 0.0
+        return self.gain * max(0.0, self.load - self.lagged)
+
+    def update(self, elapsed: float) -> float:
+        """Sample the load ``elapsed`` seconds after the last update."""
+        try:
+            load = self.sampler.sample()
+        except (OSError, ValueError):
+            self.errors += 1
+            return self.predicted_rise
+        if load is None:
+            return self.predicted_rise
+        self.samples += 1
+        if self.lagged is None:
+            self.lagged = load
+        else:
+            alpha = 1.0 - math.exp(-elapsed / self.time_constant)
+            self.lagged += (load - self.lagged) * alpha
+        self.load = load
+        return self.predicted_rise
+
+    def wait(self, seconds: float, sleep: Callable[[float], None]) -> None:
+        """Sleep up to ``seconds``, sampling the load every ``interval``.
+
+        Returns early once the predicted rise grows by ``retick`` °C, so the
+        caller can re-evaluate the curve before the temperature responds.
+        """
+        armed = self.predicted_rise
+        remaining = seconds
+        while remaining > 1e-9:
+            step = min(self.interval, remaining)
+            sleep(step)
+            remaining -= step
+            if self.update(step) >= armed + self.retick:
+                self.early_ticks += 1
+                return
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "gain": self.gain,
+            "time_constant": self.time_constant,
+            "load": self.load,
+            "lagged_load": self.lagged,
+            "predicted_rise": round(self.predicted_rise, 2),
+            "samples": self.samples,
+            "early_ticks": self.early_ticks,
+            "errors": self.errors,
+        }
+
+
+@dataclass(frozen=True)
+class PlantResponse:
+    """First-order fit of a load step at a fixed fan duty."""
+
+    gain: float  # °C per unit load
+    time_constant: float  # seconds to 63% of the rise
+    load_step: float
+    temperature_step: float
+
+
+def fit_step(samples: list[tuple[float, float, float]]) -> PlantResponse:
+    """Fit ``(seconds, load, temperature)`` samples spanning one load step."""
+    if len(samples) < 6:
+        raise ValueError("need at least 6 samples spanning the load step")
+    loads = [load for _, load, _ in samples]
+    middle = (min(loads) + max(loads)) / 2
+    rising = loads[0] < middle
+    start = next(
+        i for i, load in enumerate(loads) if (load > middle) == rising and i > 0
+    )
+    tail = max(1, len(samples) // 10)
+    before = samples[max(0, start - tail) : start]
+    after = samples[-tail:]
+    load0 = sum(s[1] for s in before) / len(before)
+    temp0 = sum(s[2] for s in before) / len(before)
+    load1 = sum(s[1] for s in after) / len(after)
+    temp1 = sum(s[2] for s in after) / len(after)
+    if abs(load1 - load0) < 0.05:
+        raise ValueError("load did not change enough to measure the plant")
+    target = temp0 + 0.632 * (temp1 - temp0)
+    t_step = samples[start - 1][0]
+    reached = next(
+        (t for t, _, temp in samples[start:] if (temp - target) * (temp1 - temp0) >= 0),
+        samples[-1][0],
+    )
+    return PlantResponse(
+        gain=(temp1 - temp0) / (load1 - load0),
+        time_constant=max(0.0, reached - t_step),
+        load_step=load1 - load0,
+        temperature_step=temp1 - temp0,
+    )
+
+
+def measure_plant(
+    duty: int = 40,
+    duration: float = 600.0,
+    *,
+    interval: float = DEFAULT_INTERVAL,
+    runner: CommandRunner | None = None,
+    read: Callable[[str], str] | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> PlantResponse:
+    """Hold the fans at ``duty`` and fit the response to a load step.
+
+    Start or stop a sustained load during the run; ``duration`` must leave
+    the temperature time to settle after it (several time constants).
+    """
+    if set_fan(duty, runner=runner)["status"] != 200:
+        raise RuntimeError(f"could not hold the fans at {duty}%")
+    sampler = LoadSampler(read)
+    sampler.sample()
+    samples = []
+    elapsed = 0.0
+    while elapsed < duration:
+        sleep(interval)
+        elapsed += interval
+        load = sampler.sample()
+        temp = get_temp(runner=runner)
+        if load is not None and temp["status"] == 200:
+            samples.append((elapsed, load, temp["response"]))
+    return fit_step(samples)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run a step test on this host and print the feedforward settings."""
+    parser = argparse.ArgumentParser(
+        prog="python -m fan_manager.feedforward",
+        description="Measure the thermal plant for --feedforward: the fans are "
+        "held at --duty while you start (or stop) a sustained CPU load.",
+    )
+    parser.add_argument("--duty", type=int, default=40)
+    parser.add_argument("--duration", type=float, default=600.0)
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    args = parser.parse_args(argv)
+    plant = measure_plant(args.duty, args.duration, interval=args.interval)
+    print(
+        f"load step {plant.load_step:+.2f} -> {plant.temperature_step:+.1f} °C; "
+        f"time constant {plant.time_constant:.0f} s\n"
+        f"fan-manager --feedforward {plant.gain:.0f} "
+        f"--feedforward-tau {plant.time_constant:.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+"""High-rate hwmon sampling with peak-hold windows (CONCEPT:FAN-001).
+
+With ``temperature_poll_rate=24`` a ten-second spike between polls never
+reaches :func:`~fan_manager.fan_manager.auto_set_fan_speed`, and polling
+faster multiplies ``sensors`` forks. A :class:`HwmonSampler` instead reads
+the coretemp ``temp*_input`` files under ``/sys/class/hwmon`` directly (a few
+``read()`` calls, no process) at ``interval`` seconds into a small fixed
+ring. It is driven from the daemon's sleep: :meth:`HwmonSampler.sleep` wraps
+the loop's ``sleep`` so every wait is cut into ``interval`` steps with a
+sample after each. The control tick then consumes a :class:`Window` of
+everything since the previous tick:
+
+  * ``max`` — the peak held since the last tick, so transients are caught;
+  * ``ema`` — exponential moving average with ``time_constant`` seconds;
+  * ``slope`` — least-squares °C/s over the last ``slope_span`` seconds.
+
+The curve is evaluated at ``Window.control``: the held peak, or the EMA
+projected ``lookahead`` seconds ahead along a rising slope if that is higher.
+Projecting a whole poll interval ahead would turn one noisy ramp into a
+full-speed burst, so the lookahead stays short.
+
+:class:`HwmonAlarms` is the event-driven alternative to a timer: it programs
+writable ``temp*_max``/``temp*_min`` thresholds of a CPU temperature input
+``band`` °C around the current operating point and blocks in ``poll()`` on
+the ``*_alarm`` attributes (``POLLPRI``, which the kernel raises with
+``sysfs_notify``) until one fires or a long safety timeout elapses. Many
+drivers never notify, so a wait that samples also ends when a reading leaves
+the band.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import math
+import os
+import select
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+HWMON_ROOT = "/sys/class/hwmon"
+CHIPS = ("coretemp", "k10temp", "zenpower")
+# Labels of CPU temperature inputs on Super-I/O and board monitoring chips.
+CPU_LABELS = ("cpu", "peci", "package", "tctl", "tdie")
+
+_log = logging.getLogger("FanManager.hwmon")
+
+
+def _read_text(path: str) -> str:
+    with open(path) as fh:
+        return fh.read()
+
+
+def _write_text(path: str, value: str) -> None:
+    with open(path, "w") as fh:
+        fh.write(value)
+
+
+@dataclass(frozen=True)
+class Window:
+    """Aggregates over the samples since the previous control tick."""
+
+    max: float
+    ema: float
+    slope: float  # °C per second
+    last: float
+    samples: int
+    zones: dict[str, float]
+    lookahead: float  # seconds the EMA is projected along a rising slope
+
+    @property
+    def control(self) -> float:
+        """Temperature the curve should act on until the next tick."""
+        return max(self.max, self.ema + max(0.0, self.slope) * self.lookahead)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "max": self.max,
+            "control": round(self.control, 2),
+            "ema": round(self.ema, 2),
+            "slope": round(self.slope, 4),
+            "samples": self.samples,
+        }
+
+
+class HwmonSampler:
+    """Reads CPU hwmon temperatures into a fixed ring of ``size`` samples.
+
+    ``read`` and ``listdir`` stand in for file access (the simulator provides
+    both as ``read_text``/``list_dir``).
+    """
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        *,
+        lookahead: float = 5.0,
+        size: int = 128,
+        time_constant: float = 8.0,
+        slope_span: float = 10.0,
+        read: Callable[[str], str] | None = None,
+        listdir: Callable[[str], list[str]] | None = None,
+    ) -> None:
+        self.interval = interval
+        self.lookahead = lookahead
+        self.time_constant = time_constant
+        self.slope_span = slope_span
+        self._read = read or _read_text
+        self._listdir = listdir or os.listdir
+        self.ring: deque[tuple[float, float]] = deque(maxlen=size)
+        self.now = 0.0
+        self.ema: float | None = None
+        self.errors = 0
+        self._inputs: list[tuple[str, str]] | None = None
+        self._peak: float | None = None
+        self._zones: dict[str, float] = {}
+        self._count = 0
+
+    def discover(self) -> list[tuple[str, str]]:
+        """``(zone, temp*_input path)`` for every CPU temperature input."""
+        if self._inputs is None:
+            inputs = []
+            seen: dict[str, int] = {}
+            try:
+                entries = sorted(self._listdir(HWMON_ROOT))
+            except OSError:
+                entries = []
+            for entry in entries:
+                base = f"{HWMON_ROOT}/{entry}"
+                try:
+                    name = self._read(f"{base}/name").strip()
+                    files = self._listdir(base)
+                except OSError:
+                    continue
+                if name not in CHIPS:
+                    continue
+                zone = f"{name}.{seen.get(name, 0)}"
+                seen[name] = seen.get(name, 0) + 1
+                inputs += [
+                    (zone, f"{base}/{f}")
+                    for f in sorted(files)
+                    if f.startswith("temp") and f.endswith("_input")
+                ]
+            self._inputs = inputs
+        return self._inputs
+
+    def sample(self, elapsed: float = 0.0) -> float | None:
+        """Read every input once; the hottest reading in °C (``None`` if none)."""
+        self.now += elapsed
+        zones: dict[str, float] = {}
+        for zone, path in self.discover():
+            try:
+                value = int(self._read(path)) / 1000.0
+            except (OSError, ValueError):
+                self.errors += 1
+                continue
+            if value > zones.get(zone, -math.inf):
+                zones[zone] = value
+        if not zones:
+            return None
+        temp = max(zones.values())
+        self.ring.append((self.now, temp))
+        if self.ema is None:
+            self.ema = temp
+        else:
+            self.ema += (temp - self.ema) * (
+                1.0 - math.exp(-elapsed / self.time_constant)
+            )
+        self._peak = temp if self._peak is None else max(self._peak, temp)
+        for zone, value in zones.items():
+            self._zones[zone] = max(self._zones.get(zone, -math.inf), value)
+        self._count += 1
+        return temp
+
+    def slope(self) -> float:
+        """Least-squares °C/s over the last ``slope_span`` seconds."""
+        points = [(t, v) for t, v in self.ring if t >= self.now - self.slope_span]
+        if len(points) < 2:
+            return 0.0
+        mean_t = sum(t for t, _ in points) / len(points)
+        mean_v = sum(v for _, v in points) / len(points)
+        var = sum((t - mean_t) ** 2 for t, _ in points)
+        if var == 0:
+            return 0.0
+        return sum((t - mean_t) * (v - mean_v) for t, v in points) / var
+
+    def take(self) -> Window | None:
+        """Aggregates since the previous call, then start a new window."""
+        if self._peak is None:  # nothing sampled since the last tick
+            self.sample()
+        if self._peak is None or self.ema is None:
+            return None
+        window = Window(
+            max=self._peak,
+            ema=self.ema,
+            slope=self.slope(),
+            last=self.ring[-1][1],
+            samples=self._count,
+            zones=dict(self._zones),
+            lookahead=self.lookahead,
+        )
+        self._peak, self._zones, self._count = None, {}, 0
+        return window
+
+    def sleep(self, sleep: Callable[[float], None]) -> Callable[[float], None]:
+        """Wrap ``sleep`` so waits are cut into ``interval`` steps and sampled."""
+
+        def sampling_sleep(seconds: float) -> None:
+            remaining = seconds
+            while remaining > 1e-9:
+                step = min(self.interval, remaining)
+                sleep(step)
+                remaining -= step
+                self.sample(step)
+
+        return sampling_sleep
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "inputs": len(self.discover()),
+            "samples": len(self.ring),
+            "ema": self.ema,
+            "slope": self.slope(),
+            "errors": self.errors,
+        }
+
+
+@dataclass
+class _Threshold:
+    input: str
+    max: str
+    min: str | None
+    alarms: list[str]
+
+
+def _outside(reading: float | None, reference: float | None, band: float) -> bool:
+    """Whether ``reading`` is more than ``band`` °C away from ``reference``."""
+    if reading is None or reference is None:
+        return False
+    return abs(reading - reference) > band
+
+
+class SysfsAlarmPoller:
+    """Block until a sysfs attribute is notified (``POLLPRI``/``POLLERR``).
+
+    Each attribute is kept open and re-read before every wait, as sysfs
+    requires, so a notification between waits is not lost.
+    """
+
+    def __init__(self) -> None:
+        self._files: dict[str, Any] = {}
+
+    def __call__(self, paths: list[str], timeout: float) -> list[str]:
+        poller = select.poll()
+        by_fd = {}
+        for path in paths:
+            fh = self._files.get(path)
+            if fh is None:
+                fh = self._files[path] = open(path, "rb", buffering=0)  # noqa: SIM115
+            fh.seek(0)
+            fh.read()
+            poller.register(fh.fileno(), select.POLLPRI | select.POLLERR)
+            by_fd[fh.fileno()] = path
+        return [by_fd[fd] for fd, _ in poller.poll(max(0.0, timeout) * 1000)]
+
+    def close(self) -> None:
+        while self._files:
+            self._files.popitem()[1].close()
+
+
+class HwmonAlarms:
+    """Sleep until a CPU hwmon threshold alarm fires, or ``timeout`` elapses.
+
+    ``read``/``write``/``listdir`` stand in for file access and ``waiter`` for
+    :class:`SysfsAlarmPoller`; the simulator provides all four.
+    """
+
+    def __init__(
+        self,
+        band: float = 3.0,
+        *,
+        read: Callable[[str], str] | None = None,
+        write: Callable[[str, str], None] | None = None,
+        listdir: Callable[[str], list[str]] | None = None,
+        waiter: Callable[[list[str], float], list[str]] | None = None,
+    ) -> None:
+        self.band = band
+        self._read = read or _read_text
+        self._write = write or _write_text
+        self._listdir = listdir or os.listdir
+        self._waiter = waiter or SysfsAlarmPoller()
+        self._thresholds: list[_Threshold] | None = None
+        self._armed: list[_Threshold] = []
+        self._saved: dict[str, str] = {}  # threshold file -> firmware value
+        self.armed_at: float | None = None
+        self.wakeups = 0
+        self.excursions = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _is_cpu(self, chip: str, base: str, index: str) -> bool:
+        if chip in CHIPS:
+            return True
+        try:
+            label = self._read(f"{base}/temp{index}_label").strip().lower()
+        except OSError:
+            return False
+        return any(word in label for word in CPU_LABELS)
+
+    def discover(self) -> list[_Threshold]:
+        """CPU temperature inputs that have a ``max`` threshold and an alarm."""
+        if self._thresholds is None:
+            found = []
+            try:
+                entries = sorted(self._listdir(HWMON_ROOT))
+            except OSError:
+                entries = []
+            for entry in entries:
+                base = f"{HWMON_ROOT}/{entry}"
+                try:
+                    chip = self._read(f"{base}/name").strip()
+                    files = set(self._listdir(base))
+                except OSError:
+                    continue
+                for f in sorted(files):
+                    if not (f.startswith("temp") and f.endswith("_max")):
+                        continue
+                    index = f[4:-4]
+                    names = ("max_alarm", "min_alarm", "alarm")
+                    alarms = [
+                        f"{base}/temp{index}_{a}"
+                        for a in names
+                        if f"temp{index}_{a}" in files
+                    ]
+                    if not alarms or not self._is_cpu(chip, base, index):
+                        continue
+                    found.append(
+                        _Threshold(
+                            input=f"{base}/temp{index}_input",
+                            max=f"{base}/{f}",
+                            min=f"{base}/temp{index}_min"
+                            if f"temp{index}_min" in files
+                            else None,
+                            alarms=alarms,
+                        )
+                    )
+            self._thresholds = found
+        return self._thresholds
+
+    def _save(self, path: str) -> None:
+        """Remember ``path``'s firmware value before its first overwrite."""
+        if path in self._saved:
+            return
+        value = self._read(path).strip()
+        int(value)  # refuse to take over a limit we could not restore
+        if not self._saved:
+            atexit.register(self.restore)
+        self._saved[path] = value
+
+    def arm(self, temperature: float) -> bool:
+        """Program thresholds ``band`` °C around each input's current reading.
+
+        ``temperature`` (the tick's reading) is used for an unreadable input.
+        The firmware's limits are saved on the first overwrite and written
+        back by :meth:`restore` (also registered with :mod:`atexit`). An input
+        whose thresholds cannot be saved or written is skipped this time and
+        tried again on the next call.
+        """
+        armed, readings = [], []
+        for t in self.discover():
+            try:
+                current = int(self._read(t.input)) / 1000.0
+            except (OSError, ValueError):
+                current = temperature
+            try:
+                for path in (t.max, t.min):
+                    if path is not None:
+                        self._save(path)
+                self._write(t.max, str(round((current + self.band) * 1000)))
+                if t.min is not None:
+                    low = max(0.0, current - self.band)
+                    self._write(t.min, str(round(low * 1000)))
+            except (OSError, ValueError) as e:
+                self.errors += 1
+                _log.warning("Cannot program hwmon threshold %s: %s", t.max, e)
+                continue
+            armed.append(t)
+            readings.append(current)
+        self._armed = armed
+        self.armed_at = max(readings) if readings else None
+        return bool(armed)
+
+    def restore(self) -> int:
+        """Write the saved firmware limits back; returns how many were restored."""
+        restored = 0
+        for path, value in list(self._saved.items()):
+            try:
+                self._write(path, value)
+            except OSError as e:
+                _log.error("Cannot restore hwmon threshold %s: %s", path, e)
+                continue
+            del self._saved[path]
+            restored += 1
+        self._armed = []
+        self.armed_at = None
+        if not self._saved:
+            atexit.unregister(self.restore)
+        return restored
+
+    def wait(self, timeout: float, sampler: HwmonSampler | None = None) -> bool:
+        """Block until an armed alarm fires (``True``) or ``timeout`` elapses.
+
+        With ``sampler`` the wait is cut into its ``interval`` steps with a
+        sample after each, so the peak-hold window still fills between ticks,
+        and it also ends (``True``) as soon as a sample moves ``band`` °C away
+        from the sampler's last reading (or :attr:`armed_at`): many drivers
+        never notify their ``*_alarm`` attributes.
+        """
+        paths = [a for t in self._armed for a in t.alarms]
+        if not paths:
+            return False
+        reference = self.armed_at
+        if sampler is not None and sampler.ring:
+            reference = sampler.ring[-1][1]  # same inputs as the samples below
+        remaining = timeout
+        while True:
+            step = remaining if sampler is None else min(sampler.interval, remaining)
+            fired = bool(self._waiter(paths, step))
+            remaining -= step
+            if sampler is not None:
+                reading = sampler.sample(step)
+                if not fired and _outside(reading, reference, self.band):
+                    self.excursions += 1
+                    return True
+            if fired or remaining <= 1e-9:
+                break
+        if fired:
+            self.wakeups += 1
+        else:
+            self.timeouts += 1
+        return fired
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "inputs": len(self.discover()),
+            "armed": len(self._armed),
+            "armed_at": self.armed_at,
+            "saved": len(self._saved),
+            "band": self.band,
+            "wakeups": self.wakeups,
+            "excursions": self.excursions,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
@@ -9,16 +9,39 @@
 no user string ever reaches a command line) and returns the package-standard
 ``{"response", "command", "status", "error"?}`` dict. The ``command`` string is
 returned with the ``-P <password>`` redacted.
+
+Each call is classified as ``read`` (retried with jittered backoff),
+``destructive`` (never retried) or ``control``, runs under that class's deadline,
+and is admitted by the target's circuit breaker (see
+:mod:`fan_manager.resilience`), so a dead BMC fails fast with status 503 and a
+hung session is killed with status 504.
+
+Slow-changing configuration and inventory reads (``mc info``, ``lan print``,
+``user list``, ``sol info``, ``chassis poh``) are served from a per-target
+cache that the matching writes invalidate; pass ``refresh=True`` to bypass it
+(see :mod:`fan_manager.bmc_cache`).
 """
 
 from __future__ import annotations
 
 import logging
+from collections.abc import Callable, Iterator
+from contextlib import closing
 from typing import Any
 
-from fan_manager.fan_manager import CommandRunner, SubprocessCommandRunner
+from fan_manager import bmc_cache, sensor_delta, views
+from fan_manager import fan_manager as _core
+from fan_manager.capabilities import binary, profile_for
+from fan_manager.fan_manager import CommandRunner, _failure_status
+from fan_manager.resilience import (
+    LOCAL_TARGET,
+    breaker_for,
+    breaker_stats,
+    call_with_policy,
+    policy_for,
+)
+from fan_manager.scheduler import lane_for, queue_stats, schedule
 
-_DEFAULT_RUNNER: CommandRunner = SubprocessCommandRunner()
 _log = logging.getLogger("FanManager.ipmi")
 
 # A "target" is an optional dict {host, user, password}. host present => out-of-band.
@@ -26,7 +49,7 @@
 
 
 def _base_argv(runner: CommandRunner, target: Target) -> list[str]:
-    ipmitool = runner.which("ipmitool")
+    ipmitool = binary(runner, "ipmitool")
     if ipmitool is None:
         raise RuntimeError("'ipmitool' executable not found on PATH")
     argv = [ipmitool]
@@ -44,6 +67,13 @@ def _base_argv(runner: CommandRunner, target: Target) -> list[str]:
     return argv
 
 
+def _target_key(target: Target) -> str:
+    """Breaker/scheduling key for a target: the BMC host, or ``"local"``."""
+    if target and target.get("host"):
+        return str(target["host"])
+    return LOCAL_TARGET
+
+
 def _redact(argv: list[str]) -> str:
     """Render argv as a string with the value after ``-P`` masked."""
     parts = []
@@ -53,25 +83,120 @@ def _redact(argv: list[str]) -> str:
 
 
 def _exec(
-    runner: CommandRunner | None, target: Target, args: list[str], *, check: bool = True
+    runner: CommandRunner | None,
+    target: Target,
+    args: list[str],
+    *,
+    check: bool = True,
+    action_class: str = "destructive",
+    breaker_key: str | None = None,
+) -> dict[str, Any]:
+    return _dispatch(
+        runner,
+        target,
+        args,
+        lambda runner, argv, timeout: runner.run(
+            argv, check=check, timeout=timeout
+        ).strip(),
+        action_class,
+        breaker_key,
+    )
+
+
+def _exec_stream(
+    runner: CommandRunner | None,
+    target: Target,
+    args: list[str],
+    consume: Callable[[Iterator[str]], Any],
+    *,
+    action_class: str = "read",
 ) -> dict[str, Any]:
-    runner = runner or _DEFAULT_RUNNER
+    """Like :func:`_exec`, but ``consume`` reads stdout lines as they arrive.
+
+    Its return value is the ``response``. When it returns before the end of
+    the stream an in-band command is killed (see
+    :meth:`~fan_manager.fan_manager.SubprocessCommandRunner.run_stream`); an
+    out-of-band one is drained to its end instead, so ``ipmitool`` closes its
+    BMC session rather than leaving it to time out on the BMC. A retry calls
+    ``consume`` again on a fresh stream.
+    """
+    remote = bool(target and target.get("host"))
+
+    def attempt(runner: CommandRunner, argv: list[str], timeout: float | None):
+        with closing(_core.stream_lines(runner, argv, timeout=timeout)) as lines:
+            result = consume(lines)
+            if remote:
+                for _ in lines:  # discarded: memory stays at one line
+                    pass
+            return result
+
+    return _dispatch(runner, target, args, attempt, action_class)
+
+
+def _dispatch(
+    runner: CommandRunner | None,
+    target: Target,
+    args: list[str],
+    call: Callable[[CommandRunner, list[str], float | None], Any],
+    action_class: str,
+    breaker_key: str | None = None,
+) -> dict[str, Any]:
+    # The core default runner (see ``set_default_runner``), so its capability
+    # profile is probed once and a swapped-in runner applies here too.
+    # ``breaker_key`` gives background callers a breaker of their own, so
+    # their failures never block the target's interactive commands.
+    runner = runner or _core._DEFAULT_RUNNER
     try:
         argv = _base_argv(runner, target) + args
         cmd = _redact(argv)
-        out = runner.run(argv, check=check)
+        key = _target_key(target)
+        lane = lane_for(action_class)
+        out = call_with_policy(
+            lambda timeout: call(runner, argv, timeout),
+            policy_for(action_class),
+            breaker_for(breaker_key or key),
+            submit=lambda attempt: schedule(key, attempt, lane=lane),
+        )
         _log.info("ipmi ok: %s", cmd)
-        return {"response": out.strip(), "command": cmd, "status": 200}
+        return {"response": out, "command": cmd, "status": 200}
     except Exception as e:  # noqa: BLE001 — surface as a typed result, never raise
         _log.error("ipmi failed: %s", e)
         return {
             "response": None,
             "command": " ".join(args),
-            "status": 500,
+            "status": _failure_status(e),
             "error": str(e),
         }
 
 
+def _cached(
+    runner: CommandRunner | None,
+    target: Target,
+    command: str,
+    args: list[str],
+    refresh: bool,
+) -> dict[str, Any]:
+    """A ``read`` through :mod:`fan_manager.bmc_cache`."""
+    return bmc_cache.read(
+        _target_key(target),
+        bmc_cache.credentials(target),
+        command,
+        tuple(args),
+        lambda: _exec(runner, target, args, action_class="read"),
+        refresh=refresh,
+    )
+
+
+def stats(runner: CommandRunner | None = None) -> dict[str, Any]:
+    """Runtime execution stats: breakers, queues, read cache and capabilities."""
+    return {
+        "breakers": breaker_stats(),
+        "queues": queue_stats(),
+        "cache": bmc_cache.stats(),
+        "capabilities": profile_for(runner or _core._DEFAULT_RUNNER).as_dict(),
+    }
+
+
 def _invalid(action: str, valid: set[str]) -> dict[str, Any]:
     return {
         "response": None,
@@ -89,7 +214,12 @@ def power(
     valid = {"status", "on", "off", "cycle", "reset", "soft"}
     if action not in valid:
         return _invalid(action, valid)
-    return _exec(runner, target, ["chassis", "power", action])
+    return _exec(
+        runner,
+        target,
+        ["chassis", "power", action],
+        action_class="read" if action == "status" else "destructive",
+    )
 
 
 def chassis(
@@ -97,13 +227,18 @@ def chassis(
     target: Target = None,
     bootdev: str | None = None,
     runner: CommandRunner | None = None,
+    refresh: bool = False,
 ) -> dict[str, Any]:
-    """Chassis info/control: status | identify | bootdev | restart_cause | poh."""
+    """Chassis info/control: status | identify | bootdev | restart_cause | poh.
+
+    ``poh`` is cached (``refresh`` bypasses the cache)."""
     valid = {"status", "identify", "bootdev", "restart_cause", "poh"}
     if action not in valid:
         return _invalid(action, valid)
     if action == "identify":
-        return _exec(runner, target, ["chassis", "identify", "15"])  # blink 15s
+        return _exec(  # blink 15s
+            runner, target, ["chassis", "identify", "15"], action_class="control"
+        )
     if action == "bootdev":
         if not bootdev:
             return {
@@ -114,10 +249,10 @@ def chassis(
             }
         return _exec(runner, target, ["chassis", "bootdev", bootdev])
     if action == "restart_cause":
-        return _exec(runner, target, ["chassis", "restart_cause"])
+        return _exec(runner, target, ["chassis", "restart_cause"], action_class="read")
     if action == "poh":
-        return _exec(runner, target, ["chassis", "poh"])
-    return _exec(runner, target, ["chassis", "status"])
+        return _cached(runner, target, "chassis poh", ["chassis", "poh"], refresh)
+    return _exec(runner, target, ["chassis", "status"], action_class="read")
 
 
 # --- CONCEPT:FAN-004 — sensors --------------------------------------------
@@ -126,8 +261,16 @@ def sensors(
     target: Target = None,
     sensor_type: str | None = None,
     runner: CommandRunner | None = None,
+    since: str | None = None,
+    view: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
-    """Sensor readings: list (sdr list) | full (sensor list) | type (sdr type <T>)."""
+    """Sensor readings: list (sdr list) | full (sensor list) | type (sdr type <T>).
+
+    Successful reads carry a ``token``; pass it back as ``since`` to get only
+    the readings that changed (see :mod:`fan_manager.sensor_delta`). ``view``
+    options (see :mod:`fan_manager.views`) filter the parsed readings, which
+    are then read line by line instead of as one buffered listing.
+    """
     valid = {"list", "full", "type"}
     if action not in valid:
         return _invalid(action, valid)
@@ -139,34 +282,93 @@ def sensors(
                 "status": 400,
                 "error": "sensor_type required (e.g. 'Temperature', 'Fan', 'Drive Slot')",
             }
-        return _exec(runner, target, ["sdr", "type", sensor_type])
-    if action == "full":
-        return _exec(runner, target, ["sensor", "list"])
-    return _exec(runner, target, ["sdr", "list"])
+        args = ["sdr", "type", sensor_type]
+    elif action == "full":
+        args = ["sensor", "list"]
+    else:
+        args = ["sdr", "list"]
+    scope = (_target_key(target), action, sensor_type)
+    if not view or not views.wants_view(view) or since:
+        res = _exec(runner, target, args, action_class="read")
+        if res["status"] == 200:
+            res.update(sensor_delta.track(scope, res["response"], since))
+        return views.shape(res, "sensors", view or {})
+    try:
+        views.check(view)
+    except views.ViewError as e:
+        return {
+            "response": None,
+            "command": " ".join(args),
+            "status": 400,
+            "error": str(e),
+        }
+    res = _exec_stream(runner, target, args, sensor_delta.parse_readings)
+    if res["status"] != 200:
+        return res
+    readings = res["response"]
+    res.update(sensor_delta.track(scope, readings))
+    rows, total = views.select(views.reading_rows(readings), view)
+    return {**res, **views.page_fields(rows, total, view)}
 
 
 # --- CONCEPT:FAN-005 — system event log -----------------------------------
 def sel(
-    action: str = "list", target: Target = None, runner: CommandRunner | None = None
+    action: str = "list",
+    target: Target = None,
+    runner: CommandRunner | None = None,
+    view: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
-    """System Event Log: list | elist | info | clear."""
+    """System Event Log: list | elist | info | clear.
+
+    With ``view`` options (see :mod:`fan_manager.views`) ``list``/``elist``
+    entries are parsed as they are read and ``ipmitool`` is stopped once the
+    page is full, so a large SEL is never held in memory.
+    """
     valid = {"list", "elist", "info", "clear"}
     if action not in valid:
         return _invalid(action, valid)
-    return _exec(runner, target, ["sel", action])
+    if action == "clear":
+        return _exec(runner, target, ["sel", action])
+    if action == "info" or not view or not views.wants_view(view):
+        res = _exec(runner, target, ["sel", action], action_class="read")
+        return views.shape(res, "fields" if action == "info" else "sel", view or {})
+    try:
+        views.check(view)
+    except views.ViewError as e:
+        return {
+            "response": None,
+            "command": f"sel {action}",
+            "status": 400,
+            "error": str(e),
+        }
+    res = _exec_stream(
+        runner,
+        target,
+        ["sel", action],
+        lambda lines: views.take(views.iter_sel_rows(lines), view, "sensor", "state"),
+    )
+    if res["status"] != 200:
+        return res
+    rows, total = res["response"]
+    return {**res, **views.page_fields(rows, total, view)}
 
 
 # --- CONCEPT:FAN-006 — Serial-over-LAN -------------------------------------
 def sol(
-    action: str = "info", target: Target = None, runner: CommandRunner | None = None
+    action: str = "info",
+    target: Target = None,
+    runner: CommandRunner | None = None,
+    refresh: bool = False,
 ) -> dict[str, Any]:
-    """Serial-over-LAN: info | deactivate. (interactive 'activate' is not exposed
-    via MCP — use the printed `ipmitool ... sol activate` recipe for a live console)."""
+    """Serial-over-LAN: info (cached) | deactivate. (interactive 'activate' is not
+    exposed via MCP — use the printed `ipmitool ... sol activate` recipe for a live
+    console)."""
     valid = {"info", "deactivate"}
     if action not in valid:
         return _invalid(action, valid)
-    arg = ["sol", "info", "1"] if action == "info" else ["sol", "deactivate"]
-    return _exec(runner, target, arg)
+    if action == "info":
+        return _cached(runner, target, "sol info", ["sol", "info", "1"], refresh)
+    return _exec(runner, target, ["sol", "deactivate"])
 
 
 # --- CONCEPT:FAN-007 — BMC config (LAN / user / mc) ------------------------
@@ -177,8 +379,11 @@ def lan(
     value: str | None = None,
     channel: str = "1",
     runner: CommandRunner | None = None,
+    refresh: bool = False,
 ) -> dict[str, Any]:
-    """BMC LAN: print | set (param+value, e.g. ipaddr/netmask/defgw/access)."""
+    """BMC LAN: print (cached) | set (param+value, e.g. ipaddr/netmask/defgw/access).
+
+    ``set`` invalidates the channel's cached ``print``."""
     valid = {"print", "set"}
     if action not in valid:
         return _invalid(action, valid)
@@ -190,8 +395,12 @@ def lan(
                 "status": 400,
                 "error": "param and value required (e.g. param='access' value='on')",
             }
-        return _exec(runner, target, ["lan", "set", channel, param, value])
-    return _exec(runner, target, ["lan", "print", channel])
+        res = _exec(runner, target, ["lan", "set", channel, param, value])
+        bmc_cache.invalidate(
+            _target_key(target), "lan print", ("lan", "print", channel)
+        )
+        return res
+    return _cached(runner, target, "lan print", ["lan", "print", channel], refresh)
 
 
 def user(
@@ -201,14 +410,15 @@ def user(
     password: str | None = None,
     channel: str = "1",
     runner: CommandRunner | None = None,
+    refresh: bool = False,
 ) -> dict[str, Any]:
-    """BMC users: list | set_password | enable | disable. (user_id required for the
-    last three; set_password takes `password`)."""
+    """BMC users: list (cached) | set_password | enable | disable. (user_id required
+    for the last three; set_password takes `password`; they invalidate `list`)."""
     valid = {"list", "set_password", "enable", "disable"}
     if action not in valid:
         return _invalid(action, valid)
     if action == "list":
-        return _exec(runner, target, ["user", "list", channel])
+        return _cached(runner, target, "user list", ["user", "list", channel], refresh)
     if not user_id:
         return {
             "response": None,
@@ -228,24 +438,31 @@ def user(
         # build the command but redact the literal pw in the returned 'command'.
         res = _exec(runner, target, ["user", "set", "password", user_id, password])
         res["command"] = f"user set password {user_id} ***"
-        return res
-    return _exec(runner, target, ["user", action, user_id])
+    else:
+        res = _exec(runner, target, ["user", action, user_id])
+    bmc_cache.invalidate(_target_key(target), "user list")
+    return res
 
 
 def mc(
-    action: str = "info", target: Target = None, runner: CommandRunner | None = None
+    action: str = "info",
+    target: Target = None,
+    runner: CommandRunner | None = None,
+    refresh: bool = False,
 ) -> dict[str, Any]:
-    """Management controller: info | reset_cold | reset_warm | selftest."""
+    """Management controller: info (cached) | reset_cold | reset_warm | selftest.
+
+    A reset invalidates everything cached for the target."""
     valid = {"info", "reset_cold", "reset_warm", "selftest"}
     if action not in valid:
         return _invalid(action, valid)
-    if action == "reset_cold":
-        return _exec(runner, target, ["mc", "reset", "cold"])
-    if action == "reset_warm":
-        return _exec(runner, target, ["mc", "reset", "warm"])
+    if action in ("reset_cold", "reset_warm"):
+        res = _exec(runner, target, ["mc", "reset", action.removeprefix("reset_")])
+        bmc_cache.invalidate(_target_key(target))
+        return res
     if action == "selftest":
-        return _exec(runner, target, ["mc", "selftest"])
-    return _exec(runner, target, ["mc", "info"])
+        return _exec(runner, target, ["mc", "selftest"], action_class="read")
+    return _cached(runner, target, "mc info", ["mc", "info"], refresh)
 
 
 # --- CONCEPT:FAN-008 — raw -------------------------------------------------
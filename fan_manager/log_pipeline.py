@@ -0,0 +1,164 @@
+"""Asynchronous, rotating, repeat-suppressing logging for the fan daemon.
+
+The control loop (CONCEPT:FAN-001 reads, CONCEPT:FAN-002 writes) logs the same
+lines every tick. :func:`configure` replaces the synchronous root handlers with:
+
+  * a :class:`DeferredQueueHandler` on the root logger — the producer only
+    enqueues the raw record; ``%``-style interpolation, JSON encoding and disk
+    writes all happen on a :class:`logging.handlers.QueueListener` thread;
+  * a :class:`RepeatFilter` ahead of the queue that drops a record identical to
+    the previous one from the same call site (same logger, level, template and
+    args) within ``repeat_window`` seconds, and stamps the next emitted record
+    with how many were suppressed;
+  * a size-rotated file with one JSON object per line (:class:`JsonFormatter`)
+    plus the human-readable stdout stream.
+
+Callers keep using ``logger.info("... %s", value)`` — never f-strings — so a
+disabled level costs one ``isEnabledFor`` check and nothing else.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from typing import Any
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# LogRecord attributes that are not user-supplied ``extra`` fields.
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and extras."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class RepeatFilter(logging.Filter):
+    """Suppress identical consecutive records from one call site.
+
+    Records are keyed by ``(logger, level, template)``; a record whose ``args``
+    equal the last emitted ones within ``window`` seconds is dropped. The next
+    record that does get through carries ``repeated=<n>``. Comparison uses the
+    unformatted template and args, so no message is ever rendered here; a
+    non-string ``msg`` (a dict logged directly) is keyed by its ``str()``.
+    """
+
+    def __init__(self, window: float = 300.0) -> None:
+        super().__init__()
+        self.window = window
+        self._lock = threading.Lock()
+        self._last: dict[tuple[str, int, Any], tuple[Any, float, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        msg = record.msg if isinstance(record.msg, str) else str(record.msg)
+        key = (record.name, record.levelno, msg)
+        with self._lock:
+            previous = self._last.get(key)
+            if previous is not None:
+                args, since, suppressed = previous
+                if args == record.args and record.created - since < self.window:
+                    self._last[key] = (args, since, suppressed + 1)
+                    return False
+                if suppressed:
+                    record.repeated = suppressed
+            self._last[key] = (record.args, record.created, 0)
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The stock :meth:`~logging.handlers.QueueHandler.prepare` renders the message
+    in the caller's thread; records never leave this process, so they are
+    enqueued untouched.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: logging.handlers.QueueListener | None = None
+_listener_lock = threading.Lock()
+
+
+def configure(
+    log_file: str,
+    level: int | str = logging.INFO,
+    *,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    repeat_window: float = 300.0,
+    stream: Any = None,
+) -> logging.handlers.QueueListener:
+    """Install the queue pipeline on the root logger (idempotent).
+
+    Args:
+        log_file: JSON-lines log file, rotated at ``max_bytes``.
+        level: Root level; records below it are never created.
+        max_bytes: Rotation size; ``backup_count`` old files are kept.
+        repeat_window: Seconds an identical record is suppressed for.
+        stream: Text stream for the human-readable copy (default stdout).
+    """
+    global _listener
+    with _listener_lock:
+        _stop_listener()
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count
+        )
+        file_handler.setFormatter(JsonFormatter())
+        stream_handler = logging.StreamHandler(stream or sys.stdout)
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+        log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        queue_handler = DeferredQueueHandler(log_queue)
+        queue_handler.addFilter(RepeatFilter(repeat_window))
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+            handler.close()
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(
+            log_queue, file_handler, stream_handler, respect_handler_level=True
+        )
+        _listener.start()
+        return _listener
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def shutdown() -> None:
+    """Flush queued records and stop the listener thread."""
+    with _listener_lock:
+        _stop_listener()
+
+
+atexit.register(shutdown)
@@ -1,15 +1,32 @@
 """MCP tool registration modules for fan-manager.
 
 Each domain has its own module with a ``register_*_tools`` function that
-attaches an action-routed dynamic tool to the FastMCP server.
+attaches an action-routed dynamic tool to the FastMCP server. The registrars
+are resolved lazily so importing this package (e.g. for the fast-start stubs in
+:mod:`fan_manager.mcp.lazy`) does not import every domain.
 """
 
-from fan_manager.mcp.mcp_fan_control import register_fan_control_tools
-from fan_manager.mcp.mcp_ipmi import register_ipmi_tools
-from fan_manager.mcp.mcp_temperature import register_temperature_tools
+import importlib
+from typing import Any
 
-__all__ = [
-    "register_temperature_tools",
-    "register_fan_control_tools",
-    "register_ipmi_tools",
-]
+_EXPORTS: dict[str, str] = {
+    "register_temperature_tools": "fan_manager.mcp.mcp_temperature",
+    "register_fan_control_tools": "fan_manager.mcp.mcp_fan_control",
+    "register_ipmi_tools": "fan_manager.mcp.mcp_ipmi",
+    "register_batch_tools": "fan_manager.mcp.mcp_batch",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,154 @@
+"""Deferred tool registration for a fast ``fan-manager-mcp`` cold start.
+
+IDEs spawn a fresh stdio server per session, and most sessions call only one or
+two tools. In fast-start mode (``FAN_MANAGER_FAST_START=True``) each domain is
+registered from the committed ``tool_manifest.json`` as lightweight
+:class:`LazyDomainTool` stubs carrying the real name, description, tags and
+input schema, so ``tools/list`` is answered without importing
+``mcp_temperature``/``mcp_fan_control``/``mcp_ipmi``. The first call into a
+domain imports its module, registers the real tools on a private collector and
+delegates; later calls go straight to the resolved tool.
+
+Regenerate the manifest after changing a tool signature or docstring::
+
+    python -m fan_manager.mcp.lazy
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from fastmcp import FastMCP
+from fastmcp.tools import Tool
+from fastmcp.tools.base import ToolResult
+
+MANIFEST_PATH = Path(__file__).with_name("tool_manifest.json")
+
+# Domain tag -> (module, registrar). Tags match ``mcp_server.TOOL_REGISTRY``.
+DOMAINS: dict[str, tuple[str, str]] = {
+    "temperature": (
+        "fan_manager.mcp.mcp_temperature",
+        "register_temperature_tools",
+    ),
+    "fan-control": (
+        "fan_manager.mcp.mcp_fan_control",
+        "register_fan_control_tools",
+    ),
+    "ipmi": ("fan_manager.mcp.mcp_ipmi", "register_ipmi_tools"),
+    "batch": ("fan_manager.mcp.mcp_batch", "register_batch_tools"),
+}
+
+_resolved: dict[str, dict[str, Tool]] = {}
+_hooks_lock = threading.Lock()
+_on_first_resolve: list[Callable[[], None]] = []
+
+
+def domain_registrar(domain: str) -> Callable[[FastMCP], None]:
+    """Eager registrar for ``domain`` that imports its module only when called."""
+    module_name, fn_name = DOMAINS[domain]
+
+    def register(mcp: FastMCP) -> None:
+        getattr(importlib.import_module(module_name), fn_name)(mcp)
+
+    register.__name__ = fn_name
+    return register
+
+
+def _run_first_resolve_hooks() -> None:
+    with _hooks_lock:
+        while _on_first_resolve:
+            _on_first_resolve.pop(0)()
+
+
+async def resolve_domain(domain: str) -> dict[str, Tool]:
+    """Import ``domain`` and return its real tools by name (cached).
+
+    The import and any first-resolve hooks run in a worker thread so concurrent
+    sessions on the same server are not blocked while a domain loads.
+    """
+    tools = _resolved.get(domain)
+    if tools is None:
+        await asyncio.to_thread(_run_first_resolve_hooks)
+        collector = FastMCP(name=f"fan-manager-{domain}")
+        await asyncio.to_thread(domain_registrar(domain), collector)
+        tools = {t.name: t for t in await collector.list_tools()}
+        tools = _resolved.setdefault(domain, tools)
+    return tools
+
+
+class LazyDomainTool(Tool):
+    """Manifest-described stub that resolves its domain on first call."""
+
+    domain: str
+
+    async def run(self, arguments: dict[str, Any]) -> ToolResult:
+        tools = await resolve_domain(self.domain)
+        return await tools[self.name].run(arguments)
+
+
+def load_manifest() -> dict[str, list[dict[str, Any]]]:
+    """The committed per-domain tool manifest."""
+    return json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+
+
+def lazy_registrar(
+    domain: str, manifest: dict[str, list[dict[str, Any]]] | None = None
+) -> Callable[[FastMCP], None]:
+    """Registrar that adds ``domain``'s stubs without importing its module."""
+
+    def register(mcp: FastMCP) -> None:
+        specs = (manifest or load_manifest())[domain]
+        for spec in specs:
+            mcp.add_tool(
+                LazyDomainTool(
+                    name=spec["name"],
+                    description=spec["description"],
+                    tags=set(spec["tags"]),
+                    parameters=spec["parameters"],
+                    output_schema=spec.get("output_schema"),
+                    domain=domain,
+                )
+            )
+
+    register.__name__ = DOMAINS[domain][1]
+    return register
+
+
+def on_first_resolve(callback: Callable[[], None]) -> None:
+    """Run ``callback`` once, just before the first domain is imported."""
+    _on_first_resolve.append(callback)
+
+
+async def build_manifest() -> dict[str, list[dict[str, Any]]]:
+    """Describe every domain's tools by registering them on a scratch server."""
+    manifest: dict[str, list[dict[str, Any]]] = {}
+    for domain in DOMAINS:
+        collector = FastMCP(name=f"manifest-{domain}")
+        domain_registrar(domain)(collector)
+        manifest[domain] = [
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "tags": sorted(tool.tags),
+                "parameters": tool.parameters,
+                "output_schema": tool.output_schema,
+            }
+            for tool in sorted(await collector.list_tools(), key=lambda t: t.name)
+        ]
+    return manifest
+
+
+def write_manifest() -> None:
+    """Regenerate ``tool_manifest.json`` from the real tool registrations."""
+    manifest = asyncio.run(build_manifest())
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    write_manifest()
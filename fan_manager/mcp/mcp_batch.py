@@ -0,0 +1,215 @@
+"""MCP tool for running several tool actions in one call.
+
+CONCEPT:FAN-001..FAN-008 — Batch (tag ``batch``)
+
+An agent assembling a host health picture otherwise pays one round trip per
+tool call. ``fan_manager_batch`` takes a list of ``{tool, action, params}``
+entries addressed to the other tools registered on the same server and returns
+every envelope in one response:
+
+  * consecutive read-only entries (:data:`READ_ONLY`) run concurrently, each in
+    a worker thread, so lm-sensors and different BMCs overlap (commands to the
+    same BMC are still serialized by :mod:`fan_manager.scheduler`);
+  * every other entry is a barrier: it runs alone, in submission order, after
+    the reads before it and before the reads after it;
+  * with ``stop_on_error`` a failed mutating entry skips the rest.
+
+Each entry is a tool call of its own as far as the server is concerned: it
+passes through the server's middleware chain (rate limiting, auth, metrics)
+on the server's event loop, and its arguments are validated against the tool's
+signature before it runs. Only the tool body then moves to a temporary event
+loop in a worker thread, so actions that leave a task running on the server's
+loop (:data:`NOT_BATCHABLE`, e.g. the control loop's ``start``) are rejected
+per entry; call those tools directly.
+"""
+
+import asyncio
+import json
+from typing import Any
+
+from fastmcp import Context, FastMCP
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.utilities.types import get_cached_typeadapter
+from mcp.types import CallToolRequestParams
+from pydantic import Field
+
+from fan_manager.mcp.lazy import LazyDomainTool, resolve_domain
+
+MAX_ENTRIES = 32
+
+# Tool -> actions that only read. Anything not listed (including unknown tools
+# and ``fan_manager_raw``) is treated as mutating.
+READ_ONLY: dict[str, set[str]] = {
+    "fan_manager_temperature": {"get", "get_core", "state"},
+    "fan_manager_fan_control": {"status"},
+    "fan_manager_power": {"status"},
+    "fan_manager_sensors": {"list", "full", "type"},
+    "fan_manager_sel": {"list", "elist", "info"},
+    "fan_manager_sol": {"info"},
+    "fan_manager_bmc": {"lan_print", "user_list", "mc_info", "selftest", "stats"},
+    "fan_manager_watch": {"list", "events"},
+}
+
+# Tool -> actions that must run on the server's own event loop.
+NOT_BATCHABLE: dict[str, set[str]] = {
+    "fan_manager_fan_control": {"start", "stop"},
+}
+
+
+def is_read_only(tool: str, action: str) -> bool:
+    return action in READ_ONLY.get(tool, set())
+
+
+def _phases(entries: list[dict[str, Any]]) -> list[tuple[bool, list[int]]]:
+    """Group entry indexes: runs of reads together, each mutation on its own."""
+    phases: list[tuple[bool, list[int]]] = []
+    for i, entry in enumerate(entries):
+        read = is_read_only(entry["tool"], entry["action"])
+        if read and phases and phases[-1][0]:
+            phases[-1][1].append(i)
+        else:
+            phases.append((read, [i]))
+    return phases
+
+
+def _normalize(raw: Any) -> dict[str, Any]:
+    if not isinstance(raw, dict) or not raw.get("tool"):
+        raise ValueError("each entry needs a 'tool' (and optional 'action', 'params')")
+    params = raw.get("params") or {}
+    if not isinstance(params, dict):
+        raise ValueError("'params' must be an object")
+    return {
+        "tool": str(raw["tool"]),
+        "action": str(raw.get("action", "")),
+        "params": params,
+    }
+
+
+def register_batch_tools(mcp: FastMCP):
+    async def _resolve(name: str):
+        tool = await mcp.get_tool(name)
+        if isinstance(tool, LazyDomainTool):
+            tool = (await resolve_domain(tool.domain))[name]
+        return tool
+
+    async def _prepare(entry: dict[str, Any]) -> dict[str, Any]:
+        """Attach the resolved tool and fill in its default ``action``."""
+        tool = None
+        if entry["tool"] != "fan_manager_batch":
+            tool = await _resolve(entry["tool"])
+        action = tool.parameters.get("properties", {}).get("action") if tool else None
+        if action is not None and not entry["action"]:
+            entry["action"] = action.get("default") or ""
+        return {**entry, "tool_obj": tool, "takes_action": bool(action)}
+
+    async def _call(entry: dict[str, Any], ctx: Context | None) -> Any:
+        """One entry through the server's middleware, its body in a worker thread."""
+        tool = entry["tool_obj"]
+        raw: dict[str, Any] = {}
+
+        async def execute(context: MiddlewareContext) -> Any:
+            # Validate as the server would; ``ctx=None`` keeps the body off the
+            # session, which belongs to the server's loop.
+            body = get_cached_typeadapter(tool.fn).validate_python(
+                {**(context.message.arguments or {}), "ctx": None}
+            )
+            # The tool bodies call blocking subprocess code; give each its own
+            # thread (and loop) so concurrent entries overlap and the server's
+            # event loop stays responsive.
+            raw["result"] = await asyncio.to_thread(asyncio.run, body)
+            return tool.convert_result(raw["result"])
+
+        arguments: dict[str, Any] = {"params_json": json.dumps(entry["params"])}
+        if entry["takes_action"]:
+            arguments["action"] = entry["action"]
+        chain: CallNext = execute
+        for mw in reversed(mcp.middleware):
+            chain = _link(mw, chain)
+        result = await chain(
+            MiddlewareContext(
+                message=CallToolRequestParams(name=entry["tool"], arguments=arguments),
+                fastmcp_context=ctx,
+                source="client",
+                type="request",
+                method="tools/call",
+            )
+        )
+        return raw["result"] if "result" in raw else result.structured_content
+
+    async def _run(entry: dict[str, Any], ctx: Context | None) -> dict[str, Any]:
+        try:
+            if entry["tool"] == "fan_manager_batch":
+                raise ValueError("batches cannot be nested")
+            if entry["action"] in NOT_BATCHABLE.get(entry["tool"], set()):
+                raise ValueError(
+                    f"{entry['tool']} '{entry['action']}' cannot run in a batch; "
+                    "call the tool directly"
+                )
+            if entry["tool_obj"] is None:
+                raise ValueError(f"Unknown or disabled tool: {entry['tool']}")
+            result = await _call(entry, ctx)
+        except Exception as e:  # noqa: BLE001 — reported per entry
+            result = {"error": str(e)}
+        return {"tool": entry["tool"], "action": entry["action"], "result": result}
+
+    @mcp.tool(tags={"batch"})
+    async def fan_manager_batch(
+        params_json: str = Field(
+            default="{}",
+            description="{'entries': [{'tool': 'fan_manager_sensors', 'action': "
+            "'type', 'params': {'sensor_type': 'Fan'}}, ...], 'stop_on_error': "
+            f"false}}. At most {MAX_ENTRIES} entries.",
+        ),
+        ctx: Context | None = Field(default=None, description="MCP context"),
+    ) -> Any:
+        """Run several tool actions in one call and return every result in order.
+        Consecutive read-only entries run concurrently; mutating entries (fan set,
+        power, clears, raw, ...) run one at a time in the order given."""
+        try:
+            kwargs = json.loads(params_json or "{}")
+            entries = [_normalize(e) for e in kwargs.get("entries") or []]
+        except Exception as e:  # noqa: BLE001
+            return {"error": f"Invalid params_json: {e}"}
+        if not entries:
+            return {"error": "batch requires a non-empty 'entries' list"}
+        if len(entries) > MAX_ENTRIES:
+            return {"error": f"batch accepts at most {MAX_ENTRIES} entries"}
+        entries = [await _prepare(e) for e in entries]
+
+        results: list[dict[str, Any]] = [{}] * len(entries)
+        stopped = False
+        for read, phase in _phases(entries):
+            if stopped:
+                for i in phase:
+                    entry = entries[i]
+                    results[i] = {
+                        "tool": entry["tool"],
+                        "action": entry["action"],
+                        "result": None,
+                        "skipped": True,
+                    }
+                continue
+            done = await asyncio.gather(*(_run(entries[i], ctx) for i in phase))
+            for i, outcome in zip(phase, done, strict=True):
+                results[i] = outcome
+            if kwargs.get("stop_on_error") and not read and _failed(done[0]["result"]):
+                stopped = True
+        return {
+            "response": results,
+            "command": "batch",
+            "status": 200,
+            "failed": sum(1 for r in results if _failed(r["result"])),
+        }
+
+
+def _link(mw: Middleware, call_next: CallNext) -> CallNext:
+    async def run(context: MiddlewareContext) -> Any:
+        return await mw(context, call_next)
+
+    return run
+
+
+def _failed(result: Any) -> bool:
+    if not isinstance(result, dict):
+        return False
+    return "error" in result or result.get("status", 200) >= 400
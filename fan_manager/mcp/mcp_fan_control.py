@@ -4,30 +4,35 @@
 
 Action-routed dynamic tool registration. A single tool per domain accepts an
 ``action`` and a ``params_json`` payload and routes to the real callables in
-``fan_manager.fan_manager``.
+``fan_manager.fan_manager``; ``start``/``stop``/``status`` manage the
+continuous control loop in :mod:`fan_manager.control_loop`.
 """
 
 import json
 from typing import Any
 
 from fastmcp import Context, FastMCP
-from pydantic import Field
+from pydantic import Field, ValidationError
 
+from fan_manager import control_loop
 from fan_manager.fan_manager import auto_set_fan_speed, set_fan
+from fan_manager.models import ControlLoopInput
 
 
 def register_fan_control_tools(mcp: FastMCP):
     @mcp.tool(tags={"fan-control"})
     async def fan_manager_fan_control(
         action: str = Field(
-            description="Action to perform. Must be one of: 'set', 'auto'",
+            description="Action to perform. Must be one of: 'set', 'auto', "
+            "'start', 'stop', 'status'",
         ),
         params_json: str = Field(
             default="{}",
             description="JSON string of parameters to pass to the action. "
             "For 'set' supply {'fan_level': 0-100}. For 'auto' supply optional "
             "{'minimum_fan_speed', 'maximum_fan_speed', 'minimum_temperature', "
-            "'maximum_temperature', 'temperature_power'}.",
+            "'maximum_temperature', 'temperature_power'}. 'start' takes the same "
+            "plus optional {'temperature_poll_rate': 1-300, 'verify': bool}.",
         ),
         ctx: Context | None = Field(
             default=None, description="MCP context for progress reporting"
@@ -38,7 +43,11 @@ async def fan_manager_fan_control(
         Action-routed methods:
           - ``set``: set the fan to a fixed level (0-100) using ``ipmitool``.
           - ``auto``: read the current temperature and set the fan speed using a
-            logarithmic temperature-to-speed curve.
+            logarithmic temperature-to-speed curve, once.
+          - ``start``/``stop``/``status``: run that curve continuously as a
+            background loop inside this server (one per process), stop it, or
+            report its parameters, tick count and last tick. ``set`` and
+            ``auto`` are refused (409) while the loop runs.
         """
         if ctx:
             await ctx.info("Adjusting fan speed...")
@@ -50,6 +59,14 @@ async def fan_manager_fan_control(
 
         kwargs = {k: v for k, v in kwargs.items() if v is not None}
 
+        loop = control_loop.controller()
+        if action in ("set", "auto") and loop.running:
+            return {
+                "response": loop.status(),
+                "command": f"fan {action}",
+                "status": 409,
+                "error": f"The control loop is running; stop it before '{action}'",
+            }
         if action == "set":
             raw_level = kwargs.get("fan_level")
             if raw_level is None:
@@ -69,5 +86,51 @@ async def fan_manager_fan_control(
                 maximum_temperature=kwargs.get("maximum_temperature", 80),
                 temperature_power=kwargs.get("temperature_power", 5),
             )
-            return {"response": result, "command": "auto_set_fan_speed", "status": 200}
+            envelope = {
+                "response": result,
+                "command": "auto_set_fan_speed",
+                "status": result["status"],
+            }
+            if "error" in result:
+                envelope["error"] = result["error"]
+            return envelope
+        if action == "start":
+            try:
+                params = ControlLoopInput(**kwargs).model_dump()
+            except ValidationError as e:
+                return {
+                    "response": None,
+                    "command": "control loop start",
+                    "status": 400,
+                    "error": str(e),
+                }
+            try:
+                status = loop.start(**params)
+            except RuntimeError as e:
+                return {
+                    "response": loop.status(),
+                    "command": "control loop start",
+                    "status": 409,
+                    "error": str(e),
+                }
+            return {"response": status, "command": "control loop start", "status": 200}
+        if action == "stop":
+            if not await loop.stop():
+                return {
+                    "response": loop.status(),
+                    "command": "control loop stop",
+                    "status": 409,
+                    "error": "The control loop is not running",
+                }
+            return {
+                "response": loop.status(),
+                "command": "control loop stop",
+                "status": 200,
+            }
+        if action == "status":
+            return {
+                "response": loop.status(),
+                "command": "control loop status",
+                "status": 200,
+            }
         raise ValueError(f"Unknown action: {action}")
@@ -4,15 +4,30 @@
 carry an out-of-band target — ``{"host": "10.0.0.113", "user": "root",
 "password": "..."}`` — to drive a remote iDRAC over ``lanplus``; omit it to run
 in-band against the local ``/dev/ipmi0``. (Creds live in OpenBao ``apps/idrac``.)
+
+``fan_manager_sensors``, ``fan_manager_sel`` and the listing actions of
+``fan_manager_bmc`` also accept the :mod:`fan_manager.views` options (``name``,
+``type``, ``status``, ``fields``, ``limit``, ``offset``, ``format``) to filter
+and page parsed rows server-side instead of returning raw ``ipmitool`` text.
 """
 
+import asyncio
+import concurrent.futures
 import json
-from typing import Any
+from typing import Any, Literal
 
 from fastmcp import Context, FastMCP
 from pydantic import Field
 
-from fan_manager import ipmi
+from fan_manager import ipmi, views, watches
+
+# Seconds a watch event may take to reach its session before sampling moves on.
+NOTIFY_TIMEOUT = 5.0
+
+_VIEW_HELP = (
+    " View options: {'name':'<glob>','type','status':'cr,nr|!ok',"
+    "'fields':[...],'limit','offset','format':'records|table'}."
+)
 
 
 def _parse(
@@ -33,6 +48,35 @@ def _parse(
     return kwargs, target, None
 
 
+def _session_notifier(ctx: Context | None):
+    """Forward watch events to ``ctx``'s session as MCP log notifications.
+
+    A failed send (the session or its loop is gone) raises, which drops the
+    watch; a slow one is left to finish on its own.
+    """
+    if ctx is None:
+        return None
+    try:
+        session = ctx.session
+    except Exception:  # noqa: BLE001 — no live session (direct calls)
+        return None
+    loop = asyncio.get_running_loop()
+
+    def notify(event: dict[str, Any]) -> None:
+        level: Literal["warning", "info"] = (
+            "warning" if event["event"] == "tripped" else "info"
+        )
+        sent = asyncio.run_coroutine_threadsafe(
+            session.send_log_message(level, event, logger="fan_manager.watch"), loop
+        )
+        try:
+            sent.result(NOTIFY_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            pass
+
+    return notify
+
+
 def register_ipmi_tools(mcp: FastMCP):
     @mcp.tool(tags={"ipmi-power"})
     async def fan_manager_power(
@@ -63,68 +107,90 @@ async def fan_manager_sensors(
         params_json: str = Field(
             default="{}",
             description="Optional target; for 'type' add "
-            "{'sensor_type':'Temperature|Fan|Drive Slot|...'}.",
+            "{'sensor_type':'Temperature|Fan|Drive Slot|...'}. Add "
+            "{'since': <token>} to get only readings changed since that reply."
+            + _VIEW_HELP,
         ),
         ctx: Context | None = Field(default=None, description="MCP context"),
     ) -> Any:
-        """Read BMC sensors / SDR (CONCEPT:FAN-004)."""
+        """Read BMC sensors / SDR (CONCEPT:FAN-004). Replies carry a 'token';
+        pass it back as 'since' to receive only changed/removed readings. View
+        options filter and page parsed rows, e.g. {'status':'!ok'} or
+        {'type':'Fan','fields':['name','value'],'format':'table'}."""
         kwargs, target, err = _parse(params_json)
         if err:
             return {"error": err}
         return ipmi.sensors(
-            action, target=target, sensor_type=kwargs.get("sensor_type")
+            action,
+            target=target,
+            sensor_type=kwargs.get("sensor_type"),
+            since=kwargs.get("since"),
+            view=kwargs,
         )
 
     @mcp.tool(tags={"ipmi-sel"})
     async def fan_manager_sel(
         action: str = Field(default="list", description="list | elist | info | clear"),
         params_json: str = Field(
-            default="{}", description="Optional target {host,user,password}."
+            default="{}",
+            description="Optional target {host,user,password}." + _VIEW_HELP,
         ),
         ctx: Context | None = Field(default=None, description="MCP context"),
     ) -> Any:
         """System Event Log — the BMC's hardware-event history (CONCEPT:FAN-005).
-        'clear' is destructive."""
-        _, target, err = _parse(params_json)
+        'clear' is destructive. View options filter list/elist entries, e.g.
+        {'type':'Temperature','offset':0,'limit':20}."""
+        kwargs, target, err = _parse(params_json)
         if err:
             return {"error": err}
-        return ipmi.sel(action, target=target)
+        return ipmi.sel(action, target=target, view=kwargs)
 
     @mcp.tool(tags={"ipmi-console"})
     async def fan_manager_sol(
         action: str = Field(default="info", description="info | deactivate"),
         params_json: str = Field(
-            default="{}", description="Optional target {host,user,password}."
+            default="{}",
+            description="Optional target {host,user,password}; 'info' is cached, "
+            "add {'refresh': true} to re-read it.",
         ),
         ctx: Context | None = Field(default=None, description="MCP context"),
     ) -> Any:
         """Serial-over-LAN console status/teardown (CONCEPT:FAN-006). A live
         interactive console must use `ipmitool -I lanplus -H <bmc> -U root -P <pw> sol activate`."""
-        _, target, err = _parse(params_json)
+        kwargs, target, err = _parse(params_json)
         if err:
             return {"error": err}
-        return ipmi.sol(action, target=target)
+        return ipmi.sol(action, target=target, refresh=bool(kwargs.get("refresh")))
 
     @mcp.tool(tags={"ipmi-bmc"})
     async def fan_manager_bmc(
         action: str = Field(
             description="lan_print | lan_set | user_list | user_set_password | "
-            "user_enable | user_disable | mc_info | mc_reset_cold | mc_reset_warm | selftest"
+            "user_enable | user_disable | mc_info | mc_reset_cold | mc_reset_warm | "
+            "selftest | stats"
         ),
         params_json: str = Field(
             default="{}",
             description="Optional target; lan_set needs "
             "{'param','value'} (e.g. param=ipaddr value=10.0.0.110); user_* "
-            "need {'user_id'} and set_password needs {'password'}.",
+            "need {'user_id'} and set_password needs {'password'}. lan_print, "
+            "user_list and mc_info are cached ({'refresh': true} re-reads) and "
+            "accept view options." + _VIEW_HELP,
         ),
         ctx: Context | None = Field(default=None, description="MCP context"),
     ) -> Any:
-        """BMC configuration: LAN, users, and management-controller ops (CONCEPT:FAN-007)."""
+        """BMC configuration: LAN, users, and management-controller ops (CONCEPT:FAN-007).
+        Reads are cached per target and invalidated by the matching writes.
+        'stats' reports per-target circuit breakers, command-queue depth/waits
+        and cache hits."""
         kwargs, target, err = _parse(params_json)
         if err:
             return {"error": err}
+        refresh = bool(kwargs.get("refresh"))
         if action == "lan_print":
-            return ipmi.lan("print", target=target)
+            return views.shape(
+                ipmi.lan("print", target=target, refresh=refresh), "fields", kwargs
+            )
         if action == "lan_set":
             return ipmi.lan(
                 "set",
@@ -133,7 +199,9 @@ async def fan_manager_bmc(
                 value=kwargs.get("value"),
             )
         if action == "user_list":
-            return ipmi.user("list", target=target)
+            return views.shape(
+                ipmi.user("list", target=target, refresh=refresh), "users", kwargs
+            )
         if action in {"user_set_password", "user_enable", "user_disable"}:
             sub = action.replace("user_", "")
             return ipmi.user(
@@ -142,7 +210,13 @@ async def fan_manager_bmc(
                 user_id=kwargs.get("user_id"),
                 password=kwargs.get("password"),
             )
-        if action in {"mc_info", "mc_reset_cold", "mc_reset_warm", "selftest"}:
+        if action == "stats":
+            return {"response": ipmi.stats(), "command": "stats", "status": 200}
+        if action == "mc_info":
+            return views.shape(
+                ipmi.mc("info", target=target, refresh=refresh), "fields", kwargs
+            )
+        if action in {"mc_reset_cold", "mc_reset_warm", "selftest"}:
             return ipmi.mc(
                 action.replace("mc_", "") if action.startswith("mc_") else action,
                 target=target,
@@ -165,3 +239,78 @@ async def fan_manager_raw(
         if not kwargs.get("data"):
             return {"error": "raw requires 'data' (space-separated hex bytes)"}
         return ipmi.raw(kwargs["data"], target=target)
+
+    @mcp.tool(tags={"ipmi-watch"})
+    async def fan_manager_watch(
+        action: str = Field(default="list", description="add | remove | list | events"),
+        params_json: str = Field(
+            default="{}",
+            description="add: {'threshold', 'op':'>|>=|<|<=', 'name':'<glob>', "
+            "'type':'Temperature|Fan|...', 'hysteresis', 'ttl': <seconds, default "
+            "3600>} plus optional target; "
+            "remove: {'id'}; events: {'since': <seq>, 'wait': <seconds, max 60>}.",
+        ),
+        ctx: Context | None = Field(default=None, description="MCP context"),
+    ) -> Any:
+        """Server-side sensor threshold watches (CONCEPT:FAN-004). One shared
+        sampler reads each watched BMC once per interval and pushes 'tripped' /
+        'cleared' events to this session as log notifications; 'events' with
+        'wait' long-polls for them. Use instead of polling fan_manager_sensors."""
+        kwargs, target, err = _parse(params_json)
+        if err:
+            return {"error": err}
+        sampler = watches.sampler()
+        if action == "add":
+            if "threshold" not in kwargs:
+                return {"error": "add requires 'threshold'"}
+            try:
+                watch = sampler.add(
+                    float(kwargs["threshold"]),
+                    op=kwargs.get("op", ">"),
+                    name=kwargs.get("name", "*"),
+                    type=kwargs.get("type"),
+                    hysteresis=float(kwargs.get("hysteresis", 0.0)),
+                    ttl=kwargs.get("ttl"),
+                    target=target,
+                    notify=_session_notifier(ctx),
+                )
+            except (TypeError, ValueError) as e:
+                return {
+                    "response": None,
+                    "command": "watch add",
+                    "status": 400,
+                    "error": str(e),
+                }
+            return {"response": watch.as_dict(), "command": "watch add", "status": 200}
+        if action == "remove":
+            if not sampler.remove(str(kwargs.get("id"))):
+                return {
+                    "response": None,
+                    "command": "watch remove",
+                    "status": 404,
+                    "error": f"No watch '{kwargs.get('id')}'",
+                }
+            return {"response": kwargs["id"], "command": "watch remove", "status": 200}
+        if action == "list":
+            return {
+                "response": {"watches": sampler.snapshot(), "sampler": sampler.stats()},
+                "command": "watch list",
+                "status": 200,
+            }
+        if action == "events":
+            try:
+                wait = max(0.0, min(float(kwargs.get("wait", 0.0)), 60.0))
+                since = int(kwargs.get("since", 0))
+            except (TypeError, ValueError) as e:
+                return {
+                    "response": None,
+                    "command": "watch events",
+                    "status": 400,
+                    "error": f"'since' must be an integer and 'wait' a number: {e}",
+                }
+            return {
+                "response": await asyncio.to_thread(sampler.events, since, wait),
+                "command": "watch events",
+                "status": 200,
+            }
+        return {"error": f"Unknown action: {action}"}
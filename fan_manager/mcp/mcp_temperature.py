@@ -13,6 +13,7 @@
 from fastmcp import Context, FastMCP
 from pydantic import Field
 
+from fan_manager import state_page
 from fan_manager.fan_manager import get_core_temp, get_temp
 
 
@@ -21,12 +22,13 @@ def register_temperature_tools(mcp: FastMCP):
     async def fan_manager_temperature(
         action: str = Field(
             default="get",
-            description="Action to perform. Must be one of: 'get', 'get_core'",
+            description="Action to perform. Must be one of: 'get', 'get_core', 'state'",
         ),
         params_json: str = Field(
             default="{}",
             description="JSON string of parameters to pass to the action. "
-            "For 'get_core' supply {'cpus': [...], 'sensors': {...}}.",
+            "For 'get_core' supply {'cpus': [...], 'sensors': {...}}. "
+            "For 'state' optionally {'path': '/dev/shm/fan-manager.state'}.",
         ),
         ctx: Context | None = Field(
             default=None, description="MCP context for progress reporting"
@@ -38,6 +40,8 @@ async def fan_manager_temperature(
           - ``get``: read the highest current CPU core temperature via ``sensors -j``.
           - ``get_core``: compute the highest core temperature from a supplied
             ``cpus`` list and ``sensors`` mapping (no shell-out).
+          - ``state``: the running daemon's latest tick (temperatures, fan
+            level, mode) from its shared-memory state page (no shell-out).
         """
         if ctx:
             await ctx.info("Reading temperature...")
@@ -56,4 +60,19 @@ async def fan_manager_temperature(
                 cpus=kwargs.get("cpus", ["coretemp-isa-0000", "coretemp-isa-0001"]),
                 sensors=kwargs.get("sensors", {}),
             )
+        if action == "state":
+            return _state(kwargs.get("path"))
         raise ValueError(f"Unknown action: {action}")
+
+
+def _state(path: str | None) -> dict[str, Any]:
+    command = f"read {path or state_page.default_path()}"
+    state = state_page.read_state(path)
+    if state is None:
+        return {
+            "response": None,
+            "command": command,
+            "status": 404,
+            "error": "No fan daemon state published (is run_service running?)",
+        }
+    return {"response": state.as_dict(), "command": command, "status": 200}
@@ -5,6 +5,10 @@
 server. Each domain is gated behind an environment toggle so the exposed tool
 surface can be trimmed to fit an IDE/LLM context window.
 
+Set ``FAN_MANAGER_FAST_START=True`` to register manifest-backed tool stubs that
+import a domain's implementation only on its first call (see
+:mod:`fan_manager.mcp.lazy`); importing this module itself has no side effects.
+
 Console script: ``fan-manager-mcp`` -> ``fan_manager.mcp_server:mcp_server``
 """
 
@@ -15,42 +19,69 @@
 warnings.filterwarnings("ignore", message=".*urllib3.*or chardet.*")
 warnings.filterwarnings("ignore", message=".*urllib3.*or charset_normalizer.*")
 
+from agent_utilities.core.config import setting
 from agent_utilities.mcp_utilities import (
     create_mcp_server,
     load_config,
     register_tool_surface,
 )
 
+from fan_manager import fan_manager as _core
 from fan_manager.api_client import Api
-from fan_manager.auth import get_client
-from fan_manager.mcp import (
-    register_fan_control_tools,
-    register_ipmi_tools,
-    register_temperature_tools,
-)
+from fan_manager.auth import get_client, get_config
+from fan_manager.capabilities import probe
+from fan_manager.fan_manager import CommandRunner
+from fan_manager.mcp.lazy import domain_registrar, lazy_registrar, on_first_resolve
 
 __version__ = "1.6.0"
-print(f"Fan Manager MCP v{__version__}", file=sys.stderr)
-
-load_config()
 
 logger = logging.getLogger("FanManagerMCP")
 
 # (tag, env-toggle, registrar) — toggle names match the framework-derived
-# ``<TAG>TOOL`` convention (``register_<tag>_tools`` -> ``<TAG>TOOL``).
+# ``<TAG>TOOL`` convention (``register_<tag>_tools`` -> ``<TAG>TOOL``). The
+# registrars import their domain module only when invoked.
 TOOL_REGISTRY = [
-    ("temperature", "TEMPERATURETOOL", register_temperature_tools),
-    ("fan-control", "FAN_CONTROLTOOL", register_fan_control_tools),
-    ("ipmi", "IPMITOOL", register_ipmi_tools),
+    ("temperature", "TEMPERATURETOOL", domain_registrar("temperature")),
+    ("fan-control", "FAN_CONTROLTOOL", domain_registrar("fan-control")),
+    ("ipmi", "IPMITOOL", domain_registrar("ipmi")),
+    ("batch", "BATCHTOOL", domain_registrar("batch")),
 ]
 
 
-def get_mcp_instance():
+def _tool_registry(fast_start: bool) -> list:
+    """``TOOL_REGISTRY``, with manifest-backed lazy stubs in fast-start mode."""
+    if not fast_start:
+        return TOOL_REGISTRY
+    return [(tag, env, lazy_registrar(tag)) for tag, env, _ in TOOL_REGISTRY]
+
+
+def get_mcp_instance(
+    runner: CommandRunner | None = None, command_args: list[str] | None = None
+):
     """Build the FastMCP server, register enabled tool domains, and return it.
 
     Registers the temperature (CONCEPT:FAN-001) and fan-control (CONCEPT:FAN-002)
-    tool domains, each gated behind its env toggle.
+    tool domains, each gated behind its env toggle, and probes the shared
+    runner's ``ipmitool``/``sensors`` capabilities once — up front normally, or
+    just before the first domain is imported in fast-start mode.
+
+    Args:
+        runner: Optional ``CommandRunner`` installed as the process-wide default
+            (e.g. a stub for load tests); the real subprocess runner otherwise.
+        command_args: CLI arguments to parse instead of ``sys.argv``.
     """
+    load_config()
+    if runner is not None:
+        _core.set_default_runner(runner)
+    fast_start = setting("FAN_MANAGER_FAST_START", False)
+    if fast_start:
+
+        def probe_default_runner() -> None:
+            probe(_core._DEFAULT_RUNNER, get_config())
+
+        on_first_resolve(probe_default_runner)
+    else:
+        probe(_core._DEFAULT_RUNNER, get_config())
     args, mcp, middlewares = create_mcp_server(
         name="Fan Manager",
         version=__version__,
@@ -58,6 +89,7 @@ def get_mcp_instance():
             "Fan Manager MCP Server - Read CPU/sensor temperatures and control "
             "Dell PowerEdge fan speed via IPMI."
         ),
+        command_args=command_args,
     )
 
     registered_tags = register_tool_surface(
@@ -65,7 +97,7 @@ def get_mcp_instance():
         client_cls=Api,
         get_client=get_client,
         service="fan-manager",
-        tool_registry=TOOL_REGISTRY,
+        tool_registry=_tool_registry(fast_start),
     )
 
     for mw in middlewares:
@@ -80,8 +112,8 @@ def mcp_server() -> None:
     Serves the CONCEPT:FAN-001 (temperature) and CONCEPT:FAN-002 (fan-control)
     tool domains over the selected transport.
     """
+    print(f"Fan Manager MCP v{__version__}", file=sys.stderr)
     mcp, args, middlewares, registered_tags = get_mcp_instance()
-    print(f"fan-manager MCP v{__version__}", file=sys.stderr)
     print("\nStarting MCP Server", file=sys.stderr)
     print(f"  Transport: {args.transport.upper()}", file=sys.stderr)
     print(f"  Auth: {getattr(args, 'auth_type', 'none')}", file=sys.stderr)
@@ -38,3 +38,12 @@ class AutoFanInput(BaseModel):
     minimum_temperature: float = Field(default=50, ge=0, le=120)
     maximum_temperature: float = Field(default=80, ge=0, le=120)
     temperature_power: int = Field(default=5, ge=0, le=10)
+
+
+class ControlLoopInput(AutoFanInput):
+    """Input for the MCP server's managed control loop (CONCEPT:FAN-002)."""
+
+    temperature_poll_rate: int = Field(default=24, ge=1, le=300)
+    verify: bool = Field(
+        default=False, description="Rewrite an unchanged level only on RPM drift."
+    )
@@ -0,0 +1,328 @@
+"""Record real ``sensors``/``ipmitool`` traffic and replay it deterministically.
+
+Fleet bugs often hinge on one host's exact ``sensors -j`` document or one BMC's
+``ipmitool`` quirks. Two :class:`~fan_manager.fan_manager.CommandRunner`
+wrappers turn such a host into a reproducible fixture:
+
+  * :class:`RecordingRunner` wraps a real runner and appends every ``which``
+    lookup and command — redacted argv, stdout, stderr, exit code, duration and
+    time offset — to a JSON-lines trace (gzip when the name ends in ``.gz``:
+    one gzip member per session, sync-flushed after every line so a killed
+    process leaves a readable file). Streamed commands (``run_stream``) are
+    teed line by line into one entry, so they replay like a ``run``.
+    ``-P <password>`` and ``user set password <id> <password>`` are masked
+    before anything is written; the file is closed at interpreter exit.
+  * :class:`ReplayRunner` answers the same calls from a trace: outputs are
+    matched per argv in recorded order, non-zero exits and timeouts are raised
+    again, and latency is reproduced at ``speed`` × wall clock (``None`` = as
+    fast as possible). Its :meth:`~ReplayRunner.sleep` lets ``run_service``
+    consume a trace in virtual time and stop when it is exhausted.
+
+Both can be installed process-wide, for the daemon, the MCP server and the
+agent alike, with ``FAN_MANAGER_RECORD=<trace>`` or
+``FAN_MANAGER_REPLAY=<trace>`` (plus ``FAN_MANAGER_REPLAY_SPEED``).
+"""
+
+from __future__ import annotations
+
+import atexit
+import gzip
+import json
+import os
+import subprocess
+import threading
+import time
+import zlib
+from collections import deque
+from collections.abc import Generator
+from pathlib import Path
+from typing import Any
+
+from fan_manager.fan_manager import stream_lines
+
+TRACE_VERSION = 1
+MASK = "***"
+_GZIP_MAGIC = b"\x1f\x8b\x08"
+
+
+class ReplayExhausted(RuntimeError):
+    """The trace holds no (more) recorded output for this argv."""
+
+
+class ReplayComplete(Exception):
+    """Raised by :meth:`ReplayRunner.sleep` once every command was replayed."""
+
+
+def redact_argv(argv: list[str]) -> list[str]:
+    """Mask the ``-P`` value and the ``user set password`` argument."""
+    out = list(argv)
+    for i in range(1, len(out)):
+        if out[i - 1] == "-P":
+            out[i] = MASK
+    for i in range(len(out) - 4):
+        if out[i : i + 3] == ["user", "set", "password"]:
+            out[i + 4] = MASK
+    return out
+
+
+def _key(argv: list[str]) -> tuple[str, ...]:
+    """Replay lookup key: redacted argv with the binary reduced to its name."""
+    redacted = redact_argv(argv)
+    if redacted:
+        redacted[0] = os.path.basename(redacted[0])
+    return tuple(redacted)
+
+
+def _gzipped(path: str | os.PathLike[str]) -> bool:
+    return str(path).endswith(".gz")
+
+
+def _inflate(data: bytes) -> tuple[bytes, bytes | None]:
+    """Text of the gzip member at the start of ``data`` and the bytes after it.
+
+    A member without a trailer was left by a killed recorder: it yields what
+    was sync-flushed, up to the next member (a later session) if there is one,
+    cut back to its last complete line. ``None`` means nothing follows.
+    """
+    member = zlib.decompressobj(wbits=31)
+    try:
+        text = member.decompress(data)
+    except zlib.error:
+        text = b""
+    else:
+        if member.eof:
+            return text, member.unused_data
+    following = data.find(_GZIP_MAGIC, 1)
+    if following < 0:
+        return text, None
+    try:
+        text = zlib.decompressobj(wbits=31).decompress(data[:following])
+    except zlib.error:
+        text = b""
+    return text[: text.rfind(b"\n") + 1], data[following:]
+
+
+def _read_text(path: str | os.PathLike[str]) -> str:
+    """Decoded trace text; a gzip member cut short yields what it holds."""
+    raw = Path(path).read_bytes()
+    if not _gzipped(path):
+        return raw.decode("utf-8", errors="replace")
+    chunks = []
+    data: bytes | None = raw
+    while data:
+        text, data = _inflate(data)
+        chunks.append(text)
+    return b"".join(chunks).decode("utf-8", errors="replace")
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, bytes):
+        return value.decode(errors="replace")
+    return value or ""
+
+
+class RecordingRunner:
+    """CommandRunner that forwards to ``inner`` and appends each call to a trace.
+
+    Args:
+        inner: The runner that really executes commands.
+        path: Trace file; appended to, with a header line per session.
+    """
+
+    def __init__(self, inner: Any, path: str | os.PathLike[str]) -> None:
+        self.inner = inner
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._file = open(self.path, "ab")  # noqa: SIM115
+        self._gzip = (
+            gzip.GzipFile(fileobj=self._file, mode="wb") if _gzipped(path) else None
+        )
+        atexit.register(self.close)
+        self._write(
+            {"trace": "fan-manager", "version": TRACE_VERSION, "at": time.time()}
+        )
+
+    def _write(self, entry: dict[str, Any]) -> None:
+        data = (json.dumps(entry, separators=(",", ":")) + "\n").encode()
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._gzip is not None:
+                self._gzip.write(data)
+                self._gzip.flush(zlib.Z_SYNC_FLUSH)  # also flushes the file
+            else:
+                self._file.write(data)
+                self._file.flush()
+
+    def _offset(self) -> float:
+        return round(time.monotonic() - self._started, 4)
+
+    def which(self, name: str) -> str | None:
+        path = self.inner.which(name)
+        self._write({"t": self._offset(), "which": name, "path": path})
+        return path
+
+    def run(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> str:
+        entry: dict[str, Any] = {"t": self._offset(), "argv": redact_argv(argv)}
+        started = time.monotonic()
+        try:
+            out = self.inner.run(argv, check=True, timeout=timeout)
+            entry["out"] = out
+            return out
+        except subprocess.CalledProcessError as e:
+            entry.update(rc=e.returncode, out=_text(e.output), err=_text(e.stderr))
+            if check:
+                raise
+            return _text(e.output)
+        except subprocess.TimeoutExpired:
+            entry["timeout"] = timeout
+            raise
+        except OSError as e:
+            entry["error"] = str(e)
+            raise
+        finally:
+            entry["dur"] = round(time.monotonic() - started, 4)
+            self._write(entry)
+
+    def run_stream(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> Generator[str, None, None]:
+        """Yield ``inner``'s stdout lines and record them as one ``run`` entry.
+
+        A consumer that stops early records the lines it read, which is what
+        a replay of the same consumer reads again.
+        """
+        entry: dict[str, Any] = {"t": self._offset(), "argv": redact_argv(argv)}
+        lines: list[str] = []
+        started = time.monotonic()
+        try:
+            for line in stream_lines(self.inner, argv, check=check, timeout=timeout):
+                lines.append(line)
+                yield line
+        except subprocess.CalledProcessError as e:
+            entry.update(rc=e.returncode, err=_text(e.stderr))
+            raise
+        except subprocess.TimeoutExpired:
+            entry["timeout"] = timeout
+            raise
+        except OSError as e:
+            entry["error"] = str(e)
+            raise
+        finally:
+            entry["out"] = "".join(f"{line}\n" for line in lines)
+            entry["dur"] = round(time.monotonic() - started, 4)
+            self._write(entry)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._gzip is not None and not self._file.closed:
+                self._gzip.close()  # the trailer; leaves the file open
+            self._file.close()
+        atexit.unregister(self.close)
+
+
+def load_trace(path: str | os.PathLike[str]) -> list[dict[str, Any]]:
+    """Every call entry in ``path`` (session header lines are skipped).
+
+    A recorder killed mid-write leaves a partial last line (or gzip member);
+    that tail is dropped.
+    """
+    lines = _read_text(path).split("\n")[:-1]  # the last piece is unterminated
+    entries = [json.loads(line) for line in lines if line.strip()]
+    return [e for e in entries if "trace" not in e]
+
+
+class ReplayRunner:
+    """CommandRunner that answers from a recorded trace.
+
+    Args:
+        trace: A trace path or the entries from :func:`load_trace`.
+        speed: Latency multiplier — ``1.0`` reproduces recorded durations and
+            poll sleeps at wall clock, ``10`` runs ten times faster, ``None``
+            skips all waiting.
+        loop: Restart an argv's outputs from the top instead of raising
+            :class:`ReplayExhausted` once they run out.
+    """
+
+    def __init__(
+        self,
+        trace: str | os.PathLike[str] | list[dict[str, Any]],
+        *,
+        speed: float | None = None,
+        loop: bool = False,
+    ) -> None:
+        entries = trace if isinstance(trace, list) else load_trace(trace)
+        self.speed = speed
+        self.loop = loop
+        self.replayed = 0
+        self._lock = threading.Lock()
+        self._paths: dict[str, str | None] = {}
+        self._recorded: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for e in entries:
+            if "which" in e:
+                self._paths.setdefault(e["which"], e["path"])
+            elif "argv" in e:
+                self._recorded.setdefault(_key(e["argv"]), []).append(e)
+        self._pending = {k: deque(v) for k, v in self._recorded.items()}
+
+    @property
+    def remaining(self) -> int:
+        """Recorded commands not replayed yet."""
+        return sum(len(q) for q in self._pending.values())
+
+    def _wait(self, seconds: float) -> None:
+        if self.speed and seconds > 0:
+            time.sleep(seconds / self.speed)
+
+    def which(self, name: str) -> str | None:
+        if name in self._paths:
+            return self._paths[name]
+        return f"/usr/bin/{name}" if any(k[0] == name for k in self._recorded) else None
+
+    def _next(self, argv: list[str]) -> dict[str, Any]:
+        key = _key(argv)
+        with self._lock:
+            pending = self._pending.get(key)
+            if not pending and self.loop and key in self._recorded:
+                pending = self._pending[key] = deque(self._recorded[key])
+            if not pending:
+                raise ReplayExhausted(f"no recorded output for: {' '.join(key)}")
+            self.replayed += 1
+            return pending.popleft()
+
+    def run(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> str:
+        entry = self._next(argv)
+        self._wait(entry.get("dur", 0.0))
+        if "timeout" in entry:
+            raise subprocess.TimeoutExpired(argv, entry["timeout"] or 0)
+        if "error" in entry:
+            raise FileNotFoundError(entry["error"])
+        rc = entry.get("rc", 0)
+        if rc and check:
+            raise subprocess.CalledProcessError(
+                rc, argv, entry.get("out", ""), entry.get("err", "")
+            )
+        return entry.get("out", "")
+
+    def sleep(self, seconds: float) -> None:
+        """``time.sleep`` for ``run_service``: scaled, and stops at trace end."""
+        if not self.loop and not self.remaining:
+            raise ReplayComplete(self.replayed)
+        self._wait(seconds)
+
+
+def runner_from_env(inner: Any) -> Any:
+    """Wrap or replace ``inner`` per ``FAN_MANAGER_RECORD``/``FAN_MANAGER_REPLAY``."""
+    replay = os.environ.get("FAN_MANAGER_REPLAY")
+    if replay:
+        speed = float(os.environ.get("FAN_MANAGER_REPLAY_SPEED", "0")) or None
+        return ReplayRunner(replay, speed=speed, loop=True)
+    record = os.environ.get("FAN_MANAGER_RECORD")
+    if record:
+        return RecordingRunner(inner, record)
+    return inner
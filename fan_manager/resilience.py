@@ -0,0 +1,290 @@
+"""Retry policies and per-target circuit breakers for hardware shell-outs.
+
+A hung lanplus session or a wedged ``/dev/ipmi0`` must never stall the
+CONCEPT:FAN-002 control loop or an MCP tool call. The
+:class:`~fan_manager.fan_manager.CommandRunner` enforces a per-command deadline;
+this module decides *whether* a failed command is retried and *whether* a target
+is called at all:
+
+  * :class:`RetryPolicy` — attempts, jittered exponential backoff and deadline
+    for one action class (``read`` retried, ``control`` retried once,
+    ``destructive`` never retried).
+  * :class:`CircuitBreaker` — per-target (``"local"`` or a BMC host) breaker
+    that fails fast once a target keeps failing and lets a single half-open
+    probe through after ``reset_timeout`` to bring it back.
+
+Only transport failures (:func:`is_transport_failure`: deadlines, ``OSError``,
+and ``ipmitool`` exits reporting a session/connection error) are retried and
+count toward a breaker. An ``ipmitool`` that exits non-zero for any other
+reason, such as an unknown sensor type, shows that the target answered: it
+fails the call at once and does not count against the target. Fan writes use
+their own breaker (:data:`FAN_TARGET`), so failed in-band reads cannot block
+them.
+
+Breaker state is process-wide and exposed through :func:`breaker_stats`.
+"""
+
+from __future__ import annotations
+
+import random
+import subprocess
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+LOCAL_TARGET = "local"
+# Breaker key for the in-band fan writes (scheduled on LOCAL_TARGET's queue).
+FAN_TARGET = "local:fan"
+
+# Lower-cased stderr fragments of an ipmitool exit that never reached the BMC.
+SESSION_ERRORS = (
+    "unable to establish",
+    "session",
+    "rmcp",
+    "timeout",
+    "timed out",
+    "connection",
+    "could not open device",
+    "no route to host",
+    "address lookup",
+    "get auth capabilities",
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the target's breaker is open."""
+
+    def __init__(self, key: str, retry_in: float):
+        super().__init__(
+            f"Circuit open for target '{key}' (retry in {max(0.0, retry_in):.1f}s)"
+        )
+        self.key = key
+        self.retry_in = retry_in
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How one action class is retried and how long each attempt may run.
+
+    Args:
+        attempts: Total attempts including the first (``1`` = never retry).
+        timeout: Per-attempt deadline in seconds handed to the runner.
+        base_delay: Backoff base in seconds; attempt ``n`` sleeps a uniformly
+            jittered ``[0, min(max_delay, base_delay * 2**n)]``.
+        max_delay: Upper bound for a single backoff sleep.
+    """
+
+    attempts: int = 1
+    timeout: float | None = 30.0
+    base_delay: float = 0.25
+    max_delay: float = 2.0
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter backoff before retry number ``attempt`` (0-based)."""
+        ceiling = min(self.max_delay, self.base_delay * (2**attempt))
+        return random.uniform(0.0, ceiling)  # nosec B311 - jitter, not crypto
+
+
+# Reads are idempotent and safe to repeat; fan-level writes are idempotent so
+# one retry is allowed; anything that changes power/BMC/SEL state is never
+# repeated behind the caller's back.
+RETRY_POLICIES: dict[str, RetryPolicy] = {
+    "read": RetryPolicy(attempts=3, timeout=15.0),
+    "control": RetryPolicy(attempts=2, timeout=10.0),
+    "destructive": RetryPolicy(attempts=1, timeout=30.0),
+}
+
+
+def policy_for(action_class: str) -> RetryPolicy:
+    """Return the :class:`RetryPolicy` for ``action_class`` (default: destructive)."""
+    return RETRY_POLICIES.get(action_class, RETRY_POLICIES["destructive"])
+
+
+class CircuitBreaker:
+    """Closed → open → half-open breaker guarding one target.
+
+    Args:
+        key: Target identifier (``"local"`` or a BMC host).
+        failure_threshold: Consecutive failures that open the breaker.
+        reset_timeout: Seconds an open breaker rejects calls before allowing a
+            half-open probe.
+        clock: Monotonic clock (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        key: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._counters = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+        self._last_error: str | None = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if (
+            self._state == OPEN
+            and self._clock() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = HALF_OPEN
+        return self._state
+
+    def before_call(self) -> None:
+        """Admit a call or raise :class:`CircuitOpenError`."""
+        with self._lock:
+            state = self._current_state()
+            if state == OPEN or (state == HALF_OPEN and self._probing):
+                self._counters["rejected"] += 1
+                retry_in = self.reset_timeout - (self._clock() - self._opened_at)
+                raise CircuitOpenError(self.key, retry_in)
+            if state == HALF_OPEN:
+                self._probing = True
+            self._counters["calls"] += 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self, error: BaseException | str | None = None) -> None:
+        with self._lock:
+            self._counters["failures"] += 1
+            self._failures += 1
+            self._last_error = str(error) if error is not None else None
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._counters["opened"] += 1
+                self._state = OPEN
+                self._opened_at = self._clock()
+            self._probing = False
+
+    def reset(self) -> None:
+        """Force the breaker closed (e.g. after a BMC is known to be back)."""
+        self.record_success()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "last_error": self._last_error,
+                **self._counters,
+            }
+
+
+def is_transport_failure(error: BaseException) -> bool:
+    """Whether ``error`` means the target could not be reached.
+
+    A :class:`subprocess.CalledProcessError` counts only if its stderr/output
+    reports a session or connection error (:data:`SESSION_ERRORS`). Every
+    other exception, including deadlines and ``OSError``, counts.
+    """
+    if isinstance(error, subprocess.CalledProcessError):
+        text = " ".join(str(t or "") for t in (error.stderr, error.output)).lower()
+        return any(marker in text for marker in SESSION_ERRORS)
+    return True
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(key: str | None) -> CircuitBreaker:
+    """Return the process-wide breaker for ``key`` (``None`` → ``"local"``)."""
+    key = key or LOCAL_TARGET
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(key)
+        return breaker
+
+
+def breaker_stats() -> dict[str, dict[str, Any]]:
+    """Snapshot every known breaker, keyed by target."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.key: b.snapshot() for b in breakers}
+
+
+def reset_breakers() -> None:
+    """Forget all breakers (tests and operator resets)."""
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def call_with_policy(
+    fn: Callable[[float | None], T],
+    policy: RetryPolicy,
+    breaker: CircuitBreaker | None = None,
+    *,
+    sleep: Callable[[float], None] = time.sleep,
+    submit: Callable[[Callable[[], T]], T] | None = None,
+) -> T:
+    """Run ``fn(timeout)`` under ``policy`` and ``breaker``.
+
+    Every attempt is admitted by the breaker first, so an open breaker fails
+    fast without spawning a process. :class:`CircuitOpenError` is never retried.
+    Only transport failures (:func:`is_transport_failure`) are retried and
+    recorded against the breaker; any other error is raised at once. The last
+    error is re-raised once attempts are exhausted.
+
+    ``submit`` runs each attempt (breaker admission included) as one job, e.g.
+    on the target's scheduler queue, so the backoff ``sleep`` between attempts
+    never holds the target. An error raised before the attempt is admitted
+    (a full queue, an open breaker) propagates as is.
+    """
+    last_error: BaseException | None = None
+    admitted = False
+
+    def attempt() -> T:
+        nonlocal admitted
+        if breaker is not None:
+            breaker.before_call()
+        admitted = True
+        return fn(policy.timeout)
+
+    for number in range(max(1, policy.attempts)):
+        if number:
+            sleep(policy.backoff(number - 1))
+        admitted = False
+        try:
+            result = attempt() if submit is None else submit(attempt)
+        except Exception as e:  # noqa: BLE001 — classified by the caller
+            if not admitted:
+                raise
+            if not is_transport_failure(e):
+                if breaker is not None:
+                    breaker.record_success()  # the target answered
+                raise
+            last_error = e
+            if breaker is not None:
+                breaker.record_failure(e)
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
+    assert last_error is not None
+    raise last_error
@@ -0,0 +1,209 @@
+"""Per-BMC command scheduling: one lane per target, parallel across targets.
+
+BMCs cope badly with concurrent sessions, yet the daemon, several MCP clients
+and the agent can all reach the same iDRAC at once. Every ``ipmitool`` command
+(:func:`fan_manager.ipmi._exec` and the CONCEPT:FAN-002 fan write in
+:func:`fan_manager.fan_manager.set_fan`) is therefore run through
+:func:`schedule`:
+
+  * each target (``"local"`` or a BMC host) gets a bounded queue served by its
+    own worker thread, so commands to one BMC are strictly serialized while
+    different BMCs proceed in parallel;
+  * queued work is ordered by lane — :data:`WRITE` (control-loop fan writes),
+    then :data:`NORMAL`, then :data:`READ` (``sdr list``, ``sel elist``, …) — so
+    a fan write jumps ahead of slow reads already waiting. A command already
+    running is never interrupted;
+  * each retry attempt is its own job (``call_with_policy(submit=...)``): the
+    backoff between attempts is slept by the caller, off the queue, so a
+    failing BMC does not stall the commands queued behind it;
+  * a full queue rejects new reads/normal work with :class:`QueueFullError`
+    (status ``429``); the write lane is always admitted;
+  * queue depth, wait times and counters per target are reported by
+    :func:`queue_stats` (and ``ipmi.stats()``).
+
+Idle workers exit after ``idle_timeout`` seconds and are restarted on demand.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+WRITE = 0
+NORMAL = 1
+READ = 2
+LANE_NAMES = {WRITE: "write", NORMAL: "normal", READ: "read"}
+
+# Resilience action class -> lane.
+_LANES = {"control": WRITE, "destructive": NORMAL, "read": READ}
+
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_IDLE_TIMEOUT = 30.0
+_WAIT_SAMPLES = 512
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a target's queue is at capacity (write lane excepted)."""
+
+    def __init__(self, key: str, depth: int):
+        super().__init__(f"Command queue for '{key}' is full ({depth} waiting)")
+        self.key = key
+        self.depth = depth
+
+
+def lane_for(action_class: str) -> int:
+    """Lane for a resilience action class; unknown classes use :data:`NORMAL`."""
+    return _LANES.get(action_class, NORMAL)
+
+
+@dataclass(order=True)
+class _Job:
+    lane: int
+    seq: int
+    fn: Callable[[], Any] = field(compare=False)
+    enqueued: float = field(compare=False)
+    future: Future = field(compare=False, default_factory=Future)
+
+
+_current = threading.local()
+
+
+class TargetQueue:
+    """Bounded, lane-ordered queue with a single worker for one target."""
+
+    def __init__(
+        self,
+        key: str,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.key = key
+        self.max_queue = max_queue
+        self.idle_timeout = idle_timeout
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._heap: list[_Job] = []
+        self._seq = itertools.count()
+        self._worker: threading.Thread | None = None
+        self._running: int | None = None
+        self._max_depth = 0
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+        self._waits: dict[int, deque[float]] = {
+            lane: deque(maxlen=_WAIT_SAMPLES) for lane in LANE_NAMES
+        }
+
+    def submit(self, fn: Callable[[], T], lane: int = NORMAL) -> Future:
+        """Queue ``fn`` on this target's lane; returns its :class:`Future`."""
+        job = _Job(lane, next(self._seq), fn, self._clock())
+        with self._cond:
+            if lane != WRITE and len(self._heap) >= self.max_queue:
+                self._counters["rejected"] += 1
+                raise QueueFullError(self.key, len(self._heap))
+            heapq.heappush(self._heap, job)
+            self._counters["submitted"] += 1
+            self._max_depth = max(self._max_depth, len(self._heap))
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._work, name=f"fan-manager-{self.key}", daemon=True
+                )
+                self._worker.start()
+            self._cond.notify()
+        return job.future
+
+    def _work(self) -> None:
+        _current.key = self.key
+        while True:
+            with self._cond:
+                while not self._heap:
+                    if not self._cond.wait(self.idle_timeout) and not self._heap:
+                        self._worker = None
+                        return
+                job = heapq.heappop(self._heap)
+                self._running = job.lane
+                self._waits[job.lane].append(self._clock() - job.enqueued)
+            failed = False
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    job.future.set_result(job.fn())
+                except BaseException as e:  # noqa: BLE001 — handed to the caller
+                    failed = True
+                    job.future.set_exception(e)
+            with self._cond:
+                self._running = None
+                self._counters["failed" if failed else "completed"] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._cond:
+            depth = len(self._heap)
+            queued = {name: 0 for name in LANE_NAMES.values()}
+            for job in self._heap:
+                queued[LANE_NAMES[job.lane]] += 1
+            waits = {LANE_NAMES[lane]: _summary(w) for lane, w in self._waits.items()}
+            return {
+                "depth": depth,
+                "max_depth": self._max_depth,
+                "queued": queued,
+                "running": None if self._running is None else LANE_NAMES[self._running],
+                "wait_ms": waits,
+                **self._counters,
+            }
+
+
+def _summary(samples: deque[float]) -> dict[str, float]:
+    if not samples:
+        return {"count": 0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]  # noqa: E731
+    return {
+        "count": len(ordered),
+        "p50": round(pick(0.50) * 1000, 3),
+        "p95": round(pick(0.95) * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3),
+    }
+
+
+_queues: dict[str, TargetQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def queue_for(key: str) -> TargetQueue:
+    """Return the process-wide queue for target ``key``."""
+    with _queues_lock:
+        q = _queues.get(key)
+        if q is None:
+            q = _queues[key] = TargetQueue(key)
+        return q
+
+
+def schedule(key: str, fn: Callable[[], T], *, lane: int = NORMAL) -> T:
+    """Run ``fn`` on ``key``'s queue and wait for its result (or exception).
+
+    Called from that target's own worker (a job scheduling more work on the
+    same target) it runs inline, so nested calls cannot deadlock.
+    """
+    if getattr(_current, "key", None) == key:
+        return fn()
+    return queue_for(key).submit(fn, lane).result()
+
+
+def queue_stats() -> dict[str, dict[str, Any]]:
+    """Snapshot every target queue, keyed by target."""
+    with _queues_lock:
+        queues = list(_queues.values())
+    return {q.key: q.snapshot() for q in queues}
+
+
+def reset_queues() -> None:
+    """Forget all queues (tests and operator resets); workers drain and exit."""
+    with _queues_lock:
+        _queues.clear()
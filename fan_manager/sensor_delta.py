@@ -0,0 +1,174 @@
+"""Change-only sensor responses for polling clients (CONCEPT:FAN-004).
+
+Agents poll ``sensors list`` and mostly receive readings they already have.
+:func:`track` parses an ``ipmitool`` SDR/sensor listing into readings, keeps a
+snapshot of what each client has seen, and hands back an opaque ``token``.
+A client that passes that token as ``since`` on its next poll gets only:
+
+  * ``changed`` — readings that are new, changed status, or moved by more than
+    the unit's tolerance (:data:`TOLERANCES`; exact match for unknown units
+    and discrete readings);
+  * ``removed`` — sensors that disappeared;
+  * ``unchanged`` — how many readings were left out.
+
+When nothing changed the same token is returned and nothing is stored. A new
+token's snapshot is the client's *previous* view plus the reported changes, so
+slow drifts below tolerance accumulate until they are reported rather than
+being silently absorbed. Snapshots are kept per token (one per client poll
+chain) in a bounded LRU; an unknown or expired token gets the full listing and
+``resync: true``.
+"""
+
+from __future__ import annotations
+
+import re
+import secrets
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+# Per-unit change tolerance (absolute, in the sensor's unit).
+TOLERANCES: dict[str, float] = {
+    "degrees c": 1.0,
+    "degrees f": 2.0,
+    "rpm": 120.0,
+    "volts": 0.05,
+    "amps": 0.2,
+    "watts": 5.0,
+    "percent": 1.0,
+}
+MAX_SNAPSHOTS = 512
+
+_READING_RE = re.compile(r"^(-?\d+(?:\.\d+)?)(?:\s+(.*))?$")
+
+Reading = dict[str, Any]
+Scope = tuple[Any, ...]
+
+
+def _split_reading(text: str) -> tuple[float | str | None, str]:
+    match = _READING_RE.match(text)
+    if match:
+        return float(match.group(1)), (match.group(2) or "").strip()
+    if text.lower() in {"", "na", "no reading", "disabled"}:
+        return None, ""
+    return text, "discrete"
+
+
+def parse_readings(text: str | Iterable[str]) -> dict[str, Reading]:
+    """Parse ``sdr list``, ``sdr type <T>`` or ``sensor list`` output.
+
+    ``text`` may also be an iterable of lines, consumed as it is read.
+    Repeated sensor names (common on Dell BMCs) get ``#2``, ``#3``… suffixes in
+    listing order.
+    """
+    readings: dict[str, Reading] = {}
+    for line in text.splitlines() if isinstance(text, str) else text:
+        cols = [c.strip() for c in line.split("|")]
+        if len(cols) < 3 or not cols[0]:
+            continue
+        if len(cols) == 3:  # sdr list: name | reading | status
+            value, unit = _split_reading(cols[1])
+            status = cols[2]
+        elif len(cols) == 5:  # sdr type: name | id | status | entity | reading
+            value, unit = _split_reading(cols[4])
+            status = cols[2]
+        else:  # sensor list: name | value | unit | status | thresholds...
+            value, _ = _split_reading(cols[1])
+            unit, status = cols[2], cols[3]
+            if isinstance(value, str):
+                unit = "discrete"
+        name, n = cols[0], 2
+        while name in readings:
+            name, n = f"{cols[0]}#{n}", n + 1
+        readings[name] = {"value": value, "unit": unit, "status": status}
+    return readings
+
+
+def _changed(old: Reading, new: Reading) -> bool:
+    if old["status"] != new["status"] or old["unit"] != new["unit"]:
+        return True
+    a, b = old["value"], new["value"]
+    if isinstance(a, float) and isinstance(b, float):
+        return abs(a - b) > TOLERANCES.get(new["unit"].lower(), 0.0)
+    return a != b
+
+
+def diff(
+    old: dict[str, Reading], new: dict[str, Reading]
+) -> tuple[dict[str, Reading], list[str]]:
+    """Readings in ``new`` that differ from ``old``, and names that vanished."""
+    changed = {
+        name: r for name, r in new.items() if name not in old or _changed(old[name], r)
+    }
+    return changed, [name for name in old if name not in new]
+
+
+class SnapshotStore:
+    """Bounded LRU of ``token -> (scope, readings)``."""
+
+    def __init__(self, max_snapshots: int = MAX_SNAPSHOTS) -> None:
+        self.max_snapshots = max_snapshots
+        self._lock = threading.Lock()
+        self._snapshots: OrderedDict[str, tuple[Scope, dict[str, Reading]]] = (
+            OrderedDict()
+        )
+
+    def get(self, token: str, scope: Scope) -> dict[str, Reading] | None:
+        with self._lock:
+            entry = self._snapshots.get(token)
+            if entry is None or entry[0] != scope:
+                return None
+            self._snapshots.move_to_end(token)
+            return entry[1]
+
+    def put(self, scope: Scope, readings: dict[str, Reading]) -> str:
+        token = secrets.token_urlsafe(9)
+        with self._lock:
+            self._snapshots[token] = (scope, readings)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return token
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+
+_store = SnapshotStore()
+
+
+def track(
+    scope: Scope, text: str | dict[str, Reading], since: str | None = None
+) -> dict[str, Any]:
+    """Envelope fields for a listing: a ``token`` and, given ``since``, a delta.
+
+    ``text`` is the raw listing or readings already parsed from it.
+
+    Returns ``{"token": ...}`` (plus ``"resync": True`` for an unknown
+    ``since``) when the caller should keep the full listing, or
+    ``{"token": ..., "response": {"changed", "removed", "unchanged"}}``.
+    """
+    readings = text if isinstance(text, dict) else parse_readings(text)
+    previous = _store.get(since, scope) if since else None
+    if previous is None:
+        fields: dict[str, Any] = {"token": _store.put(scope, readings)}
+        if since:
+            fields["resync"] = True
+        return fields
+    changed, removed = diff(previous, readings)
+    delta = {
+        "changed": changed,
+        "removed": removed,
+        "unchanged": len(readings) - len(changed),
+    }
+    if not changed and not removed:
+        return {"token": since, "response": delta}
+    view = {k: v for k, v in previous.items() if k not in removed}
+    view.update(changed)
+    return {"token": _store.put(scope, view), "response": delta}
+
+
+def reset() -> None:
+    """Drop every stored snapshot."""
+    _store.clear()
@@ -18,6 +18,7 @@
 
 from typing import Any
 
+from fan_manager.capabilities import ToolProfile, probe
 from fan_manager.fan_manager import (
     CommandRunner,
     SubprocessCommandRunner,
@@ -54,6 +55,10 @@ def config(self) -> dict[str, Any]:
         """The injected runtime configuration mapping."""
         return self._config
 
+    def probe(self, refresh: bool = False) -> ToolProfile:
+        """Probe the runner's binaries once, honoring ``config`` paths."""
+        return probe(self._runner, self._config, refresh=refresh)
+
     def read_temperature(self) -> dict[str, Any]:
         """Read the current highest CPU core temperature (CONCEPT:FAN-001)."""
         return get_temp(runner=self._runner)
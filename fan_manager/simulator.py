@@ -0,0 +1,505 @@
+"""Simulated host for closed-loop fan-curve benchmarking.
+
+:class:`SimulatedHost` implements :class:`~fan_manager.fan_manager.CommandRunner`
+on top of a lumped thermal model, so the real CONCEPT:FAN-001 read path
+(``sensors -j``) and CONCEPT:FAN-002 write path (``ipmitool raw 0x30 0x30 ..``)
+run unmodified against it:
+
+  * each CPU socket is a heat source driven by a piecewise-constant
+    :class:`Workload`, split across its cores;
+  * every core is a first-order thermal mass cooled passively and by airflow
+    that scales with fan RPM; fans slew towards the commanded duty;
+  * ``sensors -j`` reports the core temperatures with Gaussian noise and the
+    coretemp 1 °C resolution;
+  * the BMC honours ``0x30 0x30 0x01 0x00/0x01`` (manual/automatic) and
+    ``0x30 0x30 0x02 <fan|0xff> <duty>``, and answers ``sdr type fan``,
+    ``sdr type Temperature`` (one processor ``Temp`` per socket) and
+    ``sensor reading <Fan1 RPM ...>``;
+  * :meth:`SimulatedHost.read_text` and :meth:`~SimulatedHost.list_dir` serve
+    coretemp hwmon files, plus a Super-I/O chip whose PECI thresholds can be
+    written and waited on (:meth:`~SimulatedHost.wait_alarm`), for
+    :mod:`fan_manager.hwmon`; ``/proc/stat`` and
+    cpufreq files whose utilization and clock follow the socket power, for
+    :mod:`fan_manager.feedforward`; and ``thermal_throttle`` counters that
+    count each core (and package) crossing ``throttle_temperature``, for
+    :mod:`fan_manager.throttle`.
+
+Time is virtual: :meth:`SimulatedHost.sleep` advances the plant, so
+:func:`run_closed_loop` can drive :func:`~fan_manager.fan_manager.run_service`
+through an hour of operation in well under a second, and :func:`compare`
+reports settling time, overshoot, error integral, fan-write count and the
+fan-duty integral per curve configuration::
+
+    python -m fan_manager.simulator
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+import subprocess
+from dataclasses import dataclass, field
+from typing import Any
+
+CPUS = ("coretemp-isa-0000", "coretemp-isa-0001")
+_SUPERIO_ATTRS = ("input", "label", "max", "min", "max_alarm", "min_alarm")
+IPMITOOL_VERSION = "ipmitool version 1.8.19"
+
+
+class SimulationComplete(Exception):
+    """Raised by :meth:`SimulatedHost.sleep` once the run's horizon is reached."""
+
+
+@dataclass(frozen=True)
+class Workload:
+    """Piecewise-constant socket power: ``(start_seconds, watts)`` segments."""
+
+    segments: tuple[tuple[float, float], ...]
+
+    @classmethod
+    def constant(cls, watts: float) -> Workload:
+        return cls(((0.0, watts),))
+
+    @classmethod
+    def step(cls, at: float, before: float, after: float) -> Workload:
+        return cls(((0.0, before), (at, after)))
+
+    @classmethod
+    def square(
+        cls, period: float, low: float, high: float, cycles: int, start: float = 0.0
+    ) -> Workload:
+        segments = [(0.0, low)]
+        for i in range(cycles):
+            t = start + i * period
+            segments += [(t, high), (t + period / 2, low)]
+        return cls(tuple(segments))
+
+    def power(self, t: float) -> float:
+        watts = self.segments[0][1]
+        for start, value in self.segments:
+            if start > t:
+                break
+            watts = value
+        return watts
+
+    @property
+    def last_change(self) -> float:
+        return self.segments[-1][0]
+
+
+@dataclass
+class ThermalModel:
+    """Plant constants (per core unless noted)."""
+
+    ambient: float = 25.0
+    cores: int = 8
+    heat_capacity: float = 20.0  # J/K
+    passive_conductance: float = 0.25  # W/K with fans stopped
+    fan_conductance: float = 1.5  # W/K added at full RPM
+    fan_min_rpm: float = 1800.0
+    fan_max_rpm: float = 15000.0
+    fan_time_constant: float = 3.0  # s, RPM slew towards the target
+    fans: int = 6
+    auto_duty: float = 30.0  # duty the BMC runs in automatic mode
+    max_power: float = 250.0  # W per socket at full utilization
+    max_khz: int = 3_500_000  # cpuinfo_max_freq; idle cores clock at half
+    throttle_temperature: float = 95.0  # PROCHOT trip point
+    noise: float = 0.5  # sensor noise sigma, °C
+    resolution: float = 1.0  # coretemp reports whole degrees
+    dt: float = 0.5  # integration step, s
+
+
+@dataclass
+class SimulationReport:
+    """Closed-loop metrics for one run (temperatures are true, not measured)."""
+
+    duration: float
+    settling_time: float | None
+    overshoot: float
+    peak_temperature: float
+    final_temperature: float
+    fan_writes: int
+    duty_integral: float
+    mean_duty: float
+    error_integral: float = 0.0  # °C·s away from the final temperature
+
+    def as_dict(self) -> dict[str, Any]:
+        return {k: getattr(self, k) for k in self.__dataclass_fields__}
+
+
+@dataclass(eq=False)
+class SimulatedHost:
+    """A CommandRunner backed by :class:`ThermalModel` in virtual time."""
+
+    workload: Workload = field(default_factory=lambda: Workload.constant(120.0))
+    model: ThermalModel = field(default_factory=ThermalModel)
+    seed: int = 0
+    now: float = 0.0
+    stop_at: float = math.inf
+    manual: bool = False
+    fan_writes: int = 0
+    duty_integral: float = 0.0
+    history: list[tuple[float, float, float]] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        m = self.model
+        self._rng = random.Random(self.seed)
+        self._started = self.now
+        self._weights = [1.0 + 0.15 * math.sin(i * 2.1) for i in range(m.cores)]
+        self.duty = [m.auto_duty] * m.fans
+        self.rpm = [self._target_rpm(d) for d in self.duty]
+        self.busy_seconds = 0.0
+        self.thresholds: dict[str, float] = {}
+        self.core_throttles = [[0] * m.cores for _ in CPUS]
+        self.package_throttles = [0] * len(CPUS)
+        conductance = self._conductance()
+        watts = self.workload.power(0.0)
+        self.temps = [
+            [
+                m.ambient + self._core_power(watts, c) / conductance
+                for c in range(m.cores)
+            ]
+            for _ in CPUS
+        ]
+
+    # -- plant -------------------------------------------------------------
+    def _target_rpm(self, duty: float) -> float:
+        m = self.model
+        return m.fan_min_rpm + duty / 100.0 * (m.fan_max_rpm - m.fan_min_rpm)
+
+    def _conductance(self) -> float:
+        m = self.model
+        airflow = sum(self.rpm) / (len(self.rpm) * m.fan_max_rpm)
+        return m.passive_conductance + m.fan_conductance * airflow**0.8
+
+    def _core_power(self, socket_watts: float, core: int) -> float:
+        return socket_watts / self.model.cores * self._weights[core]
+
+    def utilization(self, t: float | None = None) -> float:
+        watts = self.workload.power(self.now if t is None else t)
+        return min(1.0, watts / self.model.max_power)
+
+    def max_temperature(self) -> float:
+        return max(max(socket) for socket in self.temps)
+
+    def mean_duty(self) -> float:
+        return sum(self.duty) / len(self.duty)
+
+    def advance(self, seconds: float) -> None:
+        """Integrate the plant forward by ``seconds`` of virtual time."""
+        m = self.model
+        end = self.now + seconds
+        while self.now < end - 1e-9:
+            dt = min(m.dt, end - self.now)
+            if not self.manual:
+                self.duty = [m.auto_duty] * m.fans
+            alpha = 1.0 - math.exp(-dt / m.fan_time_constant)
+            self.rpm = [
+                r + (self._target_rpm(d) - r) * alpha
+                for r, d in zip(self.rpm, self.duty, strict=True)
+            ]
+            conductance = self._conductance()
+            watts = self.workload.power(self.now)
+            trip = m.throttle_temperature
+            for s, socket in enumerate(self.temps):
+                hot = max(socket) > trip
+                for c, t in enumerate(socket):
+                    heat = self._core_power(watts, c) - (t - m.ambient) * conductance
+                    socket[c] = t + heat * dt / m.heat_capacity
+                    if t <= trip < socket[c]:
+                        self.core_throttles[s][c] += 1
+                if not hot and max(socket) > trip:
+                    self.package_throttles[s] += 1
+            self.busy_seconds += self.utilization() * dt
+            self.now += dt
+            self.duty_integral += self.mean_duty() * dt
+            self.history.append((self.now, self.max_temperature(), self.mean_duty()))
+
+    def sleep(self, seconds: float) -> None:
+        """Virtual-time ``time.sleep``; stops the run at ``stop_at``."""
+        self.advance(min(seconds, max(0.0, self.stop_at - self.now)))
+        if self.now >= self.stop_at - 1e-9:
+            raise SimulationComplete(self.now)
+
+    # -- CommandRunner -----------------------------------------------------
+    def which(self, name: str) -> str | None:
+        return f"/usr/bin/{name}" if name in ("ipmitool", "sensors") else None
+
+    def run(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> str:
+        tool = argv[0].rsplit("/", 1)[-1]
+        if tool == "sensors":
+            return json.dumps(self._sensors_doc())
+        if tool == "ipmitool":
+            return self._ipmitool(argv)
+        raise FileNotFoundError(argv[0])
+
+    def list_dir(self, path: str) -> list[str]:
+        """Directory entries under the simulated ``/sys/class/hwmon``."""
+        if path == "/sys/class/hwmon":
+            return [f"hwmon{i}" for i in range(len(CPUS) + 1)]
+        index = path.removeprefix("/sys/class/hwmon/hwmon")
+        if index.isdigit() and int(index) < len(CPUS):
+            inputs = range(1, self.model.cores + 2)
+            return ["name"] + [
+                f"temp{i}_{k}" for i in inputs for k in ("input", "label")
+            ]
+        if index == str(len(CPUS)):
+            return ["name"] + [f"temp1_{k}" for k in _SUPERIO_ATTRS]
+        raise FileNotFoundError(path)
+
+    def write_text(self, path: str, value: str) -> None:
+        """Program the Super-I/O chip's ``temp1_max``/``temp1_min`` (m°C)."""
+        name = path.removeprefix(f"/sys/class/hwmon/hwmon{len(CPUS)}/")
+        if name not in ("temp1_max", "temp1_min"):
+            raise PermissionError(path)
+        self.thresholds[name.removeprefix("temp1_")] = int(value) / 1000.0
+
+    def _alarm(self, kind: str) -> bool:
+        limit = self.thresholds.get(kind)
+        if limit is None:
+            return False
+        t = self.max_temperature()
+        return t > limit if kind == "max" else t < limit
+
+    def wait_alarm(self, paths: list[str], timeout: float) -> list[str]:
+        """Virtual-time ``poll()``: advance until a threshold alarm asserts."""
+        deadline = self.now + timeout
+        while True:
+            fired = [p for p in paths if self._alarm(p.rsplit("_", 2)[-2])]
+            if fired or self.now >= deadline - 1e-9:
+                return fired
+            self.sleep(min(self.model.dt, deadline - self.now))
+
+    def read_text(self, path: str) -> str:
+        """``/proc/stat``, cpufreq, topology, ``thermal_throttle`` and hwmon files."""
+        m = self.model
+        if path.startswith("/sys/class/hwmon/hwmon"):
+            return self._hwmon(path)
+        cpus = [f"cpu{i}" for i in range(len(CPUS) * m.cores)]
+        if path == "/proc/stat":
+            busy = round(self.busy_seconds * 100)  # USER_HZ jiffies
+            idle = round((self.now - self._started) * 100) - busy
+            lines = [f"cpu  {busy * len(cpus)} 0 0 {idle * len(cpus)} 0 0 0 0"]
+            lines += [f"{cpu} {busy} 0 0 {idle} 0 0 0 0" for cpu in cpus]
+            return "\n".join(lines) + "\n"
+        if "/thermal_throttle/" in path or path.endswith("/physical_package_id"):
+            cpu = path.split("/")[5]
+            if cpu in cpus:
+                s, c = divmod(cpus.index(cpu), m.cores)
+                if path.endswith("/physical_package_id"):
+                    return f"{s}\n"
+                if path.endswith("/core_throttle_count"):
+                    return f"{self.core_throttles[s][c]}\n"
+                if path.endswith("/package_throttle_count"):
+                    return f"{self.package_throttles[s]}\n"
+            raise FileNotFoundError(path)
+        prefix, _, name = path.rpartition("/cpufreq/")
+        if prefix.rsplit("/", 1)[-1] in cpus:
+            if name == "cpuinfo_max_freq":
+                return f"{m.max_khz}\n"
+            if name == "scaling_cur_freq":
+                return f"{round(m.max_khz * (0.5 + 0.5 * self.utilization()))}\n"
+        raise FileNotFoundError(path)
+
+    def _hwmon(self, path: str) -> str:
+        chip, _, name = path.removeprefix("/sys/class/hwmon/hwmon").partition("/")
+        if chip == str(len(CPUS)):  # board Super-I/O chip with a PECI input
+            attr = name.removeprefix("temp1_")
+            if name == "name":
+                return "nct6779\n"
+            if attr == "label":
+                return "PECI Agent 0\n"
+            if attr == "input":
+                return f"{round(self._read(self.max_temperature()) * 1000)}\n"
+            if attr in ("max", "min"):
+                default = 80.0 if attr == "max" else 0.0
+                return f"{round(self.thresholds.get(attr, default) * 1000)}\n"
+            if attr in ("max_alarm", "min_alarm"):
+                return f"{int(self._alarm(attr[:3]))}\n"
+        if chip.isdigit() and int(chip) < len(CPUS):
+            socket = self.temps[int(chip)]
+            if name == "name":
+                return "coretemp\n"
+            index, _, kind = name.removeprefix("temp").partition("_")
+            if index.isdigit() and 1 <= int(index) <= len(socket) + 1:
+                i = int(index)
+                if kind == "label":
+                    return f"Package id {chip}\n" if i == 1 else f"Core {i - 2}\n"
+                if kind == "input":
+                    value = max(socket) if i == 1 else socket[i - 2]
+                    return f"{round(self._read(value) * 1000)}\n"
+        raise FileNotFoundError(path)
+
+    def _read(self, value: float) -> float:
+        m = self.model
+        noisy = value + self._rng.gauss(0.0, m.noise)
+        return round(noisy / m.resolution) * m.resolution
+
+    def _sensors_doc(self) -> dict[str, Any]:
+        doc: dict[str, Any] = {}
+        for cpu, socket in zip(CPUS, self.temps, strict=True):
+            chip: dict[str, Any] = {
+                "Adapter": "ISA adapter",
+                "Package id 0": {"temp1_input": self._read(max(socket))},
+            }
+            for c, t in enumerate(socket):
+                chip[f"Core {c}"] = {
+                    f"temp{c + 2}_input": self._read(t),
+                    f"temp{c + 2}_max": 84.0,
+                    f"temp{c + 2}_crit": 94.0,
+                }
+            doc[cpu] = chip
+        return doc
+
+    def _ipmitool(self, argv: list[str]) -> str:
+        if "-V" in argv:
+            return IPMITOOL_VERSION
+        if argv[-3:] == ["sdr", "type", "fan"]:
+            return "\n".join(
+                f"Fan{i + 1} RPM        | {0x30 + i:02X}h | ok  |  7.1 | {rpm:.0f} RPM"
+                for i, rpm in enumerate(self.rpm)
+            )
+        if [a.lower() for a in argv[-3:]] == ["sdr", "type", "temperature"]:
+            lines = [
+                f"Temp             | {0x0E + s:02X}h | ok  |  3.{s + 1} | "
+                f"{self._read(max(socket)):.0f} degrees C"
+                for s, socket in enumerate(self.temps)
+            ]
+            inlet = f"{self.model.ambient:.0f} degrees C"
+            return "\n".join([f"Inlet Temp       | 04h | ok  |  7.1 | {inlet}", *lines])
+        if "reading" in argv and argv[argv.index("reading") - 1] == "sensor":
+            rpm = {f"Fan{i + 1} RPM": r for i, r in enumerate(self.rpm)}
+            names = argv[argv.index("reading") + 1 :]
+            return "\n".join(
+                f"{name:<17}| {rpm[name]:.0f}" for name in names if name in rpm
+            )
+        if "raw" in argv:
+            raw = [int(b, 16) for b in argv[argv.index("raw") + 1 :]]
+            if raw[:3] == [0x30, 0x30, 0x01] and len(raw) == 4:
+                self.manual = raw[3] == 0x00
+                return ""
+            if raw[:3] == [0x30, 0x30, 0x02] and len(raw) == 5:
+                fan, duty = raw[3], min(100, raw[4])
+                if self.manual:
+                    if fan == 0xFF:
+                        self.duty = [float(duty)] * self.model.fans
+                    elif fan < self.model.fans:
+                        self.duty[fan] = float(duty)
+                self.fan_writes += 1
+                return ""
+        raise subprocess.CalledProcessError(1, argv, "Invalid command")
+
+    # -- metrics -----------------------------------------------------------
+    def report(self, since: float = 0.0, band: float = 2.0) -> SimulationReport:
+        """Metrics from ``since`` (normally the last workload change) onward.
+
+        The final temperature is the mean over the last tenth of the run;
+        settling time is how long after ``since`` the true peak core
+        temperature stays within ``band`` °C of it (``None`` if it never does)
+        and the error integral sums its distance from it over time. Settling
+        time hinges on the last noisy excursion past ``band``; the integral
+        does not.
+        """
+        window = [h for h in self.history if h[0] >= since] or self.history[-1:]
+        tail = self.history[-max(1, len(self.history) // 10) :]
+        final = sum(t for _, t, _ in tail) / len(tail)
+        settled_at = None
+        for now, temp, _ in reversed(window):
+            if abs(temp - final) > band:
+                break
+            settled_at = now
+        peak = max(t for _, t, _ in window)
+        error = sum(
+            abs(temp - final) * (now - prev)
+            for (prev, _, _), (now, temp, _) in zip(window, window[1:], strict=False)
+        )
+        duration = self.now - self._started
+        return SimulationReport(
+            duration=duration,
+            settling_time=None if settled_at is None else max(0.0, settled_at - since),
+            overshoot=max(0.0, peak - final),
+            peak_temperature=peak,
+            final_temperature=final,
+            fan_writes=self.fan_writes,
+            duty_integral=self.duty_integral,
+            mean_duty=self.duty_integral / duration if duration else 0.0,
+            error_integral=error,
+        )
+
+
+def run_closed_loop(
+    host: SimulatedHost,
+    duration: float,
+    *,
+    temperature_poll_rate: float = 24,
+    **curve: Any,
+) -> SimulationReport:
+    """Run the real ``run_service`` loop against ``host`` for ``duration`` s."""
+    from fan_manager.fan_manager import run_service
+
+    host.stop_at = host.now + duration
+    try:
+        run_service(
+            temperature_poll_rate=temperature_poll_rate,
+            runner=host,
+            sleep=host.sleep,
+            **curve,
+        )
+    except SimulationComplete:
+        pass
+    return host.report(since=host.workload.last_change)
+
+
+def compare(
+    configs: dict[str, dict[str, Any]],
+    workload: Workload,
+    duration: float = 1800.0,
+    *,
+    model: ThermalModel | None = None,
+    seed: int = 0,
+) -> dict[str, SimulationReport]:
+    """Closed-loop report per named curve configuration, same plant and noise.
+
+    Each config holds ``run_service`` keyword arguments (curve bounds,
+    ``temperature_power``, ``temperature_poll_rate``).
+    """
+    reports = {}
+    for name, config in configs.items():
+        host = SimulatedHost(
+            workload=workload, model=model or ThermalModel(), seed=seed
+        )
+        reports[name] = run_closed_loop(host, duration, **config)
+    return reports
+
+
+DEFAULT_CONFIGS: dict[str, dict[str, Any]] = {
+    "default": {},
+    "linear": {"temperature_power": 1},
+    "quadratic": {"temperature_power": 2},
+    "fast-poll": {"temperature_poll_rate": 5},
+    "cool-band": {"minimum_temperature": 40, "maximum_temperature": 70},
+    "verified": {"verify": True},
+    "feedforward": {"feedforward": 32.0},
+    "sampled": {"sample_rate": 1.0},
+    "alarm": {"alarm_timeout": 300.0},
+}
+
+
+def main() -> None:
+    """Print a comparison of the built-in curve configurations."""
+    reports = compare(DEFAULT_CONFIGS, Workload.step(600, 40.0, 220.0))
+    header = f"{'config':<12}{'settle s':>10}{'overshoot':>11}{'peak °C':>9}"
+    print(header + f"{'writes':>8}{'mean duty':>11}")
+    for name, r in reports.items():
+        settle = "-" if r.settling_time is None else f"{r.settling_time:.0f}"
+        print(
+            f"{name:<12}{settle:>10}{r.overshoot:>11.1f}{r.peak_temperature:>9.1f}"
+            f"{r.fan_writes:>8}{r.mean_duty:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
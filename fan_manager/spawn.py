@@ -0,0 +1,365 @@
+"""Cheaper process launch for large server processes.
+
+:class:`~fan_manager.fan_manager.SubprocessCommandRunner` launches each
+``sensors``/``ipmitool`` through :class:`subprocess.Popen`, which for
+``start_new_session`` runs CPython's fork/exec path in the calling process.
+The MCP and agent servers carry large heaps (fastmcp, pydantic,
+agent-utilities), so that path gets measurably slower there than in the
+daemon. Two alternative :class:`~fan_manager.fan_manager.CommandRunner`\\ s:
+
+  * :class:`PosixSpawnRunner` — ``os.posix_spawnp`` with the child in its own
+    session, stdin on ``/dev/null`` and stdout/stderr on pipes; the C library
+    launches it without duplicating the parent's address space. It provides
+    ``run_stream`` too.
+  * :class:`ForkServerRunner` — a tiny helper process (``python -m
+    fan_manager.spawn``, stdlib only) started once, which receives argv as
+    JSON lines on its stdin, runs them concurrently and answers with exit
+    code, stdout and stderr. The helper enforces the deadline and kills the
+    command's process group; it is restarted if it dies. Output is returned
+    whole, so ``run_stream`` falls back to splitting it.
+
+``FAN_MANAGER_SPAWN`` selects the process-wide default runner (see
+:func:`runner_for`): ``subprocess`` (default), ``posix_spawn`` or
+``forkserver``. ``benchmarks/test_spawn.py`` compares launch latency and RSS
+of the three inside an MCP server process.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import selectors
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Generator
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any
+
+ENV_SPAWN = "FAN_MANAGER_SPAWN"
+MODES = ("subprocess", "posix_spawn", "forkserver")
+# Extra seconds the client waits past the deadline for the helper's reply.
+GRACE = 5.0
+
+
+def _killpg(pid: int) -> None:
+    """SIGKILL the process group led by ``pid`` (falls back to the process)."""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+class PosixSpawnRunner:
+    """:class:`~fan_manager.fan_manager.CommandRunner` over ``os.posix_spawnp``.
+
+    Same contract as ``SubprocessCommandRunner``: fixed argv without a shell,
+    one session per command, the group killed when the deadline elapses.
+
+    Args:
+        timeout: Default deadline (seconds) when the caller passes none.
+    """
+
+    def __init__(self, timeout: float | None = 60.0) -> None:
+        self.timeout = timeout
+
+    def which(self, name: str) -> str | None:
+        return shutil.which(name)
+
+    def _spawn(self, argv: list[str], stdout: int, stderr: int) -> int:
+        # Fixed argv, no shell: no user input reaches the command line.
+        return os.posix_spawnp(  # nosec B606 - fixed argv, no shell
+            argv[0],
+            argv,
+            os.environ,
+            file_actions=[
+                (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+                (os.POSIX_SPAWN_DUP2, stdout, 1),
+                (os.POSIX_SPAWN_DUP2, stderr, 2),
+            ],
+            setsid=True,
+        )
+
+    def run(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> str:
+        deadline = self.timeout if timeout is None else timeout
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        try:
+            pid = self._spawn(argv, out_w, err_w)
+        except BaseException:
+            os.close(out_r)
+            os.close(err_r)
+            raise
+        finally:
+            os.close(out_w)
+            os.close(err_w)
+        chunks: dict[int, list[bytes]] = {out_r: [], err_r: []}
+        expired = False
+        with selectors.DefaultSelector() as sel:
+            sel.register(out_r, selectors.EVENT_READ)
+            sel.register(err_r, selectors.EVENT_READ)
+            end = None if deadline is None else time.monotonic() + deadline
+            while sel.get_map():
+                wait = None if end is None else end - time.monotonic()
+                if wait is not None and wait <= 0:
+                    expired = True
+                    _killpg(pid)
+                    break
+                for key, _ in sel.select(wait):
+                    data = os.read(key.fd, 65536)
+                    if data:
+                        chunks[key.fd].append(data)
+                    else:
+                        sel.unregister(key.fd)
+        os.close(out_r)
+        os.close(err_r)
+        _, status = os.waitpid(pid, 0)
+        if expired:
+            raise subprocess.TimeoutExpired(argv, deadline or 0.0)
+        returncode = os.waitstatus_to_exitcode(status)
+        stdout = b"".join(chunks[out_r]).decode(errors="replace")
+        if check and returncode:
+            stderr = b"".join(chunks[err_r]).decode(errors="replace")
+            raise subprocess.CalledProcessError(returncode, argv, stdout, stderr)
+        return stdout
+
+    def run_stream(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> Generator[str, None, None]:
+        """Stdout lines as they arrive; see ``SubprocessCommandRunner.run_stream``."""
+        deadline = self.timeout if timeout is None else timeout
+        with tempfile.TemporaryFile() as stderr:
+            out_r, out_w = os.pipe()
+            try:
+                pid = self._spawn(argv, out_w, stderr.fileno())
+            except BaseException:
+                os.close(out_r)
+                raise
+            finally:
+                os.close(out_w)
+            expired = threading.Event()
+
+            def expire() -> None:
+                expired.set()
+                _killpg(pid)
+
+            timer = threading.Timer(deadline, expire) if deadline else None
+            if timer:
+                timer.daemon = True
+                timer.start()
+            finished = False
+            try:
+                with open(out_r, errors="replace") as lines:
+                    for line in lines:
+                        yield line.rstrip("\n")
+                finished = True
+            finally:
+                if timer:
+                    timer.cancel()
+                if not finished:
+                    _killpg(pid)
+                _, status = os.waitpid(pid, 0)
+            if expired.is_set():
+                raise subprocess.TimeoutExpired(argv, deadline or 0.0)
+            returncode = os.waitstatus_to_exitcode(status)
+            if check and returncode:
+                stderr.seek(0)
+                raise subprocess.CalledProcessError(
+                    returncode, argv, None, stderr.read().decode(errors="replace")
+                )
+
+
+class ForkServerRunner:
+    """:class:`~fan_manager.fan_manager.CommandRunner` through a helper process.
+
+    The helper is started on first use (or by :meth:`start`) and shared by all
+    threads; replies are matched to requests by id, so commands for different
+    targets still run concurrently.
+
+    Args:
+        timeout: Default deadline (seconds) when the caller passes none.
+        python: Interpreter that runs the helper.
+    """
+
+    def __init__(
+        self, timeout: float | None = 60.0, python: str = sys.executable
+    ) -> None:
+        self.timeout = timeout
+        self.python = python
+        self._lock = threading.Lock()
+        self._proc: subprocess.Popen | None = None
+        self._pending: dict[int, Future] = {}
+        self._next_id = 0
+        self.starts = 0
+
+    def which(self, name: str) -> str | None:
+        return shutil.which(name)
+
+    @property
+    def pid(self) -> int | None:
+        """The helper's pid while it runs."""
+        proc = self._proc
+        return proc.pid if proc is not None and proc.poll() is None else None
+
+    def start(self) -> int:
+        """Start the helper unless it is running; returns its pid."""
+        with self._lock:
+            return self._ensure().pid
+
+    def _ensure(self) -> subprocess.Popen:
+        if self._proc is not None and self._proc.poll() is None:
+            return self._proc
+        proc = subprocess.Popen(  # nosec B603 - fixed argv, no shell
+            [self.python, "-m", "fan_manager.spawn"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            start_new_session=True,
+        )
+        self._proc = proc
+        self.starts += 1
+        threading.Thread(
+            target=self._read, args=(proc,), name="fan-manager-spawn", daemon=True
+        ).start()
+        return proc
+
+    def _read(self, proc: subprocess.Popen) -> None:
+        assert proc.stdout is not None  # stdout=PIPE
+        for line in proc.stdout:
+            reply = json.loads(line)
+            with self._lock:
+                future = self._pending.pop(reply["id"], None)
+            if future is not None:
+                future.set_result(reply)
+        proc.wait()
+        with self._lock:
+            if self._proc is proc:
+                doomed = list(self._pending.values())
+                self._pending.clear()
+            else:
+                doomed = []
+        for future in doomed:
+            future.set_exception(RuntimeError("spawn helper exited"))
+
+    def run(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> str:
+        deadline = self.timeout if timeout is None else timeout
+        future: Future = Future()
+        with self._lock:
+            proc = self._ensure()
+            self._next_id += 1
+            request_id = self._next_id
+            self._pending[request_id] = future
+            assert proc.stdin is not None  # stdin=PIPE
+            try:
+                proc.stdin.write(
+                    json.dumps({"id": request_id, "argv": argv, "timeout": deadline})
+                    + "\n"
+                )
+                proc.stdin.flush()
+            except OSError:
+                del self._pending[request_id]
+                raise
+        try:
+            reply = future.result(None if deadline is None else deadline + GRACE)
+        except FutureTimeout:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise subprocess.TimeoutExpired(argv, deadline or 0.0) from None
+        if reply.get("timeout"):
+            raise subprocess.TimeoutExpired(argv, deadline or 0.0)
+        if "error" in reply:
+            raise OSError(reply.get("errno") or 0, reply["error"], argv[0])
+        stdout = reply["stdout"]
+        if check and reply["returncode"]:
+            raise subprocess.CalledProcessError(
+                reply["returncode"], argv, stdout, reply["stderr"]
+            )
+        return stdout
+
+    def close(self) -> None:
+        """Stop the helper (a later :meth:`run` starts a new one)."""
+        with self._lock:
+            proc, self._proc = self._proc, None
+        if proc is not None and proc.poll() is None:
+            assert proc.stdin is not None  # stdin=PIPE
+            proc.stdin.close()
+            try:
+                proc.wait(timeout=GRACE)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+
+
+def _handle(request: dict[str, Any], write: Any) -> None:
+    """Run one helper request and ``write`` its reply, whatever goes wrong."""
+    reply: dict[str, Any] = {"id": request.get("id")}
+    try:
+        with subprocess.Popen(  # nosec B603 - fixed argv from the parent, no shell
+            request["argv"],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True,
+        ) as proc:
+            try:
+                stdout, stderr = proc.communicate(timeout=request.get("timeout"))
+            except subprocess.TimeoutExpired:
+                _killpg(proc.pid)
+                proc.communicate()
+                reply["timeout"] = True
+            else:
+                reply.update(returncode=proc.returncode, stdout=stdout, stderr=stderr)
+    except OSError as e:
+        reply.update(errno=e.errno, error=e.strerror or str(e))
+    except Exception as e:  # noqa: BLE001 — e.g. undecodable output; the client waits
+        reply = {"id": reply["id"], "error": f"{type(e).__name__}: {e}"}
+    write(json.dumps(reply) + "\n")
+
+
+def serve(stdin: Any = None, stdout: Any = None) -> None:
+    """Helper main loop: one JSON request per line, replies in completion order."""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    lock = threading.Lock()
+
+    def write(line: str) -> None:
+        with lock:
+            stdout.write(line)
+            stdout.flush()
+
+    for line in stdin:
+        if line.strip():
+            threading.Thread(
+                target=_handle, args=(json.loads(line), write), daemon=True
+            ).start()
+
+
+def runner_for(mode: str, timeout: float | None = 60.0) -> Any:
+    """A runner for a :data:`MODES` name (``ValueError`` for anything else)."""
+    if mode == "subprocess":
+        from fan_manager.fan_manager import SubprocessCommandRunner
+
+        return SubprocessCommandRunner(timeout)
+    if mode == "posix_spawn":
+        return PosixSpawnRunner(timeout)
+    if mode == "forkserver":
+        return ForkServerRunner(timeout)
+    raise ValueError(f"Unknown spawn mode {mode!r}. Must be one of: {list(MODES)}")
+
+
+if __name__ == "__main__":
+    serve()
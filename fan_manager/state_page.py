@@ -0,0 +1,283 @@
+"""Shared-memory state page published by the fan daemon (CONCEPT:FAN-001/FAN-002).
+
+Local tooling (health checks, node exporters, the MCP server on the same host)
+wants "current temperature and fan level" far more often than the daemon
+ticks, and :func:`~fan_manager.fan_manager.get_temp` forks ``sensors`` every
+time. :func:`~fan_manager.fan_manager.run_service` therefore publishes each
+tick into a small memory-mapped file that readers map once and then read
+without further syscalls.
+
+The page is a fixed little-endian layout guarded by a seqlock:
+
+  * header: magic ``b"FMST"``, layout version, sequence counter. The writer
+    makes the sequence odd, writes the payload, then makes it even again;
+  * payload: tick timestamp, tick number, daemon pid, applied fan level
+    (``-1`` if unknown), controller mode (:data:`MODES`), hottest temperature,
+    the throttle-avoidance counters and curve ceiling (see
+    :mod:`fan_manager.throttle`) and up to :data:`MAX_ZONES` named per-zone
+    temperatures.
+
+A reader copies the payload between two reads of the sequence and retries
+while it is odd or changed, so it never sees a torn tick. There is a single
+writer (the daemon); any number of readers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import mmap
+import os
+import struct
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+MAGIC = b"FMST"
+VERSION = 2
+PAGE_SIZE = 4096
+MAX_ZONES = 16
+MODES = ("unknown", "curve", "verified", "failsafe", "error", "throttle")
+ENV_PATH = "FAN_MANAGER_STATE_PATH"
+
+_HEADER = struct.Struct("<4sHxxQ")  # magic, version, pad, seq
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 8
+_BODY = struct.Struct("<dQihBBf")  # ts, tick, pid, level, mode, zones, temp
+_BODY_OFFSET = _HEADER.size
+# thermal throttle events, power-limit events, escalations, curve ceiling
+_THROTTLE = struct.Struct("<QQIf")
+_THROTTLE_OFFSET = _BODY_OFFSET + _BODY.size
+_ZONE = struct.Struct("<32sf")  # zone name, temperature
+_ZONES_OFFSET = 72
+_ZONE_NAME = _ZONE.size - 4
+
+_RETRIES = 10_000
+
+
+def default_path() -> str:
+    """``$FAN_MANAGER_STATE_PATH``, else ``/dev/shm`` (tmpfs) or the temp dir."""
+    path = os.environ.get(ENV_PATH)
+    if path:
+        return path
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "fan-manager.state")
+
+
+@dataclass
+class TickState:
+    """One published daemon tick."""
+
+    timestamp: float
+    tick: int
+    pid: int
+    level: int | None
+    mode: str
+    temperature: float | None
+    zones: dict[str, float] = field(default_factory=dict)
+    throttle: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def age(self) -> float:
+        """Seconds since the tick was published (wall clock)."""
+        return max(0.0, time.time() - self.timestamp)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "age": round(self.age, 3)}
+
+
+class StatePublisher:
+    """Single writer of the state page at ``path`` (created if missing)."""
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or default_path()
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < PAGE_SIZE:
+                os.ftruncate(fd, PAGE_SIZE)
+            self._map = mmap.mmap(fd, PAGE_SIZE)
+        finally:
+            os.close(fd)
+        magic, version, seq = _HEADER.unpack_from(self._map, 0)
+        # Continue an even sequence left by a previous daemon so a reader
+        # holding the old mapping sees the change.
+        self._seq = seq + (seq & 1) if (magic, version) == (MAGIC, VERSION) else 0
+        _HEADER.pack_into(self._map, 0, MAGIC, VERSION, self._seq)
+        self.tick = 0
+
+    def publish(
+        self,
+        *,
+        level: int | None,
+        mode: str,
+        temperature: float | None,
+        zones: dict[str, float] | None = None,
+        throttle: dict[str, Any] | None = None,
+        timestamp: float | None = None,
+    ) -> None:
+        """Write one tick; readers never observe it half-written."""
+        items = list((zones or {}).items())[:MAX_ZONES]
+        self.tick += 1
+        self._seq += 1
+        _SEQ.pack_into(self._map, _SEQ_OFFSET, self._seq)  # odd: write in progress
+        _BODY.pack_into(
+            self._map,
+            _BODY_OFFSET,
+            time.time() if timestamp is None else timestamp,
+            self.tick,
+            os.getpid(),
+            -1 if level is None else int(level),
+            MODES.index(mode) if mode in MODES else 0,
+            len(items),
+            math.nan if temperature is None else float(temperature),
+        )
+        t = throttle or {}
+        _THROTTLE.pack_into(
+            self._map,
+            _THROTTLE_OFFSET,
+            t.get("core_throttle", 0) + t.get("package_throttle", 0),
+            t.get("core_power_limit", 0) + t.get("package_power_limit", 0),
+            t.get("escalations", 0),
+            float(t["maximum"]) if "maximum" in t else math.nan,
+        )
+        for i, (name, temp) in enumerate(items):
+            _ZONE.pack_into(
+                self._map,
+                _ZONES_OFFSET + i * _ZONE.size,
+                name.encode()[:_ZONE_NAME],
+                math.nan if temp is None else float(temp),
+            )
+        self._seq += 1
+        _SEQ.pack_into(self._map, _SEQ_OFFSET, self._seq)
+
+    def close(self) -> None:
+        self._map.close()
+
+
+class StateReader:
+    """Read-only mapping of the state page; :meth:`read` makes no syscalls."""
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or default_path()
+        with open(self.path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), PAGE_SIZE, access=mmap.ACCESS_READ)
+        magic, version, _ = _HEADER.unpack_from(self._map, 0)
+        if (magic, version) != (MAGIC, VERSION):
+            self._map.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} state page")
+
+    def read(self) -> TickState | None:
+        """Latest published tick, or ``None`` before the first one."""
+        m = self._map
+        for _ in range(_RETRIES):
+            (seq,) = _SEQ.unpack_from(m, _SEQ_OFFSET)
+            if seq & 1:
+                time.sleep(0)  # let the writer finish; only hit on contention
+                continue
+            ts, tick, pid, level, mode, count, temp = _BODY.unpack_from(m, _BODY_OFFSET)
+            throttled, limited, escalations, ceiling = _THROTTLE.unpack_from(
+                m, _THROTTLE_OFFSET
+            )
+            zones = [
+                _ZONE.unpack_from(m, _ZONES_OFFSET + i * _ZONE.size)
+                for i in range(min(count, MAX_ZONES))
+            ]
+            if _SEQ.unpack_from(m, _SEQ_OFFSET)[0] != seq:
+                time.sleep(0)
+                continue
+            if tick == 0:
+                return None
+            return TickState(
+                timestamp=ts,
+                tick=tick,
+                pid=pid,
+                level=None if level < 0 else level,
+                mode=MODES[mode] if mode < len(MODES) else "unknown",
+                temperature=None if math.isnan(temp) else round(temp, 2),
+                zones={
+                    name.rstrip(b"\0").decode(errors="replace"): round(t, 2)
+                    for name, t in zones
+                    if not math.isnan(t)
+                },
+                throttle={}
+                if math.isnan(ceiling)
+                else {
+                    "throttle_events": throttled,
+                    "power_limit_events": limited,
+                    "escalations": escalations,
+                    "maximum_temperature": round(ceiling, 2),
+                },
+            )
+        raise TimeoutError("state page kept changing while being read")
+
+    def close(self) -> None:
+        self._map.close()
+
+
+_readers: dict[str, StateReader] = {}
+
+
+def read_state(path: str | None = None) -> TickState | None:
+    """Latest daemon tick from the state page, or ``None`` if none is published.
+
+    The page is mapped on first use and the mapping kept, so repeated calls
+    cost a few memory reads.
+    """
+    path = path or default_path()
+    reader = _readers.get(path)
+    if reader is None:
+        try:
+            reader = StateReader(path)
+        except (OSError, ValueError):
+            return None
+        _readers[path] = reader
+    return reader.read()
+
+
+def reset() -> None:
+    """Drop cached reader mappings (test isolation)."""
+    while _readers:
+        _readers.popitem()[1].close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """``fan-manager status``: print the daemon's latest tick.
+
+    Exits 1 when nothing is published or the tick is older than ``--max-age``.
+    """
+    parser = argparse.ArgumentParser(
+        prog="fan-manager status",
+        description="Show the fan daemon's latest published tick.",
+    )
+    parser.add_argument("--state-file", default=None, help="State page path")
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=None,
+        help="Fail if the latest tick is older than this many seconds",
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON")
+    args = parser.parse_args(argv)
+
+    state = read_state(args.state_file)
+    if state is None:
+        print(f"no state published at {args.state_file or default_path()}")
+        return 1
+    if args.json:
+        print(json.dumps(state.as_dict()))
+    else:
+        level = "-" if state.level is None else f"{state.level}%"
+        temp = "-" if state.temperature is None else f"{state.temperature:.1f}C"
+        print(
+            f"mode={state.mode} level={level} temperature={temp} "
+            f"tick={state.tick} pid={state.pid} age={state.age:.1f}s"
+        )
+        for name, t in state.zones.items():
+            print(f"  {name}: {t:.1f}C")
+        if state.throttle:
+            print(
+                "  throttle: " + " ".join(f"{k}={v}" for k, v in state.throttle.items())
+            )
+    return 1 if args.max_age is not None and state.age > args.max_age else 0
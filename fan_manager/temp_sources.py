@@ -0,0 +1,288 @@
+"""Temperature source chain with health and latency tracking (CONCEPT:FAN-001).
+
+:func:`~fan_manager.fan_manager.get_temp` depends on ``sensors`` alone: with
+lm-sensors missing or broken every tick fails and the fans sit at
+``maximum_fan_speed``, although the BMC reports the CPU temperatures too. A
+:class:`SourceChain` reads from an ordered list of :class:`Source` objects
+instead, built by :func:`build_chain` from these names:
+
+  * ``hwmon`` — the CPU ``temp*_input`` files (no process; see
+    :mod:`fan_manager.hwmon`);
+  * ``sensors`` — ``sensors -j`` (:func:`~fan_manager.fan_manager.get_temp`);
+  * ``sdr`` — in-band ``ipmitool sdr type Temperature``, processor entities
+    (IPMI entity ID 3) or sensors named ``CPU``;
+  * ``sdr-oob`` — the same over ``lanplus`` against a BMC target.
+
+Each tick :meth:`SourceChain.read` tries the healthy sources fastest first
+(latency is an EMA of successful reads; sources not yet measured go first, in
+chain order, so each is measured once) and falls through to the next on
+failure. A failure — an error envelope, an exception or an implausible
+value — demotes the source for ``backoff`` seconds, doubling per consecutive
+failure up to ``max_backoff``. Sources in backoff are tried last, only when
+every healthy one failed. The envelope records the ``source`` that served the
+reading and its ``latency_ms``.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from fan_manager.fan_manager import CommandRunner
+
+_log = logging.getLogger("FanManager.sources")
+
+SOURCES = ("hwmon", "sensors", "sdr", "sdr-oob")
+DEFAULT_CHAIN = ("hwmon", "sensors", "sdr")
+# Readings outside this range (°C) are treated as a failed read.
+PLAUSIBLE = (5.0, 125.0)
+
+Envelope = dict[str, Any]
+
+
+@dataclass(eq=False)
+class Source:
+    """One way of reading the CPU temperature, with its runtime health."""
+
+    name: str
+    read: Callable[[], Envelope]
+    latency: float | None = None  # EMA of successful reads, seconds
+    failures: int = 0  # consecutive
+    retry_at: float = 0.0
+    served: int = 0
+    errors: int = 0
+    last_error: str | None = None
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.retry_at
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        return {
+            "healthy": self.healthy(now),
+            "latency_ms": None
+            if self.latency is None
+            else round(self.latency * 1e3, 3),
+            "served": self.served,
+            "errors": self.errors,
+            "failures": self.failures,
+            "retry_in": round(max(0.0, self.retry_at - now), 1),
+            "last_error": self.last_error,
+        }
+
+
+class SourceChain:
+    """Pick the fastest healthy :class:`Source` each read; fall back on failure."""
+
+    def __init__(
+        self,
+        sources: list[Source],
+        *,
+        backoff: float = 5.0,
+        max_backoff: float = 300.0,
+        smoothing: float = 0.3,
+        clock: Callable[[], float] = time.monotonic,
+        timer: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        if not sources:
+            raise ValueError("at least one temperature source is required")
+        self.sources = sources
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.smoothing = smoothing
+        self._clock = clock
+        self._timer = timer
+        self.last: str | None = None
+
+    def order(self, now: float | None = None) -> list[Source]:
+        """Sources in the order the next read tries them."""
+        now = self._clock() if now is None else now
+        rank = {id(s): i for i, s in enumerate(self.sources)}
+        return sorted(
+            self.sources,
+            key=lambda s: (
+                not s.healthy(now),
+                s.retry_at if not s.healthy(now) else 0.0,
+                0.0 if s.latency is None else s.latency,
+                rank[id(s)],
+            ),
+        )
+
+    def read(self) -> Envelope:
+        """The first good reading, tagged with ``source`` and ``latency_ms``."""
+        now = self._clock()
+        errors = []
+        for source in self.order(now):
+            start = self._timer()
+            try:
+                res = source.read()
+                error = _check(res)
+            except Exception as e:  # noqa: BLE001 — any failure demotes the source
+                res, error = None, str(e) or type(e).__name__
+            elapsed = self._timer() - start
+            if error is None and res is not None:
+                self._succeeded(source, elapsed)
+                return {
+                    **res,
+                    "source": source.name,
+                    "latency_ms": round(elapsed * 1e3, 3),
+                }
+            self._failed(source, error or "no reading", now)
+            errors.append(f"{source.name}: {error}")
+        return {
+            "response": None,
+            "command": "temperature sources",
+            "status": 503,
+            "error": "; ".join(errors),
+        }
+
+    def _succeeded(self, source: Source, elapsed: float) -> None:
+        if source.latency is None:
+            source.latency = elapsed
+        else:
+            source.latency += (elapsed - source.latency) * self.smoothing
+        if source.failures:
+            _log.info("Temperature source %s recovered", source.name)
+        source.failures, source.retry_at = 0, 0.0
+        source.served += 1
+        if source.name != self.last:
+            _log.info("Temperature source: %s", source.name)
+            self.last = source.name
+
+    def _failed(self, source: Source, error: str, now: float) -> None:
+        source.failures += 1
+        source.errors += 1
+        source.last_error = error
+        delay = min(self.max_backoff, self.backoff * 2 ** (source.failures - 1))
+        source.retry_at = now + delay
+        _log.warning(
+            "Temperature source %s failed (%s); demoted for %.0fs",
+            source.name,
+            error,
+            delay,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        now = self._clock()
+        return {
+            "selected": self.last,
+            "order": [s.name for s in self.order(now)],
+            "sources": {s.name: s.as_dict(now) for s in self.sources},
+        }
+
+
+def _check(res: Envelope) -> str | None:
+    """Why ``res`` is not a usable reading (``None`` if it is)."""
+    if res.get("status") != 200:
+        return res.get("error") or f"status {res.get('status')}"
+    value = res.get("response")
+    if not isinstance(value, (int, float)) or not (
+        PLAUSIBLE[0] <= value <= PLAUSIBLE[1]
+    ):
+        return f"implausible reading {value!r}"
+    return None
+
+
+def parse_sdr_temperatures(text: str) -> dict[str, float]:
+    """CPU readings from ``sdr type Temperature`` output, keyed by zone.
+
+    Processor entities (``3.<instance>``) become ``sdr.3.<instance>``; rows
+    named ``CPU…`` on other entities keep their name.
+    """
+    zones: dict[str, float] = {}
+    for line in text.splitlines():
+        cols = [c.strip() for c in line.split("|")]
+        if len(cols) != 5 or not cols[4].lower().endswith("degrees c"):
+            continue
+        name, entity = cols[0], cols[3]
+        if entity.split(".")[0] == "3":
+            zone = f"sdr.{entity}"
+        elif name.lower().startswith("cpu"):
+            zone = name
+        else:
+            continue
+        try:
+            value = float(cols[4].split()[0])
+        except ValueError:
+            continue
+        zones[zone] = max(zones.get(zone, -math.inf), value)
+    return zones
+
+
+def read_sdr(
+    runner: CommandRunner | None = None, target: dict[str, Any] | None = None
+) -> Envelope:
+    """Hottest CPU temperature from the BMC's SDR, in-band or at ``target``."""
+    from fan_manager import ipmi
+
+    res = ipmi._exec(
+        runner, target, ["sdr", "type", "Temperature"], action_class="read"
+    )
+    if res["status"] != 200:
+        return res
+    zones = parse_sdr_temperatures(res["response"] or "")
+    if not zones:
+        return {
+            "response": None,
+            "command": res["command"],
+            "status": 404,
+            "error": "No CPU temperature sensors in the SDR",
+        }
+    return {
+        "response": max(zones.values()),
+        "command": res["command"],
+        "status": 200,
+        "zones": zones,
+    }
+
+
+def build_chain(
+    names: list[str] | tuple[str, ...] = DEFAULT_CHAIN,
+    *,
+    runner: CommandRunner | None = None,
+    target: dict[str, Any] | None = None,
+    read: Callable[[str], str] | None = None,
+    listdir: Callable[[str], list[str]] | None = None,
+    **kwargs: Any,
+) -> SourceChain:
+    """A :class:`SourceChain` over ``names`` (see :data:`SOURCES`).
+
+    ``sdr-oob`` needs a BMC ``target``; ``read``/``listdir`` stand in for the
+    hwmon files. Other keyword arguments go to :class:`SourceChain`.
+    """
+    from fan_manager.fan_manager import get_temp
+    from fan_manager.hwmon import HwmonSampler
+
+    sources = []
+    for name in names:
+        if name == "hwmon":
+            sampler = HwmonSampler(read=read, listdir=listdir)
+
+            def read_hwmon(sampler: HwmonSampler = sampler) -> Envelope:
+                window = sampler.take() if sampler.sample() is not None else None
+                if window is None:
+                    raise RuntimeError("No CPU hwmon inputs")
+                return {
+                    "response": window.max,
+                    "command": "hwmon",
+                    "status": 200,
+                    "zones": window.zones,
+                }
+
+            sources.append(Source(name, read_hwmon))
+        elif name == "sensors":
+            sources.append(Source(name, lambda: get_temp(runner=runner)))
+        elif name == "sdr":
+            sources.append(Source(name, lambda: read_sdr(runner)))
+        elif name == "sdr-oob":
+            if not target or not target.get("host"):
+                raise ValueError("'sdr-oob' needs a BMC target with a host")
+            sources.append(Source(name, lambda: read_sdr(runner, target)))
+        else:
+            raise ValueError(
+                f"Unknown temperature source {name!r}. Must be one of: {list(SOURCES)}"
+            )
+    return SourceChain(sources, **kwargs)
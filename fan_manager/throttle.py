@@ -0,0 +1,139 @@
+"""Throttle avoidance from the kernel's thermal throttle counters (CONCEPT:FAN-002).
+
+The temperature curve has no notion of throttling, yet throttling is what the
+workloads actually notice. A :class:`ThrottleGuard` reads, every tick, the
+Intel ``thermal_throttle`` counters under
+``/sys/devices/system/cpu/cpu*/thermal_throttle/``:
+
+  * ``core_throttle_count`` (summed over CPUs) and ``package_throttle_count``
+    (once per ``physical_package_id``) — PROCHOT events;
+  * ``core_power_limit_count`` / ``package_power_limit_count`` where the
+    kernel exposes them — power-limit (RAPL) events.
+
+Any increase is a hard signal: the tick escalates the fans to
+``maximum_fan_speed`` and lowers the curve's effective
+``maximum_temperature`` by ``step`` °C, so the next ticks run the fans
+harder at the same temperature. Once the counters have stayed flat for
+``relax_after`` ticks the offset is given back ``relax_step`` °C at a time.
+Missing counter files (other vendors, containers) read as zero.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from fan_manager.feedforward import parse_proc_stat
+
+COUNTERS = {
+    "core_throttle": ("core_throttle_count", False),
+    "package_throttle": ("package_throttle_count", True),
+    "core_power_limit": ("core_power_limit_count", False),
+    "package_power_limit": ("package_power_limit_count", True),
+}
+
+_CPU_ROOT = "/sys/devices/system/cpu"
+
+
+def _read_text(path: str) -> str:
+    with open(path) as fh:
+        return fh.read()
+
+
+def _exists(read: Callable[[str], str], path: str) -> bool:
+    try:
+        read(path)
+    except OSError:
+        return False
+    return True
+
+
+class ThrottleGuard:
+    """Per-tick throttle detection and adaptive curve ceiling for one host."""
+
+    def __init__(
+        self,
+        *,
+        step: float = 3.0,
+        relax_after: int = 10,
+        relax_step: float = 1.0,
+        read: Callable[[str], str] | None = None,
+    ) -> None:
+        self.step = step
+        self.relax_after = relax_after
+        self.relax_step = relax_step
+        self._read = read or _read_text
+        self._packages: dict[str, str] | None = None
+        self._present: dict[str, bool] = {}
+        self.counts: dict[str, int] = dict.fromkeys(COUNTERS, 0)
+        self.offset = 0.0
+        self.escalations = 0
+        self._primed = False
+        self._quiet = 0
+
+    def _cpus(self) -> dict[str, str]:
+        """CPU -> package id, read once (a CPU is its own package if unknown)."""
+        if self._packages is None:
+            cpus = [c for c in parse_proc_stat(self._read("/proc/stat")) if c != "cpu"]
+            self._packages = {}
+            for cpu in cpus:
+                try:
+                    path = f"{_CPU_ROOT}/{cpu}/topology/physical_package_id"
+                    self._packages[cpu] = self._read(path).strip()
+                except OSError:
+                    self._packages[cpu] = cpu
+        return self._packages
+
+    def _value(self, cpu: str, name: str) -> int:
+        try:
+            return int(self._read(f"{_CPU_ROOT}/{cpu}/thermal_throttle/{name}"))
+        except (OSError, ValueError):
+            return 0
+
+    def read_counts(self) -> dict[str, int]:
+        """Current counter totals; counters absent on the first CPU are skipped."""
+        cpus = self._cpus()
+        counts = {}
+        for key, (name, per_package) in COUNTERS.items():
+            if key not in self._present:
+                first = next(iter(cpus), None)
+                self._present[key] = first is not None and _exists(
+                    self._read, f"{_CPU_ROOT}/{first}/thermal_throttle/{name}"
+                )
+            seen: set[str] = set()
+            total = 0
+            for cpu, package in cpus.items() if self._present[key] else ():
+                if per_package:
+                    if package in seen:
+                        continue
+                    seen.add(package)
+                total += self._value(cpu, name)
+            counts[key] = total
+        return counts
+
+    def poll(self) -> bool:
+        """Read the counters; ``True`` if any increased since the last poll."""
+        try:
+            counts = self.read_counts()
+        except OSError:
+            return False
+        increased = self._primed and any(counts[k] > self.counts[k] for k in COUNTERS)
+        self.counts, self._primed = counts, True
+        if increased:
+            self.escalations += 1
+            self._quiet = 0
+            self.offset += self.step
+        else:
+            self._quiet += 1
+            if self._quiet >= self.relax_after and self.offset:
+                self.offset = max(0.0, self.offset - self.relax_step)
+                self._quiet = 0
+        return increased
+
+    def maximum_temperature(self, maximum: float, minimum: float) -> float:
+        """The curve's effective ceiling, kept at least 1 °C above ``minimum``."""
+        self.offset = min(self.offset, max(0.0, maximum - minimum - 1.0))
+        return maximum - self.offset
+
+    def stats(self) -> dict[str, Any]:
+        return {**self.counts, "escalations": self.escalations, "offset": self.offset}
@@ -0,0 +1,327 @@
+"""Server-side filtering and compact encoding for IPMI tool responses.
+
+``fan_manager_sensors``, ``fan_manager_sel`` and ``fan_manager_bmc`` return raw
+``ipmitool`` text by default. When a request carries any view option, the text
+is parsed into rows and reduced *before* serialization:
+
+  * ``name`` — case-insensitive glob on the row's name column (sensor name,
+    SEL sensor, LAN/MC field, user name);
+  * ``type`` — sensor type (inferred from the unit for SDR rows: Temperature,
+    Fan, Voltage, Current, Power, Percent, Discrete; the sensor class for SEL);
+  * ``status`` — comma-separated statuses to keep (``"cr,nr"``) or, prefixed
+    with ``!``, to drop (``"!ok"``);
+  * ``fields`` — column projection (list or comma-separated string);
+  * ``limit`` / ``offset`` — paging, applied after filtering;
+  * ``format`` — ``"records"`` (list of objects, the default) or ``"table"``
+    (``{"columns": [...], "rows": [[...], ...]}``, the compact encoding).
+
+The envelope keeps ``command``/``status`` and gains ``total`` (matches before
+paging), ``returned`` and ``more`` (whether matches remain past the page). A
+CONCEPT:FAN-004 ``since`` delta is filtered too: ``name``/``type``/``status``
+narrow its ``changed`` readings.
+
+:func:`take` selects from rows parsed off a line stream instead (see
+:func:`fan_manager.ipmi.sel`): once a page is full it stops at the next match,
+so the command is cut short and ``total`` is ``None`` with ``more: true``. Only
+the page is held in memory, however long the listing.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import re
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+from fan_manager.sensor_delta import parse_readings
+
+OPTIONS = ("name", "type", "status", "fields", "limit", "offset", "format")
+FORMATS = ("records", "table")
+
+_UNIT_TYPES = {
+    "degrees c": "Temperature",
+    "degrees f": "Temperature",
+    "rpm": "Fan",
+    "volts": "Voltage",
+    "amps": "Current",
+    "watts": "Power",
+    "percent": "Percent",
+    "discrete": "Discrete",
+}
+
+Row = dict[str, Any]
+
+
+class ViewError(ValueError):
+    """An invalid view option (surfaced as status 400)."""
+
+
+# --- parsers ---------------------------------------------------------------
+def reading_rows(readings: dict[str, Any]) -> list[Row]:
+    """Rows for readings parsed by :func:`~fan_manager.sensor_delta.parse_readings`."""
+    return [
+        {"name": name, **r, "type": _UNIT_TYPES.get(r["unit"].lower(), "Other")}
+        for name, r in readings.items()
+    ]
+
+
+def sensor_rows(text: str | Iterable[str]) -> list[Row]:
+    """SDR/sensor listing rows: name, value, unit, status, type."""
+    return reading_rows(parse_readings(text))
+
+
+def iter_sel_rows(lines: Iterable[str]) -> Iterator[Row]:
+    """:func:`sel_rows` over lines, one row per line as it is read."""
+    for line in lines:
+        cols = [c.strip() for c in line.split("|")]
+        if len(cols) < 5:
+            continue
+        sensor = cols[3]
+        yield {
+            "id": cols[0],
+            "date": cols[1],
+            "time": cols[2],
+            "sensor": sensor,
+            "type": sensor.split(" #")[0],
+            "event": " | ".join(cols[4:-1]) if len(cols) > 5 else cols[4],
+            "state": cols[-1] if len(cols) > 5 else "",
+        }
+
+
+def sel_rows(text: str) -> list[Row]:
+    """``sel list``/``sel elist`` rows: id, date, time, sensor, type, event, state."""
+    return list(iter_sel_rows(text.splitlines()))
+
+
+def field_rows(text: str) -> list[Row]:
+    """``key : value`` listings (``lan print``, ``mc info``, ``sel info``).
+
+    Indented continuation lines (e.g. ``Additional Device Support``) are folded
+    into the previous field's value.
+    """
+    rows: list[Row] = []
+    for line in text.splitlines():
+        key, sep, value = line.partition(":")
+        if sep and key.strip() and not line[:1].isspace():
+            rows.append({"field": key.strip(), "value": value.strip()})
+        elif rows and line.strip():
+            extra = line.strip().lstrip(":").strip()
+            rows[-1]["value"] = ", ".join(v for v in (rows[-1]["value"], extra) if v)
+    return rows
+
+
+_USER_COLUMNS = {
+    "ID": "id",
+    "Name": "name",
+    "Callin": "callin",
+    "Link Auth": "link_auth",
+    "IPMI Msg": "ipmi_msg",
+    "Channel Priv Limit": "priv",
+}
+
+
+def user_rows(text: str) -> list[Row]:
+    """``user list`` rows, sliced at the header's column offsets."""
+    lines = text.expandtabs().splitlines()
+    if not lines:
+        return []
+    header = lines[0]
+    spans = sorted(
+        (header.find(title), key)
+        for title, key in _USER_COLUMNS.items()
+        if title in header
+    )
+    rows = []
+    for line in lines[1:]:
+        if not line.strip():
+            continue
+        row = {}
+        for i, (start, key) in enumerate(spans):
+            end = spans[i + 1][0] if i + 1 < len(spans) else None
+            row[key] = line[start:end].strip()
+        rows.append(row)
+    return rows
+
+
+# kind -> (parser, name column, status column)
+KINDS: dict[str, tuple[Any, str, str | None]] = {
+    "sensors": (sensor_rows, "name", "status"),
+    "sel": (sel_rows, "sensor", "state"),
+    "fields": (field_rows, "field", None),
+    "users": (user_rows, "name", None),
+}
+
+
+# --- selection ---------------------------------------------------------------
+def _as_list(value: Any) -> list[str]:
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(",") if v.strip()]
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value]
+    raise ViewError(f"expected a list or comma-separated string, got {value!r}")
+
+
+def _as_int(options: dict[str, Any], key: str, default: int | None) -> int | None:
+    value = options.get(key, default)
+    if value is None:
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ViewError(f"'{key}' must be an integer") from None
+    if number < 0:
+        raise ViewError(f"'{key}' must be >= 0")
+    return number
+
+
+def wants_view(options: dict[str, Any]) -> bool:
+    """Whether ``options`` asks for a parsed view rather than raw text."""
+    return any(key in options for key in OPTIONS)
+
+
+def _matcher(
+    options: dict[str, Any], name_key: str, status_key: str | None
+) -> Callable[[Row], bool]:
+    """The ``name``/``type``/``status`` filters of ``options`` as one predicate."""
+    tests: list[Callable[[Row], bool]] = []
+    name = options.get("name")
+    if name:
+        pattern = re.compile(fnmatch.translate(str(name)), re.IGNORECASE)
+        tests.append(lambda r: bool(pattern.match(str(r.get(name_key, "")))))
+    kind = options.get("type")
+    if kind:
+        wanted = {t.lower() for t in _as_list(kind)}
+        tests.append(lambda r: str(r.get("type", "")).lower() in wanted)
+    status = options.get("status")
+    if status and status_key:
+        values = _as_list(status)
+        drop = {v[1:].lower() for v in values if v.startswith("!")}
+        keep = {v.lower() for v in values if not v.startswith("!")}
+
+        def status_ok(r: Row) -> bool:
+            value = str(r.get(status_key, "")).lower()
+            return value not in drop and (not keep or value in keep)
+
+        tests.append(status_ok)
+    return lambda r: all(test(r) for test in tests)
+
+
+def _project(rows: list[Row], options: dict[str, Any]) -> list[Row]:
+    if not options.get("fields"):
+        return rows
+    fields = _as_list(options["fields"])
+    return [{f: r.get(f) for f in fields} for r in rows]
+
+
+def check(options: dict[str, Any]) -> None:
+    """Raise :class:`ViewError` for invalid ``options`` before any command runs."""
+    _matcher(options, "name", "status")
+    _as_int(options, "offset", 0)
+    _as_int(options, "limit", None)
+    if options.get("fields"):
+        _as_list(options["fields"])
+    if options.get("format", "records") not in FORMATS:
+        raise ViewError(f"'format' must be one of {list(FORMATS)}")
+
+
+def select(
+    rows: list[Row],
+    options: dict[str, Any],
+    name_key: str = "name",
+    status_key: str | None = "status",
+) -> tuple[list[Row], int]:
+    """Filter, page and project ``rows``; returns ``(rows, total_matches)``."""
+    matches = _matcher(options, name_key, status_key)
+    rows = [r for r in rows if matches(r)]
+    total = len(rows)
+    offset = _as_int(options, "offset", 0) or 0
+    limit = _as_int(options, "limit", None)
+    rows = rows[offset : None if limit is None else offset + limit]
+    return _project(rows, options), total
+
+
+def take(
+    rows: Iterable[Row],
+    options: dict[str, Any],
+    name_key: str = "name",
+    status_key: str | None = "status",
+) -> tuple[list[Row], int | None]:
+    """:func:`select` over a row stream, reading no further than it must.
+
+    Stops at the first match past ``offset + limit`` and returns ``None`` for
+    the total then; an exhausted stream gives the exact total.
+    """
+    matches = _matcher(options, name_key, status_key)
+    offset = _as_int(options, "offset", 0) or 0
+    limit = _as_int(options, "limit", None)
+    page: list[Row] = []
+    total = 0
+    for row in rows:
+        if not matches(row):
+            continue
+        if limit is not None and total >= offset + limit:
+            return _project(page, options), None
+        if total >= offset:
+            page.append(row)
+        total += 1
+    return _project(page, options), total
+
+
+def page_fields(
+    rows: list[Row], total: int | None, options: dict[str, Any]
+) -> dict[str, Any]:
+    """Envelope fields for a selected page: response, total, returned, more."""
+    offset = _as_int(options, "offset", 0) or 0
+    return {
+        "response": encode(rows, options.get("format", "records")),
+        "total": total,
+        "returned": len(rows),
+        "more": total is None or offset + len(rows) < total,
+    }
+
+
+def encode(rows: list[Row], fmt: str = "records") -> Any:
+    """``records`` (list of dicts) or ``table`` (shared column list + rows)."""
+    if fmt == "records":
+        return rows
+    if fmt == "table":
+        columns = list(rows[0]) if rows else []
+        return {"columns": columns, "rows": [[r.get(c) for c in columns] for r in rows]}
+    raise ViewError(f"'format' must be one of {list(FORMATS)}")
+
+
+def _filter_delta(delta: dict[str, Any], options: dict[str, Any]) -> dict[str, Any]:
+    keys: dict[str, Any] = {
+        k: options[k] for k in ("name", "type", "status") if k in options
+    }
+    rows, _ = select(reading_rows(delta["changed"]), keys)
+    kept = {r["name"] for r in rows}
+    return {
+        **delta,
+        "changed": {k: v for k, v in delta["changed"].items() if k in kept},
+    }
+
+
+def shape(
+    envelope: dict[str, Any], kind: str, options: dict[str, Any]
+) -> dict[str, Any]:
+    """Apply view ``options`` to a successful text envelope of ``kind``.
+
+    Envelopes without view options and failed envelopes pass through
+    unchanged; invalid options turn the envelope into a 400.
+    """
+    if not wants_view(options) or envelope.get("status") != 200:
+        return envelope
+    response = envelope.get("response")
+    try:
+        if kind == "sensors" and isinstance(response, dict) and "changed" in response:
+            return {**envelope, "response": _filter_delta(response, options)}
+        if not isinstance(response, str):
+            return envelope
+        parser, name_key, status_key = KINDS[kind]
+        rows, total = select(
+            parser(envelope["response"]), options, name_key, status_key
+        )
+        return {**envelope, **page_fields(rows, total, options)}
+    except ViewError as e:
+        return {**envelope, "response": None, "status": 400, "error": str(e)}
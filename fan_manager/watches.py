@@ -0,0 +1,358 @@
+"""Server-side threshold watches over BMC sensors (CONCEPT:FAN-004).
+
+Agents that poll ``fan_manager_sensors`` to spot overheating each spawn an
+``ipmitool`` per poll. A :class:`Watch` instead registers the condition once —
+"any Temperature sensor above 80", "``Fan*`` below 1200 RPM" — for a target, and
+one shared :class:`WatchSampler` thread evaluates every watch at
+``FAN_MANAGER_WATCH_INTERVAL`` seconds (default 5):
+
+  * each sample reads ``sdr list`` **once per target** (host and
+    credentials), however many watches (and clients) share it, through the
+    scheduler with a breaker of its own (``<target>:watch``), so failing
+    samples never block the target's interactive commands;
+  * a sensor that crosses the threshold emits a ``tripped`` event, and a
+    ``cleared`` event once it is back past the threshold by ``hysteresis``;
+  * events are logged, kept in a bounded history (:meth:`WatchSampler.events`,
+    which can long-poll with ``wait``) and pushed to the watch's ``notify``
+    callback. The MCP tool forwards them to the subscribing session as log
+    notifications; sessionless (2026-07-28) clients have no standing channel for
+    those and long-poll ``events`` instead.
+
+Watches expire ``ttl`` seconds after they are added (``FAN_MANAGER_WATCH_TTL``,
+default one hour), and a watch whose subscriber is gone (its ``notify`` raises)
+is dropped. The sampler thread starts with the first watch and exits after the
+last one is removed.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import operator
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from fan_manager import ipmi, views
+from fan_manager.fan_manager import CommandRunner
+
+_log = logging.getLogger("FanManager.watch")
+
+DEFAULT_INTERVAL = 5.0
+DEFAULT_TTL = 3600.0
+MAX_EVENTS = 256
+
+OPS: dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+def _float_from_env(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+@dataclass(eq=False)
+class Watch:
+    """``<sensor> <op> <threshold>`` over the sensors matching ``name``/``type``."""
+
+    id: str
+    threshold: float
+    op: str = ">"
+    name: str = "*"
+    type: str | None = None
+    hysteresis: float = 0.0
+    target: ipmi.Target = None
+    notify: Callable[[dict[str, Any]], None] | None = None
+    expires_at: float | None = None
+    tripped: dict[str, float] = field(default_factory=dict)
+    last_error: str | None = None
+
+    def __post_init__(self) -> None:
+        if self.op not in OPS:
+            raise ValueError(f"op must be one of {list(OPS)}")
+        if self.hysteresis < 0:
+            raise ValueError("hysteresis must be >= 0")
+        views.check(self._options())  # ViewError is a ValueError: status 400
+
+    @property
+    def key(self) -> str:
+        return ipmi._target_key(self.target)
+
+    @property
+    def sample_key(self) -> tuple[tuple[str, Any], ...]:
+        """Watches with equal keys share one read: same host *and* credentials."""
+        return tuple(sorted((self.target or {}).items()))
+
+    def _cleared(self, value: float) -> bool:
+        # Back on the safe side of the threshold by at least ``hysteresis``.
+        if self.op in (">", ">="):
+            return value < self.threshold - self.hysteresis
+        return value > self.threshold + self.hysteresis
+
+    def _options(self) -> dict[str, Any]:
+        return {"name": self.name, **({"type": self.type} if self.type else {})}
+
+    def evaluate(self, rows: list[views.Row]) -> list[dict[str, Any]]:
+        """Transitions for this sample: ``tripped`` and ``cleared`` events.
+
+        Updates :attr:`tripped`; the sampler calls it under its lock.
+        """
+        matched, _ = views.select(rows, self._options())
+        events = []
+        for row in matched:
+            value = row["value"]
+            if not isinstance(value, float):
+                continue
+            sensor = row["name"]
+            if sensor not in self.tripped and OPS[self.op](value, self.threshold):
+                self.tripped[sensor] = value
+                events.append(self._event("tripped", row))
+            elif sensor in self.tripped and self._cleared(value):
+                del self.tripped[sensor]
+                events.append(self._event("cleared", row))
+            elif sensor in self.tripped:
+                self.tripped[sensor] = value
+        return events
+
+    def _event(self, kind: str, row: views.Row) -> dict[str, Any]:
+        return {
+            "event": kind,
+            "watch": self.id,
+            "target": self.key,
+            "sensor": row["name"],
+            "value": row["value"],
+            "unit": row["unit"],
+            "condition": f"{self.op} {self.threshold:g}",
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "target": self.key,
+            "name": self.name,
+            "type": self.type,
+            "condition": f"{self.op} {self.threshold:g}",
+            "hysteresis": self.hysteresis,
+            "tripped": dict(self.tripped),
+            "expires_at": self.expires_at,
+            "last_error": self.last_error,
+        }
+
+
+class WatchSampler:
+    """Evaluates every registered :class:`Watch` from one background thread."""
+
+    def __init__(
+        self,
+        interval: float | None = None,
+        runner: CommandRunner | None = None,
+        clock: Callable[[], float] = time.time,
+        max_events: int = MAX_EVENTS,
+        ttl: float | None = None,
+    ) -> None:
+        if interval is None:
+            interval = _float_from_env("FAN_MANAGER_WATCH_INTERVAL", DEFAULT_INTERVAL)
+        self.interval = interval
+        self.ttl = (
+            _float_from_env("FAN_MANAGER_WATCH_TTL", DEFAULT_TTL)
+            if ttl is None
+            else ttl
+        )
+        self.runner = runner
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._new_event = threading.Condition(self._lock)
+        self._watches: dict[str, Watch] = {}
+        self._ids = itertools.count(1)
+        self._seq = itertools.count(1)
+        self._events: deque[dict[str, Any]] = deque(maxlen=max_events)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._counters = {"samples": 0, "reads": 0, "events": 0, "expired": 0}
+
+    # --- registration ------------------------------------------------------
+    def add(self, threshold: float, ttl: float | None = None, **kwargs: Any) -> Watch:
+        """Register a watch (see :class:`Watch` fields) and start sampling.
+
+        It expires after ``ttl`` seconds (default: the sampler's ``ttl``).
+        """
+        ttl = self.ttl if ttl is None else float(ttl)
+        if ttl <= 0:
+            raise ValueError("ttl must be > 0")
+        with self._lock:
+            watch = Watch(
+                f"w{next(self._ids)}",
+                float(threshold),
+                expires_at=self._clock() + ttl,
+                **kwargs,
+            )
+            self._watches[watch.id] = watch
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._loop, name="fan-manager-watch", daemon=True
+                )
+                self._thread.start()
+        _log.info("watch %s added: %s", watch.id, watch.as_dict()["condition"])
+        return watch
+
+    def remove(self, watch_id: str) -> bool:
+        with self._lock:
+            removed = self._watches.pop(watch_id, None) is not None
+            if not self._watches:
+                self._stop.set()
+        return removed
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [w.as_dict() for w in self._watches.values()]
+
+    def events(self, since: int = 0, wait: float = 0.0) -> list[dict[str, Any]]:
+        """Recorded events with ``seq`` greater than ``since``.
+
+        With ``wait`` > 0, block up to that many seconds for the first one.
+        """
+        with self._new_event:
+            self._new_event.wait_for(
+                lambda: self._events and self._events[-1]["seq"] > since, wait
+            )
+            return [e for e in self._events if e["seq"] > since]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "interval": self.interval,
+                "watches": len(self._watches),
+                "running": self._thread is not None,
+                **self._counters,
+            }
+
+    # --- sampling ----------------------------------------------------------
+    def _expire(self) -> None:
+        now = self._clock()
+        with self._lock:
+            expired = [
+                w
+                for w in self._watches.values()
+                if w.expires_at is not None and w.expires_at <= now
+            ]
+            for w in expired:
+                del self._watches[w.id]
+            self._counters["expired"] += len(expired)
+            if expired and not self._watches:
+                self._stop.set()
+        for w in expired:
+            _log.info("watch %s expired", w.id)
+
+    def sample_once(self) -> list[dict[str, Any]]:
+        """Drop expired watches, then read each watched target once."""
+        self._expire()
+        with self._lock:
+            by_target: dict[tuple[tuple[str, Any], ...], list[Watch]] = {}
+            for w in self._watches.values():
+                by_target.setdefault(w.sample_key, []).append(w)
+            self._counters["samples"] += 1
+        emitted = []
+        for watches in by_target.values():
+            res = ipmi._exec(
+                self.runner,
+                watches[0].target,
+                ["sdr", "list"],
+                action_class="read",
+                breaker_key=f"{watches[0].key}:watch",
+            )
+            with self._lock:
+                self._counters["reads"] += 1
+            if res["status"] != 200:
+                for w in watches:
+                    w.last_error = res.get("error")
+                continue
+            rows = views.sensor_rows(res["response"])
+            for w in watches:
+                with self._lock:
+                    try:
+                        events = w.evaluate(rows)
+                    except Exception as e:  # noqa: BLE001 — one bad watch must not stop the rest
+                        w.last_error = f"{type(e).__name__}: {e}"
+                        continue
+                    w.last_error = None
+                for event in events:
+                    emitted.append(self._record(w, event))
+        return emitted
+
+    def _record(self, watch: Watch, event: dict[str, Any]) -> dict[str, Any]:
+        with self._lock:
+            event = {"seq": next(self._seq), "time": self._clock(), **event}
+            self._events.append(event)
+            self._counters["events"] += 1
+            self._new_event.notify_all()
+        level = logging.WARNING if event["event"] == "tripped" else logging.INFO
+        _log.log(
+            level,
+            "watch %s %s: %s %s %s",
+            watch.id,
+            event["event"],
+            event["sensor"],
+            event["value"],
+            event["condition"],
+        )
+        if watch.notify is not None:
+            try:
+                watch.notify(event)
+            except Exception as e:  # noqa: BLE001 — a gone subscriber must not stop sampling
+                _log.info("watch %s dropped, notify failed: %s", watch.id, e)
+                self.remove(watch.id)
+        return event
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample_once()
+            except Exception as e:  # noqa: BLE001 — keep sampling
+                _log.error("watch sample failed: %s", e)
+        with self._lock:
+            self._thread = None
+            if self._watches:  # re-added while stopping
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._loop, name="fan-manager-watch", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self) -> None:
+        """Drop every watch and stop the sampler thread."""
+        with self._lock:
+            self._watches.clear()
+            self._stop.set()
+
+
+_sampler: WatchSampler | None = None
+_sampler_lock = threading.Lock()
+
+
+def sampler() -> WatchSampler:
+    """The process-wide sampler shared by every MCP session."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = WatchSampler()
+        return _sampler
+
+
+def reset() -> None:
+    """Stop and forget the shared sampler (tests and operator resets)."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is not None:
+            _sampler.stop()
+        _sampler = None
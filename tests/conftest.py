@@ -1,6 +1,6 @@
 """Shared pytest fixtures for fan-manager.
 
-Fan Manager shells out to ``ipmitool`` and ``sensors`` via ``subprocess.run``
+Fan Manager shells out to ``ipmitool`` and ``sensors`` via ``subprocess.Popen``
 (resolved through ``shutil.which``); tests must never touch real hardware, so we
 patch those call sites to return canned output by default.
 """
@@ -11,6 +11,21 @@
 
 import pytest
 
+from fan_manager import (
+    bmc_cache,
+    capabilities,
+    control_loop,
+    resilience,
+    scheduler,
+    sensor_delta,
+    state_page,
+    watches,
+)
+
+# Captured before ``mock_hardware`` patches it, for tests that spawn real
+# (non-hardware) child processes such as a fresh interpreter.
+_REAL_POPEN = subprocess.Popen
+
 # Reason for any skipped hardware-dependent tests
 reason = "Unit tests using mocks — no real BMC/sensors"
 
@@ -20,7 +35,7 @@ def mock_hardware():
     """Prevent any real IPMI/sensor calls during tests (CONCEPT:FAN-001/CONCEPT:FAN-002).
 
     ``fan_manager`` resolves the ``sensors``/``ipmitool`` binaries with
-    ``shutil.which`` and runs them with ``subprocess.run([...], shell=False)``.
+    ``shutil.which`` and runs them with ``subprocess.Popen([...], shell=False)``.
     We stub both so the temperature (CONCEPT:FAN-001) and fan-control
     (CONCEPT:FAN-002) routing can be exercised with no hardware present.
     """
@@ -37,18 +52,53 @@ def fake_which(name: str):
         # Pretend both required binaries exist at a stable, fake path.
         return f"/usr/bin/{name}"
 
-    def fake_run(cmd, *args, **kwargs):
-        argv = cmd if isinstance(cmd, (list, tuple)) else [cmd]
-        executable = str(argv[0])
-        stdout = fake_sensors if executable.endswith("sensors") else ""
-        return subprocess.CompletedProcess(
-            args=argv, returncode=0, stdout=stdout, stderr=""
-        )
+    class FakePopen:
+        def __init__(self, cmd, *args, **kwargs):
+            self.args = cmd if isinstance(cmd, (list, tuple)) else [cmd]
+            self.pid = 0
+            self.returncode = 0
+            executable = str(self.args[0])
+            self._stdout = fake_sensors if executable.endswith("sensors") else ""
+
+        def communicate(self, input=None, timeout=None):
+            return self._stdout, ""
+
+        def kill(self):
+            pass
 
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    resilience.reset_breakers()
+    bmc_cache.reset()
+    capabilities.reset()
+    control_loop.reset()
+    scheduler.reset_queues()
+    sensor_delta.reset()
+    watches.reset()
+    state_page.reset()
     with (
         patch("fan_manager.fan_manager.shutil.which", side_effect=fake_which) as which,
         patch(
-            "fan_manager.fan_manager.subprocess.run", side_effect=fake_run
-        ) as run,
+            "fan_manager.fan_manager.subprocess.Popen", side_effect=FakePopen
+        ) as popen,
     ):
-        yield {"which": which, "run": run}
+        yield {"which": which, "popen": popen}
+    resilience.reset_breakers()
+    bmc_cache.reset()
+    capabilities.reset()
+    control_loop.reset()
+    scheduler.reset_queues()
+    sensor_delta.reset()
+    watches.reset()
+    state_page.reset()
+
+
+@pytest.fixture
+def real_subprocess(mock_hardware):
+    """Let a test spawn real, non-hardware child processes (e.g. ``python -c``)."""
+    mock_hardware["popen"].side_effect = _REAL_POPEN
+    return mock_hardware
@@ -0,0 +1,219 @@
+"""Tests for the multi-action ``fan_manager_batch`` tool.
+
+The batch is called through its registered function with ``ctx=None``; a
+slow fake runner shows reads overlapping and mutations acting as barriers.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Literal
+
+import pytest
+from fastmcp import Context, FastMCP
+from fastmcp.server.middleware import Middleware
+from fastmcp.server.middleware.rate_limiting import RateLimitingMiddleware
+
+from fan_manager import capabilities
+from fan_manager import fan_manager as core
+from fan_manager.mcp import lazy
+from fan_manager.mcp.mcp_batch import _phases, register_batch_tools
+
+SENSORS_JSON = json.dumps({"coretemp-isa-0000": {"Core 0": {"temp1_input": 52.0}}})
+
+
+class _SlowRunner:
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay
+        self.log: list[str] = []
+        self._lock = threading.Lock()
+
+    def which(self, name: str):
+        return f"/usr/bin/{name}"
+
+    def run(self, argv, *, check=True, timeout=None):
+        time.sleep(self.delay)
+        with self._lock:
+            self.log.append(" ".join(argv[1:]))
+        if argv[0].endswith("sensors"):
+            return SENSORS_JSON
+        if "sdr" in argv:
+            return "Fan1 RPM | 3600 RPM | ok"
+        if "--fail" in " ".join(argv):
+            raise RuntimeError("boom")
+        return "ok"
+
+
+def _server(*domains: str, fast_start: bool = False) -> FastMCP:
+    mcp = FastMCP(name="test-batch")
+    for domain in domains:
+        register = lazy.lazy_registrar if fast_start else lazy.domain_registrar
+        register(domain)(mcp)
+    register_batch_tools(mcp)
+    return mcp
+
+
+async def _batch(mcp: FastMCP, entries, **extra):
+    tool = await mcp.get_tool("fan_manager_batch")
+    params = json.dumps({"entries": entries, **extra})
+    return await tool.fn(params_json=params, ctx=None)
+
+
+def test_reads_group_and_mutations_are_barriers():
+    entries = [
+        {"tool": "fan_manager_sensors", "action": "list"},
+        {"tool": "fan_manager_temperature", "action": "state"},
+        {"tool": "fan_manager_fan_control", "action": "set"},
+        {"tool": "fan_manager_sel", "action": "info"},
+        {"tool": "fan_manager_raw", "action": ""},
+        {"tool": "fan_manager_raw", "action": ""},
+    ]
+    assert _phases(entries) == [
+        (True, [0, 1]),
+        (False, [2]),
+        (True, [3]),
+        (False, [4]),
+        (False, [5]),
+    ]
+
+
+@pytest.mark.concept("FAN-001")
+@pytest.mark.concept("FAN-004")
+async def test_independent_reads_run_concurrently(monkeypatch):
+    runner = _SlowRunner(delay=0.2)
+    monkeypatch.setattr(core, "_DEFAULT_RUNNER", runner)
+    mcp = _server("temperature", "ipmi")
+    capabilities.probe(runner)  # as the server does at start, outside the timing
+    started = time.monotonic()
+    res = await _batch(
+        mcp,
+        [
+            {"tool": "fan_manager_temperature", "action": "get"},
+            {"tool": "fan_manager_sensors", "params": {"host": "10.0.0.8"}},
+            {"tool": "fan_manager_sensors", "params": {"host": "10.0.0.9"}},
+        ],
+    )
+    elapsed = time.monotonic() - started
+    assert res["status"] == 200 and res["failed"] == 0
+    assert [r["result"]["status"] for r in res["response"]] == [200, 200, 200]
+    assert res["response"][0]["result"]["response"] == 52.0
+    assert elapsed < 0.2 * 3 * 0.8  # overlapped, not three sequential reads
+
+
+@pytest.mark.concept("FAN-002")
+async def test_mutations_keep_order_and_stop_on_error(monkeypatch):
+    runner = _SlowRunner(delay=0.0)
+    monkeypatch.setattr(core, "_DEFAULT_RUNNER", runner)
+    mcp = _server("fan-control", "ipmi")
+    res = await _batch(
+        mcp,
+        [
+            {"tool": "fan_manager_sensors", "action": "list"},
+            {"tool": "fan_manager_raw", "params": {"data": "0x30 --fail"}},
+            {
+                "tool": "fan_manager_fan_control",
+                "action": "set",
+                "params": {"fan_level": 40},
+            },
+            {"tool": "fan_manager_sensors", "action": "list"},
+        ],
+        stop_on_error=True,
+    )
+    results = res["response"]
+    assert results[0]["result"]["status"] == 200
+    assert results[1]["result"]["status"] == 500
+    assert results[2]["skipped"] and results[3]["skipped"]
+    assert res["failed"] == 1
+    assert not any("0x02" in call for call in runner.log)  # fan write never ran
+
+
+async def test_entry_errors_are_reported_per_entry(monkeypatch):
+    monkeypatch.setattr(core, "_DEFAULT_RUNNER", _SlowRunner(delay=0.0))
+    mcp = _server("temperature", fast_start=True)
+    res = await _batch(
+        mcp,
+        [
+            {"tool": "fan_manager_temperature", "action": "get"},
+            {"tool": "fan_manager_temperature", "action": "melt"},
+            {"tool": "fan_manager_power", "action": "status"},  # domain disabled
+            {"tool": "fan_manager_batch"},
+        ],
+    )
+    results = [r["result"] for r in res["response"]]
+    assert results[0]["status"] == 200  # lazy stub resolved to the real tool
+    assert "Unknown action" in results[1]["error"]
+    assert "fan_manager_power" in results[2]["error"]
+    assert "nested" in results[3]["error"]
+    assert res["failed"] == 3
+
+    assert "error" in await _batch(mcp, [])
+    assert "error" in await _batch(mcp, [{"action": "get"}])
+
+
+async def test_control_loop_actions_are_rejected_and_auto_reports_the_write(
+    monkeypatch,
+):
+    class _NoFanWrites(_SlowRunner):
+        def run(self, argv, *, check=True, timeout=None):
+            if "0x02" in argv:
+                raise RuntimeError("fan write refused")
+            return super().run(argv, check=check, timeout=timeout)
+
+    monkeypatch.setattr(core, "_DEFAULT_RUNNER", _NoFanWrites(delay=0.0))
+    mcp = _server("fan-control")
+    res = await _batch(
+        mcp,
+        [
+            {"tool": "fan_manager_fan_control", "action": "start"},
+            {"tool": "fan_manager_fan_control", "action": "stop"},
+            {"tool": "fan_manager_fan_control", "action": "auto"},
+        ],
+    )
+    start, stop, auto = (r["result"] for r in res["response"])
+    assert "cannot run in a batch" in start["error"]
+    assert "cannot run in a batch" in stop["error"]
+    assert auto["status"] == 500 and "refused" in auto["error"]
+    assert auto["response"]["mode"] == "error"
+    assert res["failed"] == 3
+
+
+async def test_entries_pass_through_the_server_middleware(monkeypatch):
+    class _Count(Middleware):
+        def __init__(self):
+            self.calls: list[str] = []
+
+        async def on_call_tool(self, context, call_next):
+            self.calls.append(context.message.name)
+            return await call_next(context)
+
+    monkeypatch.setattr(core, "_DEFAULT_RUNNER", _SlowRunner(delay=0.0))
+    mcp = _server("temperature")
+    seen = _Count()
+    mcp.add_middleware(
+        RateLimitingMiddleware(max_requests_per_second=0.01, burst_capacity=2)
+    )
+    mcp.add_middleware(seen)
+    res = await _batch(mcp, [{"tool": "fan_manager_temperature", "action": "get"}] * 4)
+    results = [r["result"] for r in res["response"]]
+    assert [r.get("status") for r in results[:2]] == [200, 200]
+    assert all("Rate limit" in r["error"] for r in results[2:])
+    assert seen.calls == ["fan_manager_temperature"] * 2  # limited before reaching it
+
+
+async def test_entry_arguments_are_validated():
+    mcp = FastMCP(name="test-batch")
+
+    @mcp.tool
+    async def pick(
+        action: Literal["left", "right"] = "left",
+        params_json: str = "{}",
+        ctx: Context | None = None,
+    ) -> dict:
+        return {"status": 200, "response": action}
+
+    register_batch_tools(mcp)
+    res = await _batch(mcp, [{"tool": "pick", "action": "up"}, {"tool": "pick"}])
+    bad, good = (r["result"] for r in res["response"])
+    assert "validation error" in bad["error"] and good["response"] == "left"
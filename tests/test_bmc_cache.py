@@ -0,0 +1,106 @@
+"""Tests for the write-aware BMC read cache (CONCEPT:FAN-007).
+
+A counting fake runner shows which calls reached ``ipmitool``; the cache clock
+is patched to step past TTLs.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from fan_manager import bmc_cache, ipmi
+
+BMC = {"host": "10.0.0.113", "user": "root", "password": "s3cret"}
+
+
+class _Runner:
+    def __init__(self):
+        self.calls: list[tuple[str, ...]] = []
+        self.fail = False
+
+    def which(self, name: str):
+        return f"/usr/bin/{name}"
+
+    def run(self, argv, *, check=True, timeout=None):
+        args = tuple(argv[argv.index("-P") + 2 :] if "-P" in argv else argv[1:])
+        self.calls.append(args)
+        if self.fail:
+            raise RuntimeError("session setup failed")
+        return f"reply {len(self.calls)}"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(bmc_cache, "_clock", lambda: now[0])
+    return now
+
+
+def test_reads_are_served_from_the_cache_until_the_ttl(clock):
+    r = _Runner()
+    first = ipmi.mc("info", target=BMC, runner=r)
+    assert first["cached"] is False and first["response"] == "reply 1"
+    clock[0] += 60
+    hit = ipmi.mc("info", target=BMC, runner=r)
+    assert hit["cached"] is True and hit["age"] == 60.0
+    assert hit["response"] == "reply 1" and len(r.calls) == 1
+
+    forced = ipmi.mc("info", target=BMC, runner=r, refresh=True)
+    assert forced["cached"] is False and forced["response"] == "reply 2"
+    clock[0] += bmc_cache.TTLS["mc info"]
+    assert ipmi.mc("info", target=BMC, runner=r)["response"] == "reply 3"
+    assert ipmi.mc("info", runner=r)["response"] == "reply 4"  # in-band: own entry
+    assert bmc_cache.stats() == {
+        "entries": 2,
+        "hits": 1,
+        "misses": 3,
+        "refreshes": 1,
+        "invalidations": 0,
+    }
+
+
+def test_failures_are_not_cached_and_credentials_are_part_of_the_key(clock):
+    r = _Runner()
+    r.fail = True
+    assert ipmi.lan("print", target=BMC, runner=r)["status"] != 200
+    r.fail = False
+    assert ipmi.lan("print", target=BMC, runner=r)["cached"] is False
+    wrong = {**BMC, "password": "guess"}
+    assert ipmi.lan("print", target=wrong, runner=r)["cached"] is False
+    assert ipmi.chassis("poh", target=BMC, runner=r)["cached"] is False
+    assert ipmi.chassis("poh", target=BMC, runner=r)["cached"] is True
+
+
+def test_writes_invalidate_exactly_the_affected_entries(clock):
+    r = _Runner()
+    for channel in ("1", "2"):
+        ipmi.lan("print", target=BMC, channel=channel, runner=r)
+        ipmi.user("list", target=BMC, channel=channel, runner=r)
+    ipmi.mc("info", target=BMC, runner=r)
+    ipmi.sol("info", target=BMC, runner=r)
+    other = {**BMC, "host": "10.0.0.114"}
+    ipmi.mc("info", target=other, runner=r)
+
+    ipmi.lan("set", target=BMC, param="access", value="on", channel="2", runner=r)
+    assert ipmi.lan("print", target=BMC, channel="1", runner=r)["cached"] is True
+    assert ipmi.lan("print", target=BMC, channel="2", runner=r)["cached"] is False
+
+    ipmi.user("disable", target=BMC, user_id="3", runner=r)
+    assert ipmi.user("list", target=BMC, channel="1", runner=r)["cached"] is False
+    assert ipmi.user("list", target=BMC, channel="2", runner=r)["cached"] is False
+    assert ipmi.mc("info", target=BMC, runner=r)["cached"] is True
+
+    r.fail = True  # a reset that times out may still have happened
+    ipmi.mc("reset_warm", target=BMC, runner=r)
+    r.fail = False
+    assert r.calls[-1] == ("mc", "reset", "warm")
+    assert ipmi.sol("info", target=BMC, runner=r)["cached"] is False
+    assert ipmi.mc("info", target=other, runner=r)["cached"] is True
+
+
+def test_env_override_disables_the_cache(clock, monkeypatch):
+    monkeypatch.setenv(bmc_cache.ENV_TTL, "0")
+    r = _Runner()
+    ipmi.user("list", runner=r)
+    assert ipmi.user("list", runner=r)["cached"] is False and len(r.calls) == 2
+    assert bmc_cache.stats()["entries"] == 0
@@ -0,0 +1,100 @@
+"""Tests for the one-time ipmitool/sensors capability probe and cached lookups."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from fan_manager import capabilities, ipmi
+from fan_manager.fan_manager import get_temp
+from fan_manager.services import FanControlService
+
+
+class _ProbeRunner:
+    """Counts ``which`` calls and answers the probe commands."""
+
+    def __init__(self, version: str = "1.8.18"):
+        self.version = version
+        self.which_calls: list[str] = []
+        self.argvs: list[list[str]] = []
+
+    def which(self, name: str):
+        self.which_calls.append(name)
+        return name if name.startswith("/") else f"/usr/bin/{name}"
+
+    def run(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> str:
+        self.argvs.append(argv)
+        if argv[1:] == ["-V"]:
+            return f"ipmitool version {self.version}\n"
+        return "ok"
+
+
+def test_probe_records_the_version_and_runs_nothing_else():
+    runner = _ProbeRunner(version="1.8.19")
+    profile = capabilities.probe(runner)
+    assert profile.ipmitool_version == "1.8.19"
+    assert runner.argvs == [["/usr/bin/ipmitool", "-V"]]  # no 'sensors -j' fork
+    assert set(profile.as_dict()) == {"paths", "ipmitool_version", "probed"}
+
+
+def test_probe_honors_configured_paths():
+    runner = _ProbeRunner()
+    profile = capabilities.probe(
+        runner, {"ipmitool": "/opt/ipmi/bin/ipmitool", "sensors": "sensors"}
+    )
+    assert profile.paths["ipmitool"] == "/opt/ipmi/bin/ipmitool"
+    ipmi.power("status", runner=runner)
+    assert runner.argvs[-1][0] == "/opt/ipmi/bin/ipmitool"
+
+
+def test_probe_runs_once_per_runner():
+    runner = _ProbeRunner()
+    capabilities.probe(runner)
+    spawned = len(runner.argvs)
+    capabilities.probe(runner)
+    assert len(runner.argvs) == spawned
+    capabilities.probe(runner, refresh=True)
+    assert len(runner.argvs) > spawned
+
+
+@pytest.mark.concept("FAN-001")
+def test_hot_path_uses_cached_profile():
+    class _Sensors(_ProbeRunner):
+        def run(self, argv, *, check=True, timeout=None):
+            if argv[0].endswith("sensors"):
+                self.argvs.append(argv)
+                return json.dumps(
+                    {"coretemp-isa-0000": {"Core 0": {"temp1_input": 51.0}}}
+                )
+            return super().run(argv, check=check, timeout=timeout)
+
+    runner = _Sensors()
+    for _ in range(3):
+        assert get_temp(runner=runner)["response"] == 51.0
+        ipmi.sensors("list", runner=runner)
+    assert runner.which_calls.count("sensors") == 1
+    assert runner.which_calls.count("ipmitool") == 1
+
+
+def test_missing_binary_is_resolved_again():
+    class _LateInstall(_ProbeRunner):
+        installed = False
+
+        def which(self, name: str):
+            self.which_calls.append(name)
+            return f"/usr/bin/{name}" if self.installed else None
+
+    runner = _LateInstall()
+    assert ipmi.power("status", runner=runner)["status"] == 500
+    runner.installed = True
+    assert ipmi.power("status", runner=runner)["status"] == 200
+
+
+def test_service_probe_and_stats_expose_profile():
+    runner = _ProbeRunner()
+    svc = FanControlService(runner=runner, config={"sensors": "/opt/sensors"})
+    assert svc.probe().paths["sensors"] == "/opt/sensors"
+    assert ipmi.stats(runner)["capabilities"]["ipmitool_version"] == "1.8.18"
@@ -0,0 +1,127 @@
+"""Tests for the MCP server's managed control loop (CONCEPT:FAN-002).
+
+The loop runs ``run_service`` against the conftest hardware mocks (or a
+recording runner); ``stop`` interrupts its wait, so each test takes
+milliseconds despite the poll interval.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+
+import pytest
+from fastmcp import FastMCP
+
+from fan_manager import control_loop
+from fan_manager.mcp import register_fan_control_tools
+
+
+class _Runner:
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def which(self, name: str):
+        return f"/usr/bin/{name}"
+
+    def run(self, argv, *, check=True, timeout=None):
+        self.calls.append(list(argv))
+        if argv[0].endswith("sensors"):
+            return json.dumps({"coretemp-isa-0000": {"Core 0": {"temp1_input": 65.0}}})
+        return ""
+
+
+async def _until(predicate, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+async def test_loop_ticks_until_stopped():
+    runner = _Runner()
+    loop = control_loop.ControlLoop(runner=runner)
+    status = loop.start(temperature_poll_rate=300, temperature_power=1)
+    assert status["running"] and status["params"]["temperature_poll_rate"] == 300
+    await _until(lambda: loop.ticks == 1)
+    assert loop.status()["last_tick"]["level"] == 52  # 65 °C, halfway up a 50-80 line
+    with pytest.raises(RuntimeError, match="already running"):
+        loop.start()
+
+    assert await loop.stop() is True  # wakes the 300 s wait
+    assert loop.status()["running"] is False and loop.ticks == 1
+    assert await loop.stop() is False
+    writes = [c for c in runner.calls if c[0].endswith("ipmitool")]
+    assert writes[-1][-1] == "0x34"  # 52 %
+
+
+async def test_loop_reports_the_error_that_ended_it():
+    loop = control_loop.ControlLoop(runner=_Runner())
+    loop.start(no_such_option=True)
+    await _until(lambda: not loop.running)
+    assert loop.status()["error"].startswith("TypeError")
+
+
+async def test_cancelling_the_task_stops_the_loop():
+    loop = control_loop.ControlLoop(runner=_Runner())
+    loop.start(temperature_poll_rate=300)
+    await _until(lambda: loop.ticks == 1)
+    loop._task.cancel()
+    await _until(lambda: not loop.running)
+    assert loop._stop.is_set()
+
+
+async def test_cancelled_loop_runs_until_the_tick_in_progress_returns():
+    class _Slow(_Runner):
+        def __init__(self):
+            super().__init__()
+            self.writing, self.release = threading.Event(), threading.Event()
+
+        def run(self, argv, *, check=True, timeout=None):
+            if argv[0].endswith("ipmitool"):
+                self.writing.set()
+                self.release.wait(5)
+            return super().run(argv, check=check, timeout=timeout)
+
+    runner = _Slow()
+    loop = control_loop.ControlLoop(runner=runner)
+    loop.start(temperature_poll_rate=300)
+    await asyncio.to_thread(runner.writing.wait, 5)
+    loop._task.cancel()
+    await asyncio.sleep(0.05)
+    assert loop.running  # the worker is still writing to the BMC
+    with pytest.raises(RuntimeError, match="already running"):
+        loop.start()
+    runner.release.set()
+    await _until(lambda: not loop.running)
+
+
+@pytest.mark.concept("FAN-002")
+async def test_fan_control_tool_starts_and_stops_the_shared_loop():
+    mcp = FastMCP(name="test-fan-manager")
+    register_fan_control_tools(mcp)
+    fn = (await mcp.get_tool("fan_manager_fan_control")).fn
+
+    bad = await fn(action="start", params_json='{"temperature_poll_rate": 0}', ctx=None)
+    assert bad["status"] == 400 and "temperature_poll_rate" in bad["error"]
+
+    started = await fn(
+        action="start", params_json='{"maximum_temperature": 70}', ctx=None
+    )
+    assert started["status"] == 200 and started["response"]["running"]
+    assert started["response"]["params"]["temperature_poll_rate"] == 24
+    again = await fn(action="start", params_json="{}", ctx=None)
+    assert again["status"] == 409
+    for action, params in (("set", '{"fan_level": 30}'), ("auto", "{}")):
+        refused = await fn(action=action, params_json=params, ctx=None)
+        assert refused["status"] == 409 and "stop it" in refused["error"]
+
+    loop = control_loop.controller()
+    await _until(lambda: loop.ticks >= 1)
+    status = await fn(action="status", params_json="{}", ctx=None)
+    assert status["response"]["last_tick"]["temperature"] == 60.0
+
+    stopped = await fn(action="stop", params_json="{}", ctx=None)
+    assert stopped["status"] == 200 and not stopped["response"]["running"]
+    assert (await fn(action="stop", params_json="{}", ctx=None))["status"] == 409
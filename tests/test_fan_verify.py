@@ -0,0 +1,176 @@
+"""Tests for fan RPM readback and verify-before-rewrite (CONCEPT:FAN-002).
+
+The simulated host answers ``sdr type fan``/``sensor reading`` from its fan
+model, so verification runs against the real ``set_fan`` write path.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from fan_manager import resilience, simulator
+from fan_manager.fan_manager import auto_set_fan_speed
+from fan_manager.fan_verify import FanMap, FanVerifier
+
+
+class _Logged(simulator.SimulatedHost):
+    """Simulated host that records every ipmitool subcommand."""
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.calls: list[str] = []
+        self.broken_reading = False
+        self.broken_write = False
+
+    def run(self, argv, *, check=True, timeout=None):
+        self.calls.append(" ".join(argv[1:]))
+        if self.broken_reading and "reading" in argv:
+            raise RuntimeError("Invalid command")
+        if self.broken_write and "raw" in argv:
+            raise RuntimeError("Insufficient privilege level")
+        return super().run(argv, check=check, timeout=timeout)
+
+
+def _host() -> _Logged:
+    return _Logged(workload=simulator.Workload.constant(160.0), seed=1)
+
+
+def test_fan_map_learns_and_interpolates():
+    m = FanMap()
+    assert m.expected(40) is None
+    m.observe(20, 4000.0)
+    assert m.expected(40) is None  # one point is not a line
+    m.observe(60, 9000.0)
+    assert m.expected(40) == pytest.approx(6500.0)
+    assert m.expected(80) == pytest.approx(11500.0)
+    assert m.expected(0) == pytest.approx(1500.0)
+    m.observe(20, 5000.0)
+    assert m.points[20] == pytest.approx(4300.0)  # EMA, not overwrite
+    m.observe(20, 5000.0, replace=True)
+    assert m.points[20] == 5000.0
+
+
+@pytest.mark.concept("FAN-002")
+def test_unchanged_level_is_verified_with_a_targeted_read():
+    host, v = _host(), FanVerifier()
+    assert v.apply(40, runner=host)["command"].startswith("/usr/bin/ipmitool raw")
+    host.advance(24)
+    first = v.apply(40, runner=host)  # discovers fans via sdr type fan
+    host.advance(24)
+    second = v.apply(40, runner=host)  # targeted read
+    assert first["command"] == second["command"] == "verify fan rpm"
+    assert host.fan_writes == 1
+    assert host.calls[-1].startswith("sensor reading Fan1 RPM Fan2 RPM")
+    assert sum("sdr type fan" in c for c in host.calls) == 1
+    assert second["response"]["rpm"] == pytest.approx(
+        second["response"]["expected"], rel=0.15
+    )
+
+
+@pytest.mark.concept("FAN-002")
+def test_bmc_revert_to_auto_is_reasserted():
+    host, v = _host(), FanVerifier()
+    for _ in range(3):
+        v.apply(5, runner=host)
+        host.advance(24)
+    host.manual = False  # the BMC silently takes the fans back
+    host.advance(24)
+    res = v.apply(5, runner=host)
+    assert res["status"] == 200 and v.stats()["reasserted"] == 1
+    assert host.manual and host.fan_writes == 2
+    host.advance(24)
+    assert v.apply(5, runner=host)["command"] == "verify fan rpm"
+
+
+def test_persistent_mismatch_relearns_and_failed_read_falls_back():
+    host, v = _host(), FanVerifier()
+    v.apply(50, runner=host)
+    host.advance(24)
+    v.apply(50, runner=host)
+    v.map.points[50] *= 2  # stale mapping, e.g. fans were replaced
+    for _ in range(v.relearn_after):
+        v.apply(50, runner=host)  # reassert...
+        host.advance(24)
+    assert v.stats()["relearned"] == 0
+    v.apply(50, runner=host)  # ...still off the same way: relearn
+    stats = v.stats()
+    assert stats["reasserted"] == v.relearn_after and stats["relearned"] == 1
+    assert host.fan_writes == 1 + v.relearn_after
+    host.advance(24)
+    assert v.apply(50, runner=host)["command"] == "verify fan rpm"
+    assert v.stats()["reasserted"] == v.relearn_after
+
+    host.broken_reading = True
+    host.advance(24)
+    assert v.apply(50, runner=host)["command"] == "verify fan rpm"
+    assert v.stats()["fallback_reads"] == 1
+
+
+def test_failed_reassert_is_not_evidence_for_relearning():
+    host, v = _host(), FanVerifier(relearn_after=2)
+    v.apply(50, runner=host)
+    host.advance(24)
+    v.apply(50, runner=host)
+    v.map.points[50] *= 2
+    stale = v.map.points[50]
+    host.broken_write = True  # every reassert fails, so the fans never move
+    for _ in range(4):
+        assert v.apply(50, runner=host)["status"] != 200
+        host.advance(24)
+    stats = v.stats()
+    assert stats["relearned"] == 0 and stats["reasserted"] == 4
+    assert v.map.points[50] == stale
+
+    host.broken_write = False
+    resilience.reset_breakers()  # the failed writes opened the fan circuit
+    for _ in range(2):
+        v.apply(50, runner=host)
+        host.advance(24)
+    assert v.stats()["relearned"] == 0  # the run restarts after a good write
+    v.apply(50, runner=host)
+    assert v.stats()["relearned"] == 1
+
+
+@pytest.mark.concept("FAN-002")
+def test_verified_daemon_writes_less_for_the_same_control():
+    workload = simulator.Workload.step(600, 40.0, 220.0)
+    reports = simulator.compare(
+        {"blind": {}, "verified": {"verify": True}}, workload, duration=1200
+    )
+    blind, verified = reports["blind"], reports["verified"]
+    assert verified.fan_writes < blind.fan_writes * 0.75
+    assert verified.duty_integral == pytest.approx(blind.duty_integral, rel=0.02)
+    assert verified.peak_temperature == pytest.approx(blind.peak_temperature, abs=1)
+
+
+def test_auto_set_fan_speed_routes_through_the_verifier():
+    host, v = _host(), FanVerifier()
+    auto_set_fan_speed(runner=host, verifier=v)
+    auto_set_fan_speed(runner=host, verifier=v)
+    assert v.stats()["writes"] == 1 and v.stats()["verified"] == 1
+
+
+@pytest.mark.concept("FAN-002")
+def test_failsafe_write_is_not_mistaken_for_the_verified_level():
+    host = _Logged(workload=simulator.Workload.constant(40.0), seed=1)
+    v = FanVerifier()
+    sensors_down = [False]
+    run = host.run
+
+    def flaky(argv, *, check=True, timeout=None):
+        if sensors_down[0] and argv[0].endswith("sensors"):
+            raise RuntimeError("sensors crashed")
+        return run(argv, check=check, timeout=timeout)
+
+    host.run = flaky
+    assert auto_set_fan_speed(runner=host, verifier=v)["level"] == 5
+    host.advance(24)
+    sensors_down[0] = True
+    assert auto_set_fan_speed(runner=host, verifier=v)["mode"] == "failsafe"
+    sensors_down[0] = False
+    modes = []
+    for _ in range(5):
+        host.advance(24)
+        modes.append(auto_set_fan_speed(runner=host, verifier=v)["mode"])
+    assert modes[0] == "curve" and host.mean_duty() == 5.0
+    assert v.map.points[5] < 5000  # learned after the level was rewritten
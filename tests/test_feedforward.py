@@ -0,0 +1,102 @@
+"""Tests for load-aware feedforward (CONCEPT:FAN-002).
+
+File reads go through a dict-backed ``read`` or the simulated host's
+``read_text``, whose ``/proc/stat`` and cpufreq follow the socket power.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from fan_manager import simulator
+from fan_manager.feedforward import (
+    Feedforward,
+    LoadSampler,
+    fit_step,
+    measure_plant,
+    parse_proc_stat,
+)
+
+FREQ = "/sys/devices/system/cpu/{}/cpufreq/{}"
+
+
+class _Files(dict):
+    def __call__(self, path: str) -> str:
+        try:
+            return self[path]
+        except KeyError:
+            raise FileNotFoundError(path) from None
+
+
+def _stat(*cpus: tuple[int, int]) -> str:
+    lines = ["cpu  0 0 0 0 0 0 0 0"]
+    lines += [f"cpu{i} {b} 0 0 {i_} 5 0 0 0" for i, (b, i_) in enumerate(cpus)]
+    return "\n".join(lines)
+
+
+def test_parse_proc_stat_counts_iowait_as_idle():
+    times = parse_proc_stat("cpu0 10 2 3 80 5 0 0 0\nintr 1 2\n")
+    assert times == {"cpu0": (15, 100)}
+
+
+def test_load_is_utilization_scaled_by_clock():
+    files = _Files({FREQ.format("cpu0", "cpuinfo_max_freq"): "4000000"})
+    files[FREQ.format("cpu0", "scaling_cur_freq")] = "2000000"
+    sampler = LoadSampler(files)
+    files["/proc/stat"] = _stat((0, 0), (0, 0))
+    assert sampler.sample() is None  # no delta yet
+    files["/proc/stat"] = _stat((100, 0), (25, 75))
+    # cpu0: 100% busy at half clock; cpu1: 25% busy, no cpufreq -> ratio 1.
+    assert sampler.sample() == pytest.approx((0.5 + 0.25) / 2)
+
+
+def test_predicted_rise_jumps_with_load_and_decays():
+    files = _Files({"/proc/stat": _stat((0, 0))})
+    ff = Feedforward(gain=40.0, time_constant=20.0, interval=2.0, read=files)
+    ff.update(0.0)
+    files["/proc/stat"] = _stat((20, 180))  # 10% busy
+    assert ff.update(2.0) == 0.0  # first load sample seeds the lag
+
+    busy, idle, sleeps = 20, 180, []
+
+    def sleep(seconds):
+        nonlocal busy, idle
+        sleeps.append(seconds)
+        busy, idle = busy + 180, idle + 20  # 90% busy from now on
+        files["/proc/stat"] = _stat((busy, idle))
+
+    ff.wait(24.0, sleep)
+    assert sleeps == [2.0] and ff.early_ticks == 1  # woke on the jump
+    first = ff.predicted_rise
+    assert first == pytest.approx(40.0 * 0.8 * (1 - 0.0952), rel=0.01)
+    ff.wait(24.0, sleep)
+    assert len(sleeps) == 13 and ff.predicted_rise < first * 0.5
+
+
+@pytest.mark.concept("FAN-001")
+def test_step_test_recovers_the_simulated_plant():
+    host = simulator.SimulatedHost(workload=simulator.Workload.step(300, 40.0, 220.0))
+    plant = measure_plant(40, 900, runner=host, read=host.read_text, sleep=host.sleep)
+    assert plant.load_step == pytest.approx(0.733, abs=0.01)
+    assert plant.gain == pytest.approx(32.0, rel=0.15)
+    assert plant.time_constant == pytest.approx(18.0, abs=6.0)
+    with pytest.raises(ValueError, match="load did not change"):
+        fit_step([(float(t), 0.5, 60.0) for t in range(10)])
+
+
+@pytest.mark.concept("FAN-002")
+def test_feedforward_cuts_overshoot_on_a_load_jump():
+    workload = simulator.Workload.step(600, 40.0, 300.0)
+    reports = simulator.compare(
+        {
+            "curve": {"temperature_power": 1},
+            "feedforward": {"temperature_power": 1, "feedforward": 32.0},
+        },
+        workload,
+        duration=1200,
+    )
+    curve, ff = reports["curve"], reports["feedforward"]
+    assert ff.overshoot < curve.overshoot - 2.0
+    assert ff.peak_temperature < curve.peak_temperature - 2.0
+    assert ff.final_temperature == pytest.approx(curve.final_temperature, abs=0.5)
+    assert ff.duty_integral == pytest.approx(curve.duty_integral, rel=0.05)
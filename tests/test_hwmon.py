@@ -0,0 +1,301 @@
+"""Tests for the high-rate hwmon sampler and threshold alarms (CONCEPT:FAN-001).
+
+Files come from a dict-backed ``read``/``write``/``listdir`` or the simulated
+host's hwmon tree (coretemp plus a Super-I/O chip with writable thresholds).
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from fan_manager import simulator
+from fan_manager.fan_manager import auto_set_fan_speed
+from fan_manager.hwmon import HwmonAlarms, HwmonSampler, SysfsAlarmPoller
+
+ROOT = "/sys/class/hwmon"
+
+
+class _Tree(dict):
+    def read(self, path: str) -> str:
+        try:
+            return self[path]
+        except KeyError:
+            raise FileNotFoundError(path) from None
+
+    def write(self, path: str, value: str) -> None:
+        if path not in self:
+            raise PermissionError(path)
+        self[path] = value
+
+    def listdir(self, path: str) -> list[str]:
+        prefix = path + "/"
+        names = {k[len(prefix) :].split("/")[0] for k in self if k.startswith(prefix)}
+        if not names:
+            raise FileNotFoundError(path)
+        return sorted(names)
+
+    def set(self, *temps: float) -> None:
+        for i, t in enumerate(temps):
+            self[f"{ROOT}/hwmon1/temp{i + 1}_input"] = str(int(t * 1000))
+
+
+def _tree() -> _Tree:
+    tree = _Tree(
+        {
+            f"{ROOT}/hwmon0/name": "nvme\n",
+            f"{ROOT}/hwmon0/temp1_input": "99000\n",
+            f"{ROOT}/hwmon1/name": "coretemp\n",
+            f"{ROOT}/hwmon1/temp1_label": "Package id 0\n",
+        }
+    )
+    tree.set(50.0, 48.0)
+    return tree
+
+
+def _sampler(tree: _Tree, **kwargs) -> HwmonSampler:
+    return HwmonSampler(read=tree.read, listdir=tree.listdir, **kwargs)
+
+
+def test_discovers_cpu_inputs_only():
+    tree = _tree()
+    sampler = _sampler(tree)
+    assert [zone for zone, _ in sampler.discover()] == ["coretemp.0", "coretemp.0"]
+    assert sampler.sample() == 50.0  # the 99 °C NVMe drive is not a CPU
+
+
+def test_window_holds_the_peak_and_tracks_ema_and_slope():
+    tree = _tree()
+    sampler = _sampler(tree, size=8, time_constant=4.0, lookahead=5.0)
+    sampler.sample()
+    for t in (52, 54, 70, 58, 60):  # a one-sample spike inside a ramp
+        tree.set(t, 40.0)
+        sampler.sample(1.0)
+    window = sampler.take()
+    assert window.max == 70.0 and window.last == 60.0 and window.samples == 6
+    assert window.zones == {"coretemp.0": 70.0}
+    assert 50.0 < window.ema < 60.0
+    assert window.slope > 0
+    assert window.control == 70.0
+
+    tree.set(60.0, 40.0)
+    sampler.sample(1.0)
+    assert sampler.take().max == 60.0  # a new window after each take
+    for _ in range(20):
+        sampler.sample(1.0)
+    assert len(sampler.ring) == 8
+
+
+def test_sleep_is_cut_into_sampled_steps():
+    tree, slept = _tree(), []
+    sampler = _sampler(tree, interval=1.0)
+    sampler.sleep(slept.append)(2.5)
+    assert slept == [1.0, 1.0, 0.5] and len(sampler.ring) == 3
+    assert sampler.now == 2.5
+
+
+class _Counting(simulator.SimulatedHost):
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self.sensors_calls = 0
+
+    def run(self, argv, *, check=True, timeout=None):
+        self.sensors_calls += argv[0].endswith("sensors")
+        return super().run(argv, check=check, timeout=timeout)
+
+
+@pytest.mark.concept("FAN-001")
+def test_tick_uses_the_window_instead_of_forking_sensors():
+    host = _Counting()
+    sampler = HwmonSampler(read=host.read_text, listdir=host.list_dir)
+    sampler.sample()
+    tick = auto_set_fan_speed(runner=host, sampler=sampler)
+    assert host.sensors_calls == 0
+    assert tick["window"]["samples"] == 1
+    assert set(tick["zones"]) == {"coretemp.0", "coretemp.1"}
+
+
+@pytest.mark.concept("FAN-002")
+def test_spike_between_polls_is_caught_without_extra_writes():
+    workload = simulator.Workload(((0.0, 40.0), (290.0, 300.0), (300.0, 40.0)))
+    curve = {
+        "temperature_power": 1,
+        "minimum_temperature": 30,
+        "maximum_temperature": 60,
+    }
+    duty, writes, forks = {}, {}, {}
+    for name, extra in (("poll", {}), ("sampled", {"sample_rate": 1.0})):
+        host = _Counting(workload=workload)
+        simulator.run_closed_loop(host, 600, **curve, **extra)
+        duty[name] = max(d for t, _, d in host.history if 280 < t < 340)
+        writes[name], forks[name] = host.fan_writes, host.sensors_calls
+    assert duty["sampled"] > duty["poll"] + 10
+    assert writes["sampled"] == writes["poll"]
+    assert forks["sampled"] == 0 < forks["poll"]
+
+
+def _alarm_tree() -> _Tree:
+    tree = _tree()
+    board = f"{ROOT}/hwmon2"
+    tree.update(
+        {
+            f"{board}/name": "nct6779\n",
+            f"{board}/temp1_label": "SYSTIN\n",  # not a CPU input
+            f"{board}/temp1_input": "30000\n",
+            f"{board}/temp1_max": "80000\n",
+            f"{board}/temp1_max_alarm": "0\n",
+            f"{board}/temp2_label": "PECI Agent 0\n",
+            f"{board}/temp2_input": "55000\n",
+            f"{board}/temp2_max": "80000\n",
+            f"{board}/temp2_min": "0\n",
+            f"{board}/temp2_max_alarm": "0\n",
+            f"{board}/temp2_min_alarm": "0\n",
+        }
+    )
+    return tree
+
+
+def test_alarms_arm_writable_cpu_thresholds_around_the_reading():
+    tree, waits = _alarm_tree(), []
+
+    def waiter(paths, timeout):
+        waits.append((paths, timeout))
+        return paths[:1] if len(waits) == 1 else []
+
+    alarms = HwmonAlarms(
+        band=2.5, read=tree.read, write=tree.write, listdir=tree.listdir, waiter=waiter
+    )
+    assert [t.max for t in alarms.discover()] == [f"{ROOT}/hwmon2/temp2_max"]
+    assert alarms.arm(50.0)  # the input's own reading wins over the tick's
+    assert tree[f"{ROOT}/hwmon2/temp2_max"] == "57500"
+    assert tree[f"{ROOT}/hwmon2/temp2_min"] == "52500"
+    assert alarms.wait(300.0) is True and alarms.wait(300.0) is False
+    assert waits[0] == (
+        [f"{ROOT}/hwmon2/temp2_max_alarm", f"{ROOT}/hwmon2/temp2_min_alarm"],
+        300.0,
+    )
+    assert alarms.stats() | {"band": None} == {
+        "inputs": 1,
+        "armed": 1,
+        "armed_at": 55.0,
+        "band": None,
+        "saved": 2,
+        "wakeups": 1,
+        "excursions": 0,
+        "timeouts": 1,
+        "errors": 0,
+    }
+
+    del tree[f"{ROOT}/hwmon2/temp2_max"]  # the driver rejects the write
+    assert alarms.arm(50.0) is False and alarms.stats()["errors"] == 1
+    assert alarms.armed_at is None
+    assert alarms.wait(1.0) is False  # nothing armed: fall back to the timer
+
+    tree[f"{ROOT}/hwmon2/temp2_max"] = "57500"  # writable again: re-armed
+    assert alarms.arm(60.0) and alarms.stats()["armed"] == 1
+    assert alarms.restore() == 2 and alarms.stats()["saved"] == 0
+    assert tree[f"{ROOT}/hwmon2/temp2_max"] == "80000"  # firmware values back
+    assert tree[f"{ROOT}/hwmon2/temp2_min"] == "0"
+
+
+def test_alarm_mode_restores_the_firmware_thresholds_on_exit():
+    host = simulator.SimulatedHost()
+    simulator.run_closed_loop(host, 600, alarm_timeout=300.0)
+    assert host.thresholds == {"max": 80.0, "min": 0.0}
+
+
+def test_poller_times_out_without_a_notification(tmp_path):
+    path = tmp_path / "temp1_max_alarm"
+    path.write_text("0\n")
+    poller = SysfsAlarmPoller()
+    try:
+        assert poller([str(path)], 0.01) == []
+    finally:
+        poller.close()
+
+
+@pytest.mark.concept("FAN-002")
+def test_alarm_mode_ticks_rarely_at_steady_state_and_fast_on_a_jump():
+    ticks, peaks = {}, {}
+    for name, extra in (("poll", {}), ("alarm", {"alarm_timeout": 300.0})):
+        for load, workload in (
+            ("steady", simulator.Workload.constant(120.0)),
+            ("step", simulator.Workload.step(600, 40.0, 300.0)),
+        ):
+            host, count = simulator.SimulatedHost(workload=workload), []
+            simulator.run_closed_loop(
+                host,
+                1800,
+                temperature_power=1,
+                sample_rate=5.0,
+                on_tick=count.append,
+                **extra,
+            )
+            ticks[name, load] = len(count)
+            peaks[name, load] = max(t for _, t, _ in host.history)
+    assert ticks["alarm", "steady"] * 3 < ticks["poll", "steady"]
+    assert peaks["alarm", "step"] <= peaks["poll", "step"]
+
+
+def test_alarm_waits_keep_sampling_the_window():
+    windows = []
+    host = simulator.SimulatedHost(workload=simulator.Workload.constant(120.0))
+    simulator.run_closed_loop(
+        host,
+        900,
+        alarm_timeout=300.0,
+        sample_rate=5.0,
+        on_tick=lambda tick: windows.append(tick.get("window")),
+    )
+    assert all(w is not None for w in windows)
+    assert max(w["samples"] for w in windows) > 1
+
+
+class _Silent(simulator.SimulatedHost):
+    """A driver that never notifies its ``*_alarm`` attributes."""
+
+    def wait_alarm(self, paths, timeout):
+        self.sleep(timeout)
+        return []
+
+
+def test_alarm_wait_ends_when_the_temperature_leaves_the_band():
+    tree, waits = _alarm_tree(), []
+    sampler = _sampler(tree, interval=5.0)
+    sampler.sample()
+    alarms = HwmonAlarms(
+        read=tree.read,
+        write=tree.write,
+        listdir=tree.listdir,
+        waiter=lambda paths, timeout: waits.append(timeout) or [],
+    )
+    assert alarms.arm(55.0)
+    tree.set(50.0, 48.0)  # inside the band: no early wake
+    assert alarms.wait(15.0, sampler) is False and waits == [5.0] * 3
+    waits.clear()
+    temps = iter([51.0, 52.0, 60.0, 70.0])
+    sampler.sample = lambda elapsed=0.0, read=sampler.sample: (
+        tree.set(next(temps)) or read(elapsed)
+    )
+    assert alarms.wait(300.0, sampler) is True and waits == [5.0] * 3
+    assert alarms.stats()["excursions"] == 1
+
+
+@pytest.mark.concept("FAN-002")
+def test_alarm_mode_reacts_to_a_rise_the_driver_never_signals():
+    ticks = []
+    host = _Silent(workload=simulator.Workload.step(600, 40.0, 300.0))
+    simulator.run_closed_loop(
+        host,
+        1200,
+        alarm_timeout=300.0,
+        sample_rate=2.0,
+        on_tick=lambda tick: ticks.append(host.now),
+    )
+    assert min(t for t in ticks if t > 600) < 640
+
+    ticks.clear()
+    host = _Silent(workload=simulator.Workload.constant(120.0))
+    simulator.run_closed_loop(
+        host, 600, alarm_timeout=300.0, on_tick=lambda tick: ticks.append(host.now)
+    )
+    assert max(b - a for a, b in zip(ticks, ticks[1:], strict=False)) <= 24 + 1e-6
@@ -1,6 +1,8 @@
 """Verify package initialization and version metadata."""
 
 import importlib
+import subprocess
+import sys
 
 import pytest
 
@@ -58,3 +60,28 @@ def test_availability_flags(attr):
     """Optional-dependency flags gating the CONCEPT:FAN-* tool surface are booleans."""
     mod = importlib.import_module(PKG)
     assert isinstance(getattr(mod, attr), bool)
+
+
+@pytest.mark.concept("FAN-002")
+@pytest.mark.parametrize("module", ["fan_manager", "fan_manager.fan_manager"])
+def test_light_imports_stay_light(real_subprocess, module):
+    """The package and the CONCEPT:FAN-002 daemon never import heavy stacks eagerly."""
+    heavy = ("pydantic", "fastmcp", "agent_utilities")
+    probe = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {heavy!r} if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert out == "", f"importing {module} pulled in: {out}"
+
+
+@pytest.mark.concept("FAN-001")
+def test_lazy_exports_resolve_and_cache():
+    """Exported names resolve from the name->module table and are then cached."""
+    mod = importlib.import_module(PKG)
+    for name in mod.__all__:
+        assert getattr(mod, name) is not None
+    assert "Api" in vars(mod)
+    assert "Api" in dir(mod) and "get_mcp_instance" in dir(mod)
@@ -21,7 +21,9 @@ def __init__(self, out: str = "ok", have_bin: bool = True):
     def which(self, name: str):
         return f"/usr/bin/{name}" if self.have_bin else None
 
-    def run(self, argv: list[str], *, check: bool = True) -> str:
+    def run(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> str:
         self.last_argv = argv
         return self.out
 
@@ -125,3 +127,15 @@ def test_mc_and_raw():
 def test_envelope_shape(fn, act):
     res = fn(act, runner=_FakeRunner())
     assert set(["response", "command", "status"]).issubset(res)
+
+
+def test_swapped_default_runner_is_used():
+    from fan_manager import fan_manager as core
+
+    r = _FakeRunner(out="System Power : off")
+    previous = core.set_default_runner(r)
+    try:
+        assert ipmi.power("status")["response"] == "System Power : off"
+        assert r.last_argv[-2:] == ["power", "status"]
+    finally:
+        assert core.set_default_runner(previous) is r
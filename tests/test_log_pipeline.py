@@ -0,0 +1,119 @@
+"""Tests for the queued, rotating, repeat-suppressing log pipeline."""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+
+import pytest
+
+from fan_manager import log_pipeline
+
+
+def _record(msg="Current Temperature: %s", args=(55,), created=0.0, level=20):
+    record = logging.LogRecord("FanManager", level, __file__, 1, msg, args, None)
+    record.created = created
+    return record
+
+
+@pytest.fixture
+def root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield root
+    log_pipeline.shutdown()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_repeat_filter_suppresses_identical_records():
+    f = log_pipeline.RepeatFilter(window=60)
+    assert f.filter(_record(created=0))
+    assert not f.filter(_record(created=1))
+    assert not f.filter(_record(created=2))
+    changed = _record(args=(56,), created=3)
+    assert f.filter(changed) and changed.repeated == 2
+
+
+def test_repeat_filter_reemits_after_window():
+    f = log_pipeline.RepeatFilter(window=10)
+    assert f.filter(_record(created=0))
+    assert f.filter(_record(created=11))
+
+
+def test_repeat_filter_keys_on_template_not_message():
+    f = log_pipeline.RepeatFilter(window=60)
+    assert f.filter(_record(msg="Set fan level to %s", args=(30,)))
+    assert f.filter(_record(msg="Current Temperature: %s", args=(30,)))
+
+
+def test_repeat_filter_accepts_unhashable_messages():
+    f = log_pipeline.RepeatFilter(window=60)
+    assert f.filter(_record(msg={"fan": 30}, args=()))
+    assert not f.filter(_record(msg={"fan": 30}, args=(), created=1))
+    assert f.filter(_record(msg=["fan", 40], args=(), created=2))
+
+    logger = logging.getLogger("FanManager.test-unhashable")
+    logger.addFilter(f)
+    try:
+        logger.warning({"fan": 50})  # must not raise out of the caller
+    finally:
+        logger.removeFilter(f)
+
+
+def test_json_formatter_includes_extras_and_interpolates():
+    line = log_pipeline.JsonFormatter().format(_record(created=12.5))
+    payload = json.loads(line)
+    assert payload["message"] == "Current Temperature: 55"
+    assert payload["logger"] == "FanManager" and payload["level"] == "INFO"
+    record = _record()
+    record.repeated = 4
+    assert json.loads(log_pipeline.JsonFormatter().format(record))["repeated"] == 4
+
+
+def test_producer_never_formats():
+    class Exploding:
+        def __str__(self):
+            raise AssertionError("formatted in the caller's thread")
+
+    handler = log_pipeline.DeferredQueueHandler(log_pipeline.queue.SimpleQueue())
+    record = _record(args=(Exploding(),))
+    handler.emit(record)
+    assert handler.queue.get_nowait() is record and record.args
+
+
+def test_configure_writes_json_lines_and_flushes_on_shutdown(tmp_path, root_logger):
+    log_file = tmp_path / "fan_manager.log"
+    stream = io.StringIO()
+    log_pipeline.configure(str(log_file), stream=stream, repeat_window=60)
+    log = logging.getLogger("FanManager")
+    for _ in range(5):
+        log.info("Set fan level to %s", 30)
+    log.info("Set fan level to %s", 40)
+    log.debug("below the root level")
+    log_pipeline.shutdown()
+
+    lines = [json.loads(x) for x in log_file.read_text().splitlines()]
+    assert [x["message"] for x in lines] == [
+        "Set fan level to 30",
+        "Set fan level to 40",
+    ]
+    assert lines[1]["repeated"] == 4
+    assert "Set fan level to 40" in stream.getvalue()
+
+
+def test_configure_rotates_by_size(tmp_path, root_logger):
+    log_file = tmp_path / "fan_manager.log"
+    log_pipeline.configure(
+        str(log_file), max_bytes=512, backup_count=2, stream=io.StringIO()
+    )
+    log = logging.getLogger("FanManager")
+    for i in range(100):
+        log.info("Current Temperature: %s", i)
+    log_pipeline.shutdown()
+    assert (tmp_path / "fan_manager.log.1").exists()
+    assert not (tmp_path / "fan_manager.log.3").exists()
@@ -0,0 +1,68 @@
+"""Tests for fast-start, manifest-backed deferred tool registration.
+
+The committed manifest must match the real registrations, the stubs must list
+identically to the eager tools, and a stub call must route to the real domain
+implementation (hardware mocked by conftest) without importing any domain at
+registration time.
+"""
+
+import subprocess
+import sys
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from fan_manager.mcp import lazy
+
+
+async def _listing(mcp: FastMCP) -> list[dict]:
+    return [
+        t.to_mcp_tool().model_dump(exclude_none=True)
+        for t in sorted(await mcp.list_tools(), key=lambda t: t.name)
+    ]
+
+
+async def test_manifest_is_up_to_date():
+    """Regenerate with ``python -m fan_manager.mcp.lazy`` when this fails."""
+    assert await lazy.build_manifest() == lazy.load_manifest()
+
+
+@pytest.mark.concept("FAN-001")
+@pytest.mark.concept("FAN-002")
+async def test_lazy_stubs_list_like_eager_tools():
+    eager, fast = FastMCP(name="eager"), FastMCP(name="fast")
+    for domain in lazy.DOMAINS:
+        lazy.domain_registrar(domain)(eager)
+        lazy.lazy_registrar(domain)(fast)
+    assert await _listing(fast) == await _listing(eager)
+
+
+@pytest.mark.concept("FAN-001")
+async def test_lazy_stub_call_routes_to_real_tool():
+    mcp = FastMCP(name="fast")
+    lazy.lazy_registrar("temperature")(mcp)
+    async with Client(mcp) as client:
+        result = await client.call_tool("fan_manager_temperature", {"action": "get"})
+    assert result.structured_content["status"] == 200
+    assert result.structured_content["response"] == 60.0
+
+
+def test_first_resolve_hooks_run_once():
+    calls = []
+    lazy.on_first_resolve(lambda: calls.append(1))
+    lazy._run_first_resolve_hooks()
+    lazy._run_first_resolve_hooks()
+    assert calls == [1]
+
+
+def test_lazy_registration_imports_no_domain(real_subprocess):
+    code = (
+        "import sys; from fastmcp import FastMCP; from fan_manager.mcp import lazy\n"
+        "mcp = FastMCP(name='fast')\n"
+        "for d in lazy.DOMAINS: lazy.lazy_registrar(d)(mcp)\n"
+        "print(','.join(m for m, _ in lazy.DOMAINS.values() if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.strip()
+    assert out == ""
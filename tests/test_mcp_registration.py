@@ -103,9 +103,7 @@ async def test_fan_control_set_routes(mcp: FastMCP):
     """CONCEPT:FAN-002 — the 'set' action returns a 200 envelope (ipmitool mocked)."""
     register_fan_control_tools(mcp)
     fn = await _tool_fn(mcp, "fan_manager_fan_control")
-    result = await fn(
-        action="set", params_json=json.dumps({"fan_level": 40}), ctx=None
-    )
+    result = await fn(action="set", params_json=json.dumps({"fan_level": 40}), ctx=None)
     assert result["status"] == 200
 
 
@@ -172,7 +170,9 @@ def __init__(self, temp: float):
     def which(self, name: str) -> str:
         return f"/usr/bin/{name}"
 
-    def run(self, argv: list[str], *, check: bool = True) -> str:
+    def run(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> str:
         executable = str(argv[0])
         if executable.endswith("sensors"):
             return json.dumps(
@@ -242,7 +242,9 @@ def test_auto_failsafe_to_max_on_sensor_error():
     """CONCEPT:FAN-002 — a temperature read failure fails the fans safe to maximum."""
 
     class _BrokenRunner(_FakeRunner):
-        def run(self, argv: list[str], *, check: bool = True) -> str:
+        def run(
+            self, argv: list[str], *, check: bool = True, timeout: float | None = None
+        ) -> str:
             if str(argv[0]).endswith("sensors"):
                 return ""  # empty -> get_temp raises -> 500 envelope
             return super().run(argv, check=check)
@@ -0,0 +1,187 @@
+"""Tests for the record-and-replay CommandRunners.
+
+Traces are captured from the simulated host and from scripted fakes, then fed
+back through ``run_service`` and ``ipmi.*`` to check that replay reproduces the
+recorded outputs, failures and fan writes without leaking BMC passwords.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import subprocess
+
+import pytest
+
+from fan_manager import ipmi, replay
+from fan_manager.simulator import SimulatedHost, SimulationComplete, Workload
+
+core = importlib.import_module("fan_manager.fan_manager")
+
+TARGET = {"host": "10.0.0.113", "user": "root", "password": "s3cret"}
+
+
+class _ScriptedRunner:
+    """Pops one outcome per ``run``; an exception instance is raised."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+
+    def which(self, name: str):
+        return f"/usr/sbin/{name}"
+
+    def run(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> str:
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+def _argvs(path) -> list[list[str]]:
+    return [e["argv"] for e in replay.load_trace(path) if "argv" in e]
+
+
+def test_trace_is_redacted(tmp_path):
+    trace = tmp_path / "bmc.jsonl"
+    rec = replay.RecordingRunner(_ScriptedRunner("System Power : on", ""), trace)
+    assert ipmi.power("status", target=TARGET, runner=rec)["status"] == 200
+    ipmi.user("set_password", user_id="2", password="hunter2", runner=rec)
+    rec.close()
+    text = trace.read_text()
+    assert "s3cret" not in text and "hunter2" not in text
+    assert _argvs(trace)[1][-1] == replay.MASK
+
+
+@pytest.mark.concept("FAN-002")
+def test_replay_reproduces_run_service(tmp_path):
+    trace = tmp_path / "host.jsonl.gz"
+    host = SimulatedHost(workload=Workload.step(60, 40, 220), seed=7)
+    host.stop_at = 240
+    rec = replay.RecordingRunner(host, trace)
+    with pytest.raises(SimulationComplete):
+        core.run_service(temperature_poll_rate=10, runner=rec, sleep=host.sleep)
+    rec.close()
+
+    recorded = _argvs(trace)
+    rerun_trace = tmp_path / "rerun.jsonl"
+    player = replay.ReplayRunner(trace)
+    rerun = replay.RecordingRunner(player, rerun_trace)
+    with pytest.raises(replay.ReplayComplete):
+        core.run_service(temperature_poll_rate=10, runner=rerun, sleep=player.sleep)
+    rerun.close()
+    assert _argvs(rerun_trace) == recorded
+    assert player.remaining == 0 and player.replayed == len(recorded)
+
+
+def test_failures_replay_as_failures(tmp_path):
+    trace = tmp_path / "flaky.jsonl"
+    rec = replay.RecordingRunner(
+        _ScriptedRunner(
+            subprocess.CalledProcessError(1, ["ipmitool"], "", "Unable to establish"),
+            subprocess.TimeoutExpired(["ipmitool"], 15),
+        ),
+        trace,
+    )
+    assert ipmi.power("off", runner=rec)["status"] == 500
+    assert ipmi.power("on", runner=rec)["status"] == 504
+    rec.close()
+
+    player = replay.ReplayRunner(trace)
+    off = ipmi.power("off", runner=player)
+    assert off["status"] == 500 and player.which("ipmitool") == "/usr/sbin/ipmitool"
+    assert ipmi.power("on", runner=player)["status"] == 504
+    with pytest.raises(replay.ReplayExhausted):
+        player.run(["ipmitool", "chassis", "power", "on"])
+
+
+def test_check_false_returns_recorded_stdout(tmp_path):
+    trace = tmp_path / "rc.jsonl"
+    rec = replay.RecordingRunner(
+        _ScriptedRunner(subprocess.CalledProcessError(1, ["x"], "partial", "")), trace
+    )
+    assert rec.run(["ipmitool", "-V"], check=False) == "partial"
+    rec.close()
+    entry = replay.load_trace(trace)[-1]
+    assert entry["rc"] == 1 and entry["out"] == "partial"
+    assert replay.ReplayRunner(trace).run(["ipmitool", "-V"], check=False) == "partial"
+
+
+def test_speed_scales_recorded_latency(monkeypatch):
+    waits: list[float] = []
+    monkeypatch.setattr(replay.time, "sleep", waits.append)
+    entries = [{"t": 0, "argv": ["sensors", "-j"], "out": "{}", "dur": 0.4}]
+    replay.ReplayRunner(entries, speed=2.0).run(["/usr/bin/sensors", "-j"])
+    replay.ReplayRunner(entries).run(["sensors", "-j"])
+    assert waits == [0.2]
+
+
+def test_loop_restarts_outputs():
+    entries = [{"t": 0, "argv": ["sensors", "-j"], "out": json.dumps({"a": 1})}]
+    player = replay.ReplayRunner(entries, loop=True)
+    assert [player.run(["sensors", "-j"]) for _ in range(3)] == ['{"a": 1}'] * 3
+
+
+@pytest.mark.parametrize("name", ["killed.jsonl", "killed.jsonl.gz"])
+def test_trace_of_a_killed_recorder_loads_up_to_the_cut(tmp_path, name):
+    trace = tmp_path / name
+    rec = replay.RecordingRunner(_ScriptedRunner("one", "two", "three"), trace)
+    rec.run(["ipmitool", "sdr", "1"])
+    rec.run(["ipmitool", "sdr", "2"])
+    cut = trace.stat().st_size
+    rec.run(["ipmitool", "sdr", "3"])
+    # Never closed: the daemon was SIGKILLed part-way through the last entry.
+    data = trace.read_bytes()
+    trace.write_bytes(data[: (cut + len(data)) // 2])
+    assert _argvs(trace) == [["ipmitool", "sdr", "1"], ["ipmitool", "sdr", "2"]]
+    rec.close()
+
+
+def test_session_after_a_killed_gzip_recorder_is_still_read(tmp_path):
+    trace = tmp_path / "sessions.jsonl.gz"
+    killed = replay.RecordingRunner(_ScriptedRunner("one", "two"), trace)
+    killed.run(["ipmitool", "sdr", "1"])
+    killed.run(["ipmitool", "sdr", "2"])
+    killed._file.close()  # SIGKILL: no gzip trailer is written
+    rec = replay.RecordingRunner(_ScriptedRunner("three"), trace)
+    rec.run(["ipmitool", "sdr", "3"])
+    rec.close()
+    killed.close()
+    assert trace.read_bytes().count(b"\x1f\x8b\x08") == 2  # a member per session
+    assert [a[-1] for a in _argvs(trace)] == ["1", "2", "3"]
+
+
+class _StreamingRunner(_ScriptedRunner):
+    def run_stream(self, argv, *, check=True, timeout=None):
+        yield from self.run(argv, check=check, timeout=timeout).splitlines()
+
+
+def test_streamed_commands_are_recorded_and_replayed(tmp_path):
+    trace = tmp_path / "stream.jsonl.gz"
+    sdr = "Fan1 RPM | 3600 RPM | ok\nFan2 RPM | 3720 RPM | ok\nPSU1 | ok"
+    rec = replay.RecordingRunner(_StreamingRunner(sdr, sdr), trace)
+    argv = ["ipmitool", "sdr", "list"]
+    assert list(core.stream_lines(rec, argv)) == sdr.splitlines()
+    first = core.stream_lines(rec, argv)
+    assert next(first).startswith("Fan1")
+    first.close()  # the consumer had what it needed
+    rec.close()
+
+    entries = replay.load_trace(trace)
+    assert [e["out"] for e in entries] == [sdr + "\n", "Fan1 RPM | 3600 RPM | ok\n"]
+    player = replay.ReplayRunner(trace)
+    assert list(core.stream_lines(player, argv)) == sdr.splitlines()
+    assert player.remaining == 1
+
+
+def test_env_installs_runner(tmp_path, monkeypatch):
+    trace = tmp_path / "env.jsonl"
+    monkeypatch.setenv("FAN_MANAGER_RECORD", str(trace))
+    recorder = core._default_runner()
+    assert isinstance(recorder, replay.RecordingRunner)
+    recorder.close()
+    monkeypatch.setenv("FAN_MANAGER_REPLAY", str(trace))
+    monkeypatch.setenv("FAN_MANAGER_REPLAY_SPEED", "4")
+    player = core._default_runner()
+    assert isinstance(player, replay.ReplayRunner) and player.speed == 4.0
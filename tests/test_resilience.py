@@ -0,0 +1,188 @@
+"""Tests for command deadlines, retry policies and per-target circuit breakers.
+
+A scripted fake CommandRunner raises or returns per call, so retry counts,
+breaker transitions and the 503/504 envelopes are exercised without hardware.
+One test runs a real short-lived child to prove the deadline kills it.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import time
+
+import pytest
+
+from fan_manager import ipmi, resilience
+from fan_manager.fan_manager import SubprocessCommandRunner, set_fan
+
+
+class _ScriptedRunner:
+    """Pops one outcome per ``run``; an exception instance is raised."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.timeouts: list[float | None] = []
+
+    def which(self, name: str):
+        return f"/usr/bin/{name}"
+
+    def run(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> str:
+        self.calls += 1
+        self.timeouts.append(timeout)
+        outcome = self.outcomes.pop(0) if self.outcomes else "ok"
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture(autouse=True)
+def _no_backoff(monkeypatch):
+    fast = {
+        k: resilience.RetryPolicy(attempts=p.attempts, timeout=p.timeout, base_delay=0)
+        for k, p in resilience.RETRY_POLICIES.items()
+    }
+    monkeypatch.setattr(resilience, "RETRY_POLICIES", fast)
+
+
+def _fail() -> subprocess.CalledProcessError:
+    return subprocess.CalledProcessError(
+        1, ["ipmitool"], stderr="Error: Unable to establish IPMI v2 / RMCP+ session"
+    )
+
+
+def _refused() -> subprocess.CalledProcessError:
+    """The BMC answered but rejected the request (e.g. an unknown sensor type)."""
+    return subprocess.CalledProcessError(
+        1, ["ipmitool"], stderr="Invalid sensor type: Bogus"
+    )
+
+
+def test_reads_are_retried_with_read_deadline():
+    r = _ScriptedRunner(_fail(), _fail(), "System Power : on")
+    res = ipmi.power("status", runner=r)
+    assert res["status"] == 200 and r.calls == 3
+    assert r.timeouts[0] == resilience.RETRY_POLICIES["read"].timeout
+
+
+def test_destructive_ops_are_never_retried():
+    r = _ScriptedRunner(_fail(), "ok")
+    res = ipmi.power("off", runner=r)
+    assert res["status"] == 500 and r.calls == 1
+    r = _ScriptedRunner(_fail(), "ok")
+    assert ipmi.sel("clear", runner=r)["status"] == 500 and r.calls == 1
+
+
+def test_timeout_surfaces_as_504():
+    r = _ScriptedRunner(*[subprocess.TimeoutExpired(["ipmitool"], 1)] * 3)
+    res = ipmi.sensors("list", runner=r)
+    assert res["status"] == 504
+
+
+def test_breaker_opens_fails_fast_and_reports_stats():
+    target = {"host": "10.0.0.9", "user": "root", "password": "x"}
+    r = _ScriptedRunner(*[_fail()] * 10)
+    for _ in range(5):
+        ipmi.power("off", target=target, runner=r)
+    calls = r.calls
+    res = ipmi.power("status", target=target, runner=r)
+    assert res["status"] == 503 and r.calls == calls  # no process spawned
+    snap = ipmi.stats()["breakers"]["10.0.0.9"]
+    assert snap["state"] == resilience.OPEN and snap["rejected"] >= 1
+    # Other targets are unaffected.
+    assert ipmi.power("status", runner=_ScriptedRunner())["status"] == 200
+
+
+def test_half_open_probe_closes_breaker():
+    now = [0.0]
+    breaker = resilience.CircuitBreaker(
+        "bmc", failure_threshold=1, reset_timeout=10, clock=lambda: now[0]
+    )
+    breaker.record_failure("down")
+    with pytest.raises(resilience.CircuitOpenError):
+        breaker.before_call()
+    now[0] = 11.0
+    breaker.before_call()  # the single half-open probe
+    with pytest.raises(resilience.CircuitOpenError):
+        breaker.before_call()  # concurrent probes are rejected
+    breaker.record_success()
+    assert breaker.state == resilience.CLOSED
+
+
+def test_failed_probe_reopens_breaker():
+    now = [0.0]
+    breaker = resilience.CircuitBreaker(
+        "bmc", failure_threshold=3, reset_timeout=5, clock=lambda: now[0]
+    )
+    for _ in range(3):
+        breaker.record_failure()
+    now[0] = 6.0
+    assert breaker.state == resilience.HALF_OPEN
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+
+
+def test_request_errors_are_not_retried_or_counted():
+    r = _ScriptedRunner(*[_refused()] * 10)
+    for _ in range(6):
+        res = ipmi.sensors("type", sensor_type="Bogus", runner=r)
+        assert res["status"] == 500
+    assert r.calls == 6  # no retries
+    snap = ipmi.stats()["breakers"]["local"]
+    assert snap["state"] == resilience.CLOSED and snap["failures"] == 0
+
+
+@pytest.mark.concept("FAN-002")
+def test_failing_reads_never_block_the_fan_write():
+    r = _ScriptedRunner(*[_fail()] * 15)
+    for _ in range(5):
+        ipmi.sensors("list", runner=r)
+    assert ipmi.stats()["breakers"]["local"]["state"] == resilience.OPEN
+    assert set_fan(40, runner=_ScriptedRunner())["status"] == 200
+
+    fans = resilience.breaker_for(resilience.FAN_TARGET)
+    for _ in range(fans.failure_threshold):
+        fans.record_failure("down")
+    assert set_fan(40, runner=_ScriptedRunner())["status"] == 503
+    assert set_fan(100, runner=_ScriptedRunner())["status"] == 200
+    assert set_fan(70, runner=_ScriptedRunner(), failsafe=True)["status"] == 200
+
+
+@pytest.mark.concept("FAN-002")
+def test_set_fan_retries_once_then_fails():
+    r = _ScriptedRunner(_fail(), _fail())
+    res = set_fan(30, runner=r)
+    assert res["status"] == 500 and r.calls == 2
+
+
+def test_subprocess_runner_kills_on_deadline(real_subprocess):
+    runner = SubprocessCommandRunner(timeout=0.2)
+    started = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        runner.run([sys.executable, "-c", "import time; time.sleep(30)"])
+    assert time.monotonic() - started < 5
+
+
+def test_run_stream_yields_lines_and_stops_the_command_when_closed(real_subprocess):
+    runner = SubprocessCommandRunner(timeout=30)
+    endless = "import itertools\nfor i in itertools.count(): print(i, flush=True)"
+    started = time.monotonic()
+    lines = runner.run_stream([sys.executable, "-c", endless])
+    assert [next(lines) for _ in range(3)] == ["0", "1", "2"]
+    lines.close()  # kills the child rather than waiting for it
+    assert time.monotonic() - started < 5
+
+    failing = "import sys; print('partial'); sys.exit('no SEL')"
+    with pytest.raises(subprocess.CalledProcessError) as info:
+        list(runner.run_stream([sys.executable, "-c", failing]))
+    assert "no SEL" in info.value.stderr
+    with pytest.raises(subprocess.TimeoutExpired):
+        list(
+            runner.run_stream(
+                [sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.2
+            )
+        )
@@ -0,0 +1,141 @@
+"""Tests for the per-target command scheduler.
+
+Jobs are plain callables gated by events, so serialization per target,
+parallelism across targets, lane ordering, the queue bound and the metrics are
+checked without any runner; the last tests go through ``ipmi``/``set_fan``.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import threading
+import time
+
+import pytest
+
+from fan_manager import ipmi, scheduler
+from fan_manager.fan_manager import set_fan
+
+
+def _blocker(q: scheduler.TargetQueue) -> threading.Event:
+    """Occupy ``q``'s worker until the returned event is set."""
+    release, started = threading.Event(), threading.Event()
+
+    def hold():
+        started.set()
+        release.wait(5)
+
+    q.submit(hold, scheduler.READ)
+    assert started.wait(5)
+    return release
+
+
+def test_one_target_is_serialized_targets_run_in_parallel():
+    active: dict[str, int] = {"a": 0, "b": 0}
+    overlap: list[int] = []
+    lock = threading.Lock()
+
+    def job(key):
+        with lock:
+            active[key] += 1
+            overlap.append(active[key])
+        time.sleep(0.05)
+        with lock:
+            active[key] -= 1
+
+    threads = [
+        threading.Thread(target=scheduler.schedule, args=(key, lambda k=key: job(k)))
+        for key in ("a", "b")
+        for _ in range(4)
+    ]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert max(overlap) == 1  # never two jobs at once on one target
+    assert time.monotonic() - started < 0.05 * 8 * 0.9  # a and b overlapped
+
+
+def test_write_lane_jumps_queued_reads():
+    q = scheduler.queue_for("bmc")
+    release = _blocker(q)
+    order: list[str] = []
+    futures = [q.submit(lambda: order.append("sdr list"), scheduler.READ)]
+    futures.append(q.submit(lambda: order.append("sel elist"), scheduler.READ))
+    futures.append(q.submit(lambda: order.append("fan write"), scheduler.WRITE))
+    release.set()
+    for f in futures:
+        f.result(5)
+    assert order == ["fan write", "sdr list", "sel elist"]
+
+
+def test_queue_bound_rejects_reads_but_admits_writes():
+    q = scheduler.TargetQueue("bmc", max_queue=1)
+    release = _blocker(q)
+    q.submit(lambda: None, scheduler.READ)
+    with pytest.raises(scheduler.QueueFullError):
+        q.submit(lambda: None, scheduler.READ)
+    write = q.submit(lambda: "written", scheduler.WRITE)
+    snap = q.snapshot()
+    assert snap["depth"] == 2 and snap["queued"] == {"write": 1, "normal": 0, "read": 1}
+    assert snap["running"] == "read" and snap["rejected"] == 1
+    release.set()
+    assert write.result(5) == "written"
+
+
+def test_errors_propagate_and_nested_calls_run_inline():
+    def outer():
+        return scheduler.schedule("bmc", lambda: "inner")
+
+    assert scheduler.schedule("bmc", outer) == "inner"
+    with pytest.raises(ZeroDivisionError):
+        scheduler.schedule("bmc", lambda: 1 / 0)
+    snap = scheduler.queue_stats()["bmc"]
+    assert snap["completed"] == 1 and snap["failed"] == 1
+    assert snap["wait_ms"]["normal"]["count"] == 2
+
+
+class _Runner:
+    def which(self, name: str):
+        return f"/usr/bin/{name}"
+
+    def run(self, argv, *, check=True, timeout=None):
+        return "ok"
+
+
+def test_retries_are_requeued_so_backoff_never_holds_the_target():
+    order: list[str] = []
+    queued = []
+
+    class _Flaky(_Runner):
+        def run(self, argv, *, check=True, timeout=None):
+            order.append("sdr")
+            if len(order) == 1:
+                queue = scheduler.queue_for("10.0.0.9")
+                queued.append(
+                    queue.submit(lambda: order.append("other"), scheduler.READ)
+                )
+                raise subprocess.CalledProcessError(1, argv, "", "Connection timed out")
+            return "ok"
+
+    res = ipmi.sensors("list", target={"host": "10.0.0.9"}, runner=_Flaky())
+    assert res["status"] == 200 and queued[0].result(5) is None
+    assert order == ["sdr", "other", "sdr"]  # the retry queued behind other work
+    snap = scheduler.queue_stats()["10.0.0.9"]
+    assert snap["failed"] == 1 and snap["completed"] == 2  # one job per attempt
+
+
+def test_full_queue_surfaces_as_429():
+    scheduler.queue_for("10.0.0.9").max_queue = 0
+    res = ipmi.sensors("list", target={"host": "10.0.0.9"}, runner=_Runner())
+    assert res["status"] == 429 and "full" in res["error"]
+    assert ipmi.stats()["queues"]["10.0.0.9"]["rejected"] == 1
+
+
+@pytest.mark.concept("FAN-002")
+def test_set_fan_uses_local_write_lane():
+    scheduler.queue_for("local").max_queue = 0  # reads would be rejected
+    assert set_fan(40, runner=_Runner())["status"] == 200
+    waits = scheduler.queue_stats()["local"]["wait_ms"]
+    assert waits["write"]["count"] == 1
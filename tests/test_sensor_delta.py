@@ -0,0 +1,107 @@
+"""Tests for change-only sensor responses (CONCEPT:FAN-004 ``since`` tokens)."""
+
+from __future__ import annotations
+
+import pytest
+
+from fan_manager import ipmi, sensor_delta
+
+
+def _sdr(rpm="3600", temp="45", fan2="ok", extra=True) -> str:
+    lines = [
+        f"Fan1 RPM         | {rpm} RPM          | ok",
+        f"Fan2 RPM         | 3480 RPM          | {fan2}",
+        f"Temp             | {temp} degrees C      | ok",
+        "Temp             | 38 degrees C      | ok",
+    ]
+    if extra:
+        lines.append("PS Redundancy    | 0x00              | ok")
+    return "\n".join(lines)
+
+
+class _Runner:
+    def __init__(self):
+        self.out = _sdr()
+
+    def which(self, name: str):
+        return f"/usr/bin/{name}"
+
+    def run(self, argv, *, check=True, timeout=None):
+        return self.out
+
+
+def test_parse_sdr_list_type_and_sensor_list():
+    list_ = sensor_delta.parse_readings(_sdr())
+    assert list_["Fan1 RPM"] == {"value": 3600.0, "unit": "RPM", "status": "ok"}
+    assert list_["Temp#2"]["value"] == 38.0
+    assert list_["PS Redundancy"] == {
+        "value": "0x00",
+        "unit": "discrete",
+        "status": "ok",
+    }
+
+    typed = sensor_delta.parse_readings(
+        "Inlet Temp       | 04h | ok  |  7.1 | 23 degrees C\n"
+        "Exhaust Temp     | 01h | ns  |  7.1 | No Reading"
+    )
+    assert typed["Inlet Temp"]["value"] == 23.0
+    assert typed["Exhaust Temp"] == {"value": None, "unit": "", "status": "ns"}
+
+    full = sensor_delta.parse_readings(
+        "Fan1 RPM | 3600.000 | RPM | ok | na | 360.000 | 600.000 | na | na | na"
+    )
+    assert full["Fan1 RPM"] == {"value": 3600.0, "unit": "RPM", "status": "ok"}
+
+
+@pytest.mark.concept("FAN-004")
+def test_since_returns_only_changes_and_no_change_fast_path():
+    r = _Runner()
+    first = ipmi.sensors("list", runner=r)
+    assert first["response"].startswith("Fan1 RPM") and first["token"]
+
+    same = ipmi.sensors("list", runner=r, since=first["token"])
+    assert same["token"] == first["token"]
+    assert same["response"] == {"changed": {}, "removed": [], "unchanged": 5}
+
+    r.out = _sdr(rpm="3700", temp="45.5")  # both within tolerance
+    quiet = ipmi.sensors("list", runner=r, since=first["token"])
+    assert quiet["response"]["changed"] == {} and quiet["token"] == first["token"]
+
+    r.out = _sdr(rpm="3760", fan2="cr", extra=False)
+    delta = ipmi.sensors("list", runner=r, since=first["token"])
+    assert set(delta["response"]["changed"]) == {"Fan1 RPM", "Fan2 RPM"}
+    assert delta["response"]["removed"] == ["PS Redundancy"]
+    assert delta["token"] != first["token"]
+
+    again = ipmi.sensors("list", runner=r, since=delta["token"])
+    assert again["response"]["changed"] == {} and again["response"]["removed"] == []
+
+
+def test_drift_accumulates_against_the_clients_view():
+    r = _Runner()
+    token = ipmi.sensors("list", runner=r)["token"]
+    for rpm in ("3680", "3710"):
+        r.out = _sdr(rpm=rpm)
+        res = ipmi.sensors("list", runner=r, since=token)
+        token = res["token"]
+    assert res["response"]["changed"] == {}
+    r.out = _sdr(rpm="3730")  # 130 RPM from what the client last saw
+    assert (
+        "Fan1 RPM" in ipmi.sensors("list", runner=r, since=token)["response"]["changed"]
+    )
+
+
+def test_unknown_or_foreign_token_resyncs():
+    r = _Runner()
+    local = ipmi.sensors("list", runner=r)["token"]
+    res = ipmi.sensors("list", runner=r, since="bogus")
+    assert res["resync"] is True and isinstance(res["response"], str)
+    remote = ipmi.sensors("list", target={"host": "10.0.0.9"}, runner=r, since=local)
+    assert remote["resync"] is True
+
+
+def test_store_is_bounded():
+    store = sensor_delta.SnapshotStore(max_snapshots=2)
+    tokens = [store.put(("local",), {}) for _ in range(3)]
+    assert store.get(tokens[0], ("local",)) is None
+    assert store.get(tokens[2], ("local",)) == {}
@@ -22,7 +22,9 @@ def __init__(self, temp: float = 60.0):
     def which(self, name: str) -> str:
         return f"/usr/bin/{name}"
 
-    def run(self, argv: list[str], *, check: bool = True) -> str:
+    def run(
+        self, argv: list[str], *, check: bool = True, timeout: float | None = None
+    ) -> str:
         if str(argv[0]).endswith("sensors"):
             return json.dumps(
                 {"coretemp-isa-0000": {"Core 0": {"temp1_input": self._temp}}}
@@ -0,0 +1,83 @@
+"""Tests for the simulated thermal host (CONCEPT:FAN-001/FAN-002 closed loop).
+
+The simulator is itself a CommandRunner, so these tests run the real
+``get_temp``/``set_fan``/``run_service`` code against it and check that the
+plant, the BMC raw-command handling and the closed-loop metrics behave.
+"""
+
+from __future__ import annotations
+
+import importlib
+import subprocess
+
+import pytest
+
+from fan_manager import simulator
+from fan_manager.simulator import SimulatedHost, ThermalModel, Workload
+
+core = importlib.import_module("fan_manager.fan_manager")
+
+
+def test_workload_segments():
+    w = Workload.square(period=100, low=40, high=200, cycles=2, start=50)
+    assert [w.power(t) for t in (0, 60, 110, 160, 260)] == [40, 200, 40, 200, 40]
+    assert Workload.step(300, 40, 160).last_change == 300
+
+
+@pytest.mark.concept("FAN-002")
+def test_bmc_honours_manual_mode_only():
+    host = SimulatedHost()
+    assert core.set_fan(80, runner=host)["status"] == 200
+    assert host.manual and host.duty == [80.0] * host.model.fans
+    host.run(["ipmitool", "raw", "0x30", "0x30", "0x01", "0x01"])  # back to auto
+    host.run(["ipmitool", "raw", "0x30", "0x30", "0x02", "0xff", "0x0a"])
+    host.advance(1)
+    assert host.duty == [host.model.auto_duty] * host.model.fans
+    with pytest.raises(subprocess.CalledProcessError):
+        host.run(["ipmitool", "raw", "0x06", "0x01"])
+
+
+@pytest.mark.concept("FAN-001")
+def test_sensors_report_noisy_whole_degrees():
+    host = SimulatedHost(seed=3)
+    res = core.get_temp(runner=host)
+    assert res["status"] == 200
+    assert res["response"] == int(res["response"])
+    assert abs(res["response"] - host.max_temperature()) <= 3
+
+
+def test_more_airflow_runs_cooler():
+    temps = {}
+    for duty in (10, 90):
+        host = SimulatedHost(workload=Workload.constant(200))
+        core.set_fan(duty, runner=host)
+        host.advance(600)
+        temps[duty] = host.max_temperature()
+        assert host.rpm[0] == pytest.approx(host._target_rpm(duty), rel=1e-3)
+    assert temps[90] < temps[10] - 10
+
+
+@pytest.mark.concept("FAN-002")
+def test_closed_loop_settles_and_counts_writes():
+    host = SimulatedHost(workload=Workload.step(300, 40, 200))
+    report = simulator.run_closed_loop(host, 1200, temperature_poll_rate=10)
+    assert host.now == pytest.approx(1200)
+    assert report.fan_writes == 120  # one write per tick
+    assert report.settling_time is not None and report.settling_time < 600
+    assert report.peak_temperature >= report.final_temperature
+    assert 0 < report.mean_duty < 100
+    assert report.duty_integral == pytest.approx(report.mean_duty * 1200)
+    assert report.error_integral > 0  # the step takes a while to settle
+
+
+def test_compare_is_deterministic_per_seed():
+    configs = {"default": {}, "linear": {"temperature_power": 1}}
+    model = ThermalModel(noise=1.0)
+    a = simulator.compare(configs, Workload.step(200, 40, 200), 900, model=model)
+    b = simulator.compare(configs, Workload.step(200, 40, 200), 900, model=model)
+    assert {k: r.as_dict() for k, r in a.items()} == {
+        k: r.as_dict() for k, r in b.items()
+    }
+    # A linear curve spends more fan duty to run cooler than the default x^5.
+    assert a["linear"].mean_duty > a["default"].mean_duty
+    assert a["linear"].final_temperature < a["default"].final_temperature
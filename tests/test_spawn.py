@@ -0,0 +1,97 @@
+"""Tests for the posix_spawn and fork-server runners.
+
+Both run real short-lived ``python -c`` children (the ``real_subprocess``
+fixture lifts the hardware mocks) and must honour the same contract as
+``SubprocessCommandRunner``: stdout back, ``CalledProcessError`` with stderr,
+the process group killed at the deadline.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from fan_manager import spawn
+
+FAILING = [sys.executable, "-c", "import sys; print('partial'); sys.exit('no SEL')"]
+SLEEPER = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+@pytest.fixture(params=["posix_spawn", "forkserver"])
+def runner(request, real_subprocess):
+    runner = spawn.runner_for(request.param, timeout=10)
+    yield runner
+    if isinstance(runner, spawn.ForkServerRunner):
+        runner.close()
+
+
+def test_runner_matches_the_subprocess_contract(runner):
+    assert runner.run([sys.executable, "-c", "print('hello')"]) == "hello\n"
+    with pytest.raises(subprocess.CalledProcessError) as info:
+        runner.run(FAILING)
+    assert info.value.returncode == 1 and "no SEL" in info.value.stderr
+    assert runner.run(FAILING, check=False) == "partial\n"
+    with pytest.raises(FileNotFoundError):
+        runner.run(["/nonexistent/ipmitool", "sel", "elist"])
+
+    started = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        runner.run(SLEEPER, timeout=0.2)
+    assert time.monotonic() - started < 5
+
+
+def test_posix_spawn_streams_and_stops_on_close(real_subprocess):
+    runner = spawn.PosixSpawnRunner(timeout=30)
+    endless = "import itertools\nfor i in itertools.count(): print(i, flush=True)"
+    lines = runner.run_stream([sys.executable, "-c", endless])
+    assert [next(lines) for _ in range(3)] == ["0", "1", "2"]
+    lines.close()
+    with pytest.raises(subprocess.CalledProcessError):
+        list(runner.run_stream(FAILING))
+
+
+def test_fork_server_runs_commands_concurrently_and_restarts(real_subprocess):
+    runner = spawn.ForkServerRunner(timeout=10)
+    try:
+        nap = [sys.executable, "-c", "import time; time.sleep(0.5); print('up')"]
+        results: list[str] = []
+        threads = [
+            threading.Thread(target=lambda: results.append(runner.run(nap)))
+            for _ in range(4)
+        ]
+        started = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == ["up\n"] * 4 and time.monotonic() - started < 1.5
+        assert runner.starts == 1
+
+        os.kill(runner.pid, signal.SIGKILL)
+        deadline = time.monotonic() + 5
+        while runner.pid is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert runner.run([sys.executable, "-c", "print(2)"]) == "2\n"
+        assert runner.starts == 2
+    finally:
+        runner.close()
+
+
+def test_fork_server_replies_even_when_a_request_fails(real_subprocess):
+    replies: list[str] = []
+    binary = [sys.executable, "-c", "import sys; sys.stdout.buffer.write(b'\\xff')"]
+    spawn._handle({"id": 7, "argv": binary}, replies.append)
+    (reply,) = (json.loads(r) for r in replies)
+    assert reply["id"] == 7 and "UnicodeDecodeError" in reply["error"]
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError, match="Unknown spawn mode"):
+        spawn.runner_for("vfork")
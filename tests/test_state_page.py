@@ -0,0 +1,136 @@
+"""Tests for the daemon's shared-memory state page (CONCEPT:FAN-001/FAN-002).
+
+The real ``run_service`` loop publishes into a page under ``tmp_path`` while
+driving a simulated host; readers map the same file.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+from fastmcp import FastMCP
+
+from fan_manager import simulator, state_page
+from fan_manager.mcp.mcp_temperature import register_temperature_tools
+from fan_manager.state_page import StatePublisher, StateReader, read_state
+
+
+def test_round_trip_and_empty_page(tmp_path):
+    path = str(tmp_path / "state")
+    assert read_state(path) is None  # no file yet
+    pub = StatePublisher(path)
+    assert StateReader(path).read() is None  # mapped, nothing published
+    pub.publish(
+        level=42,
+        mode="curve",
+        temperature=61.5,
+        zones={"coretemp-isa-0000": 61.5, "coretemp-isa-0001": 58.0},
+        timestamp=1000.0,
+    )
+    state = read_state(path)
+    assert (state.tick, state.level, state.mode, state.temperature) == (
+        1,
+        42,
+        "curve",
+        61.5,
+    )
+    assert state.zones == {"coretemp-isa-0000": 61.5, "coretemp-isa-0001": 58.0}
+    assert state.timestamp == 1000.0
+
+    pub.publish(level=None, mode="error", temperature=None)
+    state = read_state(path)  # same cached mapping sees the new tick
+    assert (state.tick, state.level, state.mode, state.temperature) == (
+        2,
+        None,
+        "error",
+        None,
+    )
+    assert state.zones == {}
+
+
+def test_restarted_daemon_is_seen_through_an_existing_mapping(tmp_path):
+    path = str(tmp_path / "state")
+    StatePublisher(path).publish(level=10, mode="curve", temperature=50.0)
+    reader = StateReader(path)
+    assert reader.read().level == 10
+    StatePublisher(path).publish(level=90, mode="failsafe", temperature=None)
+    state = reader.read()
+    assert (state.tick, state.level, state.mode) == (1, 90, "failsafe")
+
+
+def test_readers_never_see_a_torn_tick(tmp_path):
+    path = str(tmp_path / "state")
+    pub = StatePublisher(path)
+    pub.publish(level=0, mode="curve", temperature=0.0, zones={"a": 0.0})
+    stop = threading.Event()
+
+    def write():
+        i = 0
+        while not stop.is_set():
+            i = (i + 1) % 100
+            pub.publish(
+                level=i,
+                mode="curve",
+                temperature=float(i),
+                zones={"a": float(i), "b": float(i)},
+            )
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    reader = StateReader(path)
+    try:
+        for _ in range(5000):
+            s = reader.read()
+            assert s.temperature == s.level == s.zones["a"]
+            assert len(s.zones) == 1 or s.zones["b"] == s.level
+    finally:
+        stop.set()
+        writer.join()
+
+
+@pytest.mark.concept("FAN-002")
+def test_run_service_publishes_each_tick(tmp_path):
+    path = str(tmp_path / "state")
+    host = simulator.SimulatedHost(workload=simulator.Workload.constant(200.0))
+    simulator.run_closed_loop(host, 240, state_path=path)
+    state = read_state(path)
+    assert state.tick == 10
+    assert state.mode == "curve" and 5 <= state.level <= 100
+    assert set(state.zones) == {"coretemp-isa-0000", "coretemp-isa-0001"}
+    assert state.temperature == max(state.zones.values())
+
+
+def test_status_command(tmp_path, capsys):
+    path = str(tmp_path / "state")
+    assert state_page.main(["--state-file", path]) == 1
+    assert "no state published" in capsys.readouterr().out
+
+    StatePublisher(path).publish(
+        level=35, mode="verified", temperature=64.0, zones={"cpu0": 64.0}
+    )
+    assert state_page.main(["--state-file", path]) == 0
+    out = capsys.readouterr().out
+    assert "mode=verified level=35% temperature=64.0C" in out
+    assert "cpu0: 64.0C" in out
+
+    assert state_page.main(["--state-file", path, "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["level"] == 35
+    assert state_page.main(["--state-file", path, "--max-age", "-1"]) == 1
+
+
+@pytest.mark.concept("FAN-001")
+async def test_temperature_tool_reads_the_state_page(tmp_path):
+    mcp = FastMCP(name="test-state")
+    register_temperature_tools(mcp)
+    tool = await mcp.get_tool("fan_manager_temperature")
+    path = str(tmp_path / "state")
+    params = json.dumps({"path": path})
+    res = await tool.fn(action="state", params_json=params, ctx=None)
+    assert res["status"] == 404
+
+    StatePublisher(path).publish(level=20, mode="curve", temperature=55.0)
+    res = await tool.fn(action="state", params_json=params, ctx=None)
+    assert res["status"] == 200
+    assert res["response"]["level"] == 20 and res["response"]["temperature"] == 55.0
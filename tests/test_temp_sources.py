@@ -0,0 +1,153 @@
+"""Tests for the temperature source chain (CONCEPT:FAN-001).
+
+Selection and backoff run over scripted sources with a fake clock and timer;
+the fallback tests use the simulated host, whose BMC answers
+``sdr type Temperature``.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from fan_manager import simulator
+from fan_manager.fan_manager import auto_set_fan_speed
+from fan_manager.temp_sources import (
+    Source,
+    SourceChain,
+    build_chain,
+    parse_sdr_temperatures,
+)
+
+SDR = """\
+Inlet Temp       | 04h | ok  |  7.1 | 23 degrees C
+Exhaust Temp     | 01h | ok  |  7.1 | 38 degrees C
+Temp             | 0Eh | ok  |  3.1 | 61 degrees C
+Temp             | 0Fh | ok  |  3.2 | 57 degrees C
+CPU1 VR Temp     | 30h | ok  | 20.1 | 49 degrees C
+Fan1 RPM         | 30h | ok  |  7.1 | 3600 RPM
+"""
+
+
+def test_sdr_keeps_processor_entities_and_cpu_names():
+    assert parse_sdr_temperatures(SDR) == {
+        "sdr.3.1": 61.0,
+        "sdr.3.2": 57.0,
+        "CPU1 VR Temp": 49.0,
+    }
+
+
+class _Scripted:
+    """A source whose latency and result the test sets per call."""
+
+    def __init__(self, clock: list[float], temp: float, cost: float):
+        self.clock, self.temp, self.cost, self.calls = clock, temp, cost, 0
+        self.error: str | None = None
+
+    def __call__(self):
+        self.calls += 1
+        self.clock[1] += self.cost
+        if self.error:
+            return {
+                "response": None,
+                "command": "x",
+                "status": 500,
+                "error": self.error,
+            }
+        return {"response": self.temp, "command": "x", "status": 200, "zones": {}}
+
+
+def _chain(**costs: float):
+    clock = [0.0, 0.0]  # [monotonic, perf counter]
+    reads = {
+        name: _Scripted(clock, 50.0 + i, cost)
+        for i, (name, cost) in enumerate(costs.items())
+    }
+    chain = SourceChain(
+        [Source(name, read) for name, read in reads.items()],
+        backoff=5.0,
+        max_backoff=20.0,
+        clock=lambda: clock[0],
+        timer=lambda: clock[1],
+    )
+    return chain, reads, clock
+
+
+def test_fastest_healthy_source_serves_and_failures_back_off():
+    chain, reads, clock = _chain(sensors=0.2, sdr=0.05)
+    first = chain.read()
+    assert (first["source"], first["latency_ms"]) == ("sensors", 200.0)
+    assert chain.read()["source"] == "sdr"  # each source is measured once
+    assert chain.read()["source"] == "sdr"  # then the faster one serves
+    assert [s.name for s in chain.order()] == ["sdr", "sensors"]
+
+    reads["sdr"].error = "Unable to establish IPMI v2 / RMCP+ session"
+    fallback = chain.read()
+    assert (fallback["source"], fallback["response"]) == ("sensors", 50.0)
+    assert chain.order()[0].name == "sensors"
+    reads["sdr"].error = None
+    clock[0] += 4.0
+    assert chain.read()["source"] == "sensors"  # sdr still backing off
+    clock[0] += 1.0
+    assert chain.read()["source"] == "sdr"
+
+    reads["sdr"].temp = 0.0  # implausible: demoted like an error
+    assert chain.read()["source"] == "sensors"
+    stats = chain.stats()["sources"]["sdr"]
+    assert stats["healthy"] is False and stats["retry_in"] == 5.0
+    assert stats["last_error"] == "implausible reading 0.0"
+    assert stats["served"] == 3 and stats["errors"] == 2
+
+
+def test_backoff_doubles_and_every_failure_is_reported():
+    chain, reads, clock = _chain(sensors=0.1)
+    reads["sensors"].error = "boom"
+    delays = []
+    for _ in range(4):
+        res = chain.read()
+        delays.append(chain.sources[0].retry_at - clock[0])
+        clock[0] = chain.sources[0].retry_at
+    assert delays == [5.0, 10.0, 20.0, 20.0]
+    assert res == {
+        "response": None,
+        "command": "temperature sources",
+        "status": 503,
+        "error": "sensors: boom",
+    }
+    with pytest.raises(ValueError, match="Unknown temperature source"):
+        build_chain(["ipmi"])
+    with pytest.raises(ValueError, match="needs a BMC target"):
+        build_chain(["sdr-oob"])
+
+
+class _NoSensors(simulator.SimulatedHost):
+    def which(self, name):
+        return None if name == "sensors" else super().which(name)
+
+
+@pytest.mark.concept("FAN-001")
+@pytest.mark.concept("FAN-002")
+def test_bmc_sdr_keeps_the_curve_running_without_lm_sensors():
+    host = _NoSensors(workload=simulator.Workload.constant(60.0))
+    assert auto_set_fan_speed(runner=host)["mode"] == "failsafe"
+    assert host.duty == [100.0] * host.model.fans
+
+    chain = build_chain(["sensors", "sdr"], runner=host)
+    tick = auto_set_fan_speed(runner=host, sources=chain)
+    assert (tick["mode"], tick["source"]) == ("curve", "sdr")
+    assert tick["level"] < 100 and set(tick["zones"]) == {"sdr.3.1", "sdr.3.2"}
+    assert chain.stats()["sources"]["sensors"]["healthy"] is False
+
+
+@pytest.mark.concept("FAN-001")
+def test_closed_loop_measures_each_source_and_records_it():
+    host = simulator.SimulatedHost(workload=simulator.Workload.constant(120.0))
+    ticks = []
+    simulator.run_closed_loop(
+        host,
+        120,
+        temperature_sources=["sensors", "hwmon", "sdr"],
+        on_tick=ticks.append,
+    )
+    sources = [t["source"] for t in ticks]
+    assert sources[:3] == ["sensors", "hwmon", "sdr"]  # chain order, once each
+    assert all(t["mode"] == "curve" for t in ticks)
@@ -0,0 +1,97 @@
+"""Tests for throttle avoidance (CONCEPT:FAN-002).
+
+Counter files come from a dict-backed ``read`` or the simulated host, whose
+``thermal_throttle`` counters count crossings of ``throttle_temperature``.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from fan_manager import simulator
+from fan_manager.fan_manager import auto_set_fan_speed
+from fan_manager.state_page import read_state
+from fan_manager.throttle import ThrottleGuard
+
+ROOT = "/sys/devices/system/cpu"
+
+
+class _Files(dict):
+    def __call__(self, path: str) -> str:
+        try:
+            return self[path]
+        except KeyError:
+            raise FileNotFoundError(path) from None
+
+
+def _host_files(core=(0, 0, 0, 0), package=(0, 0)) -> _Files:
+    files = _Files(
+        {"/proc/stat": "cpu 0 0 0 0\n" + "".join(f"cpu{i} 0 0 0 0\n" for i in range(4))}
+    )
+    for i in range(4):
+        files[f"{ROOT}/cpu{i}/topology/physical_package_id"] = str(i // 2)
+        files[f"{ROOT}/cpu{i}/thermal_throttle/core_throttle_count"] = str(core[i])
+        files[f"{ROOT}/cpu{i}/thermal_throttle/package_throttle_count"] = str(
+            package[i // 2]
+        )
+    return files
+
+
+def test_counters_are_summed_per_core_and_deduplicated_per_package():
+    guard = ThrottleGuard(read=_host_files(core=(1, 2, 3, 4), package=(5, 7)))
+    assert guard.read_counts() == {
+        "core_throttle": 10,
+        "package_throttle": 12,
+        "core_power_limit": 0,  # absent on this host
+        "package_power_limit": 0,
+    }
+
+
+def test_any_increase_escalates_and_the_ceiling_relaxes_when_quiet():
+    files = _host_files()
+    guard = ThrottleGuard(step=3.0, relax_after=2, relax_step=1.0, read=files)
+    assert guard.poll() is False  # primes the counters
+    for cpu in ("cpu2", "cpu3"):  # every CPU of a package reports its count
+        files[f"{ROOT}/{cpu}/thermal_throttle/package_throttle_count"] = "1"
+    assert guard.poll() is True
+    assert guard.maximum_temperature(80, 50) == 77.0
+    assert guard.poll() is False and guard.offset == 3.0
+    assert guard.poll() is False and guard.offset == 2.0
+    assert guard.stats()["escalations"] == 1
+
+    guard.offset = 40.0
+    assert guard.maximum_temperature(80, 50) == 51.0  # never below the floor
+
+
+@pytest.mark.concept("FAN-002")
+def test_tick_escalates_fans_on_throttle():
+    host = simulator.SimulatedHost(workload=simulator.Workload.constant(60.0))
+    files = _host_files()
+    guard = ThrottleGuard(read=files)
+    tick = auto_set_fan_speed(runner=host, throttle=guard)
+    assert tick["mode"] == "curve" and tick["level"] < 100
+    files[f"{ROOT}/cpu0/thermal_throttle/core_throttle_count"] = "4"
+    tick = auto_set_fan_speed(runner=host, throttle=guard)
+    assert (tick["mode"], tick["level"]) == ("throttle", 100)
+    assert tick["throttle"]["core_throttle"] == 4
+    assert tick["throttle"]["maximum"] == 77.0
+    assert host.duty == [100.0] * host.model.fans
+
+
+@pytest.mark.concept("FAN-002")
+def test_avoidance_mode_throttles_less_on_a_hot_plant(tmp_path):
+    model = simulator.ThermalModel(throttle_temperature=72.0)
+    workload = simulator.Workload.square(300, 40, 300, 3, start=300)
+    throttles = {}
+    for name, extra in (("curve", {}), ("avoid", {"avoid_throttle": True})):
+        host = simulator.SimulatedHost(workload=workload, model=model)
+        path = str(tmp_path / name)
+        simulator.run_closed_loop(host, 1500, state_path=path, **extra)
+        throttles[name] = sum(map(sum, host.core_throttles))
+        state = read_state(path)
+    assert throttles["avoid"] < throttles["curve"] * 0.75
+    assert state.throttle["throttle_events"] == throttles["avoid"] + sum(
+        host.package_throttles
+    )
+    assert state.throttle["escalations"] > 0
+    assert state.throttle["maximum_temperature"] < 80
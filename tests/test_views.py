@@ -0,0 +1,258 @@
+"""Tests for server-side filtering/projection of IPMI tool responses.
+
+Parsers and selection are checked on canned ``ipmitool`` output; the last tests
+go through the registered MCP tools with a fake default runner.
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from fastmcp import FastMCP
+
+from fan_manager import fan_manager as core
+from fan_manager import views
+from fan_manager.mcp.mcp_ipmi import register_ipmi_tools
+
+
+def _sdr(n_fans: int = 12, n_temps: int = 8) -> str:
+    lines = [
+        f"Fan{i} RPM         | {3600 + 10 * i} RPM          | ok" for i in range(n_fans)
+    ]
+    lines += [
+        f"Temp{i}           | {40 + i} degrees C      | ok" for i in range(n_temps)
+    ]
+    lines += [
+        "Inlet Temp       | 23 degrees C      | ok",
+        "Exhaust Temp     | 61 degrees C      | cr",
+        "Pwr Consumption  | 182 Watts         | ok",
+        "Voltage 1        | 232 Volts         | ok",
+        "PS Redundancy    | 0x00              | ok",
+        "Intrusion        | 0x00              | ns",
+    ]
+    return "\n".join(lines)
+
+
+SEL = """\
+   1 | 06/10/2026 | 10:22:01 | Temperature #0x30 | Upper Critical going high | Reading 85 > Threshold 80 degrees C | Asserted
+   2 | 06/10/2026 | 10:25:13 | Temperature #0x30 | Upper Critical going high | Reading 70 < Threshold 80 degrees C | Deasserted
+   3 | 06/11/2026 | 02:00:40 | Power Supply #0x61 | Failure detected | Asserted
+   4 | 06/11/2026 | 02:01:02 | Fan #0x33 | Lower Critical going low | Asserted"""
+
+LAN = """\
+Set in Progress         : Set Complete
+IP Address Source       : Static Address
+IP Address              : 10.0.0.110
+MAC Address             : 4c:d9:8f:00:00:01
+Cipher Suite Priv Max   : Xaaaaaaaaaaaaaa
+                        :     X=Cipher Suite Unused"""
+
+USERS = """\
+ID  Name\t     Callin  Link Auth\tIPMI Msg   Channel Priv Limit
+1                    true    false      false      NO ACCESS
+2   root             true    true       true       ADMINISTRATOR
+3   monitor          true    false      true       USER"""
+
+
+def test_sensor_rows_infer_type_and_filter():
+    rows, total = views.select(views.sensor_rows(_sdr()), {"name": "*temp*"})
+    assert total == 10
+    assert rows[-1] == {
+        "name": "Exhaust Temp",
+        "value": 61.0,
+        "unit": "degrees C",
+        "status": "cr",
+        "type": "Temperature",
+    }
+    fans, _ = views.select(views.sensor_rows(_sdr()), {"type": "fan,power"})
+    assert {r["type"] for r in fans} == {"Fan", "Power"} and len(fans) == 13
+    bad, _ = views.select(views.sensor_rows(_sdr()), {"status": "!ok"})
+    assert [r["name"] for r in bad] == ["Exhaust Temp", "Intrusion"]
+
+
+def test_paging_projection_and_table_encoding():
+    rows, total = views.select(
+        views.sensor_rows(_sdr()),
+        {"type": "Fan", "offset": 10, "limit": 5, "fields": "name,value"},
+    )
+    assert total == 12 and rows == [
+        {"name": "Fan10 RPM", "value": 3700.0},
+        {"name": "Fan11 RPM", "value": 3710.0},
+    ]
+    assert views.encode(rows, "table") == {
+        "columns": ["name", "value"],
+        "rows": [["Fan10 RPM", 3700.0], ["Fan11 RPM", 3710.0]],
+    }
+    assert views.encode([], "table") == {"columns": [], "rows": []}
+
+
+def test_sel_field_and_user_parsers():
+    sel = views.sel_rows(SEL)
+    assert sel[0]["type"] == "Temperature" and sel[0]["state"] == "Asserted"
+    assert sel[0]["event"].startswith("Upper Critical going high | Reading 85")
+    assert sel[2] == {
+        "id": "3",
+        "date": "06/11/2026",
+        "time": "02:00:40",
+        "sensor": "Power Supply #0x61",
+        "type": "Power Supply",
+        "event": "Failure detected",
+        "state": "Asserted",
+    }
+    lan = views.field_rows(LAN)
+    assert {"field": "IP Address", "value": "10.0.0.110"} in lan
+    assert lan[-1]["value"] == "Xaaaaaaaaaaaaaa, X=Cipher Suite Unused"
+    users = views.user_rows(USERS)
+    assert users[1] == {
+        "id": "2",
+        "name": "root",
+        "callin": "true",
+        "link_auth": "true",
+        "ipmi_msg": "true",
+        "priv": "ADMINISTRATOR",
+    }
+    assert users[0]["name"] == ""
+
+
+def test_shape_passthrough_and_errors():
+    env = {"response": _sdr(), "command": "ipmitool sdr list", "status": 200}
+    assert views.shape(env, "sensors", {}) is env
+    failed = {"response": None, "command": "x", "status": 500, "error": "boom"}
+    assert views.shape(failed, "sensors", {"limit": 1}) is failed
+    bad = views.shape(env, "sensors", {"limit": -1})
+    assert bad["status"] == 400 and "limit" in bad["error"]
+    bad = views.shape(env, "sensors", {"format": "csv"})
+    assert bad["status"] == 400 and "format" in bad["error"]
+
+
+@pytest.mark.concept("FAN-004")
+def test_since_delta_is_filtered():
+    delta = {
+        "changed": {
+            "Fan1 RPM": {"value": 3900.0, "unit": "RPM", "status": "ok"},
+            "Exhaust Temp": {"value": 66.0, "unit": "degrees C", "status": "cr"},
+        },
+        "removed": [],
+        "unchanged": 18,
+    }
+    env = {"response": delta, "command": "ipmitool sdr list", "status": 200}
+    res = views.shape(env, "sensors", {"type": "Temperature", "limit": 1})
+    assert list(res["response"]["changed"]) == ["Exhaust Temp"]
+    assert res["response"]["unchanged"] == 18
+    bad = views.shape(env, "sensors", {"type": 5})
+    assert bad["status"] == 400 and bad["response"] is None
+
+
+class _Runner:
+    def __init__(self, outputs: dict[str, str]):
+        self.outputs = outputs
+
+    def which(self, name: str):
+        return f"/usr/bin/{name}"
+
+    def run(self, argv, *, check=True, timeout=None):
+        return next(out for key, out in self.outputs.items() if key in " ".join(argv))
+
+
+@pytest.fixture
+def tools(monkeypatch):
+    runner = _Runner({"sdr": _sdr(), "sel": SEL, "lan": LAN, "user": USERS})
+    monkeypatch.setattr(core, "_DEFAULT_RUNNER", runner)
+    mcp = FastMCP(name="test-views")
+    register_ipmi_tools(mcp)
+
+    async def call(tool_name: str, action: str, **params):
+        tool = await mcp.get_tool(tool_name)
+        return await tool.fn(action=action, params_json=json.dumps(params), ctx=None)
+
+    return call
+
+
+@pytest.mark.concept("FAN-004")
+async def test_sensors_tool_filters_before_serialization(tools):
+    raw = await tools("fan_manager_sensors", "list")
+    assert isinstance(raw["response"], str)
+    hot = await tools(
+        "fan_manager_sensors",
+        "list",
+        status="cr",
+        fields=["name", "value"],
+        format="table",
+    )
+    assert hot["response"] == {
+        "columns": ["name", "value"],
+        "rows": [["Exhaust Temp", 61.0]],
+    }
+    assert hot["total"] == 1 and hot["returned"] == 1
+    assert len(json.dumps(hot["response"])) * 10 < len(json.dumps(raw["response"]))
+
+
+@pytest.mark.concept("FAN-005")
+@pytest.mark.concept("FAN-007")
+async def test_sel_and_bmc_tools_accept_view_options(tools):
+    sel = await tools("fan_manager_sel", "elist", type="Temperature", limit=1)
+    assert sel["response"][0]["id"] == "1"
+    assert sel["total"] is None and sel["more"] is True  # stopped at the 2nd match
+    sel = await tools("fan_manager_sel", "elist", type="Temperature", limit=5)
+    assert sel["total"] == 2 and sel["more"] is False
+    lan = await tools("fan_manager_bmc", "lan_print", name="ip address*")
+    assert [r["field"] for r in lan["response"]] == ["IP Address Source", "IP Address"]
+    users = await tools("fan_manager_bmc", "user_list", name="?*", fields="id,priv")
+    assert users["response"] == [
+        {"id": "2", "priv": "ADMINISTRATOR"},
+        {"id": "3", "priv": "USER"},
+    ]
+
+
+class _StreamingRunner:
+    """Yields a long SEL line by line and records how far it was read."""
+
+    def __init__(self, entries: int):
+        self.entries, self.read, self.closed = entries, 0, False
+
+    def which(self, name: str):
+        return f"/usr/bin/{name}"
+
+    def run(self, argv, *, check=True, timeout=None):
+        raise AssertionError("listing should be streamed")
+
+    def run_stream(self, argv, *, check=True, timeout=None):
+        try:
+            for i in range(1, self.entries + 1):
+                self.read += 1
+                sensor = "Temperature #0x30" if i % 100 == 0 else "Fan #0x31"
+                yield f"{i:4x} | 06/10/2026 | 10:22:01 | {sensor} | Lower Critical | Asserted"
+        finally:
+            self.closed = self.read < self.entries
+
+
+@pytest.mark.concept("FAN-005")
+def test_sel_view_stops_reading_once_the_page_is_full():
+    from fan_manager import ipmi
+
+    runner = _StreamingRunner(100_000)
+    res = ipmi.sel("elist", runner=runner, view={"type": "Temperature", "limit": 2})
+    assert [r["id"] for r in res["response"]] == ["64", "c8"]
+    assert res["total"] is None and res["more"] is True
+    assert runner.read == 300 and runner.closed
+
+    runner = _StreamingRunner(1_000)
+    res = ipmi.sel("elist", runner=runner, view={"type": "Temperature", "offset": 8})
+    assert res["total"] == 10 and res["returned"] == 2 and res["more"] is False
+    assert not runner.closed
+    bad = ipmi.sel("elist", runner=runner, view={"format": "csv"})
+    assert bad["status"] == 400 and runner.read == 1_000  # rejected before running
+
+
+def test_sel_view_drains_an_out_of_band_stream_instead_of_killing_it():
+    from fan_manager import ipmi
+
+    runner = _StreamingRunner(10_000)
+    bmc = {"host": "10.0.0.113", "user": "root", "password": "calvin"}
+    res = ipmi.sel(
+        "elist", target=bmc, runner=runner, view={"type": "Temperature", "limit": 2}
+    )
+    assert [r["id"] for r in res["response"]] == ["64", "c8"]
+    # ipmitool runs to its normal exit, so it closes the lanplus session.
+    assert runner.read == 10_000 and not runner.closed
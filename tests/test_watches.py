@@ -0,0 +1,223 @@
+"""Tests for server-side threshold watches (CONCEPT:FAN-004).
+
+Evaluation and the shared sampler are driven synchronously with
+``sample_once``; the last test lets the background thread push a notification
+to an in-process MCP client.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import subprocess
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from fan_manager import fan_manager as core
+from fan_manager import resilience, views, watches
+from fan_manager.mcp.mcp_ipmi import register_ipmi_tools
+
+
+def _sdr(temp: float = 45, fan: int = 3600) -> str:
+    return "\n".join(
+        [
+            f"Fan1 RPM         | {fan} RPM          | ok",
+            "Fan2 RPM         | 3480 RPM          | ok",
+            f"Exhaust Temp     | {temp} degrees C      | ok",
+            "Inlet Temp       | 23 degrees C      | ok",
+        ]
+    )
+
+
+class _Runner:
+    def __init__(self):
+        self.out = _sdr()
+        self.calls: list[list[str]] = []
+
+    def which(self, name: str):
+        return f"/usr/bin/{name}"
+
+    def run(self, argv, *, check=True, timeout=None):
+        self.calls.append(list(argv))
+        return self.out
+
+
+def test_watch_trips_and_clears_with_hysteresis():
+    w = watches.Watch("w1", 80.0, type="Temperature", hysteresis=3.0)
+    assert w.evaluate(views.sensor_rows(_sdr(temp=79))) == []
+    (tripped,) = w.evaluate(views.sensor_rows(_sdr(temp=82)))
+    assert tripped["event"] == "tripped" and tripped["sensor"] == "Exhaust Temp"
+    assert w.evaluate(views.sensor_rows(_sdr(temp=85))) == []  # still tripped
+    assert w.evaluate(views.sensor_rows(_sdr(temp=78))) == []  # inside hysteresis
+    (cleared,) = w.evaluate(views.sensor_rows(_sdr(temp=76)))
+    assert cleared["event"] == "cleared" and w.tripped == {}
+
+    low = watches.Watch("w2", 1200, op="<", name="Fan*")
+    assert [e["sensor"] for e in low.evaluate(views.sensor_rows(_sdr(fan=900)))] == [
+        "Fan1 RPM"
+    ]
+    with pytest.raises(ValueError):
+        watches.Watch("w3", 1, op="!=")
+
+
+def test_one_read_per_target_for_many_watches():
+    r = _Runner()
+    sampler = watches.WatchSampler(interval=3600, runner=r)
+    seen = []
+    sampler.add(80, type="Temperature", notify=seen.append)
+    sampler.add(1200, op="<", name="Fan*")
+    sampler.add(70, name="Exhaust*", target={"host": "10.0.0.9"})
+    r.out = _sdr(temp=82)
+    events = sampler.sample_once()
+    assert len(r.calls) == 2  # local + 10.0.0.9, not one per watch
+    assert [(e["watch"], e["target"]) for e in events] == [
+        ("w1", "local"),
+        ("w3", "10.0.0.9"),
+    ]
+    assert seen == [events[0]] and events[0]["seq"] == 1
+    assert sampler.events(since=1) == [events[1]]
+    assert sampler.stats()["reads"] == 2 and sampler.stats()["running"]
+    assert sampler.events(since=2, wait=0.01) == []
+    for w in ("w1", "w2", "w3"):
+        assert sampler.remove(w)
+    assert not sampler.remove("w1")
+    sampler.stop()
+
+
+def test_read_failures_are_reported_per_watch():
+    class _Down(_Runner):
+        def run(self, argv, *, check=True, timeout=None):
+            raise RuntimeError("BMC unreachable")
+
+    sampler = watches.WatchSampler(interval=3600, runner=_Down())
+    sampler.add(80)
+    assert sampler.sample_once() == []
+    assert "unreachable" in sampler.snapshot()[0]["last_error"]
+    sampler.stop()
+
+
+def test_watches_expire_and_share_reads_only_with_equal_credentials():
+    class _Flaky(_Runner):
+        down = False
+
+        def run(self, argv, *, check=True, timeout=None):
+            if self.down:
+                raise subprocess.CalledProcessError(1, argv, "", "Connection timed out")
+            return super().run(argv)
+
+    now = [0.0]
+    r = _Flaky()
+    sampler = watches.WatchSampler(interval=3600, runner=r, clock=lambda: now[0])
+    bmc = {"host": "10.0.0.9", "user": "root", "password": "a"}
+    sampler.add(80, target=bmc, ttl=60)
+    sampler.add(80, target={**bmc, "user": "ops"}, ttl=120)
+    sampler.sample_once()
+    assert len(r.calls) == 2  # one read per credential set, not per host
+    assert {c[c.index("-U") + 1] for c in r.calls} == {"root", "ops"}
+
+    r.down = True
+    for _ in range(3):
+        sampler.sample_once()
+    stats = resilience.breaker_stats()
+    assert stats["10.0.0.9:watch"]["state"] == "open"
+    assert "10.0.0.9" not in stats  # interactive commands are unaffected
+
+    now[0] = 90.0
+    sampler.sample_once()
+    assert [w["id"] for w in sampler.snapshot()] == ["w2"]
+    now[0] = 120.0
+    sampler.sample_once()
+    assert sampler.snapshot() == [] and sampler.stats()["expired"] == 2
+    with pytest.raises(ValueError):
+        sampler.add(80, ttl=0)
+    sampler.stop()
+
+
+def test_gone_subscriber_drops_its_watch():
+    def gone(event):
+        raise RuntimeError("Event loop is closed")
+
+    r = _Runner()
+    sampler = watches.WatchSampler(interval=3600, runner=r)
+    sampler.add(80, type="Temperature", notify=gone)
+    r.out = _sdr(temp=90)
+    assert len(sampler.sample_once()) == 1
+    assert sampler.snapshot() == []
+    sampler.stop()
+
+
+def test_a_broken_watch_does_not_stop_the_others():
+    r = _Runner()
+    sampler = watches.WatchSampler(interval=3600, runner=r)
+    with pytest.raises(ValueError, match="comma-separated"):
+        sampler.add(80, type=5)
+    broken = sampler.add(80, type="Temperature")
+    good = sampler.add(80, name="Exhaust*")
+    broken.type = 5  # slipped past validation
+    r.out = _sdr(temp=90)
+    assert [e["watch"] for e in sampler.sample_once()] == [good.id]
+    assert "ViewError" in sampler.snapshot()[0]["last_error"]
+    assert sampler.snapshot()[1]["last_error"] is None
+    sampler.stop()
+
+
+async def test_watch_add_rejects_an_invalid_filter():
+    mcp = FastMCP(name="test-watch")
+    register_ipmi_tools(mcp)
+    tool = await mcp.get_tool("fan_manager_watch")
+    params = json.dumps({"threshold": 80, "type": 5})
+    res = await tool.fn(action="add", params_json=params, ctx=None)
+    assert res["status"] == 400 and watches.sampler().snapshot() == []
+
+
+@pytest.mark.parametrize("params", [{"wait": "soon"}, {"since": "w1"}])
+async def test_events_rejects_malformed_arguments(params):
+    mcp = FastMCP(name="test-watch")
+    register_ipmi_tools(mcp)
+    tool = await mcp.get_tool("fan_manager_watch")
+    res = await tool.fn(action="events", params_json=json.dumps(params), ctx=None)
+    assert res["status"] == 400
+
+
+@pytest.mark.concept("FAN-004")
+@pytest.mark.filterwarnings("ignore:The logging capability is deprecated")
+async def test_watch_tool_pushes_log_notification(monkeypatch):
+    r = _Runner()
+    r.out = _sdr(temp=90)
+    monkeypatch.setattr(core, "_DEFAULT_RUNNER", r)
+    monkeypatch.setattr(watches, "_sampler", watches.WatchSampler(interval=0.02))
+    mcp = FastMCP(name="test-watch")
+    register_ipmi_tools(mcp)
+    received: asyncio.Queue = asyncio.Queue()
+
+    async def on_log(message):
+        await received.put(message)
+
+    # Session-based handshake: sessionless clients get no unsolicited pushes.
+    async with Client(mcp, log_handler=on_log, mode="legacy") as client:
+        added = await client.call_tool(
+            "fan_manager_watch",
+            {
+                "action": "add",
+                "params_json": json.dumps({"threshold": 85, "type": "Temperature"}),
+            },
+        )
+        assert added.data["status"] == 200
+        message = await asyncio.wait_for(received.get(), 5)
+        assert message.level == "warning"
+        assert message.data["sensor"] == "Exhaust Temp"
+        listed = await client.call_tool("fan_manager_watch", {"action": "list"})
+        assert listed.data["response"]["watches"][0]["tripped"] == {
+            "Exhaust Temp": 90.0
+        }
+        events = await client.call_tool(
+            "fan_manager_watch",
+            {"action": "events", "params_json": json.dumps({"wait": 1})},
+        )
+        assert events.data["response"][0]["event"] == "tripped"
+        removed = await client.call_tool(
+            "fan_manager_watch",
+            {"action": "remove", "params_json": json.dumps({"id": "w1"})},
+        )
+        assert removed.data["status"] == 200